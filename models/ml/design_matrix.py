@@ -0,0 +1,147 @@
+"""
+Float32 design-matrix builder shared by training and inference.
+
+Feature frames are copied column by column straight into one preallocated C-contiguous
+float32 array in the registry's `feature_columns` order, so peak memory stays close to a
+single copy of the features. Missing values stay NaN (LightGBM handles them natively) and
+absent columns are NaN-filled. Matrices can be cached on disk as `.npy` and reopened as
+read-only memmaps, so every horizon of a ticker reuses the same array.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.utils import ensure_directory
+
+ID_COLUMNS = ("date", "ticker", "day_id")
+LABEL_PREFIX = "target_state_"
+
+
+def select_feature_columns(features: pd.DataFrame, exclude: Sequence[str] = ()) -> List[str]:
+    """
+    Numeric model inputs: everything except identifiers, label columns and `exclude`.
+    """
+    skip = set(ID_COLUMNS) | set(exclude)
+    return [
+        c
+        for c in features.columns
+        if c not in skip and not c.startswith(LABEL_PREFIX) and pd.api.types.is_numeric_dtype(features[c])
+    ]
+
+
+def build_design_matrix(features: pd.DataFrame, feature_columns: Sequence[str]) -> np.ndarray:
+    out = np.empty((len(features), len(feature_columns)), dtype=np.float32)
+    for j, col in enumerate(feature_columns):
+        if col in features:
+            out[:, j] = features[col].to_numpy(dtype=np.float32, na_value=np.nan)
+        else:
+            out[:, j] = np.nan
+    return out
+
+
+def build_panel_design_matrix(
+    frames: Mapping[str, pd.DataFrame],
+    feature_columns: Sequence[str],
+) -> Tuple[np.ndarray, Dict[str, slice]]:
+    """
+    Stack several tickers into one float32 matrix without an intermediate concat.
+
+    Returns:
+        The matrix and a mapping ticker -> row slice.
+    """
+    total = sum(len(df) for df in frames.values())
+    out = np.empty((total, len(feature_columns)), dtype=np.float32)
+    offsets: Dict[str, slice] = {}
+    row = 0
+    for ticker, df in frames.items():
+        block = out[row : row + len(df)]
+        for j, col in enumerate(feature_columns):
+            if col in df:
+                block[:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+            else:
+                block[:, j] = np.nan
+        offsets[ticker] = slice(row, row + len(df))
+        row += len(df)
+    return out, offsets
+
+
+def file_version(path: str | Path) -> str:
+    """Cheap data version for a source file: size plus modification time."""
+    stat = Path(path).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+class DesignMatrixCache:
+    """
+    On-disk `.npy` cache of design matrices keyed by (name, feature columns, data version),
+    with an in-process memo so repeated lookups return the same memmap.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = ensure_directory(cache_dir)
+        self._memo: Dict[str, Tuple[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(feature_columns: Sequence[str], data_version: str) -> str:
+        h = hashlib.blake2b(digest_size=8)
+        h.update("\x1f".join(feature_columns).encode("utf-8"))
+        h.update(b"\x1e")
+        h.update(data_version.encode("utf-8"))
+        return h.hexdigest()
+
+    def path_for(self, name: str, feature_columns: Sequence[str], data_version: str) -> Path:
+        return self.cache_dir / f"{name}_{self._digest(feature_columns, data_version)}.npy"
+
+    def get(
+        self,
+        name: str,
+        features: pd.DataFrame,
+        feature_columns: Sequence[str],
+        data_version: Optional[str] = None,
+    ) -> np.ndarray:
+        if data_version is None:
+            return build_design_matrix(features, feature_columns)
+
+        digest = self._digest(feature_columns, data_version)
+        with self._lock:
+            memo = self._memo.get(name)
+            if memo is not None and memo[0] == digest:
+                self.hits += 1
+                return memo[1]
+
+        path = self.cache_dir / f"{name}_{digest}.npy"
+        if path.exists():
+            self.hits += 1
+        else:
+            self.misses += 1
+            matrix = build_design_matrix(features, feature_columns)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp.open("wb") as f:
+                np.save(f, matrix)
+            os.replace(tmp, path)
+            del matrix
+            for stale in self.cache_dir.glob(f"{name}_{'?' * len(digest)}.npy"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+        mapped = np.load(path, mmap_mode="r")
+        with self._lock:
+            self._memo[name] = (digest, mapped)
+        return mapped
+
+
+__all__ = [
+    "select_feature_columns",
+    "build_design_matrix",
+    "build_panel_design_matrix",
+    "file_version",
+    "DesignMatrixCache",
+]
@@ -0,0 +1,206 @@
+"""
+Warm-start retraining helpers: drift checks, refit-vs-continue decisions, and a benchmark
+comparing incremental boosting against a full refit.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from models.ml.design_matrix import build_design_matrix
+from models.ml.lightgbm_next_state import TrainResult, predict_proba, train_model
+
+
+@dataclass
+class DriftReport:
+    needs_refit: bool
+    reasons: List[str] = field(default_factory=list)
+    max_mean_shift: float = 0.0
+    shifted_features: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RetrainResult:
+    result: TrainResult
+    mode: str
+    drift: DriftReport
+
+
+def detect_drift(
+    previous: TrainResult,
+    recent: pd.DataFrame,
+    label_col: str,
+    mean_shift_threshold: float = 0.5,
+    max_std_ratio: float = 2.0,
+) -> DriftReport:
+    """
+    Decide whether recent data has drifted far enough from the previous training set that
+    continuing the existing booster is unsafe.
+
+    Checks, in order: reference statistics available, feature columns present, label classes
+    unchanged, and per-feature standardized mean shift / volatility ratio within bounds.
+    """
+    reasons: List[str] = []
+    if previous.feature_mean is None or previous.feature_std is None:
+        return DriftReport(needs_refit=True, reasons=["no reference feature statistics"])
+
+    missing = [c for c in previous.feature_columns if c not in recent.columns]
+    if missing:
+        reasons.append(f"missing feature columns: {missing}")
+
+    counts = recent[label_col].value_counts()
+    recent_classes = set(int(c) for c in counts[counts >= 2].index)
+    if recent_classes != set(int(c) for c in previous.classes_):
+        reasons.append("label classes changed")
+
+    present = [c for c in previous.feature_columns if c in recent.columns]
+    idx = [previous.feature_columns.index(c) for c in present]
+    ref_mean = previous.feature_mean[idx]
+    ref_std = previous.feature_std[idx]
+    values = build_design_matrix(recent, present)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cur_mean = np.nanmean(values, axis=0, dtype=np.float64)
+        cur_std = np.nanstd(values, axis=0, dtype=np.float64, ddof=1)
+        safe_std = np.where(ref_std > 0, ref_std, np.nan)
+        shift = np.abs(cur_mean - ref_mean) / safe_std
+        ratio = cur_std / safe_std
+    shift = np.nan_to_num(shift, nan=0.0)
+    ratio = np.nan_to_num(ratio, nan=1.0)
+    vol_break = (ratio > max_std_ratio) | (ratio < 1.0 / max_std_ratio)
+    shifted = [c for c, s, v in zip(present, shift, vol_break) if s > mean_shift_threshold or v]
+    if shifted:
+        reasons.append(f"feature distribution drift in {len(shifted)} columns")
+
+    return DriftReport(
+        needs_refit=bool(reasons),
+        reasons=reasons,
+        max_mean_shift=float(shift.max()) if shift.size else 0.0,
+        shifted_features=shifted,
+    )
+
+
+def retrain_model(
+    features: pd.DataFrame,
+    label_col: str,
+    params: Dict,
+    previous: Optional[TrainResult] = None,
+    extra_rounds: int = 50,
+    recent_rows: int = 250,
+    mean_shift_threshold: float = 0.5,
+    max_std_ratio: float = 2.0,
+    test_size: float = 0.2,
+    design_matrix: Optional[np.ndarray] = None,
+    feature_columns: Optional[List[str]] = None,
+) -> RetrainResult:
+    """
+    Continue boosting `previous` on the most recent rows, or refit from scratch when there
+    is no previous model or the drift checks fail. `design_matrix`/`feature_columns` are an
+    optional prebuilt matrix used for the full refit.
+    """
+    if previous is None:
+        drift = DriftReport(needs_refit=True, reasons=["no previous model"])
+    else:
+        recent = features.tail(recent_rows)
+        drift = detect_drift(
+            previous,
+            recent,
+            label_col,
+            mean_shift_threshold=mean_shift_threshold,
+            max_std_ratio=max_std_ratio,
+        )
+
+    if drift.needs_refit:
+        result = train_model(
+            features,
+            label_col=label_col,
+            params=params,
+            test_size=test_size,
+            design_matrix=design_matrix,
+            feature_columns=feature_columns,
+        )
+        return RetrainResult(result=result, mode="full", drift=drift)
+
+    result = train_model(
+        features.tail(recent_rows),
+        label_col=label_col,
+        params=params,
+        test_size=test_size,
+        init_model=previous,
+        extra_rounds=extra_rounds,
+    )
+    return RetrainResult(result=result, mode="warm_start", drift=drift)
+
+
+def _log_loss(proba: np.ndarray, classes: np.ndarray, y: np.ndarray, eps: float = 1e-15) -> float:
+    class_index = {int(c): i for i, c in enumerate(classes)}
+    cols = np.array([class_index.get(int(label), -1) for label in y])
+    picked = np.where(cols >= 0, proba[np.arange(len(y)), np.clip(cols, 0, None)], 0.0)
+    return float(-np.mean(np.log(np.clip(picked, eps, 1.0))))
+
+
+def benchmark_warm_start(
+    features: pd.DataFrame,
+    label_col: str,
+    params: Dict,
+    extra_rounds: int = 50,
+    recent_rows: int = 250,
+    holdout_rows: int = 250,
+    test_size: float = 0.2,
+) -> Dict[str, float]:
+    """
+    Compare wall time and holdout log-loss of a full refit against a warm start.
+
+    The frame is split chronologically into base | recent | holdout. A prior model is trained
+    on base, then (a) refit from scratch on base+recent and (b) continued on recent only.
+    Both are scored on the untouched holdout rows.
+    """
+    if len(features) <= recent_rows + holdout_rows:
+        raise ValueError("Not enough rows for base/recent/holdout split in warm-start benchmark.")
+
+    ordered = features.sort_values("date") if "date" in features else features
+    history = ordered.iloc[:-holdout_rows]
+    holdout = ordered.iloc[-holdout_rows:]
+    base = history.iloc[:-recent_rows]
+    recent = history.iloc[-recent_rows:]
+
+    prior = train_model(base, label_col=label_col, params=params, test_size=test_size)
+
+    start = time.perf_counter()
+    full = train_model(history, label_col=label_col, params=params, test_size=test_size)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warm = train_model(
+        recent,
+        label_col=label_col,
+        params=params,
+        test_size=test_size,
+        init_model=prior,
+        extra_rounds=extra_rounds,
+    )
+    warm_seconds = time.perf_counter() - start
+
+    y_holdout = holdout[label_col].to_numpy()
+    full_proba = predict_proba(full.model, full.scaler, holdout, full.feature_columns)
+    warm_proba = predict_proba(warm.model, warm.scaler, holdout, warm.feature_columns)
+    return {
+        "full_seconds": full_seconds,
+        "warm_seconds": warm_seconds,
+        "speedup": full_seconds / warm_seconds if warm_seconds > 0 else float("inf"),
+        "full_logloss": _log_loss(full_proba, full.classes_, y_holdout),
+        "warm_logloss": _log_loss(warm_proba, warm.classes_, y_holdout),
+        "rows_full": int(len(history)),
+        "rows_warm": int(len(recent)),
+    }
+
+
+__all__ = [
+    "DriftReport",
+    "RetrainResult",
+    "detect_drift",
+    "retrain_model",
+    "benchmark_warm_start",
+]
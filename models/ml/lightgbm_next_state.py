@@ -1,32 +1,101 @@
 """
 LightGBM classifier utilities for next-state prediction.
+
+lightgbm and scikit-learn are imported inside train_model only. Scoring goes through the
+registry loader (which imports lightgbm when it reads a booster), so importing this module
+for predictions does not load either library up front.
 """
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
 
-import lightgbm as lgb
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 
-from models.ml.model_registry import ModelKey, save_model, load_model
+from models.ml.design_matrix import build_design_matrix, select_feature_columns
+from models.ml.model_registry import (
+    ModelKey,
+    RegisteredModel,
+    load_registered_model,
+    save_registered_model,
+)
+from src.core.telemetry import traced
+
+if TYPE_CHECKING:
+    import lightgbm as lgb
+    from sklearn.preprocessing import StandardScaler
+
+
+@dataclass
+class ScalerParams:
+    """
+    Array-backed replacement for a fitted StandardScaler, restored from registry artifacts.
+    """
+
+    mean_: np.ndarray
+    scale_: np.ndarray
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
 
 
 @dataclass
 class TrainResult:
-    model: lgb.LGBMClassifier
-    scaler: StandardScaler
+    model: Union[lgb.LGBMClassifier, lgb.Booster]
+    scaler: Optional[Union[StandardScaler, ScalerParams]]
     feature_columns: List[str]
     classes_: np.ndarray
+    feature_mean: Optional[np.ndarray] = None
+    feature_std: Optional[np.ndarray] = None
+    lineage: List[Dict] = field(default_factory=list)
+
+
+def _booster(model: Union[lgb.LGBMClassifier, lgb.Booster]) -> lgb.Booster:
+    # booster_ is a property of the sklearn wrapper class only; checking the class avoids
+    # importing lightgbm just to tell the two apart
+    return model.booster_ if hasattr(type(model), "booster_") else model
+
+
+def _lineage_entry(mode: str, rows: int, rounds: int, num_trees: int, revision: int) -> Dict:
+    return {
+        "revision": revision,
+        "mode": mode,
+        "rows": int(rows),
+        "rounds": int(rounds),
+        "num_trees": int(num_trees),
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def _prepare_xy(
+    features: pd.DataFrame,
+    label_col: str,
+    feature_columns: Optional[List[str]] = None,
+    design_matrix: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Return the float32 design matrix, labels and feature column order for rows with a label.
+    A prebuilt `design_matrix` (row-aligned with `features`) is reused instead of rebuilt.
+    """
+    if feature_columns is None:
+        feature_columns = select_feature_columns(features, exclude=[label_col])
+    y = features[label_col].to_numpy()
+    keep = ~pd.isna(y)
 
+    # Drop labels with too few samples to avoid unseen classes in validation
+    labels, counts = np.unique(y[keep], return_counts=True)
+    rare = labels[counts < 2]
+    if len(rare) > 0:
+        keep &= ~np.isin(y, rare)
 
-def _prepare_xy(features: pd.DataFrame, label_col: str, drop_cols: Iterable[str]) -> Tuple[pd.DataFrame, pd.Series]:
-    drop_set = set(drop_cols)
-    X = features.drop(columns=[c for c in features.columns if c in drop_set])
-    y = features[label_col]
-    return X, y
+    if design_matrix is None:
+        X = build_design_matrix(features[keep] if not keep.all() else features, feature_columns)
+    else:
+        X = np.asarray(design_matrix[keep] if not keep.all() else design_matrix)
+    return X, y[keep].astype(int), list(feature_columns)
 
 
 def train_model(
@@ -35,63 +104,193 @@ def train_model(
     params: Dict,
     test_size: float = 0.2,
     random_state: int = 42,
+    init_model: Optional[TrainResult] = None,
+    extra_rounds: Optional[int] = None,
+    design_matrix: Optional[np.ndarray] = None,
+    feature_columns: Optional[List[str]] = None,
 ) -> TrainResult:
-    # Drop labels with too few samples to avoid unseen classes in validation
-    label_counts = features[label_col].value_counts()
-    rare_labels = label_counts[label_counts < 2].index
-    if len(rare_labels) > 0:
-        features = features[~features[label_col].isin(rare_labels)]
+    """
+    Train a LightGBM classifier, or continue boosting from `init_model` on new data.
+
+    Inputs go through the shared float32 design-matrix builder; trees need no scaling, so
+    new models carry `scaler=None`. When `init_model` is given its feature columns (and
+    scaler, for legacy models) are reused and `extra_rounds` trees (default:
+    params["n_estimators"]) are appended to its booster. The warm-start data must contain
+    exactly the previous model's classes. Warm starts also carry the drift reference
+    statistics (feature_mean/feature_std) forward unchanged, so the reference is only
+    reset by a full refit and slow drift still accumulates against it.
+    """
+    import lightgbm as lgb
+    from sklearn.model_selection import train_test_split
 
-    if features.empty:
+    if init_model is not None:
+        feature_columns = list(init_model.feature_columns)
+    X, y, feature_columns = _prepare_xy(features, label_col, feature_columns, design_matrix)
+    if len(y) == 0:
         raise ValueError("Not enough samples after dropping rare labels for training.")
 
-    X, y = _prepare_xy(features, label_col, drop_cols=["date", "ticker"])
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X.fillna(0.0))
-    X_scaled_df = pd.DataFrame(X_scaled, columns=X.columns, index=X.index)
+    scaler = None
+    if init_model is not None:
+        new_classes = set(int(c) for c in np.unique(y))
+        old_classes = set(int(c) for c in init_model.classes_)
+        if new_classes != old_classes:
+            raise ValueError(
+                f"Warm-start classes {sorted(new_classes)} differ from previous model {sorted(old_classes)}"
+            )
+        scaler = init_model.scaler
+        params = {**params, "n_estimators": extra_rounds or params.get("n_estimators", 100)}
 
-    # Stratify only if all classes have at least 2 samples
-    value_counts = y.value_counts()
-    stratify = y if (value_counts.min() >= 2 and len(value_counts) > 1) else None
+    if init_model is not None and init_model.feature_mean is not None and init_model.feature_std is not None:
+        feature_mean, feature_std = init_model.feature_mean, init_model.feature_std
+    else:
+        with np.errstate(invalid="ignore"):
+            feature_mean = np.nanmean(X, axis=0, dtype=np.float64)
+            feature_std = np.nanstd(X, axis=0, dtype=np.float64, ddof=1)
+    if scaler is not None:
+        X = scaler.transform(np.nan_to_num(X, nan=0.0))
 
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_scaled_df, y, test_size=test_size, random_state=random_state, stratify=stratify
+    # Stratify only if all classes have at least 2 samples
+    _, counts = np.unique(y, return_counts=True)
+    stratify = y if (counts.min() >= 2 and len(counts) > 1) else None
+    train_idx, val_idx = train_test_split(
+        np.arange(len(y)), test_size=test_size, random_state=random_state, stratify=stratify
     )
 
     clf = lgb.LGBMClassifier(**params)
-    clf.fit(X_train, y_train, eval_set=[(X_val, y_val)])
+    init_booster = _booster(init_model.model) if init_model is not None else None
+    clf.fit(
+        X[train_idx],
+        y[train_idx],
+        eval_set=[(X[val_idx], y[val_idx])],
+        feature_name=feature_columns,
+        init_model=init_booster,
+    )
+
+    num_trees = clf.booster_.num_trees()
+    if init_model is None:
+        lineage = [_lineage_entry("full", len(train_idx), num_trees, num_trees, revision=1)]
+    else:
+        prior_trees = init_booster.num_trees()
+        lineage = list(init_model.lineage) + [
+            _lineage_entry(
+                "warm_start",
+                len(train_idx),
+                num_trees - prior_trees,
+                num_trees,
+                revision=len(init_model.lineage) + 1,
+            )
+        ]
 
-    return TrainResult(model=clf, scaler=scaler, feature_columns=list(X.columns), classes_=clf.classes_)
+    return TrainResult(
+        model=clf,
+        scaler=scaler,
+        feature_columns=feature_columns,
+        classes_=clf.classes_,
+        feature_mean=feature_mean,
+        feature_std=feature_std,
+        lineage=lineage,
+    )
 
 
+@traced("ml")
 def predict_proba(
-    model: lgb.LGBMClassifier,
-    scaler: StandardScaler,
-    features: pd.DataFrame,
+    model: Union[lgb.LGBMClassifier, lgb.Booster],
+    scaler: Optional[Union[StandardScaler, ScalerParams]],
+    features: Union[pd.DataFrame, np.ndarray],
     feature_columns: List[str],
 ) -> np.ndarray:
-    X = features.copy()
-    missing = [c for c in feature_columns if c not in X.columns]
-    for c in missing:
-        X[c] = 0.0
-    X = X[feature_columns]
-    X_scaled = scaler.transform(X.fillna(0.0))
-    X_scaled = pd.DataFrame(X_scaled, columns=feature_columns, index=X.index)
-    return model.predict_proba(X_scaled)
+    """
+    Class probabilities for a feature frame or a prebuilt design matrix in `feature_columns`
+    order. Legacy models with a fitted scaler keep their zero-fill + scale preprocessing.
+    """
+    if isinstance(features, np.ndarray):
+        X = features
+    else:
+        X = build_design_matrix(features, feature_columns)
+    if scaler is not None:
+        X = np.asarray(scaler.transform(np.nan_to_num(X, nan=0.0)))
+    proba = _booster(model).predict(X)
+    if proba.ndim == 1:
+        proba = np.column_stack([1.0 - proba, proba])
+    return proba
+
+
+STATE_COLUMNS = {
+    -3: "prob_state_m3",
+    -2: "prob_state_m2",
+    -1: "prob_state_m1",
+    0: "prob_state_0",
+    1: "prob_state_p1",
+    2: "prob_state_p2",
+    3: "prob_state_p3",
+}
+
+
+def build_prediction_frame(
+    dates: Iterable,
+    ticker: str,
+    horizon: int,
+    model_name: str,
+    proba: np.ndarray,
+    classes: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Convert a probability matrix into PredictionRow-shaped records (one row per input row).
+    States the model never saw get NaN probabilities.
+    """
+    classes = np.asarray(classes)
+    pred_idx = proba.argmax(axis=1) if len(proba) else np.zeros(0, dtype=int)
+    out = pd.DataFrame(
+        {
+            "date": list(dates),
+            "ticker": ticker,
+            "horizon": horizon,
+            "model_name": model_name,
+            "pred_state": classes[pred_idx].astype(int),
+            "prob_pred_state": proba[np.arange(len(proba)), pred_idx].astype(float),
+        }
+    )
+    class_pos = {int(c): i for i, c in enumerate(classes)}
+    for state, col in STATE_COLUMNS.items():
+        out[col] = proba[:, class_pos[state]].astype(float) if state in class_pos else np.nan
+    return out
 
 
 def save_trained_model(train_result: TrainResult, artifacts_dir: str, key: ModelKey):
-    payload = {
-        "model": train_result.model,
-        "scaler": train_result.scaler,
-        "feature_columns": train_result.feature_columns,
-        "classes_": train_result.classes_,
+    booster = _booster(train_result.model)
+    metadata = {
+        "feature_columns": list(train_result.feature_columns),
+        "classes": [int(c) for c in train_result.classes_],
+        "num_trees": int(booster.num_trees()),
+        "revision": len(train_result.lineage),
+        "lineage": list(train_result.lineage),
     }
-    return save_model(payload, artifacts_dir, key)
+    arrays = {}
+    if train_result.scaler is not None:
+        arrays["scaler_mean"] = np.asarray(train_result.scaler.mean_, dtype=np.float64)
+        arrays["scaler_scale"] = np.asarray(train_result.scaler.scale_, dtype=np.float64)
+    if train_result.feature_mean is not None and train_result.feature_std is not None:
+        arrays["feature_mean"] = np.asarray(train_result.feature_mean, dtype=np.float64)
+        arrays["feature_std"] = np.asarray(train_result.feature_std, dtype=np.float64)
+    return save_registered_model(booster, metadata, artifacts_dir, key, arrays=arrays)
 
 
-def load_trained_model(artifacts_dir: str, key: ModelKey) -> TrainResult:
-    payload = load_model(artifacts_dir, key)
+def load_trained_model(artifacts_dir: str, key: ModelKey, use_cache: bool = True) -> TrainResult:
+    payload = load_registered_model(artifacts_dir, key, use_cache=use_cache)
+    if isinstance(payload, RegisteredModel):
+        return TrainResult(
+            model=payload.booster,
+            scaler=(
+                ScalerParams(mean_=payload.arrays["scaler_mean"], scale_=payload.arrays["scaler_scale"])
+                if "scaler_mean" in payload.arrays
+                else None
+            ),
+            feature_columns=list(payload.metadata["feature_columns"]),
+            classes_=np.asarray(payload.metadata["classes"]),
+            feature_mean=payload.arrays.get("feature_mean"),
+            feature_std=payload.arrays.get("feature_std"),
+            lineage=list(payload.metadata.get("lineage", [])),
+        )
     return TrainResult(
         model=payload["model"],
         scaler=payload["scaler"],
@@ -101,9 +300,11 @@ def load_trained_model(artifacts_dir: str, key: ModelKey) -> TrainResult:
 
 
 __all__ = [
+    "ScalerParams",
     "TrainResult",
     "train_model",
     "predict_proba",
+    "build_prediction_frame",
     "save_trained_model",
     "load_trained_model",
 ]
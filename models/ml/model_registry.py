@@ -1,12 +1,24 @@
 """
-Simple model registry for saving/loading LightGBM models keyed by ticker/horizon/version.
+Model registry for saving/loading LightGBM models keyed by ticker/horizon/version.
+
+Boosters are stored in LightGBM's native text format with a JSON sidecar (feature columns,
+class labels, metadata) and an `.npz` file for numeric arrays such as scaler parameters.
+Loaded models are kept in a size-bounded LRU cache shared by every caller in the process.
+Legacy joblib pickles are still readable.
 """
 
-from dataclasses import dataclass
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import joblib
+import numpy as np
+
+ARTIFACT_FORMAT = "lightgbm_native_v1"
 
 
 @dataclass
@@ -16,8 +28,210 @@ class ModelKey:
     horizon: int
     version: str = "v1"
 
+    def stem(self) -> str:
+        return f"{self.model_name}_{self.ticker}_h{self.horizon}_{self.version}"
+
     def filename(self) -> str:
-        return f"{self.model_name}_{self.ticker}_h{self.horizon}_{self.version}.pkl"
+        return f"{self.stem()}.pkl"
+
+
+@dataclass
+class ArtifactPaths:
+    booster: Path
+    sidecar: Path
+    arrays: Path
+    legacy: Path
+
+
+@dataclass
+class RegisteredModel:
+    booster: Any
+    metadata: Dict[str, Any]
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
+def artifact_paths(artifacts_dir: str | Path, key: ModelKey) -> ArtifactPaths:
+    base = Path(artifacts_dir)
+    stem = key.stem()
+    return ArtifactPaths(
+        booster=base / f"{stem}.txt",
+        sidecar=base / f"{stem}.json",
+        arrays=base / f"{stem}.npz",
+        legacy=base / key.filename(),
+    )
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache of loaded models with hit/miss and load-latency counters.
+
+    Entries are validated against the sidecar modification time so a model rewritten on
+    disk (e.g. by a retrain in another process) is reloaded instead of served stale.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Optional[int], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def get(self, cache_key: Tuple[str, str], stamp: Optional[int], loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        start = time.perf_counter()
+        value = loader()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.load_seconds += elapsed
+            self._entries[cache_key] = (stamp, value)
+            self._entries.move_to_end(cache_key)
+            self._evict()
+        return value
+
+    def invalidate(self, cache_key: Tuple[str, str]) -> None:
+        with self._lock:
+            self._entries.pop(cache_key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def resize(self, max_entries: int) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+            self.load_seconds = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "load_seconds_total": self.load_seconds,
+                "load_ms_mean": 1000.0 * self.load_seconds / self.misses if self.misses else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+_MODEL_CACHE = ModelCache()
+
+
+def get_model_cache() -> ModelCache:
+    return _MODEL_CACHE
+
+
+def configure_model_cache(max_entries: int) -> ModelCache:
+    _MODEL_CACHE.resize(max_entries)
+    return _MODEL_CACHE
+
+
+def _cache_key(artifacts_dir: str | Path, key: ModelKey) -> Tuple[str, str]:
+    return str(Path(artifacts_dir).resolve()), key.stem()
+
+
+def save_registered_model(
+    booster: Any,
+    metadata: Dict[str, Any],
+    artifacts_dir: str | Path,
+    key: ModelKey,
+    arrays: Optional[Dict[str, np.ndarray]] = None,
+) -> Path:
+    """
+    Persist a LightGBM booster in native text format plus JSON sidecar and array file.
+
+    Returns:
+        Path to the JSON sidecar, which identifies the artifact set.
+    """
+    paths = artifact_paths(artifacts_dir, key)
+    paths.booster.parent.mkdir(parents=True, exist_ok=True)
+    booster.save_model(str(paths.booster))
+    if arrays:
+        np.savez(paths.arrays, **{name: np.asarray(arr) for name, arr in arrays.items()})
+    elif paths.arrays.exists():
+        paths.arrays.unlink()
+
+    sidecar = {
+        "format": ARTIFACT_FORMAT,
+        "model_name": key.model_name,
+        "ticker": key.ticker,
+        "horizon": key.horizon,
+        "version": key.version,
+        "arrays": sorted(arrays) if arrays else [],
+        **metadata,
+    }
+    # Sidecar is written last so a reader never sees metadata for a half-written booster.
+    with paths.sidecar.open("w", encoding="utf-8") as f:
+        json.dump(sidecar, f, indent=2)
+    _MODEL_CACHE.invalidate(_cache_key(artifacts_dir, key))
+    return paths.sidecar
+
+
+def _load_native(paths: ArtifactPaths) -> RegisteredModel:
+    import lightgbm as lgb
+
+    with paths.sidecar.open("r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    booster = lgb.Booster(model_file=str(paths.booster))
+    arrays: Dict[str, np.ndarray] = {}
+    if metadata.get("arrays") and paths.arrays.exists():
+        with np.load(paths.arrays) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+    return RegisteredModel(booster=booster, metadata=metadata, arrays=arrays)
+
+
+def load_registered_model(
+    artifacts_dir: str | Path,
+    key: ModelKey,
+    use_cache: bool = True,
+) -> RegisteredModel | Dict[str, Any]:
+    """
+    Load a model artifact, preferring the native format and falling back to legacy pickles.
+
+    Native artifacts come back as `RegisteredModel`; legacy pickles return the raw payload.
+    """
+    paths = artifact_paths(artifacts_dir, key)
+    if paths.sidecar.exists():
+        loader = lambda: _load_native(paths)  # noqa: E731
+        stamp = paths.sidecar.stat().st_mtime_ns
+    elif paths.legacy.exists():
+        loader = lambda: joblib.load(paths.legacy)  # noqa: E731
+        stamp = paths.legacy.stat().st_mtime_ns
+    else:
+        raise FileNotFoundError(f"Model artifact not found: {paths.sidecar}")
+
+    if not use_cache:
+        return loader()
+    return _MODEL_CACHE.get(_cache_key(artifacts_dir, key), stamp, loader)
 
 
 def save_model(model, artifacts_dir: str | Path, key: ModelKey) -> Path:
@@ -35,4 +249,16 @@ def load_model(artifacts_dir: str | Path, key: ModelKey):
     return joblib.load(path)
 
 
-__all__ = ["ModelKey", "save_model", "load_model"]
+__all__ = [
+    "ModelKey",
+    "ArtifactPaths",
+    "RegisteredModel",
+    "ModelCache",
+    "artifact_paths",
+    "get_model_cache",
+    "configure_model_cache",
+    "save_registered_model",
+    "load_registered_model",
+    "save_model",
+    "load_model",
+]
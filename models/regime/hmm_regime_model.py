@@ -0,0 +1,269 @@
+"""
+Gaussian HMM regime model over benchmark log returns and realized volatility.
+
+Pure NumPy: forward-backward and Baum-Welch run in log space with recursions vectorized
+over states, random restarts run in parallel threads, and inference emits causal (filtered)
+probabilities in the RegimeRow schema. `filter_step` updates the posterior for one new bar
+in O(states^2).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.regime.rule_based_regime import REGIME_IDS
+from src.core.types import DataFrame
+from src.core.utils import get_logger
+
+logger = get_logger(__name__)
+
+_VAR_FLOOR = 1e-4
+
+
+@dataclass
+class FittedHMM:
+    start_prob: np.ndarray
+    trans_prob: np.ndarray
+    means: np.ndarray
+    variances: np.ndarray
+    obs_mean: np.ndarray
+    obs_std: np.ndarray
+    state_labels: List[str]
+    log_likelihood: float
+    vol_lookback: int = 20
+
+    @property
+    def n_states(self) -> int:
+        return len(self.start_prob)
+
+    def to_dict(self) -> Dict:
+        out = asdict(self)
+        for k, v in out.items():
+            if isinstance(v, np.ndarray):
+                out[k] = v.tolist()
+        return out
+
+    @classmethod
+    def from_dict(cls, payload: Dict) -> "FittedHMM":
+        arrays = {"start_prob", "trans_prob", "means", "variances", "obs_mean", "obs_std"}
+        return cls(**{k: np.asarray(v, dtype=np.float64) if k in arrays else v for k, v in payload.items()})
+
+
+def hmm_observations(bars: DataFrame, vol_lookback: int = 20) -> np.ndarray:
+    """
+    Observation matrix (T x 2): daily log return and annualized rolling vol of log returns.
+    Warmup rows contain NaN and are treated as uninformative by the filters.
+    """
+    log_ret = np.log(bars["close"].astype(float)).diff()
+    vol = log_ret.rolling(vol_lookback, min_periods=vol_lookback).std() * np.sqrt(252)
+    return np.column_stack([log_ret.to_numpy(), vol.to_numpy()])
+
+
+def _logsumexp(a: np.ndarray, axis: int) -> np.ndarray:
+    m = np.max(a, axis=axis, keepdims=True)
+    m = np.where(np.isfinite(m), m, 0.0)
+    out = np.log(np.sum(np.exp(a - m), axis=axis, keepdims=True)) + m
+    return np.squeeze(out, axis=axis)
+
+
+def _log_emissions(X: np.ndarray, means: np.ndarray, variances: np.ndarray) -> np.ndarray:
+    """T x K diagonal-Gaussian log densities; rows with any NaN get 0 (no information)."""
+    diff = X[:, None, :] - means[None, :, :]
+    log_b = -0.5 * np.sum(np.log(2.0 * np.pi * variances)[None] + diff**2 / variances[None], axis=2)
+    return np.where(np.isnan(X).any(axis=1)[:, None], 0.0, log_b)
+
+
+def _forward(log_pi: np.ndarray, log_a: np.ndarray, log_b: np.ndarray) -> np.ndarray:
+    T, K = log_b.shape
+    log_alpha = np.empty((T, K))
+    log_alpha[0] = log_pi + log_b[0]
+    for t in range(1, T):
+        log_alpha[t] = _logsumexp(log_alpha[t - 1][:, None] + log_a, axis=0) + log_b[t]
+    return log_alpha
+
+
+def _backward(log_a: np.ndarray, log_b: np.ndarray) -> np.ndarray:
+    T, K = log_b.shape
+    log_beta = np.zeros((T, K))
+    for t in range(T - 2, -1, -1):
+        log_beta[t] = _logsumexp(log_a + (log_b[t + 1] + log_beta[t + 1])[None, :], axis=1)
+    return log_beta
+
+
+def _baum_welch(
+    X: np.ndarray,
+    n_states: int,
+    n_iter: int,
+    tol: float,
+    seed: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, float]:
+    rng = np.random.default_rng(seed)
+    T, D = X.shape
+    valid = ~np.isnan(X).any(axis=1)
+    Xv = np.where(valid[:, None], X, 0.0)
+
+    means = X[valid][rng.choice(valid.sum(), size=n_states, replace=False)]
+    variances = np.tile(np.nanvar(X, axis=0) + _VAR_FLOOR, (n_states, 1))
+    trans = np.full((n_states, n_states), 0.1 / max(n_states - 1, 1))
+    np.fill_diagonal(trans, 0.9)
+    trans = trans / trans.sum(axis=1, keepdims=True)
+    start = np.full(n_states, 1.0 / n_states)
+
+    prev_ll = -np.inf
+    ll = -np.inf
+    for _ in range(n_iter):
+        log_a = np.log(trans)
+        log_b = _log_emissions(X, means, variances)
+        log_alpha = _forward(np.log(start), log_a, log_b)
+        log_beta = _backward(log_a, log_b)
+        ll = float(_logsumexp(log_alpha[-1], axis=0))
+
+        log_gamma = log_alpha + log_beta - ll
+        gamma = np.exp(log_gamma)
+        log_xi = (
+            log_alpha[:-1, :, None]
+            + log_a[None, :, :]
+            + (log_b[1:] + log_beta[1:])[:, None, :]
+            - ll
+        )
+        trans = np.exp(_logsumexp(log_xi, axis=0))
+        trans = trans / trans.sum(axis=1, keepdims=True)
+        start = gamma[0] / gamma[0].sum()
+
+        weights = gamma * valid[:, None]
+        totals = weights.sum(axis=0) + 1e-12
+        means = (weights.T @ Xv) / totals[:, None]
+        sq = (Xv[:, None, :] - means[None, :, :]) ** 2
+        variances = np.einsum("tk,tkd->kd", weights, sq) / totals[:, None] + _VAR_FLOOR
+
+        if abs(ll - prev_ll) < tol * max(1.0, abs(prev_ll)):
+            break
+        prev_ll = ll
+    return start, trans, means, variances, ll
+
+
+def _label_states(means: np.ndarray) -> List[str]:
+    """
+    Map states to regime labels from their (unstandardized) return/vol means: the
+    highest-vol state is crash (when K >= 3), then highest return -> bull, lowest -> bear,
+    anything else -> choppy.
+    """
+    K = len(means)
+    labels = ["choppy"] * K
+    remaining = list(range(K))
+    if K >= 3:
+        crash = int(np.argmax(means[:, 1]))
+        labels[crash] = "crash"
+        remaining.remove(crash)
+    by_return = sorted(remaining, key=lambda k: means[k, 0])
+    labels[by_return[-1]] = "bull"
+    if len(by_return) > 1:
+        labels[by_return[0]] = "bear"
+    return labels
+
+
+def train_hmm_regime(
+    bars: DataFrame,
+    n_states: int = 4,
+    n_restarts: int = 8,
+    n_iter: int = 100,
+    tol: float = 1e-4,
+    vol_lookback: int = 20,
+    random_state: int = 42,
+    n_jobs: int = 4,
+) -> FittedHMM:
+    """
+    Fit a diagonal-covariance Gaussian HMM with Baum-Welch, keeping the best of several
+    random restarts (run concurrently).
+    """
+    raw = hmm_observations(bars, vol_lookback)
+    valid = ~np.isnan(raw).any(axis=1)
+    if valid.sum() < n_states * 10:
+        raise ValueError(f"Not enough observations ({valid.sum()}) to fit a {n_states}-state HMM.")
+    obs_mean = raw[valid].mean(axis=0)
+    obs_std = raw[valid].std(axis=0)
+    obs_std = np.where(obs_std > 0, obs_std, 1.0)
+    X = (raw - obs_mean) / obs_std
+
+    seeds = [random_state + i for i in range(n_restarts)]
+    with ThreadPoolExecutor(max_workers=max(1, min(n_jobs, n_restarts))) as pool:
+        fits = list(pool.map(lambda s: _baum_welch(X, n_states, n_iter, tol, s), seeds))
+    start, trans, means, variances, ll = max(fits, key=lambda f: f[4])
+    logger.info(f"HMM fit: best log-likelihood {ll:.2f} over {n_restarts} restarts")
+
+    labels = _label_states(means * obs_std + obs_mean)
+    return FittedHMM(
+        start_prob=start,
+        trans_prob=trans,
+        means=means,
+        variances=variances,
+        obs_mean=obs_mean,
+        obs_std=obs_std,
+        state_labels=labels,
+        log_likelihood=ll,
+        vol_lookback=vol_lookback,
+    )
+
+
+def filtered_state_probs(model: FittedHMM, bars: DataFrame) -> np.ndarray:
+    """Causal P(state_t | obs_1..t) for every bar (T x K)."""
+    X = (hmm_observations(bars, model.vol_lookback) - model.obs_mean) / model.obs_std
+    log_b = _log_emissions(X, model.means, model.variances)
+    log_alpha = _forward(np.log(model.start_prob), np.log(model.trans_prob), log_b)
+    return np.exp(log_alpha - _logsumexp(log_alpha, axis=1)[:, None])
+
+
+def filter_step(
+    model: FittedHMM,
+    prev_log_posterior: Optional[np.ndarray],
+    observation: np.ndarray,
+) -> np.ndarray:
+    """
+    One online filtering update: predict through the transition matrix and condition on
+    the new (log return, vol) observation. Returns the normalized log posterior.
+    """
+    x = ((np.asarray(observation, dtype=np.float64) - model.obs_mean) / model.obs_std)[None, :]
+    log_b = _log_emissions(x, model.means, model.variances)[0]
+    if prev_log_posterior is None:
+        log_prior = np.log(model.start_prob)
+    else:
+        log_prior = _logsumexp(prev_log_posterior[:, None] + np.log(model.trans_prob), axis=0)
+    log_post = log_prior + log_b
+    return log_post - _logsumexp(log_post, axis=0)
+
+
+def regime_frame(model: FittedHMM, dates, benchmark, state_probs: np.ndarray) -> DataFrame:
+    """Collapse state probabilities into RegimeRow columns (per-label probability sums)."""
+    label_probs = {label: np.zeros(len(state_probs)) for label in REGIME_IDS}
+    for k, label in enumerate(model.state_labels):
+        label_probs[label] += state_probs[:, k]
+    stacked = np.column_stack([label_probs[label] for label in REGIME_IDS])
+    names = np.array(list(REGIME_IDS))
+    best = names[stacked.argmax(axis=1)]
+    return pd.DataFrame(
+        {
+            "date": dates,
+            "benchmark": benchmark,
+            "regime_label": best,
+            "regime_id": [REGIME_IDS[label] for label in best],
+            **{f"regime_prob_{label}": label_probs[label] for label in REGIME_IDS},
+        }
+    )
+
+
+def infer_regime(model: FittedHMM, bars: DataFrame) -> DataFrame:
+    probs = filtered_state_probs(model, bars)
+    return regime_frame(model, bars["date"].to_numpy(), bars["ticker"].to_numpy(), probs)
+
+
+__all__ = [
+    "FittedHMM",
+    "hmm_observations",
+    "train_hmm_regime",
+    "filtered_state_probs",
+    "filter_step",
+    "infer_regime",
+]
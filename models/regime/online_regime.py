@@ -0,0 +1,155 @@
+"""
+Stateful rule-based regime tracker for streaming benchmark bars.
+
+Keeps ring buffers and running aggregates for the SMAs, return vol, vol z-score and
+running peak, so each new bar is labelled in O(1) with the same rules as `assign_regime`.
+State round-trips through JSON, letting a daily or intraday loop resume from a checkpoint
+instead of recomputing the whole history.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from models.regime.rule_based_regime import REGIME_IDS, classify_regime
+from src.core.streaming import RollingWindow
+from src.core.types import DataFrame, RegimeRow
+
+STATE_VERSION = 1
+
+
+class OnlineRegimeTracker:
+    def __init__(
+        self,
+        benchmark: str,
+        trend_ma_short: int,
+        trend_ma_long: int,
+        vol_lookback: int,
+        high_vol_zscore: float,
+        crash_drawdown_threshold: float,
+    ):
+        self.benchmark = benchmark
+        self.trend_ma_short = trend_ma_short
+        self.trend_ma_long = trend_ma_long
+        self.vol_lookback = vol_lookback
+        self.high_vol_zscore = high_vol_zscore
+        self.crash_drawdown_threshold = crash_drawdown_threshold
+
+        self._short = RollingWindow(trend_ma_short)
+        self._long = RollingWindow(trend_ma_long)
+        self._returns = RollingWindow(vol_lookback)
+        self._vols = RollingWindow(vol_lookback)
+        self._prev_close: Optional[float] = None
+        self._peak: Optional[float] = None
+        self.last_date: Optional[str] = None
+        self.n_bars = 0
+
+    def update(self, date, close: float) -> RegimeRow:
+        """Consume one bar and return its RegimeRow."""
+        close = float(close)
+        self._short.push(close)
+        self._long.push(close)
+        if self._prev_close is not None:
+            self._returns.push(close / self._prev_close - 1.0)
+        self._prev_close = close
+        self._peak = close if self._peak is None else max(self._peak, close)
+
+        vol_z = math.nan
+        if self._returns.full:
+            vol = self._returns.std() * (252 ** 0.5)
+            self._vols.push(vol)
+            if self._vols.full:
+                vol_std = self._vols.std()
+                diff = vol - self._vols.mean()
+                if vol_std > 0:
+                    vol_z = diff / vol_std
+                elif diff != 0:
+                    vol_z = math.copysign(math.inf, diff)
+
+        sma_short = self._short.mean() if self._short.full else math.nan
+        sma_long = self._long.mean() if self._long.full else math.nan
+        drawdown = (close - self._peak) / self._peak
+        label = classify_regime(
+            close, sma_short, sma_long, vol_z, drawdown, self.high_vol_zscore, self.crash_drawdown_threshold
+        )
+
+        self.last_date = str(date)
+        self.n_bars += 1
+        row: RegimeRow = {
+            "date": date,
+            "benchmark": self.benchmark,
+            "regime_label": label,
+            "regime_id": REGIME_IDS[label],
+        }
+        for name in REGIME_IDS:
+            row[f"regime_prob_{name}"] = 1.0 if name == label else 0.0
+        return row
+
+    def update_frame(self, bars: DataFrame) -> DataFrame:
+        """Feed bars in order and return their regime rows (same columns as assign_regime)."""
+        rows: List[RegimeRow] = [self.update(d, c) for d, c in zip(bars["date"], bars["close"])]
+        return pd.DataFrame(rows, columns=_COLUMNS)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "benchmark": self.benchmark,
+            "params": {
+                "trend_ma_short": self.trend_ma_short,
+                "trend_ma_long": self.trend_ma_long,
+                "vol_lookback": self.vol_lookback,
+                "high_vol_zscore": self.high_vol_zscore,
+                "crash_drawdown_threshold": self.crash_drawdown_threshold,
+            },
+            "windows": {
+                "short": self._short.state_dict(),
+                "long": self._long.state_dict(),
+                "returns": self._returns.state_dict(),
+                "vols": self._vols.state_dict(),
+            },
+            "prev_close": self._prev_close,
+            "peak": self._peak,
+            "last_date": self.last_date,
+            "n_bars": self.n_bars,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "OnlineRegimeTracker":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported regime tracker state version: {state.get('version')}")
+        tracker = cls(state["benchmark"], **state["params"])
+        windows = state["windows"]
+        tracker._short = RollingWindow.from_state(windows["short"])
+        tracker._long = RollingWindow.from_state(windows["long"])
+        tracker._returns = RollingWindow.from_state(windows["returns"])
+        tracker._vols = RollingWindow.from_state(windows["vols"])
+        tracker._prev_close = state["prev_close"]
+        tracker._peak = state["peak"]
+        tracker.last_date = state["last_date"]
+        tracker.n_bars = state["n_bars"]
+        return tracker
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.state_dict()))
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "OnlineRegimeTracker":
+        return cls.from_state(json.loads(Path(path).read_text()))
+
+    def matches_params(self, **params: Any) -> bool:
+        current = self.state_dict()["params"]
+        return all(current.get(k) == v for k, v in params.items())
+
+
+_COLUMNS = ["date", "benchmark", "regime_label", "regime_id"] + [f"regime_prob_{n}" for n in REGIME_IDS]
+
+
+__all__ = ["OnlineRegimeTracker"]
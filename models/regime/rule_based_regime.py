@@ -5,11 +5,34 @@ Labels: bull, bear, choppy, crash
 
 import pandas as pd
 
+from src.core.cache import frame_ticker, get_series_cache
 from src.core.types import DataFrame
 from src.core.utils import get_logger
 
 logger = get_logger(__name__)
 
+REGIME_IDS = {"bull": 0, "bear": 1, "choppy": 2, "crash": 3}
+
+
+def classify_regime(
+    price: float,
+    sma_short: float,
+    sma_long: float,
+    vol_z: float,
+    drawdown: float,
+    high_vol_zscore: float,
+    crash_drawdown_threshold: float,
+) -> str:
+    if pd.isna(price) or pd.isna(sma_short) or pd.isna(sma_long) or pd.isna(vol_z):
+        return "choppy"
+    if drawdown <= crash_drawdown_threshold:
+        return "crash"
+    if price > sma_long and vol_z <= high_vol_zscore:
+        return "bull"
+    if price < sma_long and vol_z <= high_vol_zscore:
+        return "bear"
+    return "choppy"
+
 
 def compute_drawdown(close: pd.Series) -> pd.Series:
     cum_max = close.cummax()
@@ -25,13 +48,17 @@ def assign_regime(
     crash_drawdown_threshold: float,
 ) -> DataFrame:
     df = bars.copy()
-    df["sma_short"] = df["close"].rolling(trend_ma_short, min_periods=trend_ma_short).mean()
-    df["sma_long"] = df["close"].rolling(trend_ma_long, min_periods=trend_ma_long).mean()
+    # Shared run cache: the benchmark's SMAs/vol are usually already computed by build_features
+    cache = get_series_cache()
+    ticker = frame_ticker(df)
+    df["sma_short"] = cache.sma(ticker, df["close"], trend_ma_short)
+    df["sma_long"] = cache.sma(ticker, df["close"], trend_ma_long)
 
-    returns = df["close"].pct_change()
-    vol = returns.rolling(vol_lookback, min_periods=vol_lookback).std() * (252 ** 0.5)
-    vol_mean = vol.rolling(vol_lookback, min_periods=vol_lookback).mean()
-    vol_std = vol.rolling(vol_lookback, min_periods=vol_lookback).std()
+    returns = cache.returns(ticker, df["close"])
+    vol = cache.realized_vol(ticker, returns, vol_lookback)
+    vol_name = f"realized_vol_{vol_lookback}"
+    vol_mean = cache.rolling_mean(ticker, vol_name, vol, vol_lookback)
+    vol_std = cache.rolling_std(ticker, vol_name, vol, vol_lookback)
     vol_z = (vol - vol_mean) / vol_std
 
     drawdown = compute_drawdown(df["close"])
@@ -39,22 +66,9 @@ def assign_regime(
     labels = []
     ids = []
     for price, s_short, s_long, vz, dd in zip(df["close"], df["sma_short"], df["sma_long"], vol_z, drawdown):
-        if pd.isna(price) or pd.isna(s_short) or pd.isna(s_long) or pd.isna(vz):
-            labels.append("choppy")
-            ids.append(2)
-            continue
-        if dd <= crash_drawdown_threshold:
-            labels.append("crash")
-            ids.append(3)
-        elif price > s_long and vz <= high_vol_zscore:
-            labels.append("bull")
-            ids.append(0)
-        elif price < s_long and vz <= high_vol_zscore:
-            labels.append("bear")
-            ids.append(1)
-        else:
-            labels.append("choppy")
-            ids.append(2)
+        label = classify_regime(price, s_short, s_long, vz, dd, high_vol_zscore, crash_drawdown_threshold)
+        labels.append(label)
+        ids.append(REGIME_IDS[label])
 
     df_out = pd.DataFrame(
         {
@@ -71,4 +85,4 @@ def assign_regime(
     return df_out
 
 
-__all__ = ["assign_regime"]
+__all__ = ["REGIME_IDS", "classify_regime", "assign_regime"]
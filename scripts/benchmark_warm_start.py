@@ -0,0 +1,69 @@
+"""
+Benchmark warm-start LightGBM retraining against a full refit for one ticker/horizon.
+
+Usage:
+    python -m scripts.benchmark_warm_start --ticker SPY --horizon 1 --extra-rounds 50
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+if not __package__:
+    sys.exit("Run from the repository root as a module: python -m scripts.benchmark_warm_start")
+
+from models.ml.incremental import benchmark_warm_start  # noqa: E402
+from src.core.io import read_parquet  # noqa: E402
+from src.core.utils import get_logger, load_config  # noqa: E402
+from src.features.label_targets import label_future_states  # noqa: E402
+
+logger = get_logger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare warm-start retraining with a full refit.")
+    parser.add_argument("--config", default="config/settings.yaml", help="Path to settings.yaml")
+    parser.add_argument("--ticker", required=True, help="Ticker whose features are used")
+    parser.add_argument("--horizon", type=int, default=1, help="Label horizon")
+    parser.add_argument("--extra-rounds", type=int, default=50, help="Boosting rounds added on warm start")
+    parser.add_argument("--recent-rows", type=int, default=250, help="Rows treated as newly arrived data")
+    parser.add_argument("--holdout-rows", type=int, default=250, help="Trailing rows used for validation")
+    parser.add_argument("--n-estimators", type=int, default=400, help="Rounds for the full refit")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    settings = load_config(args.config)
+    features_dir = Path(settings.get("paths", {}).get("features_dir", "data/features"))
+    feats = read_parquet(features_dir / f"{args.ticker}.parquet")
+    label_col = f"target_state_h{args.horizon}"
+    if label_col not in feats:
+        feats = label_future_states(feats, horizons=[args.horizon])
+    feats = feats.drop(columns=[c for c in feats.columns if c.startswith("target_state_") and c != label_col])
+
+    params = {
+        "n_estimators": args.n_estimators,
+        "learning_rate": 0.05,
+        "num_leaves": 63,
+        "objective": "multiclass",
+        "num_class": 7,
+        "random_state": 42,
+        "min_child_samples": 50,
+        "verbose": -1,
+    }
+    results = benchmark_warm_start(
+        feats,
+        label_col=label_col,
+        params=params,
+        extra_rounds=args.extra_rounds,
+        recent_rows=args.recent_rows,
+        holdout_rows=args.holdout_rows,
+    )
+    logger.info(f"Warm-start benchmark for {args.ticker} h{args.horizon}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
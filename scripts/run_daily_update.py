@@ -2,16 +2,15 @@
 Daily update pipeline (assumes models already trained and raw data up to date).
 
 Usage:
-    python scripts/run_daily_update.py --config config/settings.yaml
+    python -m scripts.run_daily_update --config config/settings.yaml
+    python -m scripts.run_daily_update --profile cprofile --profile-memory
 """
 
 import argparse
 import sys
-from pathlib import Path
 
-REPO_ROOT = Path(__file__).resolve().parents[1]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
+if not __package__:
+    sys.exit("Run from the repository root as a module: python -m scripts.run_daily_update")
 
 from src.pipeline.preprocess_data import preprocess_data  # noqa: E402
 from src.pipeline.build_features import build_features  # noqa: E402
@@ -20,7 +19,9 @@ from src.pipeline.run_regime_engine import run_regime_engine  # noqa: E402
 from src.pipeline.run_predictions import run_predictions  # noqa: E402
 from src.pipeline.run_meta_model import run_meta_model  # noqa: E402
 from src.pipeline.run_position_sizing import run_position_sizing  # noqa: E402
-from src.core.utils import get_logger  # noqa: E402
+from src.core.profiling import add_profiling_arguments, profiling_options, profiling_run  # noqa: E402
+from src.core.telemetry import run_directory, telemetry_run  # noqa: E402
+from src.core.utils import get_logger, load_config  # noqa: E402
 
 logger = get_logger(__name__)
 
@@ -30,11 +31,28 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--config", default="config/settings.yaml", help="Path to settings.yaml")
     parser.add_argument("--data-sources", default="config/data_sources.yaml", help="Path to data_sources.yaml")
     parser.add_argument("--regimes", default="config/regimes.yaml", help="Path to regimes.yaml")
+    parser.add_argument("--telemetry", action="store_true", help="Write a telemetry report and Chrome trace")
+    add_profiling_arguments(parser)
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
+    settings = load_config(args.config)
+    telemetry_cfg = settings.get("telemetry", {})
+    enabled = args.telemetry or telemetry_cfg.get("enabled", False)
+    output_dir = run_directory(telemetry_cfg.get("output_dir", "data/telemetry"), "daily_update")
+    with telemetry_run(output_dir, enabled=enabled, memory=telemetry_cfg.get("memory", "rss")), profiling_run(
+        output_dir / "profiles", **profiling_options(args, settings)
+    ) as profiler:
+        run_pipeline(args)
+    if enabled:
+        logger.info(f"Telemetry report and trace written to {output_dir}")
+    if profiler is not None:
+        logger.info(f"Stage profiles ({', '.join(profiler.written)}) written to {output_dir / 'profiles'}")
+
+
+def run_pipeline(args: argparse.Namespace) -> None:
     logger.info("Starting daily update pipeline")
     preprocess_data(settings_path=args.config, data_sources_path=args.data_sources)
     build_features(settings_path=args.config, data_sources_path=args.data_sources)
@@ -2,16 +2,15 @@
 Run full backtest pipeline end-to-end.
 
 Usage:
-    python scripts/run_full_backtest.py --config config/settings.yaml
+    python -m scripts.run_full_backtest --config config/settings.yaml
+    python -m scripts.run_full_backtest --skip-train --profile sampling --profile-stage build_features
 """
 
 import argparse
 import sys
-from pathlib import Path
 
-REPO_ROOT = Path(__file__).resolve().parents[1]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
+if not __package__:
+    sys.exit("Run from the repository root as a module: python -m scripts.run_full_backtest")
 
 from src.pipeline.preprocess_data import preprocess_data  # noqa: E402
 from src.pipeline.build_features import build_features  # noqa: E402
@@ -22,7 +21,10 @@ from src.pipeline.run_predictions import run_predictions  # noqa: E402
 from src.pipeline.run_meta_model import run_meta_model  # noqa: E402
 from src.pipeline.run_position_sizing import run_position_sizing  # noqa: E402
 from src.pipeline.run_backtest import run_backtest_pipeline  # noqa: E402
-from src.core.utils import get_logger  # noqa: E402
+from src.core.cache import configure_series_cache  # noqa: E402
+from src.core.profiling import add_profiling_arguments, profiling_options, profiling_run  # noqa: E402
+from src.core.telemetry import run_directory, telemetry_run  # noqa: E402
+from src.core.utils import get_logger, load_config  # noqa: E402
 
 logger = get_logger(__name__)
 
@@ -33,12 +35,31 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--data-sources", default="config/data_sources.yaml", help="Path to data_sources.yaml")
     parser.add_argument("--regimes", default="config/regimes.yaml", help="Path to regimes.yaml")
     parser.add_argument("--skip-train", action="store_true", help="Skip ML training if models already exist")
+    parser.add_argument("--telemetry", action="store_true", help="Write a telemetry report and Chrome trace")
+    add_profiling_arguments(parser)
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
+    settings = load_config(args.config)
+    telemetry_cfg = settings.get("telemetry", {})
+    enabled = args.telemetry or telemetry_cfg.get("enabled", False)
+    output_dir = run_directory(telemetry_cfg.get("output_dir", "data/telemetry"), "full_backtest")
+    with telemetry_run(output_dir, enabled=enabled, memory=telemetry_cfg.get("memory", "rss")), profiling_run(
+        output_dir / "profiles", **profiling_options(args, settings)
+    ) as profiler:
+        run_pipeline(args, settings)
+    if enabled:
+        logger.info(f"Telemetry report and trace written to {output_dir}")
+    if profiler is not None:
+        logger.info(f"Stage profiles ({', '.join(profiler.written)}) written to {output_dir / 'profiles'}")
+
+
+def run_pipeline(args: argparse.Namespace, settings: dict) -> None:
     logger.info("Starting full backtest pipeline")
+    # One derived-series cache for the whole run so later stages reuse rolling series
+    cache = configure_series_cache(settings.get("cache", {}).get("series_max_mb", 256))
 
     preprocess_data(settings_path=args.config, data_sources_path=args.data_sources)
     build_features(settings_path=args.config, data_sources_path=args.data_sources)
@@ -51,6 +72,7 @@ def main():
     run_meta_model(settings_path=args.config, regimes_config_path=args.regimes)
     run_position_sizing(settings_path=args.config, data_sources_path=args.data_sources)
     run_backtest_pipeline(settings_path=args.config, data_sources_path=args.data_sources)
+    logger.info(f"Series cache: {cache.stats()}")
     logger.info("Full backtest pipeline completed")
 
 
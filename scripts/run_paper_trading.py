@@ -0,0 +1,107 @@
+"""
+Paper-trade live bars: warm the streaming state from processed history, then follow a bar
+feed and append orders to <live_dir>/orders.jsonl.
+
+Usage:
+    python -m scripts.run_paper_trading --tail data/live/bars.jsonl
+    python -m scripts.run_paper_trading --socket 127.0.0.1:9100 --no-ml
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+import pandas as pd
+
+if not __package__:
+    sys.exit("Run from the repository root as a module: python -m scripts.run_paper_trading")
+
+from src.core.frequency import get_frequency  # noqa: E402
+from src.core.io import processed_path, read_parquet  # noqa: E402
+from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
+from src.live.feed import read_socket, tail_file  # noqa: E402
+from src.live.runtime import JsonlOrderLog, PaperTradingRuntime  # noqa: E402
+
+logger = get_logger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the live paper-trading loop.")
+    parser.add_argument("--config", default="config/settings.yaml", help="Path to settings.yaml")
+    parser.add_argument("--data-sources", default="config/data_sources.yaml", help="Path to data_sources.yaml")
+    parser.add_argument("--regimes", default="config/regimes.yaml", help="Path to regimes.yaml")
+    feed = parser.add_mutually_exclusive_group(required=True)
+    feed.add_argument("--tail", help="JSON-lines bar file to follow")
+    feed.add_argument("--socket", help="host:port of a JSON-lines bar publisher")
+    parser.add_argument("--idle-timeout", type=float, help="Stop tailing after this many idle seconds")
+    parser.add_argument("--artifacts-dir", default="models/ml/artifacts", help="Model artifacts directory")
+    parser.add_argument("--no-ml", action="store_true", help="Trade on rule-based signals only")
+    return parser.parse_args()
+
+
+def _warmup_bars(settings: dict, data_sources: dict, tickers, sessions: int) -> pd.DataFrame:
+    rows = get_frequency(settings).bars(sessions)
+    frames = []
+    for ticker in tickers:
+        path = processed_path(ticker, data_sources)
+        if not path.exists():
+            logger.warning(f"No processed bars for {ticker} at {path}; starting its state cold")
+            continue
+        frames.append(read_parquet(path).tail(rows))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["date", "ticker"])
+
+
+def main():
+    args = parse_args()
+    settings = load_config(args.config)
+    data_sources = load_config(args.data_sources)
+    regimes_cfg = load_config(args.regimes)
+    live_cfg = settings.get("live", {})
+    live_dir = ensure_directory(settings.get("paths", {}).get("live_dir", "data/live"))
+
+    scorer = None
+    service = None
+    if not args.no_ml:
+        from src.serving.scoring_service import ScoringService
+
+        ml_cfg = settings.get("ml", {})
+        horizon = ml_cfg.get("horizons", [1])[0]
+        service = ScoringService(
+            artifacts_dir=args.artifacts_dir,
+            model_name=ml_cfg.get("model_name", "lightgbm_v1"),
+            horizons=[horizon],
+            tickers=settings.get("tickers", []),
+        )
+
+        def scorer(rows):
+            return service.score(rows, [horizon])
+
+    runtime = PaperTradingRuntime.from_settings(
+        settings, regimes_cfg, scorer=scorer, order_sink=JsonlOrderLog(live_dir / "orders.jsonl")
+    )
+    runtime.warm_up(_warmup_bars(settings, data_sources, runtime.universe, live_cfg.get("warmup_sessions", 260)))
+
+    if args.tail:
+        poll = live_cfg.get("poll_interval_ms", 50) / 1000.0
+        feed = tail_file(args.tail, poll_interval=poll, idle_timeout=args.idle_timeout)
+    else:
+        host, port = args.socket.rsplit(":", 1)
+        feed = read_socket(host, int(port))
+
+    try:
+        metrics = asyncio.run(runtime.run(feed))
+    finally:
+        if service is not None:
+            service.stop()
+    (live_dir / "metrics.json").write_text(json.dumps(metrics, indent=2, default=str))
+    latency = metrics["bar_latency"]
+    logger.info(
+        f"Paper trading stopped after {metrics['steps']} steps: {metrics['orders']} orders, "
+        f"p50 {latency['p50_ms']:.2f} ms, p99 {latency['p99_ms']:.2f} ms, "
+        f"{metrics['over_budget']} over the {metrics['latency_budget_ms']:g} ms budget"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Start the local scoring service with all configured models resident.
+
+Usage:
+    python -m scripts.run_scoring_service --config config/settings.yaml --port 8765
+"""
+
+import argparse
+import sys
+
+if not __package__:
+    sys.exit("Run from the repository root as a module: python -m scripts.run_scoring_service")
+
+from src.core.utils import get_logger, load_config  # noqa: E402
+from src.serving.scoring_service import ScoringService, serve_forever  # noqa: E402
+
+logger = get_logger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the local low-latency scoring service.")
+    parser.add_argument("--config", default="config/settings.yaml", help="Path to settings.yaml")
+    parser.add_argument("--host", help="Bind address (defaults to serving.host)")
+    parser.add_argument("--port", type=int, help="Port (defaults to serving.port)")
+    parser.add_argument("--artifacts-dir", default="models/ml/artifacts", help="Model artifacts directory")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    settings = load_config(args.config)
+    ml_cfg = settings.get("ml", {})
+    serving_cfg = settings.get("serving", {})
+
+    service = ScoringService(
+        artifacts_dir=args.artifacts_dir,
+        model_name=ml_cfg.get("model_name", "lightgbm_v1"),
+        horizons=ml_cfg.get("horizons", [1, 3, 5]),
+        tickers=settings.get("tickers", []),
+        max_batch_rows=serving_cfg.get("max_batch_rows", 4096),
+        max_wait_ms=serving_cfg.get("max_wait_ms", 2.0),
+    )
+    serve_forever(
+        service,
+        host=args.host or serving_cfg.get("host", "127.0.0.1"),
+        port=args.port if args.port is not None else serving_cfg.get("port", 8765),
+    )
+
+
+if __name__ == "__main__":
+    main()
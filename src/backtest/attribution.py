@@ -0,0 +1,92 @@
+"""
+PnL attribution to alpha components, tickers, regimes and dates.
+
+Each (date, ticker) row's PnL is split pro rata over its `contrib_*` columns (the pieces
+combine_signals summed into alpha_score); rows whose contributions net to ~0 go to
+`residual`. With A the rows x components PnL matrix and G a stacked one-hot group matrix
+(date, ticker and regime blocks), the whole attribution is G @ A, evaluated as a weighted
+bincount over the stacked group codes so G is never materialized.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+COMPONENTS = ("trend", "mean_rev", "vol", "rel_strength", "ml")
+DIMENSIONS = ("date", "ticker", "regime")
+
+
+def component_pnl(pnl: np.ndarray, contribs: np.ndarray, eps: float = 1e-12) -> np.ndarray:
+    """
+    rows x (components + 1) PnL matrix: pnl * contrib_k / sum(contrib), last column the
+    residual for rows without usable contributions. Rows always sum back to `pnl`.
+    """
+    p = np.nan_to_num(np.asarray(pnl, dtype=np.float64))
+    c = np.nan_to_num(np.asarray(contribs, dtype=np.float64))
+    total = c.sum(axis=1)
+    usable = np.abs(total) > eps
+    shares = np.where(usable[:, None], c / np.where(usable, total, 1.0)[:, None], 0.0)
+    out = np.empty((len(p), c.shape[1] + 1))
+    out[:, :-1] = shares * p[:, None]
+    out[:, -1] = np.where(usable, 0.0, p)
+    return out
+
+
+def attribute_pnl(
+    trades: pd.DataFrame,
+    alpha_scores: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Attribution table with one row per (dimension, key) and pnl_<component> columns plus
+    pnl_residual and pnl_total. `trades` needs date/ticker/pnl; contributions and
+    regime_label come from `alpha_scores` when given, else from `trades` itself.
+    """
+    contrib_cols = [f"contrib_{c}" for c in COMPONENTS]
+    df = trades[["date", "ticker", "pnl"] + [c for c in contrib_cols + ["regime_label"] if c in trades]]
+    if alpha_scores is not None:
+        extra = [c for c in contrib_cols + ["regime_label"] if c in alpha_scores]
+        df = df.drop(columns=[c for c in extra if c in df]).merge(
+            alpha_scores[["date", "ticker"] + extra], on=["date", "ticker"], how="left"
+        )
+    contribs = np.column_stack(
+        [df[c].to_numpy(dtype=np.float64) if c in df else np.zeros(len(df)) for c in contrib_cols]
+    ) if len(df) else np.zeros((0, len(contrib_cols)))
+    values = component_pnl(df["pnl"].to_numpy(), contribs)
+
+    keys = []
+    codes = []
+    offset = 0
+    regimes = df["regime_label"] if "regime_label" in df else pd.Series("unknown", index=df.index)
+    for dim, column in zip(DIMENSIONS, (df["date"], df["ticker"], regimes.fillna("unknown"))):
+        code, uniques = pd.factorize(column, sort=True)
+        codes.append(code + offset)
+        keys.extend((dim, str(u)) for u in uniques)
+        offset += len(uniques)
+    stacked = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64)
+    weights = np.tile(values, (len(DIMENSIONS), 1))
+    grouped = np.column_stack(
+        [np.bincount(stacked, weights=weights[:, j], minlength=offset) for j in range(values.shape[1])]
+    ) if offset else np.zeros((0, values.shape[1]))
+
+    names = [f"pnl_{c}" for c in COMPONENTS] + ["pnl_residual"]
+    out = pd.DataFrame(grouped, columns=names)
+    out.insert(0, "key", [k for _, k in keys])
+    out.insert(0, "dimension", pd.Categorical([d for d, _ in keys], categories=DIMENSIONS))
+    out["pnl_total"] = grouped.sum(axis=1)
+    return out
+
+
+def pnl_by_component(attribution: pd.DataFrame) -> Dict[str, float]:
+    """Whole-period PnL per component (summing one dimension covers every row once)."""
+    rows = attribution[attribution["dimension"] == "ticker"]
+    cols = [c for c in attribution.columns if c.startswith("pnl_") and c != "pnl_total"]
+    return {c[len("pnl_"):]: float(rows[c].sum()) for c in cols}
+
+
+def pnl_by_dimension(attribution: pd.DataFrame, dimension: str) -> Dict[str, float]:
+    rows = attribution[attribution["dimension"] == dimension]
+    return dict(zip(rows["key"], rows["pnl_total"].astype(float)))
+
+
+__all__ = ["COMPONENTS", "component_pnl", "attribute_pnl", "pnl_by_component", "pnl_by_dimension"]
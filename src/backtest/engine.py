@@ -1,36 +1,90 @@
 """
-Simple daily backtest engine: applies target weights to next-day returns.
-Assumes positions are end-of-day target weights applied to next day's close-to-close return.
+Simple backtest engine: applies target weights to next-bar returns.
+Assumes positions are end-of-bar target weights applied to the next bar's close-to-close
+return (next day for daily bars); `ret_1d_fwd` / `daily_return` keep their names intraday.
 """
 
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
+from src.backtest.costs import CostModel, apply_no_trade_band, cost_grid
+from src.core.calendar import TradingCalendar, join_on_day
+from src.core.telemetry import traced
 from src.core.types import DataFrame
 
 
+def _apply_costs(df: DataFrame, prices: DataFrame, cost_model: CostModel, calendar: TradingCalendar) -> DataFrame:
+    """
+    Pivot positions onto the dates x tickers grid, run the no-trade band and cost model as
+    array operations, and scatter held weights, trades and costs back onto the rows.
+    Dates a ticker has no row for keep its last weight, so gaps in its data are not
+    charged as a full exit and re-entry.
+    """
+    date_codes, dates = pd.factorize(df["date"], sort=True)
+    ticker_codes, tickers = pd.factorize(df["ticker"], sort=True)
+    shape = (len(dates), len(tickers))
+
+    targets = np.full(shape, np.nan)
+    targets[date_codes, ticker_codes] = df["target_weight"].fillna(0.0).to_numpy(dtype=np.float64)
+    targets = pd.DataFrame(targets).ffill().to_numpy()
+    close = np.full(shape, np.nan)
+    close[date_codes, ticker_codes] = df["close"].to_numpy(dtype=np.float64)
+    volume = None
+    if "volume" in prices:
+        vol_rows = join_on_day(df[["date", "ticker"]], prices, ["volume"], by="ticker", calendar=calendar)
+        volume = np.full(shape, np.nan)
+        volume[date_codes, ticker_codes] = vol_rows["volume"].to_numpy(dtype=np.float64)
+
+    held = apply_no_trade_band(targets, cost_model.no_trade_band)
+    grid = cost_grid(cost_model, held, close, volume, list(tickers))
+
+    df["held_weight"] = held[date_codes, ticker_codes]
+    df["trade_weight"] = grid["trade"][date_codes, ticker_codes]
+    df["cost"] = grid["cost"][date_codes, ticker_codes]
+    df["notional"] = df["trade_weight"] * cost_model.portfolio_value
+    df["quantity"] = df["notional"] / df["close"]
+    df["side"] = np.where(df["trade_weight"] > 0, "buy", np.where(df["trade_weight"] < 0, "sell", "hold"))
+    df["fees"] = df["cost"] * cost_model.portfolio_value
+    return df
+
+
+@traced("backtest")
 def run_backtest(
     prices: DataFrame,
     positions: DataFrame,
     strategy_name: str,
+    cost_model: Optional[CostModel] = None,
 ) -> tuple[DataFrame, DataFrame]:
-    # Align on date/ticker
-    df = positions.merge(
-        prices[["date", "ticker", "close"]],
-        on=["date", "ticker"],
-        how="left",
-        suffixes=("", "_price"),
-    )
+    """
+    With `cost_model`, positions are traded through its no-trade band, PnL is earned on the
+    held weight net of spread/commission/impact costs, and trades carry fees and turnover.
+    """
+    # Align on date/ticker by trading-day id
+    calendar = TradingCalendar(prices["date"])
+    df = join_on_day(positions, prices, ["close"], by="ticker", calendar=calendar, suffix="_price")
     df = df.sort_values(["ticker", "date"])
 
     # Compute forward returns (next day close / current close - 1)
     df["next_close"] = df.groupby("ticker")["close"].shift(-1)
     df["ret_1d_fwd"] = df["next_close"] / df["close"] - 1.0
 
+    weight_col = "target_weight"
+    if cost_model is not None:
+        df = _apply_costs(df, prices, cost_model, calendar)
+        weight_col = "held_weight"
+
     # Shift PnL to the day the return is realized (next day)
-    df["pnl"] = df["target_weight"] * df["ret_1d_fwd"]
-    df["pnl_effective_date"] = df["date"].shift(-1)
+    df["pnl"] = df[weight_col] * df["ret_1d_fwd"]
+    if cost_model is not None:
+        # Costs are paid at the rebalance close and realized with that row's return
+        df["pnl"] = df["pnl"].where(df["ret_1d_fwd"].notna(), 0.0) - df["cost"]
+    # Per ticker: a row's return is realized on that ticker's next date. A final row has no
+    # return left, only its rebalance cost, which is booked on the trade date itself
+    df["pnl_effective_date"] = df.groupby("ticker")["date"].shift(-1).fillna(df["date"])
 
-    # Aggregate by effective date to avoid first day PnL; drop NaN effective dates
+    # Aggregate by effective date to avoid first day PnL
     daily = (
         df.dropna(subset=["pnl_effective_date"])
         .groupby("pnl_effective_date")["pnl"]
@@ -41,23 +95,22 @@ def run_backtest(
     )
 
     # Recompute exposures by calendar date
-    exposures = df.groupby("date")["target_weight"].agg(
+    exposures = df.groupby("date")[weight_col].agg(
         gross_exposure=lambda s: s.abs().sum(), net_exposure="sum"
     ).reset_index()
+    if cost_model is not None:
+        costs = df.groupby("date").agg(
+            turnover=("trade_weight", lambda s: s.abs().sum()), transaction_costs=("cost", "sum")
+        )
+        exposures = exposures.merge(costs.reset_index(), on="date", how="left")
     portfolio = exposures.merge(daily, on="date", how="left").fillna({"daily_return": 0.0})
     portfolio = portfolio.sort_values("date").reset_index(drop=True)
     portfolio["strategy_name"] = strategy_name
 
-    trades = df[
-        [
-            "date",
-            "ticker",
-            "strategy_name",
-            "target_weight",
-            "ret_1d_fwd",
-            "pnl",
-        ]
-    ]
+    trade_cols = ["date", "ticker", "strategy_name", "target_weight", "ret_1d_fwd", "pnl"]
+    if cost_model is not None:
+        trade_cols += ["held_weight", "trade_weight", "side", "quantity", "notional", "fees", "cost"]
+    trades = df[trade_cols]
     return portfolio, trades
 
 
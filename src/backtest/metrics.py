@@ -1,9 +1,16 @@
 """
 Backtest metrics: Sharpe, Sortino, max drawdown, win rate.
+
+Rolling versions work on a dates x strategies return matrix from cumulative sums (one pass
+per window length, independent of the window size), and the bootstrap draws stationary
+block resamples for all replicates at once, in batches bounded by `batch_size`.
 """
 
+from typing import Dict, Optional, Sequence
+
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 from src.risk.risk_metrics import drawdown
 
@@ -34,4 +41,153 @@ def win_rate(returns: pd.Series) -> float:
     return (returns > 0).mean()
 
 
-__all__ = ["sharpe_ratio", "sortino_ratio", "max_drawdown", "win_rate"]
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window` sums along axis 0 (NaN until the window is full)."""
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    c = np.cumsum(x, axis=0)
+    out[window - 1] = c[window - 1]
+    out[window:] = c[window:] - c[:-window]
+    return out
+
+
+def _rolling_max_drawdown(returns: np.ndarray, window: int, chunk_bytes: int = 64 * 1024 * 1024) -> np.ndarray:
+    log_wealth = np.cumsum(np.log1p(returns), axis=0)
+    n_dates, n_cols = returns.shape
+    out = np.full(returns.shape, np.nan)
+    if n_dates < window:
+        return out
+    views = sliding_window_view(log_wealth, window, axis=0)  # (n_dates - window + 1, n_cols, window)
+    step = max(1, chunk_bytes // (8 * window * max(n_cols, 1)))
+    for start in range(0, len(views), step):
+        block = views[start : start + step]
+        dd = (block - np.maximum.accumulate(block, axis=2)).min(axis=2)
+        out[window - 1 + start : window - 1 + start + len(block)] = np.expm1(dd)
+    return out
+
+
+def rolling_metrics(
+    returns: pd.DataFrame | pd.Series,
+    window: int,
+    risk_free: float = 0.0,
+    periods_per_year: int = 252,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Trailing-window Sharpe, Sortino, win rate and max drawdown for every column of a dates x
+    strategies return frame (same definitions as the full-period functions; NaN until a
+    window is full, missing returns count as 0).
+    """
+    frame = returns.to_frame() if isinstance(returns, pd.Series) else returns
+    x = frame.fillna(0.0).to_numpy(dtype=np.float64) - risk_free / periods_per_year
+    ann = np.sqrt(periods_per_year)
+    # centre each column so the running sums of squares do not cancel
+    centre = x.mean(axis=0) if len(x) else np.zeros(x.shape[1])
+    z = x - centre
+    s1, s2 = _window_sums(z, window), _window_sums(z * z, window)
+    mean = s1 / window + centre
+    var = (s2 - s1 * s1 / window) / max(window - 1, 1)
+    std = np.sqrt(np.clip(var, 0.0, None))
+
+    neg = np.minimum(x, 0.0)
+    n_neg = _window_sums((x < 0).astype(np.float64), window)
+    d1, d2 = _window_sums(neg, window), _window_sums(neg * neg, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d_var = (d2 - d1 * d1 / n_neg) / (n_neg - 1)
+        d_std = np.sqrt(np.clip(d_var, 0.0, None))
+        sharpe = np.where(std > 1e-12, ann * mean / std, 0.0)
+        sortino = np.where((n_neg > 1) & (d_std > 1e-12), ann * mean / d_std, 0.0)
+    full = ~np.isnan(s1)
+    wins = _window_sums((x > 0).astype(np.float64), window) / window
+
+    def wrap(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(np.where(full, values, np.nan), index=frame.index, columns=frame.columns)
+
+    return {
+        "sharpe": wrap(sharpe),
+        "sortino": wrap(sortino),
+        "win_rate": wrap(wins),
+        "max_drawdown": wrap(_rolling_max_drawdown(frame.fillna(0.0).to_numpy(dtype=np.float64), window)),
+    }
+
+
+def rolling_metrics_frame(
+    returns: pd.Series,
+    windows: Sequence[int] = (63, 126, 252),
+    periods_per_year: int = 252,
+) -> pd.DataFrame:
+    """One strategy's rolling metrics as columns `<metric>_<window>`."""
+    out = pd.DataFrame(index=returns.index)
+    for window in windows:
+        for name, frame in rolling_metrics(returns, window, periods_per_year=periods_per_year).items():
+            out[f"{name}_{window}"] = frame.iloc[:, 0]
+    return out
+
+
+def stationary_bootstrap_indices(
+    n_obs: int,
+    n_samples: int,
+    mean_block: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    (n_samples x n_obs) Politis-Romano resample indices: each step starts a new block with
+    probability 1 / mean_block, otherwise continues the previous block (wrapping around).
+    """
+    starts = rng.integers(0, n_obs, size=(n_samples, n_obs))
+    new_block = rng.random((n_samples, n_obs)) < 1.0 / max(mean_block, 1.0)
+    new_block[:, 0] = True
+    pos = np.arange(n_obs)
+    last_start = np.maximum.accumulate(np.where(new_block, pos, 0), axis=1)
+    origin = np.take_along_axis(starts, last_start, axis=1)
+    return (origin + pos - last_start) % n_obs
+
+
+def bootstrap_confidence_intervals(
+    returns: pd.Series,
+    n_samples: int = 10_000,
+    mean_block: float = 20.0,
+    confidence: float = 0.95,
+    periods_per_year: int = 252,
+    batch_size: int = 1_000,
+    seed: Optional[int] = 42,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Stationary block bootstrap CIs for the annualized Sharpe ratio and max drawdown.
+    Replicates are evaluated as (batch x dates) matrices, `batch_size` rows at a time.
+    """
+    x = returns.fillna(0.0).to_numpy(dtype=np.float64)
+    n_obs = len(x)
+    if n_obs < 2 or n_samples <= 0:
+        return {}
+    rng = np.random.default_rng(seed)
+    sharpe = np.empty(n_samples)
+    mdd = np.empty(n_samples)
+    log_r = np.log1p(x)
+    for start in range(0, n_samples, batch_size):
+        size = min(batch_size, n_samples - start)
+        idx = stationary_bootstrap_indices(n_obs, size, mean_block, rng)
+        sample = x[idx]
+        std = sample.std(axis=1, ddof=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe[start : start + size] = np.where(std > 0, np.sqrt(periods_per_year) * sample.mean(axis=1) / std, 0.0)
+        wealth = np.cumsum(log_r[idx], axis=1)
+        mdd[start : start + size] = np.expm1((wealth - np.maximum.accumulate(wealth, axis=1)).min(axis=1))
+    tail = 50.0 * (1.0 - confidence)
+    out = {}
+    for name, values in (("sharpe", sharpe), ("max_drawdown", mdd)):
+        lo, hi = np.percentile(values, [tail, 100.0 - tail])
+        out[name] = {"lower": float(lo), "upper": float(hi), "median": float(np.median(values))}
+    return out
+
+
+__all__ = [
+    "sharpe_ratio",
+    "sortino_ratio",
+    "max_drawdown",
+    "win_rate",
+    "rolling_metrics",
+    "rolling_metrics_frame",
+    "stationary_bootstrap_indices",
+    "bootstrap_confidence_intervals",
+]
@@ -4,11 +4,19 @@ Backtest reporting: compute metrics and write outputs.
 
 import json
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
 import pandas as pd
 
-from src.backtest.metrics import max_drawdown, sharpe_ratio, sortino_ratio, win_rate
+from src.backtest.attribution import attribute_pnl, pnl_by_component, pnl_by_dimension
+from src.backtest.metrics import (
+    bootstrap_confidence_intervals,
+    max_drawdown,
+    rolling_metrics_frame,
+    sharpe_ratio,
+    sortino_ratio,
+    win_rate,
+)
 from src.core.io import write_parquet
 from src.core.utils import ensure_directory, get_logger
 
@@ -20,7 +28,21 @@ def summarize_backtest(
     trades: pd.DataFrame,
     out_dir: Path,
     strategy_name: str,
+    rolling_windows: Sequence[int] = (63, 126, 252),
+    bootstrap_samples: int = 0,
+    bootstrap_block: float = 20.0,
+    confidence: float = 0.95,
+    alpha_scores: Optional[pd.DataFrame] = None,
+    periods_per_year: int = 252,
 ) -> Dict:
+    """
+    Full-period metrics plus rolling-window metrics (rolling_metrics.parquet) and, when
+    `bootstrap_samples` > 0, stationary block bootstrap intervals for Sharpe and drawdown.
+
+    With `alpha_scores` (or contrib_* columns on `trades`), PnL is attributed to components,
+    tickers, regimes and dates (attribution.parquet) and pnl_by_regime uses each ticker's
+    own regime_label. `periods_per_year` annualizes per-bar returns (252 for daily bars).
+    """
     ensure_directory(out_dir)
 
     portfolio["cum_return"] = (1 + portfolio["daily_return"].fillna(0.0)).cumprod()
@@ -31,17 +53,42 @@ def summarize_backtest(
             portfolio.groupby("regime_label")["daily_return"].sum().to_dict()
         )
 
+    attribution = None
+    has_contribs = any(c.startswith("contrib_") for c in trades.columns)
+    if len(trades) and "pnl" in trades and (alpha_scores is not None or has_contribs):
+        attribution = attribute_pnl(trades, alpha_scores)
+        if not pnl_by_regime:
+            pnl_by_regime = {k: v for k, v in pnl_by_dimension(attribution, "regime").items() if k != "unknown"}
+
     summary = {
         "strategy_name": strategy_name,
         "start_date": str(portfolio["date"].min()),
         "end_date": str(portfolio["date"].max()),
-        "sharpe": float(sharpe_ratio(portfolio["daily_return"].fillna(0.0))),
-        "sortino": float(sortino_ratio(portfolio["daily_return"].fillna(0.0))),
+        "sharpe": float(sharpe_ratio(portfolio["daily_return"].fillna(0.0), periods_per_year=periods_per_year)),
+        "sortino": float(sortino_ratio(portfolio["daily_return"].fillna(0.0), periods_per_year=periods_per_year)),
         "max_drawdown": float(max_drawdown(portfolio["cum_return"])),
         "win_rate": float(win_rate(portfolio["daily_return"].fillna(0.0))),
         "num_trades": int(len(trades)),
         "pnl_by_regime": pnl_by_regime,
     }
+    if attribution is not None:
+        summary["pnl_by_component"] = pnl_by_component(attribution)
+        summary["pnl_by_ticker"] = pnl_by_dimension(attribution, "ticker")
+        write_parquet(attribution, out_dir / "attribution.parquet")
+
+    if bootstrap_samples > 0:
+        summary["bootstrap"] = bootstrap_confidence_intervals(
+            portfolio["daily_return"],
+            n_samples=bootstrap_samples,
+            mean_block=bootstrap_block,
+            confidence=confidence,
+            periods_per_year=periods_per_year,
+        )
+
+    if rolling_windows:
+        rolling = rolling_metrics_frame(portfolio["daily_return"], rolling_windows, periods_per_year)
+        rolling.insert(0, "date", portfolio["date"].to_numpy())
+        write_parquet(rolling, out_dir / "rolling_metrics.parquet")
 
     write_parquet(portfolio, out_dir / "pnl_timeseries.parquet")
     write_parquet(trades, out_dir / "trades.parquet")
@@ -0,0 +1,285 @@
+"""
+Event-driven order/fill simulator with struct-of-arrays logs.
+
+Each bar is one event: the book is marked at the close, target weights become share orders
+(cancel-and-replace against the current position, so unfilled size is re-sent next bar),
+and orders fill at the close up to `max_participation` of the bar's volume. Fees come from
+the CostModel (half-spread, commission, square-root impact on the filled notional).
+
+Orders, fills and position snapshots are appended column-wise into preallocated NumPy
+buffers that double when full, so a run never creates per-row Python objects; tickers are
+stored as int32 codes and exported as Arrow dictionary arrays.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.backtest.costs import BPS, CostModel, trailing_vol_adv
+
+SIDE_BUY = 1
+SIDE_SELL = -1
+
+
+class ColumnBuffer:
+    """Growable struct-of-arrays: one preallocated NumPy column per field."""
+
+    schema: Dict[str, np.dtype] = {}
+
+    def __init__(self, tickers: Sequence[str], dates: Optional[Sequence] = None, capacity: int = 1024):
+        self.tickers = list(tickers)
+        self.dates = None if dates is None else np.asarray(dates)
+        self._size = 0
+        self._cols = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in self.schema.items()}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self._cols.values())))
+
+    def _reserve(self, extra: int) -> None:
+        need = self._size + extra
+        if need <= self.capacity:
+            return
+        new_cap = self.capacity
+        while new_cap < need:
+            new_cap *= 2
+        for name, col in self._cols.items():
+            grown = np.empty(new_cap, dtype=col.dtype)
+            grown[: self._size] = col[: self._size]
+            self._cols[name] = grown
+
+    def append(self, **columns) -> None:
+        """Append a block of rows; every field must be given (scalars broadcast)."""
+        sizes = [np.size(v) for v in columns.values() if np.ndim(v) > 0]
+        n = max(sizes) if sizes else 1
+        if n == 0:
+            return
+        missing = set(self.schema) - set(columns)
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(missing)}")
+        self._reserve(n)
+        end = self._size + n
+        for name, values in columns.items():
+            self._cols[name][self._size : end] = values
+        self._size = end
+
+    def column(self, name: str) -> np.ndarray:
+        """View of the filled part of a column (no copy)."""
+        return self._cols[name][: self._size]
+
+    def to_arrow(self) -> pa.Table:
+        arrays = {}
+        for name in self.schema:
+            values = self.column(name)
+            if name == "ticker_id":
+                arrays["ticker"] = pa.DictionaryArray.from_arrays(
+                    pa.array(values, type=pa.int32()), pa.array(self.tickers, type=pa.string())
+                )
+            elif name == "step" and self.dates is not None:
+                arrays["date"] = pa.array(self.dates[values])
+            else:
+                arrays[name] = pa.array(values)
+        return pa.table(arrays)
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.to_arrow().to_pandas()
+
+
+class OrderLog(ColumnBuffer):
+    schema = {
+        "order_id": np.dtype(np.int64),
+        "step": np.dtype(np.int32),
+        "ticker_id": np.dtype(np.int32),
+        "side": np.dtype(np.int8),
+        "quantity": np.dtype(np.float64),
+        "filled": np.dtype(np.float64),
+    }
+
+
+class TradeLog(ColumnBuffer):
+    schema = {
+        "order_id": np.dtype(np.int64),
+        "step": np.dtype(np.int32),
+        "ticker_id": np.dtype(np.int32),
+        "side": np.dtype(np.int8),
+        "quantity": np.dtype(np.float64),
+        "price": np.dtype(np.float64),
+        "notional": np.dtype(np.float64),
+        "fees": np.dtype(np.float64),
+    }
+
+
+class PositionBook(ColumnBuffer):
+    """Live share/cash state plus a snapshot log of non-flat positions per step."""
+
+    schema = {
+        "step": np.dtype(np.int32),
+        "ticker_id": np.dtype(np.int32),
+        "quantity": np.dtype(np.float64),
+        "market_value": np.dtype(np.float64),
+        "weight": np.dtype(np.float64),
+    }
+
+    def __init__(self, tickers: Sequence[str], dates=None, capacity: int = 1024, cash: float = 0.0):
+        super().__init__(tickers, dates, capacity)
+        self.quantity = np.zeros(len(self.tickers), dtype=np.float64)
+        self.cash = float(cash)
+
+    def equity(self, prices: np.ndarray) -> float:
+        return self.cash + float(np.dot(self.quantity, np.nan_to_num(prices)))
+
+    def snapshot(self, step: int, prices: np.ndarray, equity: float) -> None:
+        held = np.flatnonzero(self.quantity)
+        value = self.quantity[held] * np.nan_to_num(prices[held])
+        self.append(
+            step=step,
+            ticker_id=held,
+            quantity=self.quantity[held],
+            market_value=value,
+            weight=value / equity if equity else 0.0,
+        )
+
+
+@dataclass
+class SimulationResult:
+    orders: OrderLog
+    fills: TradeLog
+    positions: PositionBook
+    equity: np.ndarray
+
+
+def simulate(
+    targets: np.ndarray,
+    close: np.ndarray,
+    volume: Optional[np.ndarray],
+    tickers: Sequence[str],
+    dates: Optional[Sequence] = None,
+    cost_model: Optional[CostModel] = None,
+    max_participation: float = 0.1,
+    min_trade_shares: float = 1e-9,
+    capacity: int = 1024,
+) -> SimulationResult:
+    """
+    Run target weights (dates x tickers, NaN = flat) through the event loop.
+
+    Orders are sized against equity marked at that bar's close; names without a price that
+    bar are not traded. Fills are capped at
+    `max_participation * volume` (uncapped where volume is missing or non-positive).
+    """
+    model = cost_model or CostModel(spread_bps=0.0, commission_bps=0.0, impact_coef=0.0)
+    t = np.nan_to_num(np.asarray(targets, dtype=np.float64))
+    px = np.asarray(close, dtype=np.float64)
+    # marks carry the last traded close through missing bars
+    marks = pd.DataFrame(px).ffill().to_numpy()
+    n_steps, n = t.shape
+    vol = None if volume is None else np.asarray(volume, dtype=np.float64)
+    if vol is not None and model.impact_coef > 0:
+        sigma, adv = trailing_vol_adv(model, px, vol)
+        sigma, adv = np.nan_to_num(sigma), np.nan_to_num(adv)
+    else:
+        sigma = adv = None
+    linear_rate = model.spread_vector(tickers) / 2.0 + model.commission_bps * BPS
+
+    orders = OrderLog(tickers, dates, capacity)
+    fills = TradeLog(tickers, dates, capacity)
+    book = PositionBook(tickers, dates, capacity, cash=model.portfolio_value)
+    equity = np.empty(n_steps)
+    next_order_id = 0
+
+    for step in range(n_steps):
+        price = px[step]
+        tradable = np.isfinite(price) & (price > 0)
+        eq = book.equity(marks[step])
+        desired = np.where(tradable, t[step] * eq / np.where(tradable, price, 1.0), book.quantity)
+        delta = desired - book.quantity
+        idx = np.flatnonzero(np.abs(delta) > min_trade_shares)
+        if idx.size:
+            want = delta[idx]
+            fill = want
+            if vol is not None:
+                cap = max_participation * vol[step, idx]
+                capped = np.isfinite(cap) & (cap > 0)
+                fill = np.where(capped, np.sign(want) * np.minimum(np.abs(want), np.where(capped, cap, 0.0)), want)
+            order_ids = next_order_id + np.arange(idx.size)
+            next_order_id += idx.size
+            orders.append(
+                order_id=order_ids,
+                step=step,
+                ticker_id=idx,
+                side=np.where(want > 0, SIDE_BUY, SIDE_SELL),
+                quantity=np.abs(want),
+                filled=np.abs(fill),
+            )
+
+            done = np.abs(fill) > min_trade_shares
+            idx, fill, order_ids = idx[done], fill[done], order_ids[done]
+            notional = fill * price[idx]
+            traded = np.abs(notional)
+            rate = linear_rate[idx]
+            if sigma is not None:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    impact = model.impact_coef * sigma[step, idx] * np.sqrt(traded / adv[step, idx])
+                rate = rate + np.where(np.isfinite(impact), impact, 0.0)
+            fees = traded * rate
+            fills.append(
+                order_id=order_ids,
+                step=step,
+                ticker_id=idx,
+                side=np.where(fill > 0, SIDE_BUY, SIDE_SELL),
+                quantity=np.abs(fill),
+                price=price[idx],
+                notional=traded,
+                fees=fees,
+            )
+            book.quantity[idx] += fill
+            book.cash -= float(notional.sum() + fees.sum())
+
+        equity[step] = book.equity(marks[step])
+        book.snapshot(step, marks[step], equity[step])
+
+    return SimulationResult(orders=orders, fills=fills, positions=book, equity=equity)
+
+
+def simulate_positions(
+    prices: pd.DataFrame,
+    positions: pd.DataFrame,
+    cost_model: Optional[CostModel] = None,
+    max_participation: float = 0.1,
+) -> SimulationResult:
+    """Long-frame wrapper: pivot (date, ticker) prices/positions onto the grid and simulate."""
+    wide_close = prices.pivot_table(index="date", columns="ticker", values="close").sort_index()
+    targets = positions.pivot_table(index="date", columns="ticker", values="target_weight", aggfunc="sum")
+    targets = targets.reindex(index=wide_close.index, columns=wide_close.columns)
+    volume = None
+    if "volume" in prices:
+        volume = (
+            prices.pivot_table(index="date", columns="ticker", values="volume")
+            .reindex(index=wide_close.index, columns=wide_close.columns)
+            .to_numpy()
+        )
+    return simulate(
+        targets.to_numpy(),
+        wide_close.to_numpy(),
+        volume,
+        list(wide_close.columns),
+        dates=wide_close.index.to_numpy(),
+        cost_model=cost_model,
+        max_participation=max_participation,
+    )
+
+
+__all__ = [
+    "ColumnBuffer",
+    "OrderLog",
+    "TradeLog",
+    "PositionBook",
+    "SimulationResult",
+    "simulate",
+    "simulate_positions",
+]
@@ -0,0 +1,119 @@
+"""
+Single command-line entry point for the pipeline stages.
+
+Usage:
+    python -m src.cli <command> [options]
+    python -m src.cli features --tickers NVDA
+    python -m src.cli inspect --ticker SPY --start 2024-01-01 --alpha
+
+Each command names its stage function as "module:function" and imports it only when the
+command runs. `--help` and light commands such as `inspect` therefore never load LightGBM,
+scikit-learn or the other stages. This module itself imports only the standard library.
+"""
+
+import argparse
+import importlib
+import sys
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+
+class Command(NamedTuple):
+    target: str
+    help: str
+    options: Tuple[str, ...]
+    show_rows: bool = False
+
+
+_STAGE = ("tickers", "settings_path", "data_sources_path")
+
+COMMANDS: Dict[str, Command] = {
+    "fetch": Command(
+        "src.pipeline.fetch_raw_data:fetch_raw_data", "Download raw OHLCV with yfinance", _STAGE + ("period",)
+    ),
+    "preprocess": Command(
+        "src.pipeline.preprocess_data:preprocess_data", "Clean raw bars into processed Parquet", _STAGE
+    ),
+    "features": Command("src.pipeline.build_features:build_features", "Build per-ticker features", _STAGE),
+    "signals": Command("src.pipeline.build_signals:build_signals", "Compute rule-based signals", _STAGE),
+    "regime": Command(
+        "src.pipeline.run_regime_engine:run_regime_engine",
+        "Label market regimes for the benchmarks",
+        ("settings_path", "data_sources_path", "regimes_config_path"),
+    ),
+    "train": Command("src.pipeline.train_ml_models:train_ml_models", "Train the next-state LightGBM models", _STAGE),
+    "predict": Command("src.pipeline.run_predictions:run_predictions", "Score features with trained models", _STAGE),
+    "meta": Command(
+        "src.pipeline.run_meta_model:run_meta_model",
+        "Combine signals and predictions into alpha scores",
+        ("tickers", "settings_path", "regimes_config_path"),
+    ),
+    "size": Command(
+        "src.pipeline.run_position_sizing:run_position_sizing", "Size positions from alpha scores", _STAGE
+    ),
+    "backtest": Command("src.pipeline.run_backtest:run_backtest_pipeline", "Backtest the sized positions", _STAGE),
+    "inspect": Command(
+        "src.pipeline.inspect_signals:inspect_signals",
+        "Print a ticker's signals or alpha scores",
+        ("ticker", "settings_path", "start", "end", "alpha"),
+        show_rows=True,
+    ),
+}
+
+_OPTIONS: Dict[str, Tuple[str, dict]] = {
+    "tickers": (
+        "--tickers",
+        {"nargs": "+", "metavar": "TICKER", "help": "Tickers to process in addition to the configured ones"},
+    ),
+    "settings_path": (
+        "--config",
+        {"default": "config/settings.yaml", "metavar": "PATH", "help": "Path to settings.yaml"},
+    ),
+    "data_sources_path": (
+        "--data-sources",
+        {"default": "config/data_sources.yaml", "metavar": "PATH", "help": "Path to data_sources.yaml"},
+    ),
+    "regimes_config_path": (
+        "--regimes",
+        {"default": "config/regimes.yaml", "metavar": "PATH", "help": "Path to regimes.yaml"},
+    ),
+    "period": ("--period", {"default": "5y", "help": "yfinance history period"}),
+    "ticker": ("--ticker", {"required": True, "help": "Ticker symbol to inspect"}),
+    "start": ("--start", {"metavar": "DATE", "help": "Start date (YYYY-MM-DD)"}),
+    "end": ("--end", {"metavar": "DATE", "help": "End date (YYYY-MM-DD)"}),
+    "alpha": ("--alpha", {"action": "store_true", "help": "Inspect alpha scores instead of raw signals"}),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Hybrid alpha pipeline commands.")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+    for name, command in COMMANDS.items():
+        sub = commands.add_parser(name, help=command.help, description=command.help)
+        for option in command.options:
+            flag, kwargs = _OPTIONS[option]
+            sub.add_argument(flag, dest=option, **kwargs)
+        if command.show_rows:
+            sub.add_argument("--rows", type=int, default=20, help="Rows to print")
+    return parser
+
+
+def resolve(target: str):
+    """Import "module:function" on demand."""
+    module, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    command = COMMANDS[args.command]
+    result = resolve(command.target)(**{option: getattr(args, option) for option in command.options})
+    if command.show_rows:
+        print(result.head(args.rows))
+    return 0
+
+
+__all__ = ["COMMANDS", "Command", "build_parser", "main", "resolve"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
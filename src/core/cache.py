@@ -0,0 +1,172 @@
+"""
+Per-run cache of derived series shared across pipeline stages.
+
+Entries are keyed by (ticker, transform, window, data version), where the data version is a
+digest of the input values, so a stage that reads the same closes from another file (e.g.
+the regime engine re-reading benchmark bars that build_features already rolled over) hits
+the cache while changed data never does. Values are stored as NumPy arrays and re-wrapped
+on the caller's index. Eviction is LRU, bounded by total array bytes.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CacheKey = Tuple[str, str, int, str]
+
+
+def data_version(values: pd.Series | np.ndarray) -> str:
+    """Content digest of a series' values (index ignored)."""
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    arr = np.ascontiguousarray(values)
+    h = hashlib.blake2b(digest_size=12)
+    h.update(str(arr.shape).encode("ascii"))
+    h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+class SeriesCache:
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get_or_compute(self, key: CacheKey, compute: Callable[[], pd.Series | np.ndarray]) -> np.ndarray:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit
+            self.misses += 1
+
+        result = compute()
+        arr = result.to_numpy(dtype=np.float64, na_value=np.nan) if isinstance(result, pd.Series) else np.asarray(result)
+        arr.setflags(write=False)
+        if arr.nbytes > self.max_bytes:
+            return arr
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = arr
+            self._bytes += arr.nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+        return arr
+
+    def derived(
+        self,
+        ticker: str,
+        transform: str,
+        window: int,
+        source: pd.Series,
+        compute: Callable[[pd.Series], pd.Series],
+    ) -> pd.Series:
+        """`compute(source)` through the cache, returned on `source`'s index."""
+        key = (str(ticker), transform, int(window), data_version(source))
+        values = self.get_or_compute(key, lambda: compute(source))
+        # copy so callers can modify the result without touching the cached array
+        return pd.Series(values, index=source.index, copy=True)
+
+    # Common transforms, defined once so every stage keys them identically
+    def returns(self, ticker: str, close: pd.Series, periods: int = 1) -> pd.Series:
+        return self.derived(ticker, "pct_change", periods, close, lambda s: s.pct_change(periods=periods))
+
+    def sma(self, ticker: str, close: pd.Series, window: int) -> pd.Series:
+        return self.derived(ticker, "sma", window, close, lambda s: s.rolling(window=window, min_periods=window).mean())
+
+    def rolling_mean(self, ticker: str, name: str, series: pd.Series, window: int) -> pd.Series:
+        return self.derived(
+            ticker, f"mean:{name}", window, series, lambda s: s.rolling(window=window, min_periods=window).mean()
+        )
+
+    def rolling_std(self, ticker: str, name: str, series: pd.Series, window: int) -> pd.Series:
+        return self.derived(
+            ticker, f"std:{name}", window, series, lambda s: s.rolling(window=window, min_periods=window).std()
+        )
+
+    def realized_vol(self, ticker: str, returns: pd.Series, window: int, periods_per_year: int = 252) -> pd.Series:
+        """Annualized rolling std of simple returns (same definition as realized_vol_<w>)."""
+        return self.derived(
+            ticker,
+            f"realized_vol:{periods_per_year}",
+            window,
+            returns,
+            lambda s: s.rolling(window=window, min_periods=window).std() * np.sqrt(periods_per_year),
+        )
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        with self._lock:
+            keys = [k for k in self._entries if ticker is None or k[0] == ticker]
+            for k in keys:
+                self._bytes -= self._entries.pop(k).nbytes
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def frame_ticker(df: pd.DataFrame) -> str:
+    """Ticker label for cache keys of a single-ticker frame ("" when absent)."""
+    return str(df["ticker"].iloc[0]) if "ticker" in df and len(df) else ""
+
+
+_DEFAULT: Optional[SeriesCache] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_series_cache() -> SeriesCache:
+    """Process-wide cache shared by the pipeline stages of one run."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = SeriesCache()
+        return _DEFAULT
+
+
+def configure_series_cache(max_mb: float) -> SeriesCache:
+    """Start a fresh run cache with the given byte budget."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        _DEFAULT = SeriesCache(int(max_mb * 1024 * 1024))
+        return _DEFAULT
+
+
+__all__ = ["data_version", "SeriesCache", "frame_ticker", "get_series_cache", "configure_series_cache"]
@@ -0,0 +1,205 @@
+"""
+Trading calendar with dense int32 day ids.
+
+Every trading day gets an integer id, its position on the sorted calendar, so joins between
+artifacts become a searchsorted over int64 keys (day id, or group * n_days + day id) plus a
+positional gather instead of a pandas merge on the `date` column. Dates of any dtype
+(strings, datetime64[ns], tz-aware timestamps, python dates) are normalized to the
+calendar's unit first, so joins no longer depend on which dtype a source happened to write.
+
+build_features persists the calendar and stamps a `day_id` column on the features; frames
+that both carry `day_id` are joined on it directly, after checking that every id present on
+both names the same date on each (artifacts stamped by different calendars fall back to a
+date join). For intraday bars the calendar runs at
+second resolution, so an id names one bar rather than one session; the unit is inferred
+from the dates (daily stamps share a single time of day).
+"""
+
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.types import DataFrame
+
+DAY_ID = "day_id"
+
+
+def to_periods(dates, unit: str = "D") -> np.ndarray:
+    """Normalize any date-like sequence to datetime64[unit] (tz-aware values keep wall-clock time)."""
+    if isinstance(dates, np.ndarray) and dates.dtype.kind == "M":
+        return dates.astype(f"datetime64[{unit}]")
+    ser = pd.to_datetime(dates if isinstance(dates, pd.Series) else pd.Series(dates))
+    if ser.dt.tz is not None:
+        ser = ser.dt.tz_localize(None)
+    return ser.to_numpy().astype(f"datetime64[{unit}]")
+
+
+def to_days(dates) -> np.ndarray:
+    return to_periods(dates, "D")
+
+
+def infer_unit(dates) -> str:
+    """'D' when every stamp has the same time of day (daily bars), else 's' (intraday)."""
+    stamps = to_periods(dates, "s")
+    stamps = stamps[~np.isnat(stamps)].astype(np.int64)
+    return "D" if len(np.unique(stamps % 86_400)) <= 1 else "s"
+
+
+class TradingCalendar:
+    def __init__(self, dates=(), unit: Optional[str] = None):
+        self.unit = unit or (infer_unit(dates) if len(dates) else "D")
+        empty = np.array([], dtype=f"datetime64[{self.unit}]")
+        days = np.unique(to_periods(dates, self.unit)) if len(dates) else empty
+        self.days = days[~np.isnat(days)]
+
+    @classmethod
+    def from_frames(
+        cls, frames: Iterable[pd.DataFrame], column: str = "date", unit: Optional[str] = None
+    ) -> "TradingCalendar":
+        parts = [to_periods(df[column], "s") for df in frames if column in df]
+        return cls(np.concatenate(parts) if parts else np.array([], dtype="datetime64[s]"), unit)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TradingCalendar) and np.array_equal(self.days, other.days)
+
+    def day_ids(self, dates) -> np.ndarray:
+        """int32 trading-day ids for `dates`; -1 where the date is not on the calendar."""
+        days = to_periods(dates, self.unit)
+        if not len(self.days):
+            return np.full(len(days), -1, dtype=np.int32)
+        pos = np.searchsorted(self.days, days)
+        found = (pos < len(self.days)) & (self.days[np.minimum(pos, len(self.days) - 1)] == days)
+        return np.where(found, pos, -1).astype(np.int32)
+
+    def dates_for(self, ids) -> np.ndarray:
+        """datetime64[ns] dates for day ids (NaT for -1 or out-of-range ids)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        valid = (ids >= 0) & (ids < len(self.days))
+        out = np.full(len(ids), np.datetime64("NaT"), dtype="datetime64[ns]")
+        out[valid] = self.days[ids[valid]]
+        return out
+
+    def extend(self, dates) -> "TradingCalendar":
+        """Calendar over the union of both; existing ids are unchanged when `dates` only add later days."""
+        return TradingCalendar(np.concatenate([self.days, to_periods(dates, self.unit)]), self.unit)
+
+    def is_prefix_of(self, other: "TradingCalendar") -> bool:
+        """True when every id of this calendar maps to the same day on `other`."""
+        return len(self) <= len(other) and np.array_equal(self.days, other.days[: len(self)])
+
+    def with_day_ids(self, df: DataFrame, column: str = "date") -> DataFrame:
+        """Copy of `df` with a `day_id` column for its dates."""
+        out = df.copy()
+        out[DAY_ID] = self.day_ids(df[column])
+        return out
+
+    def to_frame(self) -> DataFrame:
+        ids = np.arange(len(self.days), dtype=np.int32)
+        return pd.DataFrame({DAY_ID: ids, "date": self.days.astype("datetime64[ns]")})
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.to_frame().to_parquet(path, index=False)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TradingCalendar":
+        return cls(pd.read_parquet(path)["date"])
+
+
+def _id_dates(df: DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    ids = df[DAY_ID].to_numpy(dtype=np.int64)
+    ids, first = np.unique(ids, return_index=True)
+    keep = ids >= 0
+    return ids[keep], to_periods(df["date"].iloc[first[keep]], "s")
+
+
+def same_day_ids(left: DataFrame, right: DataFrame) -> bool:
+    """
+    True when every `day_id` present on both frames maps to the same date on each, i.e. they
+    were stamped by compatible calendars. Frames without a `date` column cannot be checked.
+    """
+    if "date" not in left or "date" not in right:
+        return True
+    left_ids, left_dates = _id_dates(left)
+    right_ids, right_dates = _id_dates(right)
+    _, li, ri = np.intersect1d(left_ids, right_ids, assume_unique=True, return_indices=True)
+    return bool(np.array_equal(left_dates[li], right_dates[ri]))
+
+
+def _group_codes(left: pd.Series, right: pd.Series) -> tuple[np.ndarray, np.ndarray, int]:
+    groups = pd.Index(pd.unique(right))
+    return groups.get_indexer(left).astype(np.int64), groups.get_indexer(right).astype(np.int64), len(groups)
+
+
+def join_on_day(
+    left: DataFrame,
+    right: DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    by: Optional[str] = None,
+    calendar: Optional[TradingCalendar] = None,
+    suffix: str = "_right",
+) -> DataFrame:
+    """
+    Left join of `right[columns]` onto `left` by trading day (and `by`, e.g. ticker), matching
+    `left.merge(right, on=["date", by], how="left")` when `right` is unique on those keys
+    (otherwise its last row wins). Rows of `left` keep their order; the index is reset.
+
+    Frames that both carry `day_id` are joined on it unless a `calendar` is given or their
+    ids disagree on a date (see same_day_ids); otherwise dates are mapped through `calendar`
+    (default: the calendar of `right`'s dates). Columns already on `left` are added with
+    `suffix`.
+    """
+    keys = {"date", DAY_ID} | ({by} if by else set())
+    columns = [c for c in (right.columns if columns is None else columns) if c not in keys]
+
+    if calendar is None and DAY_ID in left and DAY_ID in right and same_day_ids(left, right):
+        left_day = left[DAY_ID].to_numpy(dtype=np.int64)
+        right_day = right[DAY_ID].to_numpy(dtype=np.int64)
+        n_days = int(max(left_day.max(initial=-1), right_day.max(initial=-1))) + 1
+    else:
+        calendar = calendar if calendar is not None else TradingCalendar(right["date"])
+        left_day = calendar.day_ids(left["date"]).astype(np.int64)
+        right_day = calendar.day_ids(right["date"]).astype(np.int64)
+        n_days = len(calendar)
+
+    if by:
+        left_group, right_group, _ = _group_codes(left[by], right[by])
+    else:
+        left_group = np.zeros(len(left), dtype=np.int64)
+        right_group = np.zeros(len(right), dtype=np.int64)
+
+    ok_right = (right_day >= 0) & (right_group >= 0)
+    rows = np.flatnonzero(ok_right)
+    right_keys = right_group[ok_right] * n_days + right_day[ok_right]
+    order = np.argsort(right_keys, kind="stable")
+    sorted_keys, sorted_rows = right_keys[order], rows[order]
+
+    left_keys = left_group * n_days + left_day
+    pos = np.full(len(left), -1, dtype=np.int64)
+    if len(sorted_keys):
+        idx = np.searchsorted(sorted_keys, left_keys, side="right") - 1
+        hit = (left_day >= 0) & (left_group >= 0) & (idx >= 0)
+        hit &= sorted_keys[np.maximum(idx, 0)] == left_keys
+        pos[hit] = sorted_rows[idx[hit]]
+
+    out = left.reset_index(drop=True)
+    missing = pos < 0
+    take = np.maximum(pos, 0)
+    for col in columns:
+        name = f"{col}{suffix}" if col in out else col
+        if len(right):
+            values = right[col].iloc[take].reset_index(drop=True)
+            out[name] = values.where(~missing) if missing.any() else values
+        else:
+            out[name] = np.nan
+    return out
+
+
+__all__ = ["DAY_ID", "to_periods", "to_days", "infer_unit", "TradingCalendar", "same_day_ids", "join_on_day"]
@@ -0,0 +1,117 @@
+"""
+Bar frequency: annualization, session-denominated lookbacks and minute-to-daily resampling.
+
+Lookbacks in config (sma, returns, realized_vol, atr, volume) are counted in sessions, so a
+20-session SMA on 5-minute bars spans 20 * 78 bars while keeping the `sma_20` column name.
+Annualization uses bars per session * sessions per year. Daily bars are the 1-bar-per-session
+case and go through exactly the same arithmetic as before.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.calendar import to_periods
+from src.core.types import DataFrame
+
+SESSIONS_PER_YEAR = 252
+
+
+@dataclass(frozen=True)
+class Frequency:
+    name: str
+    minutes: int
+    bars_per_session: int
+    sessions_per_year: int = SESSIONS_PER_YEAR
+
+    @property
+    def intraday(self) -> bool:
+        return self.bars_per_session > 1
+
+    @property
+    def periods_per_year(self) -> int:
+        return self.bars_per_session * self.sessions_per_year
+
+    def bars(self, sessions: int) -> int:
+        """Bars spanned by a lookback of `sessions` sessions."""
+        return int(sessions) * self.bars_per_session
+
+
+# US equities regular session: 390 minutes
+FREQUENCIES: Dict[str, Frequency] = {
+    "1d": Frequency("1d", 390, 1),
+    "15min": Frequency("15min", 15, 26),
+    "5min": Frequency("5min", 5, 78),
+    "1min": Frequency("1min", 1, 390),
+}
+DAILY = FREQUENCIES["1d"]
+
+
+def get_frequency(spec: Optional[str | Dict[str, Any] | Frequency] = None) -> Frequency:
+    """Frequency from a name, a settings dict (its `frequency` key) or None (daily)."""
+    if isinstance(spec, Frequency):
+        return spec
+    if isinstance(spec, dict):
+        spec = spec.get("frequency")
+    if spec is None:
+        return DAILY
+    if spec not in FREQUENCIES:
+        raise ValueError(f"Unknown bar frequency {spec!r}; expected one of {sorted(FREQUENCIES)}")
+    return FREQUENCIES[spec]
+
+
+def session_ids(dates) -> tuple[np.ndarray, np.ndarray]:
+    """(int32 session id per bar, sorted session dates); the session is the bar's calendar date."""
+    days = to_periods(dates, "D")
+    sessions, codes = np.unique(days, return_inverse=True)
+    return codes.astype(np.int32), sessions
+
+
+def resample_to_daily(bars: DataFrame) -> DataFrame:
+    """
+    Daily OHLCV from intraday bars: one vectorized reduction per column over (ticker, session)
+    groups of the time-sorted bars. Dates come out as session dates at midnight.
+    """
+    df = bars.sort_values(["ticker", "date"], kind="stable") if "ticker" in bars else bars.sort_values("date")
+    codes, sessions = session_ids(df["date"])
+    tickers = df["ticker"].to_numpy() if "ticker" in df else np.zeros(len(df), dtype=np.int64)
+    ticker_codes, ticker_values = pd.factorize(tickers)
+    key = ticker_codes.astype(np.int64) * max(len(sessions), 1) + codes
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) if len(key) else np.array([], dtype=np.int64)
+    ends = np.r_[starts[1:], len(key)] - 1
+
+    out = pd.DataFrame({"date": sessions[codes[starts]].astype("datetime64[ns]")})
+    if "ticker" in df:
+        out["ticker"] = np.asarray(ticker_values, dtype=object)[ticker_codes[starts]]
+    reducers = {
+        "open": "first",
+        "high": np.maximum,
+        "low": np.minimum,
+        "close": "last",
+        "adj_close": "last",
+        "volume": np.add,
+    }
+    for col, how in reducers.items():
+        if col not in df:
+            continue
+        values = df[col].to_numpy(dtype=np.float64)
+        if how == "first":
+            out[col] = values[starts]
+        elif how == "last":
+            out[col] = values[ends]
+        else:
+            out[col] = how.reduceat(values, starts) if len(starts) else np.array([], dtype=np.float64)
+    return out
+
+
+__all__ = [
+    "SESSIONS_PER_YEAR",
+    "Frequency",
+    "FREQUENCIES",
+    "DAILY",
+    "get_frequency",
+    "session_ids",
+    "resample_to_daily",
+]
@@ -7,12 +7,17 @@ from pathlib import Path
 from typing import Optional
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 
+from .telemetry import traced
 from .types import DataFrame
 from .utils import ensure_directory, get_logger
 
 logger = get_logger(__name__)
 
+SESSION_PARTITION = "session"
+
 
 def resolve_path(path: str | Path, data_root: Optional[str | Path] = None) -> Path:
     """
@@ -32,9 +37,38 @@ def resolve_path(path: str | Path, data_root: Optional[str | Path] = None) -> Pa
     return path_obj
 
 
+def resolve_source_path(directory: str | Path, pattern: str, ticker: str, data_root: Optional[str | Path] = None) -> Path:
+    """
+    Path of one ticker's file from a data_sources.yaml `{directory, pattern}` entry. A relative
+    directory is placed under `data_root`; a leading component equal to the root's name
+    ("data/processed" with data_root "data") is not repeated.
+    """
+    base_dir = Path(directory)
+    if not base_dir.is_absolute() and data_root:
+        root = Path(data_root)
+        if base_dir.parts and base_dir.parts[0] == root.name:
+            base_dir = root / Path(*base_dir.parts[1:])
+        else:
+            base_dir = root / base_dir
+    return base_dir / pattern.format(ticker=ticker)
+
+
+def processed_path(ticker: str, data_sources: dict) -> Path:
+    """Processed bars file for `ticker` per data_sources.yaml (processed_files, data_root)."""
+    proc_cfg = data_sources.get("processed_files", {})
+    return resolve_source_path(
+        proc_cfg.get("directory", "data/processed"),
+        proc_cfg.get("pattern", "{ticker}.parquet"),
+        ticker,
+        data_sources.get("data_root"),
+    )
+
+
+@traced("io", reads=lambda path, data_root=None: resolve_path(path, data_root))
 def read_parquet(path: str | Path, data_root: Optional[str | Path] = None) -> DataFrame:
     """
-    Read a Parquet file into a DataFrame.
+    Read a Parquet file into a DataFrame. A directory written by `write_parquet_by_session`
+    is read back as one frame in date order, without the partition column.
 
     Args:
         path: Path to the Parquet file.
@@ -42,9 +76,14 @@ def read_parquet(path: str | Path, data_root: Optional[str | Path] = None) -> Da
     """
     resolved = resolve_path(path, data_root)
     logger.info(f"Reading Parquet file from {resolved}")
+    if resolved.is_dir():
+        df = pd.read_parquet(resolved)
+        df = df.drop(columns=[SESSION_PARTITION], errors="ignore")
+        return df.sort_values("date", kind="stable").reset_index(drop=True) if "date" in df else df
     return pd.read_parquet(resolved)
 
 
+@traced("io", writes=lambda result, *args, **kwargs: result)
 def write_parquet(
     df: DataFrame, path: str | Path, data_root: Optional[str | Path] = None
 ) -> Path:
@@ -66,6 +105,34 @@ def write_parquet(
     return resolved
 
 
+@traced("io", writes=lambda result, *args, **kwargs: result)
+def write_parquet_by_session(
+    df: DataFrame, path: str | Path, data_root: Optional[str | Path] = None
+) -> Path:
+    """
+    Write intraday rows as a directory partitioned by session date
+    (<path>/session=YYYY-MM-DD/part-0.parquet). Only the sessions present in `df` are
+    replaced, so appending a day rewrites one small file.
+    """
+    resolved = resolve_path(path, data_root)
+    if resolved.is_file():
+        resolved.unlink()
+    ensure_directory(resolved)
+    logger.info(f"Writing session-partitioned Parquet dataset to {resolved}")
+    sessions = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+    table = pa.Table.from_pandas(df.assign(**{SESSION_PARTITION: sessions.to_numpy()}), preserve_index=False)
+    ds.write_dataset(
+        table,
+        resolved,
+        format="parquet",
+        partitioning=[SESSION_PARTITION],
+        partitioning_flavor="hive",
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+    return resolved
+
+
 def read_csv(path: str | Path, data_root: Optional[str | Path] = None) -> DataFrame:
     """
     Read a CSV file into a DataFrame.
@@ -88,4 +155,13 @@ def write_csv(
     return resolved
 
 
-__all__ = ["read_parquet", "write_parquet", "read_csv", "write_csv", "resolve_path"]
+__all__ = [
+    "read_parquet",
+    "write_parquet",
+    "write_parquet_by_session",
+    "read_csv",
+    "write_csv",
+    "resolve_path",
+    "resolve_source_path",
+    "processed_path",
+]
@@ -0,0 +1,56 @@
+"""
+Thread-safe latency recorder backed by a fixed-size ring buffer of recent samples.
+"""
+
+import threading
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+class LatencyTracker:
+    def __init__(self, capacity: int = 10_000):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._samples = np.zeros(capacity, dtype=np.float64)
+        self._capacity = capacity
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples[self._next] = seconds
+            self._next = (self._next + 1) % self._capacity
+            self._count += 1
+
+    def percentiles(self, qs: Sequence[float] = (50, 99)) -> Dict[str, float]:
+        with self._lock:
+            window = self._samples[: min(self._count, self._capacity)].copy()
+        if window.size == 0:
+            return {f"p{q:g}_ms": 0.0 for q in qs}
+        values = np.percentile(window, qs) * 1000.0
+        return {f"p{q:g}_ms": float(v) for q, v in zip(qs, values)}
+
+    def histogram(self, bounds_ms: Sequence[float]) -> Dict[str, int]:
+        """Recent samples per bucket: `le_<b>ms` for each ascending bound, then `gt_<last>ms`."""
+        with self._lock:
+            window = self._samples[: min(self._count, self._capacity)].copy()
+        edges = np.asarray(bounds_ms, dtype=np.float64)
+        counts = np.bincount(np.searchsorted(edges, window * 1000.0, side="left"), minlength=len(edges) + 1)
+        out = {f"le_{b:g}ms": int(c) for b, c in zip(edges, counts)}
+        out[f"gt_{edges[-1]:g}ms" if len(edges) else "all"] = int(counts[len(edges)])
+        return out
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            window = self._samples[: min(self._count, self._capacity)].copy()
+            count = self._count
+        stats = self.percentiles()
+        stats["count"] = count
+        stats["mean_ms"] = float(window.mean() * 1000.0) if window.size else 0.0
+        stats["max_ms"] = float(window.max() * 1000.0) if window.size else 0.0
+        return stats
+
+
+__all__ = ["LatencyTracker"]
@@ -0,0 +1,352 @@
+"""
+Opt-in per-stage profiling: where the time and memory go inside a pipeline stage.
+
+`profiling_run(output_dir, mode=...)` registers a telemetry span hook so that every
+`traced("stage")` call (or only the stages named in `stages`) runs under a profiler. Each
+profiled stage call writes into `output_dir`:
+
+- `<stage>.collapsed`: collapsed stacks ("frame;frame;frame weight" per line), ready for
+  flamegraph.pl, inferno or speedscope;
+- `<stage>.top.txt`: top-N functions by cumulative/own time (cProfile) or samples (sampling);
+- `<stage>.prof`: the raw cProfile stats (snakeviz, pstats), cProfile mode only;
+- `<stage>.alloc.collapsed` / `<stage>.alloc.txt`: bytes still allocated at the end of the
+  stage by allocating stack and top-N allocation sites, when `memory=True` (tracemalloc).
+
+Modes:
+
+- "cprofile": deterministic, main-thread only. Collapsed stacks are reconstructed from the
+  caller graph, splitting each function's time across its callers in proportion, so deep
+  stacks are approximate; weights are microseconds.
+- "sampling": a daemon thread snapshots every thread's Python stack each `interval` seconds
+  (rooted at the thread name); weights are sample counts. Cheaper and wall-clock based, so
+  waiting threads show up too; time inside native code is charged to the calling frame.
+
+With `memory=True` each profiled stage starts tracemalloc with deep tracebacks unless it
+is already tracing. If telemetry_run(memory="tracemalloc") started it with fewer frames,
+restarting would reset the traced memory under telemetry's open spans, so the stacks stay
+truncated to that depth (noted in `<stage>.alloc.txt`) and a warning is logged once.
+
+Repeated calls of one stage get `-2`, `-3`, ... suffixes. Stages never nest in the pipeline;
+a stage called while another is being profiled is covered by the outer profile.
+"""
+
+import argparse
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.core.telemetry import add_span_hook, remove_span_hook
+from src.core.utils import ensure_directory, get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_MODES = ("cprofile", "sampling", None)
+_REPO_ROOT = str(Path(__file__).resolve().parents[2]) + os.sep
+_MAX_DEPTH = 64
+_TRACEMALLOC_FRAMES = 32
+
+
+@functools.lru_cache(maxsize=None)
+def _short_path(filename: str) -> str:
+    if filename.startswith(_REPO_ROOT):
+        return filename[len(_REPO_ROOT) :]
+    return os.path.basename(filename)
+
+
+def _frame_label(filename: str, lineno: int, name: str) -> str:
+    # ';' separates frames in collapsed stacks (the weight follows the last space)
+    if filename in ("~", ""):
+        return name.replace(";", ":")
+    return f"{name} ({_short_path(filename)}:{lineno})".replace(";", ":")
+
+
+def collapsed_from_pstats(stats: pstats.Stats, min_us: int = 1) -> Counter:
+    """
+    Approximate collapsed stacks (microseconds) from cProfile's caller graph.
+
+    Walks from the root functions down the callees; a callee reached through a caller gets
+    the share of its own/cumulative time recorded for that caller edge.
+    """
+    raw = stats.stats  # func -> (cc, nc, tottime, cumtime, callers{caller: (cc, nc, tt, ct)})
+    callees: Dict[tuple, List[Tuple[tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [f for f, v in raw.items() if not any(c in raw for c in v[4])]
+    out: Counter = Counter()
+
+    def walk(func: tuple, path: List[str], on_path: set, scale: float) -> None:
+        tottime = raw[func][2]
+        label = path + [_frame_label(*func)]
+        own = int(round(tottime * scale * 1e6))
+        if own >= min_us:
+            out[";".join(label)] += own
+        if len(label) >= _MAX_DEPTH:
+            return
+        on_path = on_path | {func}
+        for callee, edge_cum in callees.get(func, ()):
+            callee_cum = raw[callee][3]
+            if callee in on_path or callee_cum <= 0:
+                continue
+            child_scale = edge_cum * scale / callee_cum
+            if edge_cum * scale * 1e6 >= min_us:
+                walk(callee, label, on_path, min(child_scale, 1.0))
+
+    for root in roots:
+        walk(root, [], set(), 1.0)
+    return out
+
+
+def _write_collapsed(path: Path, stacks: Counter) -> Path:
+    lines = [f"{stack} {int(weight)}" for stack, weight in sorted(stacks.items()) if weight > 0]
+    path.write_text("\n".join(lines) + ("\n" if lines else ""))
+    return path
+
+
+class _CProfileRecorder:
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self) -> None:
+        self.profiler.disable()
+
+    def write(self, out: Path, label: str, top_n: int) -> List[Path]:
+        buffer = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=buffer)
+        stats.dump_stats(out / f"{label}.prof")
+        for key in ("cumulative", "tottime"):
+            buffer.write(f"Top {top_n} by {key}:\n")
+            stats.sort_stats(key).print_stats(top_n)
+        (out / f"{label}.top.txt").write_text(buffer.getvalue())
+        collapsed = _write_collapsed(out / f"{label}.collapsed", collapsed_from_pstats(stats))
+        return [out / f"{label}.prof", out / f"{label}.top.txt", collapsed]
+
+
+class _Sampler(threading.Thread):
+    """Counts collapsed Python stacks of all other threads every `interval` seconds."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="stage-profiler", daemon=True)
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._halt = threading.Event()
+        self.start()
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._halt.wait(self.interval):
+            frames = sys._current_frames()
+            if any(tid not in names for tid in frames):
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in frames.items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.append(names.get(tid, f"thread-{tid}").replace(";", ":"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+
+    def write(self, out: Path, label: str, top_n: int) -> List[Path]:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.counts.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames[1:]):
+                total[frame] += count
+        width = max(self.samples, 1)
+        lines = [f"{self.samples} samples per thread"]
+        for title, counter in (("own samples", own), ("inclusive samples", total)):
+            lines += ["", f"Top {top_n} by {title}:", f"{'samples':>9} {'pct':>7}  function"]
+            lines += [f"{n:>9} {100.0 * n / width:>6.1f}%  {frame}" for frame, n in counter.most_common(top_n)]
+        (out / f"{label}.top.txt").write_text("\n".join(lines) + "\n")
+        return [out / f"{label}.top.txt", _write_collapsed(out / f"{label}.collapsed", self.counts)]
+
+
+class _AllocationRecorder:
+    """tracemalloc snapshots around the stage; filtering and diffing wait until write()."""
+
+    def __init__(self):
+        self.started = not tracemalloc.is_tracing()
+        if self.started:
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+        self.frames = tracemalloc.get_traceback_limit()
+        self.before = tracemalloc.take_snapshot()
+        self.base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self.start_s = time.perf_counter()
+
+    def stop(self) -> None:
+        self.elapsed_s = time.perf_counter() - self.start_s
+        self.current, self.peak = tracemalloc.get_traced_memory()
+        self.after = tracemalloc.take_snapshot()
+        if self.started:
+            tracemalloc.stop()
+
+    def write(self, out: Path, label: str, top_n: int) -> List[Path]:
+        ignore = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*"),
+        ]
+        before, after = self.before.filter_traces(ignore), self.after.filter_traces(ignore)
+        stacks: Counter = Counter()
+        for stat in after.compare_to(before, "traceback"):
+            if stat.size_diff > 0:
+                stacks[";".join(f"{_short_path(f.filename)}:{f.lineno}" for f in stat.traceback)] += stat.size_diff
+        lines = [
+            f"elapsed {self.elapsed_s:.3f} s, peak +{(self.peak - self.base) / 1e6:.2f} MB, "
+            f"retained +{(self.current - self.base) / 1e6:.2f} MB, stacks up to {self.frames} frames",
+            "",
+            f"Top {top_n} allocation sites by retained size:",
+        ]
+        lines += [str(stat) for stat in after.compare_to(before, "lineno")[:top_n]]
+        (out / f"{label}.alloc.txt").write_text("\n".join(lines) + "\n")
+        return [out / f"{label}.alloc.txt", _write_collapsed(out / f"{label}.alloc.collapsed", stacks)]
+
+
+class StageProfiler:
+    """Profiles traced stages into `output_dir`; see the module docstring for the outputs."""
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        mode: Optional[str] = "cprofile",
+        stages: Optional[Iterable[str]] = None,
+        memory: bool = False,
+        top_n: int = 30,
+        interval: float = 0.005,
+    ):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {PROFILE_MODES}, got {mode!r}")
+        self.output_dir = Path(output_dir)
+        self.mode = mode
+        self.stages = set(stages) if stages else None
+        self.memory = memory
+        self.top_n = top_n
+        self.interval = interval
+        self.written: Dict[str, List[Path]] = {}
+        self._calls: Counter = Counter()
+        self._busy = threading.Lock()
+        self._warned_frames = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None or self.memory
+
+    def wants(self, name: str) -> bool:
+        return self.stages is None or name in self.stages
+
+    def hook(self, name: str, category: str):
+        if category != "stage" or not self.wants(name):
+            return None
+        return self.profile(name)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Profile the block as one call of stage `name` (no-op if another stage is profiling)."""
+        if not self._busy.acquire(blocking=False):
+            yield
+            return
+        try:
+            self._calls[name] += 1
+            label = name if self._calls[name] == 1 else f"{name}-{self._calls[name]}"
+            recorders = []
+            if self.mode == "cprofile":
+                recorders.append(_CProfileRecorder())
+            elif self.mode == "sampling":
+                recorders.append(_Sampler(self.interval))
+            if self.memory:
+                recorders.append(_AllocationRecorder())
+                frames = recorders[-1].frames
+                if frames < _TRACEMALLOC_FRAMES and not self._warned_frames:
+                    self._warned_frames = True
+                    logger.warning(
+                        f"tracemalloc is already tracing {frames} frame(s) per allocation (telemetry "
+                        "memory='tracemalloc'?); allocation stacks are truncated to that depth"
+                    )
+            try:
+                yield
+            finally:
+                # stop everything before any output is built, so no recorder sees another's work
+                for recorder in reversed(recorders):
+                    recorder.stop()
+                out = ensure_directory(self.output_dir)
+                for recorder in recorders:
+                    self.written.setdefault(label, []).extend(recorder.write(out, label, self.top_n))
+        finally:
+            self._busy.release()
+
+
+@contextmanager
+def profiling_run(
+    output_dir: str | Path,
+    mode: Optional[str] = "cprofile",
+    stages: Optional[Iterable[str]] = None,
+    memory: bool = False,
+    top_n: int = 30,
+    interval: float = 0.005,
+) -> Iterator[Optional[StageProfiler]]:
+    """Profile traced stages run inside the block; yields None when nothing is enabled."""
+    profiler = StageProfiler(output_dir, mode, stages, memory, top_n, interval)
+    if not profiler.enabled:
+        yield None
+        return
+    add_span_hook(profiler.hook)
+    try:
+        yield profiler
+    finally:
+        remove_span_hook(profiler.hook)
+
+
+def add_profiling_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", choices=["cprofile", "sampling"], help="Profile pipeline stages")
+    parser.add_argument(
+        "--profile-stage", action="append", metavar="STAGE", help="Only profile this stage (repeatable)"
+    )
+    parser.add_argument("--profile-memory", action="store_true", help="Track allocations per stage (tracemalloc)")
+    parser.add_argument("--profile-top", type=int, help="Rows in the top-N summaries")
+
+
+def profiling_options(args: argparse.Namespace, settings: dict) -> dict:
+    """profiling_run keyword arguments from the CLI flags, falling back to settings["profiling"]."""
+    cfg = settings.get("profiling", {}) or {}
+    return {
+        "mode": args.profile or cfg.get("mode"),
+        "stages": args.profile_stage or cfg.get("stages") or None,
+        "memory": args.profile_memory or cfg.get("memory", False),
+        "top_n": args.profile_top or cfg.get("top_n", 30),
+        "interval": cfg.get("interval_ms", 5) / 1000.0,
+    }
+
+
+__all__ = [
+    "PROFILE_MODES",
+    "StageProfiler",
+    "collapsed_from_pstats",
+    "profiling_run",
+    "add_profiling_arguments",
+    "profiling_options",
+]
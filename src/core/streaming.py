@@ -0,0 +1,141 @@
+"""
+Streaming building blocks: fixed-size rolling windows with O(1) mean/std updates and a
+lag buffer for "value n steps ago" lookups.
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class RollingWindow:
+    """
+    Ring buffer over the last `size` values with running sums.
+
+    Sums are kept relative to a shift (the window mean at the last resync) to avoid
+    cancellation in the variance, and are recomputed exactly from the buffer every
+    `resync_every` pushes so floating-point drift stays bounded on long streams.
+    """
+
+    def __init__(self, size: int, resync_every: Optional[int] = None):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self.resync_every = resync_every or max(size * 8, 256)
+        self._buf = np.zeros(size, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+        self._shift = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_resync = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.size)
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.size
+
+    def push(self, value: float) -> None:
+        if self._count == 0:
+            self._shift = float(value)
+        if self.full:
+            old = self._buf[self._next] - self._shift
+            self._sum -= old
+            self._sumsq -= old * old
+        self._buf[self._next] = value
+        d = float(value) - self._shift
+        self._sum += d
+        self._sumsq += d * d
+        self._next = (self._next + 1) % self.size
+        self._count += 1
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every:
+            self.resync()
+
+    def reset(self) -> None:
+        """Drop all values (e.g. after a NaN, which pandas' rolling(min_periods=size) never skips)."""
+        self._buf[:] = 0.0
+        self._next = 0
+        self._count = 0
+        self._shift = self._sum = self._sumsq = 0.0
+        self._since_resync = 0
+
+    def resync(self) -> None:
+        window = self._buf[: len(self)]
+        self._shift = float(window.mean()) if window.size else 0.0
+        centered = window - self._shift
+        self._sum = float(centered.sum())
+        self._sumsq = float(np.dot(centered, centered))
+        self._since_resync = 0
+
+    def mean(self) -> float:
+        n = len(self)
+        if n == 0:
+            return math.nan
+        return self._shift + self._sum / n
+
+    def std(self, ddof: int = 1) -> float:
+        n = len(self)
+        if n <= ddof:
+            return math.nan
+        var = (self._sumsq - self._sum * self._sum / n) / (n - ddof)
+        return math.sqrt(max(var, 0.0))
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "resync_every": self.resync_every,
+            "buffer": self._buf.tolist(),
+            "next": self._next,
+            "count": self._count,
+            "shift": self._shift,
+            "sum": self._sum,
+            "sumsq": self._sumsq,
+            "since_resync": self._since_resync,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RollingWindow":
+        window = cls(state["size"], resync_every=state["resync_every"])
+        window._buf = np.asarray(state["buffer"], dtype=np.float64)
+        window._next = state["next"]
+        window._count = state["count"]
+        window._shift = state["shift"]
+        window._sum = state["sum"]
+        window._sumsq = state["sumsq"]
+        window._since_resync = state["since_resync"]
+        return window
+
+
+class LagBuffer:
+    """Ring buffer of the last `depth` values; `lag(k)` is the value pushed k pushes ago."""
+
+    def __init__(self, depth: int):
+        if depth < 1:
+            raise ValueError("depth must be >= 1")
+        self.depth = depth
+        self._buf = np.full(depth, np.nan, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.depth)
+
+    def push(self, value: float) -> None:
+        self._buf[self._next] = value
+        self._next = (self._next + 1) % self.depth
+        self._count += 1
+
+    def lag(self, k: int) -> float:
+        """Value pushed `k` pushes before the latest (k=0 is the latest); NaN if not seen yet."""
+        if k < 0 or k >= self.depth:
+            raise IndexError(f"lag {k} outside buffer depth {self.depth}")
+        if k >= self._count:
+            return math.nan
+        return float(self._buf[(self._next - 1 - k) % self.depth])
+
+
+__all__ = ["RollingWindow", "LagBuffer"]
@@ -0,0 +1,372 @@
+"""
+Per-stage telemetry: wall/CPU time, rows in/out, bytes read/written and memory per call.
+
+Pipeline stages and hot functions are decorated with `traced(category)`. While no run is
+active the wrapper is a single global check before calling through, so instrumented code
+pays well under a microsecond per call. Inside `telemetry_run(...)` every call becomes a
+span (nested spans per thread) and, on exit, the run is written as:
+
+- `report.json`: run totals, per-function aggregates and every span;
+- `trace.json`: Chrome trace events (open in chrome://tracing or ui.perfetto.dev).
+
+CPU time is process-wide (all threads, including native pools such as LightGBM's) over the
+span. Rows are the lengths of DataFrame/ndarray arguments and results. Bytes come from the file
+sizes behind `reads`/`writes` paths. Memory is the process RSS delta and peak-RSS growth
+("rss", default) or the tracemalloc current/peak delta ("tracemalloc", slower but exact per
+span; allocations of concurrent threads are attributed to whichever spans are open).
+"""
+
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+MEMORY_MODES = ("rss", "tracemalloc", None)
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# ru_maxrss is KiB on Linux, bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return _max_rss_bytes()
+
+
+def _max_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+def _rows(value: Any) -> int:
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(value)
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], (pd.DataFrame, np.ndarray)):
+        return sum(len(v) for v in value)
+    return 0
+
+
+def _path_bytes(path: Any) -> int:
+    if path is None:
+        return 0
+    path = Path(path)
+    try:
+        if path.is_dir():
+            return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start_ns: int
+    thread_id: int
+    depth: int
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    mem_delta: int = 0
+    mem_peak_delta: int = 0
+    error: Optional[str] = None
+    _mem_start: int = field(default=0, repr=False)
+    _peak_seen: int = field(default=0, repr=False)
+
+
+_SUMMED = ("wall_s", "cpu_s", "rows_in", "rows_out", "bytes_read", "bytes_written")
+
+
+class Telemetry:
+    def __init__(self, memory: Optional[str] = "rss"):
+        if memory not in MEMORY_MODES:
+            raise ValueError(f"memory must be one of {MEMORY_MODES}, got {memory!r}")
+        self.memory = memory
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+        self._started_at = time.time()
+        self._started_tracemalloc = False
+        if memory == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def close(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self, name: str, category: str) -> Span:
+        stack = self._stack()
+        span = Span(name, category, time.perf_counter_ns(), threading.get_ident(), len(stack))
+        if self.memory == "tracemalloc":
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._peak_seen = max(stack[-1]._peak_seen, peak)
+            tracemalloc.reset_peak()
+            span._mem_start = span._peak_seen = current
+        elif self.memory == "rss":
+            span._mem_start = _rss_bytes()
+            span._peak_seen = _max_rss_bytes()
+        span.cpu_s = time.process_time()
+        stack.append(span)
+        return span
+
+    def finish(self, span: Span) -> None:
+        end_ns = time.perf_counter_ns()
+        span.cpu_s = time.process_time() - span.cpu_s
+        span.wall_s = (end_ns - span.start_ns) / 1e9
+        if self.memory == "tracemalloc":
+            current, peak = tracemalloc.get_traced_memory()
+            span._peak_seen = max(span._peak_seen, peak)
+            span.mem_delta = current - span._mem_start
+            span.mem_peak_delta = span._peak_seen - span._mem_start
+        elif self.memory == "rss":
+            span.mem_delta = _rss_bytes() - span._mem_start
+            span.mem_peak_delta = _max_rss_bytes() - span._peak_seen
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        if stack and self.memory == "tracemalloc":
+            stack[-1]._peak_seen = max(stack[-1]._peak_seen, span._peak_seen)
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str = "block") -> Iterator[Span]:
+        span = self.start(name, category)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = type(exc).__name__
+            raise
+        finally:
+            self.finish(span)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per (category, name) aggregates, slowest total wall time first."""
+        with self._lock:
+            spans = list(self.spans)
+        agg: Dict[tuple, Dict[str, Any]] = {}
+        for s in spans:
+            row = agg.get((s.category, s.name))
+            if row is None:
+                row = agg[(s.category, s.name)] = {"name": s.name, "category": s.category, "calls": 0, "errors": 0}
+                row.update(dict.fromkeys(_SUMMED, 0))
+                row["max_mem_peak_delta"] = 0
+            row["calls"] += 1
+            row["errors"] += s.error is not None
+            for key in _SUMMED:
+                row[key] += getattr(s, key)
+            row["max_mem_peak_delta"] = max(row["max_mem_peak_delta"], s.mem_peak_delta)
+        return sorted(agg.values(), key=lambda r: r["wall_s"], reverse=True)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        records = []
+        for s in sorted(spans, key=lambda s: s.start_ns):
+            record = {k: v for k, v in asdict(s).items() if not k.startswith("_")}
+            record["start_s"] = (s.start_ns - self._origin_ns) / 1e9
+            records.append(record)
+        return {
+            "started_at": self._started_at,
+            "wall_s": (time.perf_counter_ns() - self._origin_ns) / 1e9,
+            "memory_mode": self.memory,
+            "max_rss_bytes": _max_rss_bytes(),
+            "stages": [r for r in records if r["category"] == "stage"],
+            "functions": self.summary(),
+            "spans": records,
+        }
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """Chrome trace-event "X" (complete) events, timestamps in microseconds from run start."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for s in sorted(spans, key=lambda s: s.start_ns):
+            args = {
+                "cpu_ms": round(s.cpu_s * 1000.0, 3),
+                "rows_in": s.rows_in,
+                "rows_out": s.rows_out,
+                "bytes_read": s.bytes_read,
+                "bytes_written": s.bytes_written,
+                "mem_delta": s.mem_delta,
+                "mem_peak_delta": s.mem_peak_delta,
+            }
+            if s.error:
+                args["error"] = s.error
+            events.append(
+                {
+                    "name": s.name,
+                    "cat": s.category,
+                    "ph": "X",
+                    "ts": (s.start_ns - self._origin_ns) / 1000.0,
+                    "dur": s.wall_s * 1e6,
+                    "pid": pid,
+                    "tid": s.thread_id,
+                    "args": args,
+                }
+            )
+        return events
+
+    def write(self, output_dir: str | Path) -> Dict[str, Path]:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        report_path = output_dir / "report.json"
+        trace_path = output_dir / "trace.json"
+        report_path.write_text(json.dumps(self.report(), indent=2, default=str))
+        trace_path.write_text(json.dumps({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}))
+        return {"report": report_path, "trace": trace_path}
+
+
+_ACTIVE: Optional[Telemetry] = None
+# (name, category) -> context manager or None, entered around every traced call (e.g. profiling)
+SpanHook = Callable[[str, str], Optional[ContextManager]]
+_HOOKS: List[SpanHook] = []
+
+
+def get_telemetry() -> Optional[Telemetry]:
+    return _ACTIVE
+
+
+def enable_telemetry(memory: Optional[str] = "rss") -> Telemetry:
+    """Start collecting spans process-wide (replaces any active collector)."""
+    global _ACTIVE
+    if _ACTIVE is not None:
+        _ACTIVE.close()
+    _ACTIVE = Telemetry(memory)
+    return _ACTIVE
+
+
+def disable_telemetry() -> Optional[Telemetry]:
+    global _ACTIVE
+    telemetry, _ACTIVE = _ACTIVE, None
+    if telemetry is not None:
+        telemetry.close()
+    return telemetry
+
+
+def add_span_hook(hook: SpanHook) -> None:
+    """Wrap traced calls in `hook(name, category)` when it returns a context manager."""
+    _HOOKS.append(hook)
+
+
+def remove_span_hook(hook: SpanHook) -> None:
+    if hook in _HOOKS:
+        _HOOKS.remove(hook)
+
+
+def run_directory(base: str | Path, label: str) -> Path:
+    """Per-run output directory: <base>/<label>-<YYYYmmdd-HHMMSS>."""
+    return Path(base) / f"{label}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+@contextmanager
+def telemetry_run(output_dir: str | Path | None, enabled: bool = True, memory: Optional[str] = "rss"):
+    """Collect spans for the block and write report.json/trace.json to `output_dir` on exit."""
+    if not enabled:
+        yield None
+        return
+    telemetry = enable_telemetry(memory)
+    try:
+        with telemetry.span("run", "run"):
+            yield telemetry
+    finally:
+        disable_telemetry()
+        if output_dir is not None:
+            telemetry.write(output_dir)
+
+
+def traced(
+    category: str,
+    name: Optional[str] = None,
+    reads: Optional[Callable[..., Any]] = None,
+    writes: Optional[Callable[..., Any]] = None,
+):
+    """
+    Record each call of the decorated function as a span while telemetry is enabled, inside
+    any context managers returned by registered span hooks.
+
+    `reads(*args, **kwargs)` returns the path the call reads (its size counts as bytes read);
+    `writes(result, *args, **kwargs)` returns the path written, measured after the call.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        def call(telemetry: Optional[Telemetry], args, kwargs):
+            if telemetry is None:
+                return func(*args, **kwargs)
+            span = telemetry.start(span_name, category)
+            try:
+                span.rows_in = sum(_rows(a) for a in args) + sum(_rows(v) for v in kwargs.values())
+                if reads is not None:
+                    span.bytes_read = _path_bytes(reads(*args, **kwargs))
+                result = func(*args, **kwargs)
+                span.rows_out = _rows(result)
+                if writes is not None:
+                    span.bytes_written = _path_bytes(writes(result, *args, **kwargs))
+                return result
+            except BaseException as exc:
+                span.error = type(exc).__name__
+                raise
+            finally:
+                telemetry.finish(span)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            telemetry = _ACTIVE
+            if telemetry is None and not _HOOKS:
+                return func(*args, **kwargs)
+            if not _HOOKS:
+                return call(telemetry, args, kwargs)
+            with ExitStack() as stack:
+                for hook in list(_HOOKS):
+                    context = hook(span_name, category)
+                    if context is not None:
+                        stack.enter_context(context)
+                return call(telemetry, args, kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+__all__ = [
+    "MEMORY_MODES",
+    "Span",
+    "Telemetry",
+    "get_telemetry",
+    "enable_telemetry",
+    "disable_telemetry",
+    "add_span_hook",
+    "remove_span_hook",
+    "run_directory",
+    "telemetry_run",
+    "traced",
+]
@@ -0,0 +1,175 @@
+"""
+Out-of-core feature building for histories that do not fit comfortably in memory.
+
+Processed bars are streamed from Parquet in row (date) chunks. Each chunk is prefixed with
+the last `overlap` rows of the previous one, features are computed on the stitched frame,
+the warmup rows are dropped and the rest is appended to the output file. With `overlap` at
+least the largest feature lookback, every rolling feature equals the in-memory result.
+Intraday output can be written session-partitioned, in the same layout as
+io.write_parquet_by_session.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.core.io import SESSION_PARTITION
+from src.core.types import DataFrame
+from src.features.lazy import feature_warmup
+
+# builders copy the bars and join partial frames; budget a few live copies per chunk
+_COPY_FACTOR = 4
+
+
+def feature_columns(feature_cfg: Dict, rel_lookbacks: Sequence[int] = (20, 60), beta_window: int = 60) -> List[str]:
+    """Feature names build_features produces for `feature_cfg`."""
+    lookbacks = feature_cfg.get("lookbacks", {})
+    atr_period = feature_cfg.get("atr_period", 14)
+    volume_lookback = feature_cfg.get("volume_lookback", 20)
+    cols = [f"ret_{w}d" for w in lookbacks.get("returns", [])]
+    cols += [c for w in lookbacks.get("sma", []) for c in (f"sma_{w}", f"dist_to_sma_{w}")]
+    cols += [f"realized_vol_{w}" for w in lookbacks.get("realized_vol", [])]
+    cols += [f"atr_{atr_period}", "intraday_range_pct"]
+    cols += [f"volume_z_{volume_lookback}", f"volume_to_{volume_lookback}d_avg"]
+    cols += [f"rel_ret_vs_benchmark_{w}" for w in rel_lookbacks] + [f"beta_vs_benchmark_{beta_window}"]
+    return cols
+
+
+def max_lookback(feature_cfg: Dict) -> int:
+    """Rows of history the deepest feature needs (dependencies included)."""
+    return max((feature_warmup(c) for c in feature_columns(feature_cfg)), default=0)
+
+
+def chunk_rows_for(max_memory_mb: float, n_columns: int, overlap: int) -> int:
+    """Rows per chunk so that (rows + overlap) x columns x copies stays under `max_memory_mb`."""
+    row_bytes = 8 * n_columns * _COPY_FACTOR
+    rows = int(max_memory_mb * 1024 * 1024) // row_bytes - overlap
+    if rows < max(overlap, 1):
+        raise ValueError(f"max_memory_mb={max_memory_mb} is too small for an overlap of {overlap} rows")
+    return rows
+
+
+def iter_chunks(
+    path: str | Path,
+    chunk_rows: int,
+    overlap: int,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[tuple[DataFrame, int]]:
+    """Yield (frame, n_warmup): each chunk prefixed with up to `overlap` rows of the previous."""
+    tail: Optional[DataFrame] = None
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+        chunk = batch.to_pandas()
+        frame = chunk if tail is None or tail.empty else pd.concat([tail, chunk], ignore_index=True)
+        yield frame, len(frame) - len(chunk)
+        tail = frame.iloc[max(len(frame) - overlap, 0) :].reset_index(drop=True) if overlap else None
+
+
+def build_chunked(
+    source: str | Path,
+    output: str | Path,
+    compute: Callable[[DataFrame], DataFrame],
+    overlap: int,
+    chunk_rows: int,
+    columns: Optional[Sequence[str]] = None,
+    partition_by_session: bool = False,
+) -> Dict[str, int]:
+    """
+    Stream `source` through `compute` chunk by chunk and append the non-warmup rows to
+    `output`, written to a temp path and moved into place at the end (replacing a previous
+    file or session directory). With `partition_by_session`, `output` is a directory with
+    one session=YYYY-MM-DD partition per session date; a session split across chunks gets
+    one part file per chunk.
+    """
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f"{output.stem}.{os.getpid()}.tmp")
+    writer: Optional[pq.ParquetWriter] = None
+    schema: Optional[pa.Schema] = None
+    stats = {"chunks": 0, "rows": 0, "max_frame_rows": 0}
+    try:
+        for frame, n_warmup in iter_chunks(source, chunk_rows, overlap, columns):
+            out = compute(frame).iloc[n_warmup:]
+            table = pa.Table.from_pandas(out, preserve_index=False)
+            if schema is None:
+                schema = table.schema
+            else:
+                table = table.cast(schema)
+            if partition_by_session:
+                sessions = pa.array(pd.to_datetime(out["date"]).dt.strftime("%Y-%m-%d").to_numpy())
+                ds.write_dataset(
+                    table.append_column(SESSION_PARTITION, sessions),
+                    tmp,
+                    format="parquet",
+                    partitioning=[SESSION_PARTITION],
+                    partitioning_flavor="hive",
+                    basename_template=f"part-{stats['chunks']}-{{i}}.parquet",
+                    existing_data_behavior="overwrite_or_ignore",
+                )
+            else:
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, schema)
+                writer.write_table(table)
+            stats["chunks"] += 1
+            stats["rows"] += len(out)
+            stats["max_frame_rows"] = max(stats["max_frame_rows"], len(frame))
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        _remove(tmp)
+        raise
+    if writer is not None:
+        writer.close()
+    if schema is None:
+        raise ValueError(f"No rows to build features from in {source}")
+    _remove(output)
+    os.replace(tmp, output)
+    return stats
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def dataset_columns(path: str | Path) -> List[str]:
+    """Column names of a Parquet file or a session-partitioned directory."""
+    path = Path(path)
+    if path.is_dir():
+        names = ds.dataset(path, format="parquet", partitioning="hive").schema.names
+        return [name for name in names if name != SESSION_PARTITION]
+    return pq.read_schema(path).names
+
+
+def read_day_range(
+    path: str | Path,
+    first_day: int,
+    last_day: int,
+    columns: Optional[Sequence[str]] = None,
+) -> DataFrame:
+    """
+    Rows of a day_id-stamped Parquet file (or session-partitioned directory) with
+    first_day <= day_id <= last_day.
+    """
+    filters = [("day_id", ">=", int(first_day)), ("day_id", "<=", int(last_day))]
+    df = pq.read_table(path, columns=columns, filters=filters).to_pandas()
+    df = df.drop(columns=[SESSION_PARTITION], errors="ignore")
+    return df.sort_values("day_id", kind="stable").reset_index(drop=True) if Path(path).is_dir() else df
+
+
+__all__ = [
+    "feature_columns",
+    "max_lookback",
+    "chunk_rows_for",
+    "iter_chunks",
+    "build_chunked",
+    "dataset_columns",
+    "read_day_range",
+]
@@ -0,0 +1,215 @@
+"""
+Lazily computed, memoized feature columns.
+
+Each feature family is declared once as a name pattern with its dependencies and a compute
+function (same definitions as the build_*_features modules). `LazyFeatures.get(name)`
+resolves dependencies recursively and caches every intermediate, so e.g. `ret_1d` is computed
+once and shared by every `realized_vol_<w>`. Columns already present on the seed frame
+(e.g. a materialized features file) are used as-is.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.calendar import DAY_ID, join_on_day
+from src.core.types import DataFrame
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    pattern: str
+    deps: Callable[[re.Match], List[str]]
+    compute: Callable[["LazyFeatures", re.Match], pd.Series]
+    warmup: Callable[[re.Match], int]
+    needs_benchmark: bool = False
+
+
+def _w(m: re.Match) -> int:
+    return int(m.group(1))
+
+
+def _rolling(ctx: "LazyFeatures", col: str, window: int):
+    return ctx.get(col).rolling(window=window, min_periods=window)
+
+
+def _benchmark_aligned(ctx: "LazyFeatures", name: str) -> pd.Series:
+    if ctx.benchmark is None:
+        raise KeyError(f"Feature needs a benchmark: {name}")
+    keys = [c for c in ("date", DAY_ID) if c in ctx.frame]
+    bench = pd.DataFrame({c: ctx.benchmark.get(c) for c in keys if c in ctx.benchmark.frame})
+    bench["_bench"] = ctx.benchmark.get(name).to_numpy()
+    return pd.Series(join_on_day(ctx.frame[keys], bench, ["_bench"])["_bench"].to_numpy(), index=ctx.frame.index)
+
+
+def _true_range(ctx: "LazyFeatures") -> pd.Series:
+    prev_close = ctx.get("close").shift(1)
+    high, low = ctx.get("high"), ctx.get("low")
+    return pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+
+
+FEATURES: List[FeatureSpec] = [
+    FeatureSpec(
+        r"ret_(\d+)d",
+        lambda m: ["close"],
+        lambda ctx, m: ctx.get("close").pct_change(periods=_w(m)),
+        _w,
+    ),
+    FeatureSpec(
+        r"sma_(\d+)",
+        lambda m: ["close"],
+        lambda ctx, m: _rolling(ctx, "close", _w(m)).mean(),
+        lambda m: _w(m) - 1,
+    ),
+    FeatureSpec(
+        r"dist_to_sma_(\d+)",
+        lambda m: ["close", f"sma_{_w(m)}"],
+        lambda ctx, m: (ctx.get("close") - ctx.get(f"sma_{_w(m)}")) / ctx.get(f"sma_{_w(m)}"),
+        lambda m: _w(m) - 1,
+    ),
+    FeatureSpec(
+        r"realized_vol_(\d+)",
+        lambda m: ["ret_1d"],
+        lambda ctx, m: _rolling(ctx, "ret_1d", _w(m)).std() * np.sqrt(252),
+        _w,
+    ),
+    FeatureSpec(
+        r"momentum_(\d+)",
+        lambda m: [f"ret_{_w(m)}d", f"realized_vol_{_w(m)}"],
+        lambda ctx, m: ctx.get(f"ret_{_w(m)}d") / ctx.get(f"realized_vol_{_w(m)}"),
+        _w,
+    ),
+    FeatureSpec(
+        r"atr_(\d+)",
+        lambda m: ["high", "low", "close"],
+        lambda ctx, m: _true_range(ctx).rolling(window=_w(m), min_periods=_w(m)).mean() / ctx.get("close"),
+        _w,
+    ),
+    FeatureSpec(
+        r"intraday_range_pct",
+        lambda m: ["high", "low", "close"],
+        lambda ctx, m: (ctx.get("high") - ctx.get("low")) / ctx.get("close"),
+        lambda m: 0,
+    ),
+    FeatureSpec(
+        r"volume_z_(\d+)",
+        lambda m: ["volume"],
+        lambda ctx, m: (ctx.get("volume") - _rolling(ctx, "volume", _w(m)).mean())
+        / _rolling(ctx, "volume", _w(m)).std(),
+        lambda m: _w(m) - 1,
+    ),
+    FeatureSpec(
+        r"volume_to_(\d+)d_avg",
+        lambda m: ["volume"],
+        lambda ctx, m: ctx.get("volume") / _rolling(ctx, "volume", _w(m)).mean(),
+        lambda m: _w(m) - 1,
+    ),
+    FeatureSpec(
+        r"rel_ret_vs_benchmark_(\d+)",
+        lambda m: ["date", f"ret_{_w(m)}d"],
+        lambda ctx, m: ctx.get(f"ret_{_w(m)}d") - _benchmark_aligned(ctx, f"ret_{_w(m)}d"),
+        _w,
+        needs_benchmark=True,
+    ),
+    FeatureSpec(
+        r"beta_vs_benchmark_(\d+)",
+        lambda m: ["date", "ret_1d"],
+        lambda ctx, m: ctx.get("ret_1d")
+        .rolling(window=_w(m), min_periods=_w(m))
+        .cov(_benchmark_aligned(ctx, "ret_1d"))
+        / _benchmark_aligned(ctx, "ret_1d").rolling(window=_w(m), min_periods=_w(m)).var(),
+        _w,
+        needs_benchmark=True,
+    ),
+]
+
+
+def resolve_feature(name: str) -> Optional[tuple[FeatureSpec, re.Match]]:
+    for spec in FEATURES:
+        m = re.fullmatch(spec.pattern, name)
+        if m:
+            return spec, m
+    return None
+
+
+def feature_dependencies(name: str) -> List[str]:
+    found = resolve_feature(name)
+    return [] if found is None else found[0].deps(found[1])
+
+
+def feature_warmup(name: str) -> int:
+    """Rows needed before `name` is defined, following dependencies (0 for raw columns)."""
+    found = resolve_feature(name)
+    if found is None:
+        return 0
+    spec, m = found
+    return spec.warmup(m) + max((feature_warmup(d) for d in spec.deps(m)), default=0)
+
+
+def needs_benchmark(columns: Iterable[str]) -> bool:
+    for name in columns:
+        found = resolve_feature(name)
+        if found is not None and found[0].needs_benchmark:
+            return True
+    return False
+
+
+def plan_columns(columns: Iterable[str]) -> List[str]:
+    """Transitive closure of `columns`, dependencies first (raw columns included)."""
+    order: List[str] = []
+    seen = set()
+
+    def visit(name: str) -> None:
+        if name in seen:
+            return
+        seen.add(name)
+        for dep in feature_dependencies(name):
+            visit(dep)
+        order.append(name)
+
+    for col in columns:
+        visit(col)
+    return order
+
+
+class LazyFeatures:
+    def __init__(self, frame: DataFrame, benchmark: Optional["LazyFeatures"] = None):
+        self.frame = frame.reset_index(drop=True)
+        self.benchmark = benchmark
+        self._memo: Dict[str, pd.Series] = {}
+        self.computed: List[str] = []
+
+    def get(self, name: str) -> pd.Series:
+        memo = self._memo.get(name)
+        if memo is not None:
+            return memo
+        if name in self.frame:
+            series = self.frame[name]
+        else:
+            found = resolve_feature(name)
+            if found is None:
+                raise KeyError(f"Unknown feature column: {name}")
+            spec, m = found
+            series = spec.compute(self, m)
+            self.computed.append(name)
+        self._memo[name] = series
+        return series
+
+    def frame_for(self, columns: Sequence[str], keys: Sequence[str] = ("date", "ticker", DAY_ID)) -> DataFrame:
+        cols = [c for c in keys if c in self.frame] + [c for c in columns if c not in keys]
+        return pd.DataFrame({c: self.get(c) for c in cols})
+
+
+__all__ = [
+    "FeatureSpec",
+    "FEATURES",
+    "resolve_feature",
+    "feature_dependencies",
+    "feature_warmup",
+    "needs_benchmark",
+    "plan_columns",
+    "LazyFeatures",
+]
@@ -4,6 +4,8 @@ Relative strength features comparing a ticker to a benchmark.
 
 import pandas as pd
 
+from src.core.calendar import join_on_day
+from src.core.telemetry import traced
 from src.core.types import DataFrame
 
 
@@ -13,6 +15,7 @@ def _rolling_beta(asset_ret: pd.Series, bench_ret: pd.Series, window: int) -> pd
     return cov / var
 
 
+@traced("features")
 def build_relative_strength_features(
     ticker_features: DataFrame,
     benchmark_features: DataFrame,
@@ -21,7 +24,7 @@ def build_relative_strength_features(
 ) -> DataFrame:
     df = ticker_features.copy()
 
-    bench_cols = ["date"]
+    bench_cols = [c for c in ("date", "day_id") if c in benchmark_features]
     if "ret_20d" in benchmark_features:
         bench_cols.append("ret_20d")
     if "ret_60d" in benchmark_features:
@@ -36,7 +39,7 @@ def build_relative_strength_features(
             "ret_1d": "bench_ret_1d",
         }
     )
-    df = df.merge(bench, on="date", how="left")
+    df = join_on_day(df, bench)
 
     # Relative returns
     if 20 in lookbacks and "ret_20d" in df and "bench_ret_20d" in df:
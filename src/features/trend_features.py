@@ -6,23 +6,29 @@ from typing import Dict, Iterable, Sequence
 
 import pandas as pd
 
+from src.core.cache import frame_ticker, get_series_cache
+from src.core.frequency import DAILY, Frequency
+from src.core.telemetry import traced
 from src.core.types import DataFrame
 
 
 def _sma(df: DataFrame, window: int) -> pd.Series:
-    return df["close"].rolling(window=window, min_periods=window).mean()
+    return get_series_cache().sma(frame_ticker(df), df["close"], window)
 
 
 def _returns(df: DataFrame, window: int) -> pd.Series:
-    return df["close"].pct_change(periods=window)
+    return get_series_cache().returns(frame_ticker(df), df["close"], window)
 
 
+@traced("features")
 def build_trend_features(
     bars: DataFrame,
     lookbacks: Dict[str, Iterable[int]],
+    frequency: Frequency = DAILY,
 ) -> DataFrame:
     """
     Build trend-related features: SMAs, distance to SMAs, and rolling returns.
+    Lookbacks are in sessions (bars for daily data).
     """
     sma_windows: Sequence[int] = lookbacks.get("sma", [])
     ret_windows: Sequence[int] = lookbacks.get("returns", [])
@@ -31,7 +37,7 @@ def build_trend_features(
 
     # Moving averages
     for w in sma_windows:
-        df[f"sma_{w}"] = _sma(df, w)
+        df[f"sma_{w}"] = _sma(df, frequency.bars(w))
 
     # Distances to SMAs
     for w in sma_windows:
@@ -39,7 +45,7 @@ def build_trend_features(
 
     # Rolling returns
     for w in ret_windows:
-        df[f"ret_{w}d"] = _returns(df, w)
+        df[f"ret_{w}d"] = _returns(df, frequency.bars(w))
 
     # Momentum example: 20-day return over 20-day vol if available
     if "ret_20d" in df and "realized_vol_20" in df:
@@ -5,12 +5,16 @@ Volatility-related features: realized volatility, ATR, intraday range.
 import numpy as np
 import pandas as pd
 
+from src.core.cache import frame_ticker, get_series_cache
+from src.core.frequency import DAILY, Frequency
+from src.core.telemetry import traced
 from src.core.types import DataFrame
 
 
-def _realized_vol(df: DataFrame, window: int) -> pd.Series:
-    returns = df["close"].pct_change()
-    return returns.rolling(window=window, min_periods=window).std() * np.sqrt(252)
+def _realized_vol(df: DataFrame, window: int, periods_per_year: int = 252) -> pd.Series:
+    cache = get_series_cache()
+    ticker = frame_ticker(df)
+    return cache.realized_vol(ticker, cache.returns(ticker, df["close"]), window, periods_per_year)
 
 
 def _true_range(df: DataFrame) -> pd.Series:
@@ -21,20 +25,24 @@ def _true_range(df: DataFrame) -> pd.Series:
     return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
 
 
+@traced("features")
 def build_volatility_features(
     bars: DataFrame,
     realized_vol_windows: list[int],
     atr_period: int,
+    frequency: Frequency = DAILY,
 ) -> DataFrame:
+    """Windows are in sessions; realized vol is annualized from per-bar returns."""
     df = bars.copy()
 
     # Realized volatility (annualized)
     for w in realized_vol_windows:
-        df[f"realized_vol_{w}"] = _realized_vol(df, w)
+        df[f"realized_vol_{w}"] = _realized_vol(df, frequency.bars(w), frequency.periods_per_year)
 
     # Average True Range (normalized by close)
     tr = _true_range(df)
-    df[f"atr_{atr_period}"] = tr.rolling(window=atr_period, min_periods=atr_period).mean()
+    atr_bars = frequency.bars(atr_period)
+    df[f"atr_{atr_period}"] = tr.rolling(window=atr_bars, min_periods=atr_bars).mean()
     df[f"atr_{atr_period}"] = df[f"atr_{atr_period}"] / df["close"]
 
     # Intraday range percent
@@ -4,13 +4,17 @@ Volume-based features: z-score and volume relative to rolling average.
 
 import pandas as pd
 
+from src.core.frequency import DAILY, Frequency
+from src.core.telemetry import traced
 from src.core.types import DataFrame
 
 
-def build_volume_features(bars: DataFrame, lookback: int) -> DataFrame:
+@traced("features")
+def build_volume_features(bars: DataFrame, lookback: int, frequency: Frequency = DAILY) -> DataFrame:
     df = bars.copy()
-    rolling_mean = df["volume"].rolling(window=lookback, min_periods=lookback).mean()
-    rolling_std = df["volume"].rolling(window=lookback, min_periods=lookback).std()
+    window = frequency.bars(lookback)
+    rolling_mean = df["volume"].rolling(window=window, min_periods=window).mean()
+    rolling_std = df["volume"].rolling(window=window, min_periods=window).std()
 
     df[f"volume_z_{lookback}"] = (df["volume"] - rolling_mean) / rolling_std
     df[f"volume_to_{lookback}d_avg"] = df["volume"] / rolling_mean
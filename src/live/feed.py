@@ -0,0 +1,102 @@
+"""
+Bar feeds for the live loop: async iterators of Bar records.
+
+Bars travel as JSON lines ({"date", "ticker", "open", "high", "low", "close", "volume", ...}).
+`tail_file` follows a file being appended to (the stand-in for a vendor drop), `read_socket`
+subscribes to a TCP publisher, and `replay_frame` replays a bars frame, optionally paced.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import pandas as pd
+
+from src.core.types import Bar, DataFrame
+
+BAR_FIELDS = ("open", "high", "low", "close", "adj_close", "volume")
+
+
+def parse_bar(line: str | bytes) -> Bar:
+    """Bar from one JSON line; the date is parsed to a Timestamp and prices to floats."""
+    raw = json.loads(line)
+    bar: Bar = {"date": pd.Timestamp(raw["date"]), "ticker": str(raw["ticker"])}
+    for field in BAR_FIELDS:
+        if field in raw:
+            bar[field] = float(raw[field])
+    if "adj_close" not in bar and "close" in bar:
+        bar["adj_close"] = bar["close"]
+    return bar
+
+
+def format_bar(bar: Bar) -> str:
+    """JSON line for a bar (inverse of parse_bar)."""
+    out = {k: (v.isoformat() if hasattr(v, "isoformat") else v) for k, v in bar.items()}
+    return json.dumps(out)
+
+
+async def tail_file(
+    path: str | Path,
+    poll_interval: float = 0.05,
+    from_start: bool = True,
+    idle_timeout: Optional[float] = None,
+) -> AsyncIterator[Bar]:
+    """
+    Follow a JSON-lines file, yielding bars as complete lines are appended. Stops after
+    `idle_timeout` seconds without new data (None: follow forever).
+    """
+    path = Path(path)
+    while not path.exists():
+        await asyncio.sleep(poll_interval)
+    with path.open("r") as fh:
+        if not from_start:
+            fh.seek(0, 2)
+        partial = ""
+        idle = 0.0
+        while True:
+            chunk = fh.readline()
+            if chunk:
+                idle = 0.0
+                partial += chunk
+                if partial.endswith("\n"):
+                    line, partial = partial.strip(), ""
+                    if line:
+                        yield parse_bar(line)
+                continue
+            if idle_timeout is not None and idle >= idle_timeout:
+                return
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+
+
+async def read_socket(host: str, port: int) -> AsyncIterator[Bar]:
+    """Connect to a TCP publisher and yield its JSON-line bars until it closes the stream."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.strip():
+                yield parse_bar(line)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def replay_frame(bars: DataFrame, interval: float = 0.0) -> AsyncIterator[Bar]:
+    """Replay a bars frame in (date, ticker) order, sleeping `interval` seconds between timestamps."""
+    df = bars.sort_values(["date", "ticker"], kind="stable")
+    fields = [c for c in ("date", "ticker", *BAR_FIELDS) if c in df]
+    prev = None
+    for record in df[fields].to_dict(orient="records"):
+        date = pd.Timestamp(record["date"])
+        if prev is not None and date != prev:
+            await asyncio.sleep(interval)
+        prev = date
+        record["date"] = date
+        yield record
+
+
+__all__ = ["BAR_FIELDS", "parse_bar", "format_bar", "tail_file", "read_socket", "replay_frame"]
@@ -0,0 +1,359 @@
+"""
+Asyncio paper-trading loop.
+
+A producer task drains the bar feed into a bounded queue; when processing falls behind the
+queue fills and the producer blocks, which stops reads from the file or socket (TCP flow
+control pushes back on the publisher). The consumer groups bars into steps (one timestamp,
+complete once every ticker in the universe has reported or a later timestamp arrives) and
+for each step updates the streaming features, signals and benchmark regimes, scores the ML
+models, combines everything into alpha with the regime weight table, sizes target weights
+by realized vol and emits orders against the paper book.
+
+With `conflate`, a step is only traded when no later step is already waiting behind it:
+state still advances on every bar, but stale steps skip scoring and order generation so
+the loop catches up instead of trading on old prices. Latency from the step's last bar
+arriving to its orders being emitted is tracked against `latency_budget_ms`.
+"""
+
+import asyncio
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.regime.online_regime import OnlineRegimeTracker
+from src.core.frequency import DAILY, Frequency, get_frequency
+from src.core.latency import LatencyTracker
+from src.core.types import Bar, DataFrame, FeatureRow
+from src.core.utils import get_logger
+from src.live.feed import BAR_FIELDS
+from src.live.state import SessionRegime, StreamingFeatures, StreamingSignals, prediction_signal
+from src.meta.regime_map import REGIME_LABELS
+from src.meta.rule_based_meta import COMPONENTS, weight_table
+
+logger = get_logger(__name__)
+
+Order = Dict[str, Any]
+Scorer = Callable[[List[FeatureRow]], List[Dict[str, Any]]]
+OrderSink = Callable[[List[Order]], None]
+
+DEFAULT_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+DEFAULT_SIGNALS = ("trend_alpha", "mean_reversion_alpha", "vol_alpha", "rel_strength_alpha")
+
+
+class JsonlOrderLog:
+    """Order sink appending one JSON line per order."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, orders: List[Order]) -> None:
+        with self.path.open("a") as fh:
+            for order in orders:
+                fh.write(json.dumps(order) + "\n")
+
+
+class PaperTradingRuntime:
+    def __init__(
+        self,
+        tickers: Sequence[str],
+        benchmark: str,
+        feature_cfg: Mapping[str, Any],
+        weights: Mapping[str, Mapping[str, float]],
+        regime_params: Mapping[str, Any],
+        frequency: Frequency = DAILY,
+        signals: Optional[Sequence[str]] = None,
+        signal_params: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        regime_benchmarks: Optional[Mapping[str, str]] = None,
+        scorer: Optional[Scorer] = None,
+        target_vol: float = 0.15,
+        max_weight: float = 0.1,
+        min_trade_weight: float = 0.0,
+        queue_size: int = 1024,
+        latency_budget_ms: float = 50.0,
+        latency_buckets_ms: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS,
+        conflate: bool = True,
+        order_sink: Optional[OrderSink] = None,
+    ):
+        if queue_size < 1:
+            raise ValueError("queue_size must be >= 1")
+        self.tickers = list(dict.fromkeys(tickers))
+        self.benchmark = benchmark
+        self.frequency = frequency
+        self.ticker_regime = {t: (regime_benchmarks or {}).get(t, benchmark) for t in self.tickers}
+        regime_names = list(dict.fromkeys([benchmark, *self.ticker_regime.values()]))
+        self.universe = list(dict.fromkeys([*regime_names, *self.tickers]))
+
+        self.features = {
+            t: StreamingFeatures(t, feature_cfg, frequency, is_benchmark=t == benchmark) for t in self.universe
+        }
+        signal_names = list(DEFAULT_SIGNALS if signals is None else signals)
+        self.signals = {t: StreamingSignals(signal_names, signal_params, frequency) for t in self.tickers}
+        self.regimes = {
+            b: SessionRegime(OnlineRegimeTracker(b, **regime_params), frequency) for b in regime_names
+        }
+        self._weights = weight_table(REGIME_LABELS, weights)
+        self._label_index = {label: i for i, label in enumerate(REGIME_LABELS)}
+        self._ml_column = [col for _, col, _ in COMPONENTS].index("ml_signal")
+
+        self.scorer = scorer
+        self.target_vol = target_vol
+        self.max_weight = max_weight
+        self.min_trade_weight = min_trade_weight
+        self.queue_size = queue_size
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.latency_buckets_ms = list(latency_buckets_ms)
+        self.conflate = conflate
+        self.order_sink = order_sink
+        self.book: Dict[str, float] = {t: 0.0 for t in self.tickers}
+
+        self.bar_latency = LatencyTracker()
+        self.step_latency = LatencyTracker()
+        self._last_received: Optional[pd.Timestamp] = None
+        self._last_step: Optional[pd.Timestamp] = None
+        self.steps_received = 0
+        self.steps = 0
+        self.steps_conflated = 0
+        self.bars = 0
+        self.late_bars = 0
+        self.unknown_bars = 0
+        self.orders = 0
+        self.over_budget = 0
+        self.backpressure_waits = 0
+        self.queue_high_water = 0
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Mapping[str, Any],
+        regimes_cfg: Mapping[str, Any],
+        scorer: Optional[Scorer] = None,
+        order_sink: Optional[OrderSink] = None,
+    ) -> "PaperTradingRuntime":
+        live_cfg = settings.get("live", {})
+        signals_cfg = settings.get("signals", {})
+        risk_cfg = settings.get("risk", {})
+        rules = regimes_cfg.get("rules", {})
+        benchmark = settings.get("benchmark")
+        if not benchmark:
+            raise ValueError("settings.benchmark is required for the live loop")
+        # same rule defaults as run_regime_engine
+        regime_params = {
+            "trend_ma_short": rules.get("trend_ma_short", 50),
+            "trend_ma_long": rules.get("trend_ma_long", 200),
+            "vol_lookback": rules.get("vol_lookback", 20),
+            "high_vol_zscore": rules.get("high_vol_zscore", 1.5),
+            "crash_drawdown_threshold": rules.get("crash_drawdown_threshold", -0.2),
+        }
+        return cls(
+            tickers=settings.get("tickers", []),
+            benchmark=benchmark,
+            feature_cfg=settings.get("features", {}),
+            weights=regimes_cfg.get("weights", {}),
+            regime_params=regime_params,
+            frequency=get_frequency(settings),
+            signals=signals_cfg.get("enabled", list(DEFAULT_SIGNALS)),
+            signal_params=signals_cfg.get("params", {}),
+            regime_benchmarks=settings.get("regime_benchmarks", {}),
+            scorer=scorer,
+            target_vol=risk_cfg.get("target_vol", 0.15),
+            max_weight=risk_cfg.get("max_weight", 0.1),
+            min_trade_weight=live_cfg.get("min_trade_weight", 0.0),
+            queue_size=live_cfg.get("queue_size", 1024),
+            latency_budget_ms=live_cfg.get("latency_budget_ms", 50.0),
+            latency_buckets_ms=live_cfg.get("latency_buckets_ms", DEFAULT_LATENCY_BUCKETS_MS),
+            conflate=live_cfg.get("conflate", True),
+            order_sink=order_sink,
+        )
+
+    def update(self, bars: Mapping[str, Bar]) -> Tuple[Dict[str, FeatureRow], Dict[str, Dict[str, float]]]:
+        """Advance features, regimes and signals with one step's bars (benchmarks first)."""
+        rows: Dict[str, FeatureRow] = {}
+        bench_row = None
+        bench_ret = math.nan
+        for ticker in self.universe:
+            bar = bars.get(ticker)
+            if bar is None:
+                continue
+            state = self.features[ticker]
+            rows[ticker] = state.update(bar, bench_row, bench_ret)
+            if ticker == self.benchmark:
+                bench_row, bench_ret = rows[ticker], state.last_bar_return
+            if ticker in self.regimes:
+                self.regimes[ticker].update(bar["date"], bar["close"])
+        signals = {t: self.signals[t].update(rows[t]) for t in self.tickers if t in rows}
+        return rows, signals
+
+    def decide(
+        self,
+        rows: Mapping[str, FeatureRow],
+        signals: Mapping[str, Mapping[str, float]],
+        ml_signal: Optional[Mapping[str, float]] = None,
+    ) -> List[Order]:
+        """
+        Alpha, target weight and orders for the tickers in `rows`; the paper book is assumed
+        filled at the bar close. Missing ML scores count as 0.
+        """
+        orders: List[Order] = []
+        for ticker, sig in signals.items():
+            label = self.regimes[self.ticker_regime[ticker]].label
+            values = np.array([sig.get(col, 0.0) for _, col, _ in COMPONENTS])
+            values[self._ml_column] = (ml_signal or {}).get(ticker, 0.0)
+            alpha = float(np.clip(values @ self._weights[self._label_index[label]], -1.0, 1.0))
+            vol = self.features[ticker].realized_vol()
+            target = 0.0
+            if vol > 0:
+                target = float(np.clip(alpha * self.target_vol / vol, -self.max_weight, self.max_weight))
+            delta = target - self.book[ticker]
+            # flattening always goes through; other changes need to clear the no-trade band
+            if delta == 0.0 or (abs(delta) <= self.min_trade_weight and target != 0.0):
+                continue
+            self.book[ticker] = target
+            orders.append(
+                {
+                    "date": pd.Timestamp(rows[ticker]["date"]).isoformat(),
+                    "ticker": ticker,
+                    "side": 1 if delta > 0 else -1,
+                    "delta_weight": delta,
+                    "target_weight": target,
+                    "price": float(rows[ticker]["close"]),
+                    "alpha_score": alpha,
+                    "regime_label": label,
+                }
+            )
+        return orders
+
+    def step(self, bars: Mapping[str, Bar], trade: bool = True) -> List[Order]:
+        """Synchronous update + scoring + orders for one step (warm-up and replays)."""
+        rows, signals = self.update(bars)
+        if not trade:
+            return []
+        ml = {}
+        if self.scorer is not None:
+            ml = prediction_signal(self.scorer([rows[t] for t in self.tickers if t in rows]))
+        return self._emit(self.decide(rows, signals, ml))
+
+    def warm_up(self, bars: DataFrame) -> int:
+        """Feed historical bars through the streaming state without trading; returns steps fed."""
+        fields = [c for c in ("date", "ticker", *BAR_FIELDS) if c in bars]
+        df = bars[bars["ticker"].isin(self.universe)].sort_values(["date", "ticker"], kind="stable")[fields]
+        df = df.assign(date=pd.to_datetime(df["date"]))
+        n = 0
+        for _, group in df.groupby("date", sort=True):
+            self.update({rec["ticker"]: rec for rec in group.to_dict(orient="records")})
+            n += 1
+        if n:
+            self._last_step = self._last_received = pd.Timestamp(df["date"].iloc[-1])
+        logger.info(f"Warmed live state with {n} steps of history")
+        return n
+
+    def _emit(self, orders: List[Order]) -> List[Order]:
+        if orders and self.order_sink is not None:
+            self.order_sink(orders)
+        self.orders += len(orders)
+        return orders
+
+    async def run(self, feed: AsyncIterator[Bar]) -> Dict[str, Any]:
+        """Consume `feed` until it ends; returns the metrics."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        producer = asyncio.create_task(self._ingest(feed, queue))
+        try:
+            await self._consume(queue)
+        except BaseException:
+            producer.cancel()
+            raise
+        await producer
+        return self.metrics()
+
+    async def _ingest(self, feed: AsyncIterator[Bar], queue: asyncio.Queue) -> None:
+        try:
+            async for bar in feed:
+                # unknown tickers never open a step, so they cannot trigger conflation
+                if bar["ticker"] not in self.features:
+                    self.unknown_bars += 1
+                    continue
+                date = pd.Timestamp(bar["date"])
+                if self._last_received is None or date > self._last_received:
+                    self._last_received = date
+                    self.steps_received += 1
+                if queue.full():
+                    self.backpressure_waits += 1
+                await queue.put((time.perf_counter(), date, bar))
+                self.queue_high_water = max(self.queue_high_water, queue.qsize())
+        finally:
+            await queue.put(None)
+
+    async def _consume(self, queue: asyncio.Queue) -> None:
+        pending: Dict[str, Bar] = {}
+        pending_date: Optional[pd.Timestamp] = None
+        # arrival of the newest bar in `pending`: a step's latency runs from its own last bar
+        pending_received = 0.0
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            received, date, bar = item
+            ticker = bar["ticker"]
+            if self._last_step is not None and date <= self._last_step:
+                self.late_bars += 1
+                logger.warning(f"Dropping late bar {ticker} @ {date} (last step {self._last_step})")
+                continue
+            if pending and date != pending_date:
+                await self._flush(pending, pending_date, pending_received)
+                pending = {}
+            pending_date = date
+            pending[ticker] = bar
+            pending_received = received
+            self.bars += 1
+            if len(pending) == len(self.universe):
+                await self._flush(pending, pending_date, pending_received)
+                pending = {}
+        if pending:
+            await self._flush(pending, pending_date, pending_received)
+
+    async def _flush(self, bars: Dict[str, Bar], date: pd.Timestamp, received: float) -> None:
+        start = time.perf_counter()
+        self.steps += 1
+        self._last_step = date
+        # a later step is already queued behind the next one: skip trading on stale prices
+        trade = not (self.conflate and self.steps_received >= self.steps + 2)
+        rows, signals = self.update(bars)
+        if trade:
+            ml = {}
+            if self.scorer is not None:
+                preds = await asyncio.to_thread(self.scorer, [rows[t] for t in self.tickers if t in rows])
+                ml = prediction_signal(preds)
+            self._emit(self.decide(rows, signals, ml))
+        else:
+            self.steps_conflated += 1
+        done = time.perf_counter()
+        self.step_latency.record(done - start)
+        self.bar_latency.record(done - received)
+        if done - received > self.latency_budget:
+            self.over_budget += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "bars": self.bars,
+            "steps": self.steps,
+            "steps_conflated": self.steps_conflated,
+            "late_bars": self.late_bars,
+            "unknown_bars": self.unknown_bars,
+            "orders": self.orders,
+            "latency_budget_ms": self.latency_budget * 1000.0,
+            "over_budget": self.over_budget,
+            "backpressure_waits": self.backpressure_waits,
+            "queue_high_water": self.queue_high_water,
+            "bar_latency": self.bar_latency.snapshot(),
+            "bar_latency_histogram": self.bar_latency.histogram(self.latency_buckets_ms),
+            "step_latency": self.step_latency.snapshot(),
+            "book": dict(self.book),
+        }
+
+
+__all__ = ["JsonlOrderLog", "PaperTradingRuntime"]
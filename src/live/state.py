@@ -0,0 +1,287 @@
+"""
+Per-ticker streaming state for the live loop: features, signals and session regimes.
+
+Every column build_features writes is kept up to date in O(1) per bar with RollingWindow /
+LagBuffer aggregates, using the same definitions (session-scaled windows, per-bar returns,
+annualization by bars per year) so a replayed history reproduces the batch values. A NaN
+input restarts the windows it feeds, matching pandas' rolling(min_periods=window).
+"""
+
+import math
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from models.regime.online_regime import OnlineRegimeTracker
+from src.core.frequency import DAILY, Frequency
+from src.core.streaming import LagBuffer, RollingWindow
+from src.core.types import Bar, FeatureRow
+from src.signals.registry import SIGNALS
+
+# sessions of per-bar returns behind the realized vol used for position sizing
+SIZING_VOL_SESSIONS = 20
+REL_LOOKBACKS = (20, 60)
+BETA_SESSIONS = 60
+
+
+def _div(num: float, den: float) -> float:
+    """num / den with pandas semantics (x/0 -> +-inf, 0/0 -> NaN) instead of raising."""
+    if den == 0 or math.isnan(den):
+        if math.isnan(num) or num == 0 or math.isnan(den):
+            return math.nan
+        return math.copysign(math.inf, num) * math.copysign(1.0, den)
+    return num / den
+
+
+def _push(window: RollingWindow, value: float) -> None:
+    if math.isnan(value):
+        window.reset()
+    else:
+        window.push(value)
+
+
+def _mean(window: RollingWindow) -> float:
+    return window.mean() if window.full else math.nan
+
+
+def _std(window: RollingWindow) -> float:
+    return window.std() if window.full else math.nan
+
+
+def _clip(value: float, lower: float = -1.0, upper: float = 1.0) -> float:
+    """clip(-1, 1) then fillna(0), as the batch signals do."""
+    if math.isnan(value):
+        return 0.0
+    return min(max(value, lower), upper)
+
+
+class StreamingFeatures:
+    """
+    One ticker's build_features columns, updated bar by bar. The relative-strength columns
+    of the benchmark itself are taken against its own row (0 relative return, beta 1).
+    """
+
+    def __init__(
+        self,
+        ticker: str,
+        feature_cfg: Mapping[str, Any],
+        frequency: Frequency = DAILY,
+        is_benchmark: bool = False,
+    ):
+        lookbacks = feature_cfg.get("lookbacks", {})
+        self.ticker = ticker
+        self.is_benchmark = is_benchmark
+        self.frequency = frequency
+        self.sma_windows = list(lookbacks.get("sma", []))
+        self.ret_windows = list(lookbacks.get("returns", []))
+        self.vol_windows = list(lookbacks.get("realized_vol", []))
+        self.atr_period = feature_cfg.get("atr_period", 14)
+        self.volume_lookback = feature_cfg.get("volume_lookback", 20)
+        self.rel_windows = [w for w in REL_LOOKBACKS if w in self.ret_windows]
+
+        bars = frequency.bars
+        self._sma = {w: RollingWindow(bars(w)) for w in self.sma_windows}
+        self._vol = {w: RollingWindow(bars(w)) for w in {*self.vol_windows, SIZING_VOL_SESSIONS}}
+        self._atr = RollingWindow(bars(self.atr_period))
+        self._volume = RollingWindow(bars(self.volume_lookback))
+        beta_bars = bars(BETA_SESSIONS)
+        self._beta_x = RollingWindow(beta_bars)
+        self._beta_y = RollingWindow(beta_bars)
+        self._beta_xy = RollingWindow(beta_bars)
+        self._closes = LagBuffer(max([bars(w) for w in self.ret_windows] + [1]) + 1)
+        self._prev_close = math.nan
+        self.last_bar_return = math.nan
+        self.n_bars = 0
+
+    def realized_vol(self, sessions: int = SIZING_VOL_SESSIONS) -> float:
+        """Annualized std of per-bar returns over the last `sessions` sessions."""
+        return _std(self._vol[sessions]) * math.sqrt(self.frequency.periods_per_year)
+
+    def _ret(self, sessions: int) -> float:
+        return _div(self._closes.lag(0), self._closes.lag(self.frequency.bars(sessions))) - 1.0
+
+    def update(
+        self, bar: Bar, benchmark: Optional[FeatureRow] = None, benchmark_return: float = math.nan
+    ) -> FeatureRow:
+        """
+        Consume one bar and return its FeatureRow. `benchmark` is the benchmark's row for the
+        same bar and `benchmark_return` its per-bar return (used for beta when the features
+        have no ret_1d); both are missing when the benchmark has no bar then.
+        """
+        close = float(bar["close"])
+        high, low = float(bar["high"]), float(bar["low"])
+        prev = self._prev_close
+        bar_ret = _div(close, prev) - 1.0 if not math.isnan(prev) else math.nan
+        self._closes.push(close)
+        self._prev_close = close
+        self.last_bar_return = bar_ret
+        self.n_bars += 1
+
+        row: FeatureRow = {"date": bar["date"], "ticker": self.ticker, "close": close}
+        for w in self.ret_windows:
+            row[f"ret_{w}d"] = self._ret(w)
+        for w in self.sma_windows:
+            _push(self._sma[w], close)
+            row[f"sma_{w}"] = _mean(self._sma[w])
+        for w in self.sma_windows:
+            row[f"dist_to_sma_{w}"] = _div(close - row[f"sma_{w}"], row[f"sma_{w}"])
+
+        if not math.isnan(bar_ret):
+            for window in self._vol.values():
+                window.push(bar_ret)
+        for w in self.vol_windows:
+            row[f"realized_vol_{w}"] = self.realized_vol(w)
+        if "ret_20d" in row and "realized_vol_20" in row:
+            row["momentum_20"] = _div(row["ret_20d"], row["realized_vol_20"])
+
+        true_range = high - low
+        if not math.isnan(prev):
+            true_range = max(true_range, abs(high - prev), abs(low - prev))
+        _push(self._atr, true_range)
+        row[f"atr_{self.atr_period}"] = _div(_mean(self._atr), close)
+        row["intraday_range_pct"] = _div(high - low, close)
+
+        volume = float(bar["volume"])
+        _push(self._volume, volume)
+        vol_mean = _mean(self._volume)
+        row[f"volume_z_{self.volume_lookback}"] = _div(volume - vol_mean, _std(self._volume))
+        row[f"volume_to_{self.volume_lookback}d_avg"] = _div(volume, vol_mean)
+
+        if self.is_benchmark:
+            benchmark, benchmark_return = row, bar_ret
+        bench = benchmark or {}
+        for w in REL_LOOKBACKS:
+            col = f"ret_{w}d"
+            rel = row[col] - bench.get(col, math.nan) if w in self.rel_windows else math.nan
+            row[f"rel_ret_vs_benchmark_{w}"] = rel
+        asset_ret = row["ret_1d"] if "ret_1d" in row else bar_ret
+        self._update_beta(asset_ret, bench.get("ret_1d", benchmark_return))
+        row["beta_vs_benchmark_60"] = self._beta()
+        return row
+
+    def _update_beta(self, x: float, y: float) -> None:
+        if math.isnan(x) or math.isnan(y):
+            for window in (self._beta_x, self._beta_y, self._beta_xy):
+                window.reset()
+            return
+        self._beta_x.push(x)
+        self._beta_y.push(y)
+        self._beta_xy.push(x * y)
+
+    def _beta(self) -> float:
+        if not self._beta_xy.full:
+            return math.nan
+        n = self._beta_xy.size
+        cov = (self._beta_xy.mean() - self._beta_x.mean() * self._beta_y.mean()) * n / (n - 1)
+        return _div(cov, self._beta_y.std() ** 2)
+
+
+class StreamingSignals:
+    """Registered signals for one ticker, computed from its streaming FeatureRows."""
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        params: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        frequency: Frequency = DAILY,
+    ):
+        unknown = [n for n in names if n not in SIGNALS or n not in _UPDATES]
+        if unknown:
+            raise KeyError(f"No streaming implementation for signals: {unknown}")
+        self.names = list(names)
+        self.params = {n: SIGNALS[n].resolve((params or {}).get(n)) for n in self.names}
+        self._windows: Dict[str, RollingWindow] = {
+            n: RollingWindow(frequency.bars(self.params[n]["lookback"])) for n in self.names if n in _ROLLING
+        }
+
+    def update(self, row: FeatureRow) -> Dict[str, float]:
+        return {n: _UPDATES[n](row, self._windows.get(n), **self.params[n]) for n in self.names}
+
+
+def _trend(row: FeatureRow, _: Optional[RollingWindow], fast: int = 20, slow: int = 50) -> float:
+    price = row["close"]
+    dist_fast = _div(price - row[f"sma_{fast}"], price)
+    dist_slow = _div(price - row[f"sma_{slow}"], price)
+    return _clip(0.6 * dist_fast + 0.4 * dist_slow)
+
+
+def _zscore_alpha(value: float, window: RollingWindow, z_threshold: float) -> float:
+    _push(window, value)
+    return _clip(-_div(value - _mean(window), _std(window)) / z_threshold)
+
+
+def _mean_reversion(row: FeatureRow, window: RollingWindow, lookback: int = 5, z_threshold: float = 1.0) -> float:
+    return _zscore_alpha(row[f"ret_{lookback}d"], window, z_threshold)
+
+
+def _volatility(
+    row: FeatureRow,
+    window: RollingWindow,
+    vol_col: str = "realized_vol_20",
+    lookback: int = 60,
+    z_threshold: float = 1.0,
+) -> float:
+    return _zscore_alpha(row[vol_col], window, z_threshold)
+
+
+def _relative_strength(row: FeatureRow, _: Optional[RollingWindow], lookback: int = 20, scale: float = 0.1) -> float:
+    return _clip(_div(row[f"rel_ret_vs_benchmark_{lookback}"], scale))
+
+
+_UPDATES = {
+    "trend_alpha": _trend,
+    "mean_reversion_alpha": _mean_reversion,
+    "vol_alpha": _volatility,
+    "rel_strength_alpha": _relative_strength,
+}
+_ROLLING = {"mean_reversion_alpha", "vol_alpha"}
+
+
+class SessionRegime:
+    """
+    Regime label for a benchmark's bars. Daily bars update the tracker directly (lag 0);
+    intraday bars feed it each session's last close once the next session opens, so bars
+    carry the previous session's regime, as combine_signals(regime_lag=1) does in batch.
+    """
+
+    def __init__(self, tracker: OnlineRegimeTracker, frequency: Frequency = DAILY, default: str = "choppy"):
+        self.tracker = tracker
+        self.frequency = frequency
+        self.label = default
+        self._session: Optional[pd.Timestamp] = None
+        self._session_close = math.nan
+
+    def update(self, date, close: float) -> str:
+        if not self.frequency.intraday:
+            self.label = self.tracker.update(date, close)["regime_label"]
+            return self.label
+        session = pd.Timestamp(date).normalize()
+        if self._session is not None and session != self._session:
+            self.label = self.tracker.update(self._session, self._session_close)["regime_label"]
+        self._session = session
+        self._session_close = float(close)
+        return self.label
+
+
+def prediction_signal(predictions: Sequence[Mapping[str, Any]]) -> Dict[str, float]:
+    """ticker -> ml_signal (P(up states) - P(down states), clipped), as ml_signal_frame."""
+    out: Dict[str, float] = {}
+    for pred in predictions:
+        up = sum(float(pred[k]) for k in ("prob_state_p1", "prob_state_p2", "prob_state_p3") if _present(pred, k))
+        down = sum(float(pred[k]) for k in ("prob_state_m1", "prob_state_m2", "prob_state_m3") if _present(pred, k))
+        out[str(pred["ticker"])] = float(np.clip(up - down, -1.0, 1.0))
+    return out
+
+
+def _present(row: Mapping[str, Any], key: str) -> bool:
+    return key in row and row[key] is not None and not pd.isna(row[key])
+
+
+__all__ = [
+    "SIZING_VOL_SESSIONS",
+    "StreamingFeatures",
+    "StreamingSignals",
+    "SessionRegime",
+    "prediction_signal",
+]
@@ -0,0 +1,84 @@
+"""
+Dates x benchmarks regime-id matrix for per-ticker regime lookups.
+
+Each benchmark's regime series is scattered into one int8 matrix whose rows are integer
+trading-day ids (a TradingCalendar over the union of regime dates). Mapping a ticker's dates to
+regimes is then a searchsorted on the date axis plus a column gather, so the cost per ticker
+does not grow with the number of benchmarks.
+"""
+
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.calendar import TradingCalendar, to_days
+
+REGIME_LABELS = ("bull", "bear", "choppy", "crash")
+DEFAULT_REGIME_ID = REGIME_LABELS.index("choppy")
+_LABEL_TO_ID = {label: i for i, label in enumerate(REGIME_LABELS)}
+
+
+def regime_benchmark_map(settings: Dict[str, Any]) -> Dict[str, str]:
+    """Ticker -> benchmark from `regime_benchmarks`, defaulting to the global `benchmark`."""
+    default = settings.get("benchmark")
+    mapping = settings.get("regime_benchmarks") or {}
+    return {t: mapping.get(t, default) for t in settings.get("tickers", [])}
+
+
+def regime_benchmarks(settings: Dict[str, Any]) -> List[str]:
+    """All benchmarks that need a regime series (global benchmark first)."""
+    found = [settings.get("benchmark")] + list((settings.get("regime_benchmarks") or {}).values())
+    return [b for b in dict.fromkeys(found) if b]
+
+
+class RegimeMatrix:
+    def __init__(self, dates: np.ndarray, benchmarks: Sequence[str], ids: np.ndarray):
+        self.calendar = TradingCalendar(dates, unit="D")
+        self.dates = self.calendar.days
+        self.benchmarks = list(benchmarks)
+        self.ids = ids
+        self._column = {b: j for j, b in enumerate(self.benchmarks)}
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame]) -> "RegimeMatrix":
+        """Build from benchmark -> regime frame (date, regime_id or regime_label)."""
+        days = {b: to_days(df["date"]) for b, df in frames.items()}
+        calendar = TradingCalendar.from_frames(frames.values(), unit="D")
+        ids = np.full((len(calendar), len(frames)), DEFAULT_REGIME_ID, dtype=np.int8)
+        for j, (benchmark, df) in enumerate(frames.items()):
+            if "regime_id" in df:
+                values = df["regime_id"].to_numpy(dtype=np.int8)
+            else:
+                values = df["regime_label"].map(_LABEL_TO_ID).fillna(DEFAULT_REGIME_ID).to_numpy(dtype=np.int8)
+            ids[calendar.day_ids(days[benchmark]), j] = values
+        return cls(calendar.days, list(frames), ids)
+
+    def day_ids(self, dates) -> np.ndarray:
+        """Integer trading-day ids for `dates`; -1 where the date is not on the axis."""
+        return self.calendar.day_ids(dates)
+
+    def lookup(self, dates, benchmark: str, lag: int = 0) -> np.ndarray:
+        """
+        Regime ids for `dates` under `benchmark` (choppy where unknown). With `lag`, each date
+        takes the regime of the session `lag` rows earlier on the axis (intraday bars use the
+        previous session's regime, which is known at the open).
+        """
+        day = self.day_ids(dates)
+        if lag:
+            day = np.where(day >= lag, day - lag, -1)
+        col = self._column.get(benchmark)
+        if col is None:
+            return np.full(len(day), DEFAULT_REGIME_ID, dtype=np.int8)
+        return np.where(day >= 0, self.ids[np.maximum(day, 0), col], DEFAULT_REGIME_ID).astype(np.int8)
+
+    def labels(self, dates, benchmark: str, lag: int = 0) -> np.ndarray:
+        return np.asarray(REGIME_LABELS, dtype=object)[self.lookup(dates, benchmark, lag)]
+
+
+__all__ = [
+    "REGIME_LABELS",
+    "RegimeMatrix",
+    "regime_benchmark_map",
+    "regime_benchmarks",
+]
@@ -3,14 +3,18 @@ Combine rule-based signals, ML predictions, and regime weights into alpha_score.
 """
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Sequence, Union
 
+import numpy as np
 import pandas as pd
 
+from src.core.calendar import DAY_ID, join_on_day
+from src.core.telemetry import traced
 from src.meta.meta_utils import clamp
+from src.meta.regime_map import REGIME_LABELS, RegimeMatrix
 
 
-def _ml_signal(predictions: pd.DataFrame, horizon: int = 1) -> pd.DataFrame:
+def ml_signal_frame(predictions: pd.DataFrame, horizon: int = 1) -> pd.DataFrame:
     preds = predictions[predictions["horizon"] == horizon].copy()
     if preds.empty:
         preds["ml_signal"] = 0.0
@@ -26,57 +30,74 @@ def _ml_signal(predictions: pd.DataFrame, horizon: int = 1) -> pd.DataFrame:
     return preds[["date", "ticker", "ml_signal"]]
 
 
+COMPONENTS = (
+    ("contrib_trend", "trend_alpha", "trend_alpha"),
+    ("contrib_mean_rev", "mean_reversion_alpha", "mean_reversion_alpha"),
+    ("contrib_vol", "vol_alpha", "vol_alpha"),
+    ("contrib_rel_strength", "rel_strength_alpha", "rel_strength_alpha"),
+    ("contrib_ml", "ml_signal", "ml"),
+)
+
+
+def weight_table(labels: Sequence[str], weights: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """Rows = regime labels, columns = components; unknown regimes use the choppy weights."""
+    fallback = weights.get("choppy", {})
+    return np.array(
+        [[weights.get(label, fallback).get(key, 0.0) for _, _, key in COMPONENTS] for label in labels],
+        dtype=np.float64,
+    ).reshape(len(labels), len(COMPONENTS))
+
+
+@traced("meta")
 def combine_signals(
     signals: pd.DataFrame,
     predictions: pd.DataFrame,
-    regimes: pd.DataFrame,
+    regimes: Union[pd.DataFrame, RegimeMatrix],
     weights: Dict[str, Dict[str, float]],
     horizon: int = 1,
+    benchmark: Optional[str] = None,
+    regime_lag: int = 0,
 ) -> pd.DataFrame:
-    ml = _ml_signal(predictions, horizon=horizon)
-
-    df = signals.merge(ml, on=["date", "ticker"], how="left")
-    regimes_min = regimes[["date", "regime_label"]]
-    df = df.merge(regimes_min, on="date", how="left")
-    df["regime_label"] = df["regime_label"].fillna("choppy")
-
-    contribs = {
-        "contrib_trend": [],
-        "contrib_mean_rev": [],
-        "contrib_vol": [],
-        "contrib_rel_strength": [],
-        "contrib_ml": [],
-    }
-    alpha_scores = []
-
-    for _, row in df.iterrows():
-        regime = row["regime_label"]
-        w = weights.get(regime, weights.get("choppy", {}))
-        c_trend = row.get("trend_alpha", 0.0) * w.get("trend_alpha", 0.0)
-        c_mean = row.get("mean_reversion_alpha", 0.0) * w.get("mean_reversion_alpha", 0.0)
-        c_vol = row.get("vol_alpha", 0.0) * w.get("vol_alpha", 0.0)
-        c_rel = row.get("rel_strength_alpha", 0.0) * w.get("rel_strength_alpha", 0.0)
-        c_ml = row.get("ml_signal", 0.0) * w.get("ml", 0.0)
-        contribs["contrib_trend"].append(c_trend)
-        contribs["contrib_mean_rev"].append(c_mean)
-        contribs["contrib_vol"].append(c_vol)
-        contribs["contrib_rel_strength"].append(c_rel)
-        contribs["contrib_ml"].append(c_ml)
-        alpha_scores.append(c_trend + c_mean + c_vol + c_rel + c_ml)
-
-    df["contrib_trend"] = contribs["contrib_trend"]
-    df["contrib_mean_rev"] = contribs["contrib_mean_rev"]
-    df["contrib_vol"] = contribs["contrib_vol"]
-    df["contrib_rel_strength"] = contribs["contrib_rel_strength"]
-    df["contrib_ml"] = contribs["contrib_ml"]
-
-    df["alpha_score"] = clamp(pd.Series(alpha_scores), -1.0, 1.0)
+    """
+    `regimes` is either a single regime frame joined on date, or a RegimeMatrix from which
+    the regime for `benchmark` is gathered by trading-day id. Joins go through
+    src/core/calendar.py, so the frames' date dtypes need not agree. `regime_lag` sessions
+    delay the regime (1 for intraday bars, whose session regime is only known at its close).
+    """
+    ml = ml_signal_frame(predictions, horizon=horizon)
+
+    df = join_on_day(signals, ml, by="ticker")
+    if isinstance(regimes, RegimeMatrix):
+        if benchmark is None:
+            raise ValueError("benchmark is required when regimes is a RegimeMatrix")
+        codes = regimes.lookup(df["date"], benchmark, regime_lag).astype(np.intp)
+        labels = list(REGIME_LABELS)
+        df["regime_label"] = np.asarray(labels, dtype=object)[codes]
+    else:
+        if regime_lag:
+            regimes = regimes.sort_values("date")
+            regimes = regimes.assign(regime_label=regimes["regime_label"].shift(regime_lag))
+        df = join_on_day(df, regimes, ["regime_label"])
+        df["regime_label"] = df["regime_label"].fillna("choppy")
+        codes, uniques = pd.factorize(df["regime_label"])
+        labels = list(uniques)
+
+    values = np.zeros((len(df), len(COMPONENTS)))
+    for j, (_, col, _) in enumerate(COMPONENTS):
+        if col in df:
+            values[:, j] = df[col].to_numpy(dtype=np.float64)
+    contribs = values * weight_table(labels, weights)[codes]
+    for j, (name, _, _) in enumerate(COMPONENTS):
+        df[name] = contribs[:, j]
+
+    df["alpha_score"] = clamp(pd.Series(contribs.sum(axis=1), index=df.index), -1.0, 1.0)
     df["alpha_confidence"] = df["alpha_score"].abs()
 
     return df[
         [
             "date",
             "ticker",
+            *([DAY_ID] if DAY_ID in df else []),
             "alpha_score",
             "alpha_confidence",
             "contrib_trend",
@@ -89,4 +110,4 @@ def combine_signals(
     ]
 
 
-__all__ = ["combine_signals"]
+__all__ = ["ml_signal_frame", "COMPONENTS", "weight_table", "combine_signals"]
@@ -2,48 +2,40 @@
 Feature pipeline: load processed bars, compute feature sets, and persist to data/features/.
 """
 
-import sys
 from pathlib import Path
 from typing import Dict, Iterable, List, Sequence
 
 import pandas as pd
-
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
-from src.core.io import read_parquet, write_parquet  # noqa: E402
-from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
-from src.data.preprocessing import CANONICAL_COLUMNS  # noqa: E402
-from src.features.relative_strength_features import build_relative_strength_features  # noqa: E402
-from src.features.trend_features import build_trend_features  # noqa: E402
-from src.features.volatility_features import build_volatility_features  # noqa: E402
-from src.features.volume_features import build_volume_features  # noqa: E402
+import pyarrow.parquet as pq
+
+from src.core.cache import get_series_cache
+from src.core.calendar import DAY_ID, TradingCalendar, join_on_day
+from src.core.frequency import DAILY, Frequency, get_frequency
+from src.core.io import processed_path, read_parquet, write_parquet, write_parquet_by_session
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
+from src.data.preprocessing import CANONICAL_COLUMNS
+from src.features.chunked import (
+    build_chunked,
+    chunk_rows_for,
+    dataset_columns,
+    feature_columns,
+    max_lookback,
+    read_day_range,
+)
+from src.features.relative_strength_features import build_relative_strength_features
+from src.features.trend_features import build_trend_features
+from src.features.volatility_features import build_volatility_features
+from src.features.volume_features import build_volume_features
 
 logger = get_logger(__name__)
 
 
-def _resolve_path(directory: str, pattern: str, ticker: str, data_root: str | None) -> Path:
-    base_dir = Path(directory)
-    if not base_dir.is_absolute() and data_root:
-        root = Path(data_root)
-        if base_dir.parts and base_dir.parts[0] == root.name:
-            base_dir = root / Path(*base_dir.parts[1:])
-        else:
-            base_dir = root / base_dir
-    ensure_directory(base_dir)
-    return base_dir / pattern.format(ticker=ticker)
-
-
 def _load_processed_bars(
     ticker: str,
     data_sources: Dict,
 ) -> pd.DataFrame:
-    proc_cfg = data_sources.get("processed_files", {})
-    pattern = proc_cfg.get("pattern", "{ticker}.parquet")
-    directory = proc_cfg.get("directory", "data/processed")
-    data_root = data_sources.get("data_root")
-    path = _resolve_path(directory, pattern, ticker, data_root)
+    path = processed_path(ticker, data_sources)
     if not path.exists():
         raise FileNotFoundError(f"Processed bars not found for {ticker}: {path}")
     df = read_parquet(path)
@@ -53,24 +45,132 @@ def _load_processed_bars(
     return df
 
 
-def _build_base_features(bars: pd.DataFrame, feature_cfg: Dict) -> pd.DataFrame:
+def _build_base_features(bars: pd.DataFrame, feature_cfg: Dict, frequency: Frequency = DAILY) -> pd.DataFrame:
     lookbacks = feature_cfg.get("lookbacks", {})
     realized_vol = lookbacks.get("realized_vol", [])
     atr_period = feature_cfg.get("atr_period", 14)
     volume_lookback = feature_cfg.get("volume_lookback", 20)
 
-    vol_df = build_volatility_features(bars, realized_vol_windows=list(realized_vol), atr_period=atr_period)
-    bars_for_trend = bars.merge(vol_df, on=["date", "ticker"], how="left")
-    trend_df = build_trend_features(bars_for_trend, lookbacks=lookbacks)
-    volume_df = build_volume_features(bars, lookback=volume_lookback)
+    vol_df = build_volatility_features(
+        bars, realized_vol_windows=list(realized_vol), atr_period=atr_period, frequency=frequency
+    )
+    bars_for_trend = join_on_day(bars, vol_df, by="ticker")
+    trend_df = build_trend_features(bars_for_trend, lookbacks=lookbacks, frequency=frequency)
+    volume_df = build_volume_features(bars, lookback=volume_lookback, frequency=frequency)
 
     # Keep price columns for downstream signals that need them
-    features = bars[["date", "ticker", "close"]].copy()
+    features = bars[[c for c in ("date", "ticker", DAY_ID, "close") if c in bars]].copy()
     for df in [trend_df, vol_df, volume_df]:
-        features = features.merge(df, on=["date", "ticker"], how="left")
+        features = join_on_day(features, df, by="ticker")
     return features
 
 
+def _build_ticker_features(
+    bars: pd.DataFrame,
+    benchmark_base: pd.DataFrame,
+    feature_cfg: Dict,
+    frequency: Frequency = DAILY,
+) -> pd.DataFrame:
+    base_features = _build_base_features(bars, feature_cfg, frequency)
+
+    # Relative strength features need returns present
+    ret_lookbacks = feature_cfg.get("lookbacks", {}).get("returns", [])
+    rel_lookbacks = [lb for lb in [20, 60] if lb in ret_lookbacks]
+    rs_df = build_relative_strength_features(
+        ticker_features=base_features,
+        benchmark_features=benchmark_base,
+        lookbacks=rel_lookbacks,
+        beta_window=frequency.bars(60),
+    )
+    return join_on_day(base_features, rs_df, by="ticker")
+
+
+def _update_calendar(settings: Dict, date_frames: Iterable[pd.DataFrame], features_dir: Path) -> TradingCalendar:
+    """
+    Trading-day ids shared by every downstream artifact; extend the saved calendar so ids
+    already written stay valid (a backfill before its first day re-bases them).
+    """
+    calendar_path = Path(settings.get("paths", {}).get("calendar_path", features_dir.parent / "calendar.parquet"))
+    calendar = TradingCalendar.from_frames(date_frames)
+    if calendar_path.exists():
+        previous = TradingCalendar.load(calendar_path)
+        calendar = previous.extend(calendar.days)
+        if not previous.is_prefix_of(calendar):
+            logger.warning("Trading calendar re-based; rebuild downstream artifacts that carry day_id")
+    calendar.save(calendar_path)
+    return calendar
+
+
+def _build_features_chunked(
+    tickers: List[str],
+    benchmark: str,
+    settings: Dict,
+    data_sources: Dict,
+    features_dir: Path,
+) -> List[Path]:
+    """
+    Stream each ticker's processed bars in date chunks overlapping by the largest lookback.
+    The benchmark is built first; other tickers read only the benchmark rows of each chunk's
+    day range back from its features file.
+    """
+    feature_cfg = settings.get("features", {})
+    chunk_cfg = feature_cfg.get("chunked", {})
+    frequency = get_frequency(settings)
+    # lookbacks are in sessions; on intraday bars round the warmup up by a whole session
+    overlap = int(chunk_cfg.get("overlap") or frequency.bars(max_lookback(feature_cfg) + frequency.intraday))
+    chunk_rows = chunk_cfg.get("chunk_rows") or chunk_rows_for(
+        chunk_cfg.get("max_memory_mb", 512),
+        len(CANONICAL_COLUMNS) + len(feature_columns(feature_cfg)) + 1,
+        overlap,
+    )
+    sources = {t: processed_path(t, data_sources) for t in tickers}
+    for t, path in sources.items():
+        if not path.exists():
+            raise FileNotFoundError(f"Processed bars not found for {t}: {path}")
+        missing = [c for c in CANONICAL_COLUMNS if c not in pq.ParquetFile(path).schema_arrow.names]
+        if missing:
+            raise ValueError(f"Processed bars for {t} missing columns: {missing}")
+    date_frames = (pd.read_parquet(p, columns=["date"]) for p in sources.values())
+    calendar = _update_calendar(settings, date_frames, features_dir)
+    logger.info(f"Chunked features: {chunk_rows} rows per chunk, {overlap} rows overlap")
+
+    cache = get_series_cache()
+    bench_path = features_dir / f"{benchmark}.parquet"
+    bench_cols = ["date", DAY_ID, "close", "ret_1d", "ret_20d", "ret_60d"]
+    written_paths: List[Path] = []
+    for ticker in [benchmark] + [t for t in tickers if t != benchmark]:
+
+        def compute(frame: pd.DataFrame, ticker: str = ticker) -> pd.DataFrame:
+            bars = calendar.with_day_ids(frame)
+            if ticker == benchmark:
+                bench = _build_base_features(bars, feature_cfg, frequency)
+                features = _build_ticker_features(bars, bench, feature_cfg, frequency)
+            else:
+                days = bars[DAY_ID]
+                present = dataset_columns(bench_path)
+                bench = read_day_range(bench_path, days.min(), days.max(), [c for c in bench_cols if c in present])
+                features = _build_ticker_features(bars, bench, feature_cfg, frequency)
+            # chunk-sized entries are never reused; keep the run cache within the memory bound
+            cache.invalidate(ticker)
+            return features
+
+        output_path = features_dir / f"{ticker}.parquet"
+        stats = build_chunked(
+            sources[ticker],
+            output_path,
+            compute,
+            overlap,
+            chunk_rows,
+            CANONICAL_COLUMNS,
+            partition_by_session=frequency.intraday,
+        )
+        written_paths.append(output_path)
+        logger.info(f"Wrote features for {ticker} to {output_path} ({stats['rows']} rows in {stats['chunks']} chunks)")
+
+    return written_paths
+
+
+@traced("stage", name="build_features")
 def build_features(
     tickers: Iterable[str] | None = None,
     settings_path: str | Path = "config/settings.yaml",
@@ -78,6 +178,7 @@ def build_features(
 ) -> List[Path]:
     """
     Build features for configured tickers (defaults to config tickers) and save to data/features/.
+    With features.chunked.enabled, bars are streamed in overlapping chunks instead of loaded whole.
     """
     settings = load_config(settings_path)
     data_sources = load_config(data_sources_path)
@@ -93,38 +194,37 @@ def build_features(
 
     logger.info(f"Building features for tickers: {tickers_to_process}")
 
+    if not benchmark:
+        raise ValueError("Benchmark must be set in settings.yaml to compute relative strength features.")
+
+    features_dir = Path(settings.get("paths", {}).get("features_dir", "data/features"))
+    ensure_directory(features_dir)
+
+    if feature_cfg.get("chunked", {}).get("enabled", False):
+        return _build_features_chunked(tickers_to_process, benchmark, settings, data_sources, features_dir)
+
     # Load processed bars
     processed_cache: Dict[str, pd.DataFrame] = {}
     for t in tickers_to_process:
         processed_cache[t] = _load_processed_bars(t, data_sources)
 
+    calendar = _update_calendar(settings, processed_cache.values(), features_dir)
+    processed_cache = {t: calendar.with_day_ids(bars) for t, bars in processed_cache.items()}
+
     # Precompute benchmark base features for relative strength
-    if not benchmark:
-        raise ValueError("Benchmark must be set in settings.yaml to compute relative strength features.")
-    benchmark_base = _build_base_features(processed_cache[benchmark], feature_cfg)
+    frequency = get_frequency(settings)
+    benchmark_base = _build_base_features(processed_cache[benchmark], feature_cfg, frequency)
 
     written_paths: List[Path] = []
-    features_dir = Path(settings.get("paths", {}).get("features_dir", "data/features"))
-    ensure_directory(features_dir)
-
     for ticker in tickers_to_process:
-        bars = processed_cache[ticker]
-        base_features = _build_base_features(bars, feature_cfg)
-
-        # Relative strength features need returns present
-        ret_lookbacks = feature_cfg.get("lookbacks", {}).get("returns", [])
-        rel_lookbacks = [lb for lb in [20, 60] if lb in ret_lookbacks]
-        rs_df = build_relative_strength_features(
-            ticker_features=base_features,
-            benchmark_features=benchmark_base,
-            lookbacks=rel_lookbacks,
-            beta_window=60,
-        )
-        features_df = base_features.merge(rs_df, on=["date", "ticker"], how="left")
+        features_df = _build_ticker_features(processed_cache[ticker], benchmark_base, feature_cfg, frequency)
 
-        # Save
+        # Save (intraday: one file per session under <ticker>.parquet/)
         output_path = features_dir / f"{ticker}.parquet"
-        write_parquet(features_df, output_path)
+        if frequency.intraday:
+            write_parquet_by_session(features_df, output_path)
+        else:
+            write_parquet(features_df, output_path)
         written_paths.append(output_path)
         logger.info(f"Wrote features for {ticker} to {output_path}")
 
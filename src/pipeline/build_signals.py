@@ -2,26 +2,22 @@
 Pipeline to build rule-based signals from features and persist to data/signals/.
 """
 
-import sys
 from pathlib import Path
 from typing import Dict, Iterable, List
 
 import pandas as pd
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
-from src.core.io import read_parquet, write_parquet  # noqa: E402
-from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
-from src.signals.mean_reversion_alpha import compute_mean_reversion_alpha  # noqa: E402
-from src.signals.relative_strength_alpha import compute_relative_strength_alpha  # noqa: E402
-from src.signals.trend_alpha import compute_trend_alpha  # noqa: E402
-from src.signals.volatility_alpha import compute_volatility_alpha  # noqa: E402
+from src.core.frequency import get_frequency
+from src.core.io import processed_path, read_parquet, write_parquet
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
+from src.features.lazy import LazyFeatures
+from src.signals.registry import compute_signals, plan_signals
 
 logger = get_logger(__name__)
 
 
+@traced("stage", name="build_signals")
 def build_signals(
     tickers: Iterable[str] | None = None,
     settings_path: str | Path = "config/settings.yaml",
@@ -34,32 +30,37 @@ def build_signals(
     if tickers:
         tickers_to_process = list(dict.fromkeys(list(tickers) + tickers_to_process))
 
-    features_dir = Path(settings.get("paths", {}).get("features_dir", "data/features"))
-    signals_dir = Path(settings.get("paths", {}).get("signals_dir", "data/signals"))
+    paths_cfg = settings.get("paths", {})
+    features_dir = Path(paths_cfg.get("features_dir", "data/features"))
+    signals_dir = Path(paths_cfg.get("signals_dir", "data/signals"))
     ensure_directory(signals_dir)
 
+    signals_cfg = settings.get("signals", {})
+    frequency = get_frequency(settings)
+    plan = plan_signals(signals_cfg.get("enabled"), signals_cfg.get("params"), frequency=frequency)
+    lazy = signals_cfg.get("lazy", False)
+    if lazy and frequency.intraday:
+        # lazy feature windows are bar counts; intraday features must come from build_features
+        raise ValueError("signals.lazy computes features on daily-bar windows; disable it for intraday bars")
+    logger.info(f"Signal plan: {plan.signals} needs {plan.columns} (warmup {plan.warmup} rows)")
+
+    benchmark = None
+    if lazy and plan.needs_benchmark:
+        bench_path = processed_path(settings.get("benchmark"), data_sources)
+        if not bench_path.exists():
+            raise FileNotFoundError(f"Benchmark bars not found: {bench_path}")
+        benchmark = LazyFeatures(read_parquet(bench_path))
+
     written: List[Path] = []
     for ticker in tickers_to_process:
-        feature_path = features_dir / f"{ticker}.parquet"
-        if not feature_path.exists():
-            raise FileNotFoundError(f"Features file not found for {ticker}: {feature_path}")
-
-        feats = read_parquet(feature_path)
-        feats["trend_alpha"] = compute_trend_alpha(feats)
-        feats["mean_reversion_alpha"] = compute_mean_reversion_alpha(feats)
-        feats["vol_alpha"] = compute_volatility_alpha(feats)
-        feats["rel_strength_alpha"] = compute_relative_strength_alpha(feats)
+        # lazy: start from processed bars and compute only the planned feature columns;
+        # otherwise read the materialized features file
+        source_path = processed_path(ticker, data_sources) if lazy else features_dir / f"{ticker}.parquet"
+        if not source_path.exists():
+            raise FileNotFoundError(f"{'Bars' if lazy else 'Features'} file not found for {ticker}: {source_path}")
 
-        signals = feats[
-            [
-                "date",
-                "ticker",
-                "trend_alpha",
-                "mean_reversion_alpha",
-                "vol_alpha",
-                "rel_strength_alpha",
-            ]
-        ]
+        features = LazyFeatures(read_parquet(source_path), benchmark=benchmark)
+        signals = compute_signals(features, plan)
         out_path = signals_dir / f"{ticker}.parquet"
         write_parquet(signals, out_path)
         written.append(out_path)
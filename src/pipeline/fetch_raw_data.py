@@ -0,0 +1,39 @@
+"""
+Fetch historical OHLCV for configured tickers (plus regime benchmarks) with yfinance and
+write raw files to data/raw/.
+"""
+
+from pathlib import Path
+from typing import Iterable, List
+
+from src.core.utils import get_logger, load_config
+from src.data.yfinance_fetch import fetch_and_save_raw
+from src.meta.regime_map import regime_benchmarks
+
+logger = get_logger(__name__)
+
+
+def fetch_raw_data(
+    tickers: Iterable[str] | None = None,
+    settings_path: str | Path = "config/settings.yaml",
+    data_sources_path: str | Path = "config/data_sources.yaml",
+    period: str = "5y",
+) -> List[Path]:
+    """Defaults to 5 years of history; the fetcher falls back to max if that is unavailable."""
+    settings = load_config(settings_path)
+    data_sources = load_config(data_sources_path)
+
+    tickers_to_fetch = list(settings.get("tickers", []))
+    for benchmark in regime_benchmarks(settings):
+        if benchmark not in tickers_to_fetch:
+            tickers_to_fetch.append(benchmark)
+    if tickers:
+        tickers_to_fetch = list(dict.fromkeys(list(tickers) + tickers_to_fetch))
+
+    written = fetch_and_save_raw(tickers_to_fetch, data_sources_config=data_sources, period=period)
+    logger.info(f"Wrote raw files: {written}")
+    return written
+
+
+if __name__ == "__main__":
+    fetch_raw_data()
@@ -0,0 +1,38 @@
+"""
+Read back the signals (or alpha scores) written for a ticker, optionally within a date range.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from src.core.utils import load_config
+
+
+def load_table(path: Path) -> pd.DataFrame:
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def inspect_signals(
+    ticker: str,
+    settings_path: str | Path = "config/settings.yaml",
+    start: str | None = None,
+    end: str | None = None,
+    alpha: bool = False,
+) -> pd.DataFrame:
+    paths = load_config(settings_path).get("paths", {})
+    if alpha:
+        base_dir = Path(paths.get("alpha_scores_dir", "data/meta/alpha_scores"))
+    else:
+        base_dir = Path(paths.get("signals_dir", "data/signals"))
+
+    df = load_table(base_dir / f"{ticker}.parquet")
+    if start:
+        df = df[df["date"] >= start]
+    if end:
+        df = df[df["date"] <= end]
+    return df
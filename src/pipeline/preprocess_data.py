@@ -3,38 +3,36 @@ Pipeline orchestrator for data preprocessing.
 Loads raw OHLCV files, standardizes them, and writes processed bars to disk.
 """
 
-import sys
 from pathlib import Path
 from typing import Iterable, List, Sequence
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
-from src.core.utils import get_logger, load_config  # noqa: E402
-from src.data.loaders import load_raw_ohlcv, save_processed_bars  # noqa: E402
-from src.data.preprocessing import preprocess_ohlcv, validate_processed_schema  # noqa: E402
+from src.core.telemetry import traced
+from src.core.utils import get_logger, load_config
+from src.data.loaders import load_raw_ohlcv, save_processed_bars
+from src.data.preprocessing import preprocess_ohlcv, validate_processed_schema
+from src.meta.regime_map import regime_benchmarks
 
 logger = get_logger(__name__)
 
 
 def _unique_tickers(config: dict, tickers: Sequence[str] | None) -> List[str]:
     configured = list(config.get("tickers", []))
-    benchmark = config.get("benchmark")
-    if benchmark and benchmark not in configured:
-        configured.append(benchmark)
+    for benchmark in regime_benchmarks(config):
+        if benchmark not in configured:
+            configured.append(benchmark)
     if tickers:
         configured = list(dict.fromkeys(list(tickers) + configured))
     return configured
 
 
+@traced("stage", name="preprocess_data")
 def preprocess_data(
     tickers: Iterable[str] | None = None,
     settings_path: str | Path = "config/settings.yaml",
     data_sources_path: str | Path = "config/data_sources.yaml",
 ) -> List[Path]:
     """
-    Run preprocessing for the provided tickers (defaults to config tickers + benchmark).
+    Run preprocessing for the provided tickers (defaults to config tickers + regime benchmarks).
 
     Returns:
         List of paths written.
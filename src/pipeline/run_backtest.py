@@ -2,24 +2,27 @@
 Pipeline to run backtest: loads prices and positions, executes engine, writes reports.
 """
 
-import sys
 from pathlib import Path
 from typing import Iterable, List
 
 import pandas as pd
+import pyarrow.parquet as pq
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
-from src.backtest.engine import run_backtest  # noqa: E402
-from src.backtest.reports import summarize_backtest  # noqa: E402
-from src.core.io import read_parquet  # noqa: E402
-from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
+from src.backtest.costs import CostModel
+from src.backtest.engine import run_backtest
+from src.backtest.reports import summarize_backtest
+from src.backtest.simulator import simulate_positions
+from src.core.calendar import join_on_day
+from src.core.frequency import get_frequency
+from src.core.io import read_parquet, write_parquet
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
+from src.risk.risk_analytics import risk_report, uniform_shocks
 
 logger = get_logger(__name__)
 
 
+@traced("stage", name="run_backtest")
 def run_backtest_pipeline(
     tickers: Iterable[str] | None = None,
     settings_path: str | Path = "config/settings.yaml",
@@ -61,14 +64,74 @@ def run_backtest_pipeline(
     prices_df = pd.concat(prices_list, ignore_index=True)
     positions_df = pd.concat(positions_list, ignore_index=True)
 
-    portfolio, trades = run_backtest(prices_df, positions_df, strategy_name=strategy_name)
+    # Alpha scores carry the contrib_* columns and per-ticker regimes used for attribution
+    alpha_dir = Path(paths_cfg.get("alpha_scores_dir", "data/meta/alpha_scores"))
+    alpha_paths = [alpha_dir / f"{t}.parquet" for t in tickers_to_process]
+    alpha_frames = [read_parquet(p) for p in alpha_paths if p.exists()]
+    alpha_df = pd.concat(alpha_frames, ignore_index=True) if alpha_frames else None
+
+    costs_cfg = settings.get("backtest", {}).get("costs", {})
+    cost_model = CostModel.from_config(costs_cfg) if costs_cfg.get("enabled", False) else None
+    portfolio, trades = run_backtest(prices_df, positions_df, strategy_name=strategy_name, cost_model=cost_model)
     if regimes_df is not None:
-        portfolio = portfolio.merge(regimes_df, on="date", how="left")
-        trades = trades.merge(regimes_df, left_on="date", right_on="date", how="left")
+        portfolio = join_on_day(portfolio, regimes_df)
+        trades = join_on_day(trades, regimes_df)
 
-    summary = summarize_backtest(portfolio, trades, out_dir=out_dir, strategy_name=strategy_name)
+    # rows are bars: windows and bootstrap blocks configured in sessions scale to bars
+    metrics_cfg = settings.get("backtest", {}).get("metrics", {})
+    frequency = get_frequency(settings)
+    summary = summarize_backtest(
+        portfolio,
+        trades,
+        out_dir=out_dir,
+        strategy_name=strategy_name,
+        rolling_windows=[frequency.bars(w) for w in metrics_cfg.get("rolling_windows", (63, 126, 252))],
+        bootstrap_samples=metrics_cfg.get("bootstrap_samples", 0),
+        bootstrap_block=metrics_cfg.get("bootstrap_block", 20) * frequency.bars_per_session,
+        confidence=metrics_cfg.get("confidence", 0.95),
+        alpha_scores=alpha_df,
+        periods_per_year=frequency.periods_per_year,
+    )
     logger.info(f"Backtest complete: {summary}")
-    return [out_dir / "summary.json", out_dir / "pnl_timeseries.parquet", out_dir / "trades.parquet"]
+    written = [out_dir / "summary.json", out_dir / "pnl_timeseries.parquet", out_dir / "trades.parquet"]
+    for extra in ("rolling_metrics.parquet", "attribution.parquet"):
+        if (out_dir / extra).exists():
+            written.append(out_dir / extra)
+
+    sim_cfg = settings.get("backtest", {}).get("simulator", {})
+    if sim_cfg.get("enabled", False):
+        result = simulate_positions(
+            prices_df,
+            positions_df,
+            cost_model=cost_model or CostModel.from_config(costs_cfg),
+            max_participation=sim_cfg.get("max_participation", 0.1),
+        )
+        for name, log in (("orders", result.orders), ("fills", result.fills), ("positions", result.positions)):
+            path = out_dir / f"sim_{name}.parquet"
+            pq.write_table(log.to_arrow(), path)
+            written.append(path)
+        logger.info(f"Simulated {len(result.orders)} orders / {len(result.fills)} fills into {out_dir}")
+
+    risk_cfg = settings.get("backtest", {}).get("risk_analytics", {})
+    if risk_cfg.get("enabled", False):
+        returns = prices_df.pivot_table(index="date", columns="ticker", values="close").sort_index().pct_change()
+        weights = positions_df.pivot_table(index="date", columns="ticker", values="target_weight", aggfunc="sum")
+        stress = risk_cfg.get("stress_scenarios") or {}
+        report = risk_report(
+            returns,
+            weights,
+            alpha=risk_cfg.get("alpha", 0.99),
+            window=risk_cfg.get("window", 500),
+            filtered=risk_cfg.get("filtered", True),
+            halflife=risk_cfg.get("halflife", 60),
+            memory_budget_mb=risk_cfg.get("memory_budget_mb", 256),
+            shocks=uniform_shocks(returns.columns, stress) if stress else None,
+        )
+        risk_path = out_dir / "risk_report.parquet"
+        write_parquet(report, risk_path)
+        logger.info(f"Wrote VaR/CVaR and stress report to {risk_path}")
+        written.append(risk_path)
+    return written
 
 
 if __name__ == "__main__":
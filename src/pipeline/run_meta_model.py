@@ -2,24 +2,23 @@
 Pipeline to combine signals, predictions, and regimes into alpha scores.
 """
 
-import sys
 from pathlib import Path
 from typing import Iterable, List
 
 import pandas as pd
 import yaml
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
-from src.core.io import read_parquet, write_parquet  # noqa: E402
-from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
-from src.meta.rule_based_meta import combine_signals  # noqa: E402
+from src.core.frequency import get_frequency
+from src.core.io import read_parquet, write_parquet
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
+from src.meta.regime_map import RegimeMatrix, regime_benchmark_map, regime_benchmarks
+from src.meta.rule_based_meta import combine_signals
 
 logger = get_logger(__name__)
 
 
+@traced("stage", name="run_meta_model")
 def run_meta_model(
     tickers: Iterable[str] | None = None,
     settings_path: str | Path = "config/settings.yaml",
@@ -41,11 +40,15 @@ def run_meta_model(
 
     horizon = settings.get("ml", {}).get("horizons", [1])[0]
     weights = regimes_cfg.get("weights", {})
-    benchmark = settings.get("benchmark")
-    regime_path = regimes_dir / f"{benchmark}.parquet"
-    if not regime_path.exists():
-        raise FileNotFoundError(f"Regime file not found: {regime_path}")
-    regimes = read_parquet(regime_path)
+    default_benchmark = settings.get("benchmark")
+    ticker_benchmark = regime_benchmark_map(settings)
+    frames = {}
+    for benchmark in regime_benchmarks(settings):
+        regime_path = regimes_dir / f"{benchmark}.parquet"
+        if not regime_path.exists():
+            raise FileNotFoundError(f"Regime file not found: {regime_path}")
+        frames[benchmark] = read_parquet(regime_path)
+    regimes = RegimeMatrix.from_frames(frames)
 
     written: List[Path] = []
     for ticker in tickers_to_process:
@@ -56,7 +59,15 @@ def run_meta_model(
 
         signals = read_parquet(signals_path)
         preds = read_parquet(preds_path)
-        alpha_df = combine_signals(signals, preds, regimes, weights=weights, horizon=horizon)
+        alpha_df = combine_signals(
+            signals,
+            preds,
+            regimes,
+            weights=weights,
+            horizon=horizon,
+            benchmark=ticker_benchmark.get(ticker, default_benchmark),
+            regime_lag=1 if get_frequency(settings).intraday else 0,
+        )
         out_path = alpha_dir / f"{ticker}.parquet"
         write_parquet(alpha_df, out_path)
         written.append(out_path)
@@ -2,23 +2,59 @@
 Pipeline to compute position sizes from alpha scores and realized volatility.
 """
 
-import sys
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Optional, Tuple
 
 import pandas as pd
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
-from src.core.io import read_parquet, write_parquet  # noqa: E402
-from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
-from src.risk.position_sizing import compute_positions  # noqa: E402
+from src.core.cache import get_series_cache
+from src.core.frequency import Frequency, get_frequency
+from src.core.io import read_parquet, write_parquet
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
+from src.risk.covariance import EWMACovariance
+from src.risk.portfolio_construction import PortfolioConstraints
+from src.risk.position_sizing import compute_positions, portfolio_vol_scales
 
 logger = get_logger(__name__)
 
-
+RISK_STATE_FILE = "ewma_covariance.npz"
+VOL_SCALE_FILE = "portfolio_vol_scale.parquet"
+
+
+def _load_risk_state(
+    risk_dir: Path, tickers: List[str], cov_cfg: dict, frequency: Frequency, dates: pd.Index
+) -> Tuple[EWMACovariance, Optional[pd.Series]]:
+    """
+    Resume the EWMA covariance saved by the previous run, reindexed to `tickers`, with its
+    per-date vol scales. Starts fresh when there is no state, the configured parameters
+    changed, or the saved state is ahead of the return history. halflife and min_periods
+    are configured in sessions and converted to bars.
+    """
+    fresh = EWMACovariance(
+        tickers,
+        halflife=cov_cfg.get("halflife", 60) * frequency.bars_per_session,
+        shrinkage=cov_cfg.get("shrinkage", 0.0),
+        min_periods=frequency.bars(cov_cfg.get("min_periods", 60)),
+        periods_per_year=frequency.periods_per_year,
+    )
+    state_path, scale_path = risk_dir / RISK_STATE_FILE, risk_dir / VOL_SCALE_FILE
+    if not state_path.exists() or not scale_path.exists():
+        return fresh, None
+    saved = EWMACovariance.load(state_path)
+    params = ("halflife", "shrinkage", "min_periods", "periods_per_year")
+    if any(getattr(saved, p) != getattr(fresh, p) for p in params):
+        logger.warning(f"Risk model parameters changed since {state_path} was saved; rebuilding from history")
+        return fresh, None
+    if saved.last_date is None or len(dates) == 0 or pd.Timestamp(saved.last_date) > pd.Timestamp(dates.max()):
+        logger.warning("Saved risk model state is ahead of the return history; rebuilding from history")
+        return fresh, None
+    scales = read_parquet(scale_path)
+    prior = pd.Series(scales["vol_scale"].to_numpy(), index=pd.to_datetime(scales["date"]))
+    return saved.reindex(tickers), prior
+
+
+@traced("stage", name="run_position_sizing")
 def run_position_sizing(
     tickers: Iterable[str] | None = None,
     settings_path: str | Path = "config/settings.yaml",
@@ -40,10 +76,26 @@ def run_position_sizing(
     positions_dir = positions_root / strategy_name
     ensure_directory(positions_dir)
 
+    frequency = get_frequency(settings)
     target_vol = settings.get("risk", {}).get("target_vol", 0.15)
     max_weight = settings.get("risk", {}).get("max_weight", 0.1)
 
-    written: List[Path] = []
+    cov_cfg = settings.get("risk", {}).get("covariance", {})
+    use_risk_model = cov_cfg.get("enabled", False)
+    port_cfg = settings.get("risk", {}).get("portfolio", {})
+    constraints = None
+    if port_cfg.get("enabled", False):
+        constraints = PortfolioConstraints(
+            max_weight=max_weight,
+            gross_max=port_cfg.get("gross_max", 1.0),
+            net_min=port_cfg.get("net_min", -1.0),
+            net_max=port_cfg.get("net_max", 1.0),
+            turnover_max=port_cfg.get("turnover_max"),
+        )
+
+    alphas = {}
+    vols = {}
+    rets = {}
     for ticker in tickers_to_process:
         alpha_path = alpha_dir / f"{ticker}.parquet"
         feats_path = features_dir / f"{ticker}.parquet"
@@ -52,12 +104,62 @@ def run_position_sizing(
 
         alpha = read_parquet(alpha_path)
         feats = read_parquet(feats_path)
-        if "ret_1d" not in feats:
+        # per-bar returns: ret_1d on daily bars, close-to-close bar returns intraday
+        if "ret_1d" not in feats or frequency.intraday:
             feats["ret_1d"] = feats["close"].pct_change()
-        vol = feats["ret_1d"].rolling(window=20, min_periods=20).std() * (252 ** 0.5)
+        vol = get_series_cache().realized_vol(
+            ticker, feats["ret_1d"], frequency.bars(20), frequency.periods_per_year
+        )
         vol.index = feats["date"]
+        alphas[ticker] = alpha
+        vols[ticker] = vol
+        rets[ticker] = pd.Series(feats["ret_1d"].to_numpy(), index=feats["date"])
+
+    if use_risk_model or constraints is not None:
+        # One cross-sectional pass over all tickers: optional EWMA-covariance vol targeting,
+        # then the constrained portfolio construction.
+        alpha_all = pd.concat(alphas.values(), ignore_index=True)
+        vol_frame = pd.DataFrame(vols)
+        vol_scales = None
+        if use_risk_model:
+            risk_dir = Path(paths_cfg.get("risk_model_dir", "data/risk"))
+            returns = pd.DataFrame(rets).sort_index()
+            risk_model, prior_scales = _load_risk_state(risk_dir, tickers_to_process, cov_cfg, frequency, returns.index)
+            streamed_from = risk_model.last_date
+            unscaled = compute_positions(alpha_all, vol_frame, target_vol=target_vol, max_weight=max_weight)
+            vol_scales = portfolio_vol_scales(
+                unscaled,
+                risk_model,
+                returns,
+                target_vol,
+                n_factors=cov_cfg.get("n_factors"),
+                factor_refresh=frequency.bars(20),
+                prior_scales=prior_scales,
+            )
+            risk_model.save(risk_dir / RISK_STATE_FILE)
+            write_parquet(vol_scales.rename_axis("date").reset_index(), risk_dir / VOL_SCALE_FILE)
+            logger.info(
+                f"Risk model ({risk_model.n_assets} names) updated from {streamed_from or 'the start'} "
+                f"to {risk_model.last_date}; state saved to {risk_dir}"
+            )
+        combined = compute_positions(
+            alpha_all,
+            vol_frame,
+            target_vol=target_vol,
+            max_weight=max_weight,
+            constraints=constraints,
+            vol_scales=vol_scales,
+        )
+        per_ticker = {t: combined[combined["ticker"] == t] for t in tickers_to_process}
+    else:
+        per_ticker = {
+            t: compute_positions(alphas[t], vols[t], target_vol=target_vol, max_weight=max_weight)
+            for t in tickers_to_process
+        }
 
-        positions = compute_positions(alpha, vol, target_vol=target_vol, max_weight=max_weight)
+    written: List[Path] = []
+    for ticker, positions in per_ticker.items():
+        positions = positions.copy()
         positions["strategy_name"] = strategy_name
         out_path = positions_dir / f"{ticker}.parquet"
         write_parquet(positions, out_path)
@@ -2,24 +2,22 @@
 Pipeline to run predictions using trained LightGBM models and persist to data/predictions/.
 """
 
-import sys
 from pathlib import Path
 from typing import Iterable, List
 
 import pandas as pd
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
-from models.ml.lightgbm_next_state import load_trained_model, predict_proba  # noqa: E402
-from models.ml.model_registry import ModelKey  # noqa: E402
-from src.core.io import read_parquet, write_parquet  # noqa: E402
-from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
+from models.ml.design_matrix import DesignMatrixCache, file_version
+from models.ml.lightgbm_next_state import build_prediction_frame, load_trained_model, predict_proba
+from models.ml.model_registry import ModelKey, configure_model_cache
+from src.core.io import read_parquet, write_parquet
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
 
 logger = get_logger(__name__)
 
 
+@traced("stage", name="run_predictions")
 def run_predictions(
     tickers: Iterable[str] | None = None,
     settings_path: str | Path = "config/settings.yaml",
@@ -39,6 +37,8 @@ def run_predictions(
     horizons = settings.get("ml", {}).get("horizons", [1, 3, 5])
     model_name = settings.get("ml", {}).get("model_name", "lightgbm_v1")
     artifacts_dir = Path("models/ml/artifacts")
+    model_cache = configure_model_cache(settings.get("ml", {}).get("model_cache_size", 256))
+    matrix_cache = DesignMatrixCache(settings.get("paths", {}).get("design_matrix_dir", "data/cache/design_matrix"))
 
     written: List[Path] = []
     for ticker in tickers_to_process:
@@ -46,48 +46,29 @@ def run_predictions(
         if not feats_path.exists():
             raise FileNotFoundError(f"Features file not found for {ticker}: {feats_path}")
         feats = read_parquet(feats_path)
+        data_version = file_version(feats_path)
 
-        preds_rows = []
+        frames = []
         for h in horizons:
             key = ModelKey(model_name=model_name, ticker=ticker, horizon=h, version="v1")
             trained = load_trained_model(str(artifacts_dir), key)
-            # Align feature columns
-            X = feats.copy()
-            missing_cols = [c for c in trained.feature_columns if c not in X.columns]
-            for c in missing_cols:
-                X[c] = 0.0
-            X = X[trained.feature_columns]
-
+            # Horizons normally share feature columns, so they reuse one cached float32 matrix
+            X = matrix_cache.get(ticker, feats, trained.feature_columns, data_version)
             proba = predict_proba(trained.model, trained.scaler, X, trained.feature_columns)
-            classes = trained.classes_
-            # For each row, find pred_state and prob_pred_state
-            for dt, row_proba in zip(feats["date"], proba):
-                pred_idx = row_proba.argmax()
-                pred_state = classes[pred_idx]
-                preds_rows.append(
-                    {
-                        "date": dt,
-                        "ticker": ticker,
-                        "horizon": h,
-                        "model_name": model_name,
-                        "pred_state": int(pred_state),
-                        "prob_pred_state": float(row_proba[pred_idx]),
-                        "prob_state_m3": float(row_proba[classes.tolist().index(-3)]) if -3 in classes else None,
-                        "prob_state_m2": float(row_proba[classes.tolist().index(-2)]) if -2 in classes else None,
-                        "prob_state_m1": float(row_proba[classes.tolist().index(-1)]) if -1 in classes else None,
-                        "prob_state_0": float(row_proba[classes.tolist().index(0)]) if 0 in classes else None,
-                        "prob_state_p1": float(row_proba[classes.tolist().index(1)]) if 1 in classes else None,
-                        "prob_state_p2": float(row_proba[classes.tolist().index(2)]) if 2 in classes else None,
-                        "prob_state_p3": float(row_proba[classes.tolist().index(3)]) if 3 in classes else None,
-                    }
-                )
+            frames.append(build_prediction_frame(feats["date"], ticker, h, model_name, proba, trained.classes_))
 
-        preds_df = pd.DataFrame(preds_rows)
+        preds_df = pd.concat(frames, ignore_index=True)
         out_path = preds_dir / f"{ticker}.parquet"
         write_parquet(preds_df, out_path)
         written.append(out_path)
         logger.info(f"Wrote predictions for {ticker} to {out_path}")
 
+    stats = model_cache.stats()
+    logger.info(
+        f"Model cache: {stats['hits']} hits / {stats['misses']} misses "
+        f"(hit rate {stats['hit_rate']:.1%}), mean load {stats['load_ms_mean']:.1f} ms, "
+        f"{stats['size']}/{stats['max_entries']} resident"
+    )
     return written
 
 
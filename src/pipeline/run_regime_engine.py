@@ -1,76 +1,150 @@
 """
-Pipeline to compute benchmark regimes using the rule-based engine and persist to data/regimes/.
+Pipeline to compute benchmark regimes (rule-based or HMM engine) and persist to data/regimes/.
 """
 
-import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
 import pandas as pd
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
-from src.core.io import read_parquet, write_parquet  # noqa: E402
-from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
-from models.regime.rule_based_regime import assign_regime  # noqa: E402
+from src.core.frequency import DAILY, Frequency, get_frequency, resample_to_daily
+from src.core.io import read_parquet, resolve_source_path, write_parquet
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
+from src.meta.regime_map import regime_benchmarks
+from models.regime.rule_based_regime import assign_regime
+from models.regime.hmm_regime_model import infer_regime, train_hmm_regime
+from models.regime.online_regime import OnlineRegimeTracker
 
 logger = get_logger(__name__)
 
 
-def _resolve_path(directory: str, pattern: str, ticker: str, data_root: str | None) -> Path:
-    base_dir = Path(directory)
-    if not base_dir.is_absolute() and data_root:
-        root = Path(data_root)
-        if base_dir.parts and base_dir.parts[0] == root.name:
-            base_dir = root / Path(*base_dir.parts[1:])
+def _rule_params(rules: dict) -> dict:
+    return {
+        "trend_ma_short": rules.get("trend_ma_short", 50),
+        "trend_ma_long": rules.get("trend_ma_long", 200),
+        "vol_lookback": rules.get("vol_lookback", 20),
+        "high_vol_zscore": rules.get("high_vol_zscore", 1.5),
+        "crash_drawdown_threshold": rules.get("crash_drawdown_threshold", -0.2),
+    }
+
+
+def _incremental_regimes(bars: pd.DataFrame, benchmark: str, params: dict, out_path: Path) -> pd.DataFrame:
+    """
+    Resume the online tracker from its checkpoint and label only bars newer than the last
+    checkpointed date; fall back to a full pass when there is no usable checkpoint.
+    """
+    state_path = out_path.with_name(f"{benchmark}_tracker.json")
+    tracker = None
+    if state_path.exists() and out_path.exists():
+        tracker = OnlineRegimeTracker.load(state_path)
+        if not tracker.matches_params(**params):
+            logger.info("Regime rules changed since last checkpoint; recomputing from scratch")
+            tracker = None
+
+    if tracker is None:
+        tracker = OnlineRegimeTracker(benchmark, **params)
+        regime_df = tracker.update_frame(bars)
+    else:
+        cutoff = pd.Timestamp(tracker.last_date)
+        new_bars = bars[pd.to_datetime(bars["date"]) > cutoff]
+        existing = read_parquet(out_path)
+        existing = existing[pd.to_datetime(existing["date"]) <= cutoff]
+        logger.info(f"Updating {benchmark} regimes incrementally with {len(new_bars)} new bars")
+        regime_df = pd.concat([existing, tracker.update_frame(new_bars)], ignore_index=True)
+    tracker.save(state_path)
+    return regime_df
+
+
+def _run_benchmark(
+    benchmark: str,
+    proc_path: Path,
+    regimes_cfg: dict,
+    regimes_dir: Path,
+    frequency: Frequency = DAILY,
+) -> Path:
+    if not proc_path.exists():
+        raise FileNotFoundError(f"Processed benchmark file not found: {proc_path}")
+
+    bars = read_parquet(proc_path)
+    if frequency.intraday:
+        # regimes are defined on sessions; the meta model applies them from the next session
+        bars = resample_to_daily(bars)
+    rules = regimes_cfg.get("rules", {})
+    out_path = regimes_dir / f"{benchmark}.parquet"
+    engine = regimes_cfg.get("engine", "rule_based")
+    if engine == "hmm":
+        hmm_cfg = regimes_cfg.get("hmm", {})
+        model = train_hmm_regime(
+            bars,
+            n_states=hmm_cfg.get("n_states", 4),
+            n_restarts=hmm_cfg.get("n_restarts", 8),
+            n_iter=hmm_cfg.get("n_iter", 100),
+            tol=hmm_cfg.get("tol", 1e-4),
+            vol_lookback=hmm_cfg.get("vol_lookback", rules.get("vol_lookback", 20)),
+            random_state=hmm_cfg.get("random_state", 42),
+            n_jobs=hmm_cfg.get("n_jobs", 4),
+        )
+        regime_df = infer_regime(model, bars)
+        model_path = regimes_dir / f"{benchmark}_hmm.json"
+        model_path.write_text(json.dumps(model.to_dict(), indent=2))
+        logger.info(f"Saved HMM regime model for {benchmark} to {model_path}")
+    elif engine == "rule_based":
+        params = _rule_params(rules)
+        if regimes_cfg.get("incremental", False):
+            regime_df = _incremental_regimes(bars, benchmark, params, out_path)
         else:
-            base_dir = root / base_dir
-    return base_dir / pattern.format(ticker=ticker)
+            regime_df = assign_regime(bars, **params)
+    else:
+        raise ValueError(f"Unknown regime engine: {engine}")
+
+    write_parquet(regime_df, out_path)
+    logger.info(f"Wrote regimes for {benchmark} to {out_path}")
+    return out_path
 
 
+@traced("stage", name="run_regime_engine")
 def run_regime_engine(
     settings_path: str | Path = "config/settings.yaml",
     data_sources_path: str | Path = "config/data_sources.yaml",
     regimes_config_path: str | Path = "config/regimes.yaml",
 ) -> List[Path]:
+    """
+    Compute regimes for the global benchmark and every benchmark referenced by
+    `regime_benchmarks` in settings, running the benchmarks concurrently.
+    """
     settings = load_config(settings_path)
     data_sources = load_config(data_sources_path)
     regimes_cfg = load_config(regimes_config_path)
 
-    benchmark = settings.get("benchmark")
-    if not benchmark:
+    if not settings.get("benchmark"):
         raise ValueError("Benchmark must be set in settings.yaml")
+    benchmarks = regime_benchmarks(settings)
 
     proc_cfg = data_sources.get("processed_files", {})
     pattern = proc_cfg.get("pattern", "{ticker}.parquet")
     directory = proc_cfg.get("directory", "data/processed")
     data_root = data_sources.get("data_root")
-    proc_path = _resolve_path(directory, pattern, benchmark, data_root)
 
-    if not proc_path.exists():
-        raise FileNotFoundError(f"Processed benchmark file not found: {proc_path}")
-
-    bars = read_parquet(proc_path)
-
-    rules = regimes_cfg.get("rules", {})
     regimes_dir = Path(settings.get("paths", {}).get("regimes_dir", "data/regimes"))
     ensure_directory(regimes_dir)
 
-    regime_df = assign_regime(
-        bars,
-        trend_ma_short=rules.get("trend_ma_short", 50),
-        trend_ma_long=rules.get("trend_ma_long", 200),
-        vol_lookback=rules.get("vol_lookback", 20),
-        high_vol_zscore=rules.get("high_vol_zscore", 1.5),
-        crash_drawdown_threshold=rules.get("crash_drawdown_threshold", -0.2),
-    )
-
-    out_path = regimes_dir / f"{benchmark}.parquet"
-    write_parquet(regime_df, out_path)
-    logger.info(f"Wrote regimes for {benchmark} to {out_path}")
-    return [out_path]
+    max_workers = max(1, min(regimes_cfg.get("max_workers", 4), len(benchmarks)))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(
+                _run_benchmark,
+                b,
+                resolve_source_path(directory, pattern, b, data_root),
+                regimes_cfg,
+                regimes_dir,
+                get_frequency(settings),
+            )
+            for b in benchmarks
+        ]
+        return [f.result() for f in futures]
 
 
 if __name__ == "__main__":
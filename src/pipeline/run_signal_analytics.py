@@ -0,0 +1,73 @@
+"""
+Pipeline to score every signal column: rank IC, IC decay, quantile spreads and turnover.
+"""
+
+from pathlib import Path
+from typing import Iterable, List
+
+import pandas as pd
+
+from src.core.calendar import join_on_day
+from src.core.io import processed_path, read_parquet, write_parquet
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
+from src.meta.rule_based_meta import ml_signal_frame
+from src.signals.signal_analytics import SignalAnalytics, SignalPanel
+
+logger = get_logger(__name__)
+
+
+@traced("stage", name="run_signal_analytics")
+def run_signal_analytics(
+    tickers: Iterable[str] | None = None,
+    settings_path: str | Path = "config/settings.yaml",
+    data_sources_path: str | Path = "config/data_sources.yaml",
+) -> List[Path]:
+    settings = load_config(settings_path)
+    data_sources = load_config(data_sources_path)
+
+    tickers_to_process: List[str] = list(settings.get("tickers", []))
+    if tickers:
+        tickers_to_process = list(dict.fromkeys(list(tickers) + tickers_to_process))
+
+    paths_cfg = settings.get("paths", {})
+    signals_dir = Path(paths_cfg.get("signals_dir", "data/signals"))
+    preds_dir = Path(paths_cfg.get("predictions_dir", "data/predictions"))
+    out_dir = ensure_directory(paths_cfg.get("signal_analytics_dir", "data/analytics/signals"))
+    cfg = settings.get("signal_analytics", {})
+    horizon = settings.get("ml", {}).get("horizons", [1])[0]
+
+    prices_list = []
+    signals_list = []
+    for ticker in tickers_to_process:
+        prices_path = processed_path(ticker, data_sources)
+        signals_path = signals_dir / f"{ticker}.parquet"
+        if not prices_path.exists() or not signals_path.exists():
+            raise FileNotFoundError(f"Missing prices or signals for {ticker}")
+        signals = read_parquet(signals_path)
+        preds_path = preds_dir / f"{ticker}.parquet"
+        if preds_path.exists():
+            ml = ml_signal_frame(read_parquet(preds_path), horizon=horizon)
+            signals = join_on_day(signals, ml, by="ticker")
+        prices_list.append(read_parquet(prices_path)[["date", "ticker", "close"]])
+        signals_list.append(signals)
+
+    panel = SignalPanel.from_frames(
+        pd.concat(prices_list, ignore_index=True), pd.concat(signals_list, ignore_index=True)
+    )
+    analytics = SignalAnalytics(
+        cache_dir=out_dir / "cache",
+        horizons=cfg.get("horizons", [1, 5, 10, 20]),
+        n_quantiles=cfg.get("n_quantiles", 5),
+    )
+    summary, reports = analytics.run(panel)
+
+    written = [write_parquet(summary, out_dir / "summary.parquet")]
+    for name, report in reports.items():
+        written.append(write_parquet(report, out_dir / f"{name}.parquet"))
+    logger.info(f"Wrote signal analytics for {len(reports)} signals to {out_dir}")
+    return written
+
+
+if __name__ == "__main__":
+    run_signal_analytics()
@@ -2,16 +2,13 @@
 Pipeline to train LightGBM models for next-state prediction and persist artifacts.
 """
 
-import sys
 from pathlib import Path
 from typing import Iterable, List
 
 import pandas as pd
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-if str(REPO_ROOT) not in sys.path:
-    sys.path.insert(0, str(REPO_ROOT))
-
+from models.ml.design_matrix import DesignMatrixCache, file_version, select_feature_columns
+from models.ml.incremental import retrain_model
 from models.ml.lightgbm_next_state import (
     TrainResult,
     load_trained_model,
@@ -19,13 +16,15 @@ from models.ml.lightgbm_next_state import (
     train_model,
 )
 from models.ml.model_registry import ModelKey
-from src.core.io import read_parquet  # noqa: E402
-from src.core.utils import ensure_directory, get_logger, load_config  # noqa: E402
-from src.features.label_targets import label_future_states  # noqa: E402
+from src.core.io import read_parquet
+from src.core.telemetry import traced
+from src.core.utils import ensure_directory, get_logger, load_config
+from src.features.label_targets import label_future_states
 
 logger = get_logger(__name__)
 
 
+@traced("stage", name="train_ml_models")
 def train_ml_models(
     tickers: Iterable[str] | None = None,
     settings_path: str | Path = "config/settings.yaml",
@@ -45,6 +44,9 @@ def train_ml_models(
     horizons = settings.get("ml", {}).get("horizons", [1, 3, 5])
     model_name = settings.get("ml", {}).get("model_name", "lightgbm_v1")
     test_size = settings.get("ml", {}).get("test_size", 0.2)
+    warm_cfg = settings.get("ml", {}).get("warm_start", {})
+    warm_enabled = bool(warm_cfg.get("enabled", False))
+    matrix_cache = DesignMatrixCache(settings.get("paths", {}).get("design_matrix_dir", "data/cache/design_matrix"))
 
     written: List[Path] = []
     for ticker in tickers_to_process:
@@ -58,10 +60,12 @@ def train_ml_models(
         if not set(label_cols).issubset(set(feats.columns)):
             feats = label_future_states(feats, horizons=horizons)
 
+        # One float32 design matrix per ticker, shared by every horizon (labels are excluded)
+        feature_columns = select_feature_columns(feats)
+        X = matrix_cache.get(ticker, feats, feature_columns, file_version(feats_path))
+
         for h in horizons:
             label_col = f"target_state_h{h}"
-            # Drop rows without label
-            train_df = feats.dropna(subset=[label_col])
             params = {
                 "n_estimators": 400,
                 "learning_rate": 0.05,
@@ -77,11 +81,42 @@ def train_ml_models(
                 "reg_alpha": 0.1,
                 "class_weight": "balanced",
             }
-            result: TrainResult = train_model(train_df, label_col=label_col, params=params, test_size=test_size)
             key = ModelKey(model_name=model_name, ticker=ticker, horizon=h, version="v1")
+            if warm_enabled:
+                try:
+                    previous = load_trained_model(str(artifacts_dir), key)
+                except FileNotFoundError:
+                    previous = None
+                retrained = retrain_model(
+                    feats,
+                    label_col=label_col,
+                    params=params,
+                    previous=previous,
+                    extra_rounds=warm_cfg.get("extra_rounds", 50),
+                    recent_rows=warm_cfg.get("recent_rows", 250),
+                    mean_shift_threshold=warm_cfg.get("mean_shift_threshold", 0.5),
+                    max_std_ratio=warm_cfg.get("max_std_ratio", 2.0),
+                    test_size=test_size,
+                    design_matrix=X,
+                    feature_columns=feature_columns,
+                )
+                result: TrainResult = retrained.result
+                mode = retrained.mode
+                if retrained.drift.reasons:
+                    logger.info(f"{ticker} h{h}: full refit ({'; '.join(retrained.drift.reasons)})")
+            else:
+                result = train_model(
+                    feats,
+                    label_col=label_col,
+                    params=params,
+                    test_size=test_size,
+                    design_matrix=X,
+                    feature_columns=feature_columns,
+                )
+                mode = "full"
             path = save_trained_model(result, artifacts_dir=str(artifacts_dir), key=key)
             written.append(path)
-            logger.info(f"Trained model for {ticker} h{h} -> {path}")
+            logger.info(f"Trained model for {ticker} h{h} ({mode}, revision {len(result.lineage)}) -> {path}")
 
     return written
 
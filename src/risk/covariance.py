@@ -0,0 +1,205 @@
+"""
+Universe-wide EWMA covariance risk model.
+
+Each day is a rank-1 update S <- lam * S + (1 - lam) * r r^T applied in row blocks so the
+temporary never exceeds `block_rows x N`. Names without a return that day keep their rows
+and columns untouched. Because S starts from zero, each pair also accumulates its total
+weight W_ij = 1 - lam^n_ij over the n_ij days both names traded, and reads divide by it
+(the zero-mean equivalent of pandas `ewm(adjust=True)`), so short and ragged histories are
+not biased toward zero. Reads can apply shrinkage toward the diagonal or go through a
+k-factor eigen decomposition. State persists as float32 packed upper triangles (.npz).
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.utils import ensure_directory
+
+STATE_FORMAT = "ewma_cov_v2"
+_LEGACY_FORMATS = ("ewma_cov_v1",)
+
+
+class EWMACovariance:
+    def __init__(
+        self,
+        tickers: Sequence[str],
+        halflife: float = 60.0,
+        shrinkage: float = 0.0,
+        min_periods: int = 20,
+        periods_per_year: int = 252,
+        block_rows: int = 512,
+    ):
+        if halflife <= 0:
+            raise ValueError("halflife must be positive")
+        if not 0.0 <= shrinkage <= 1.0:
+            raise ValueError("shrinkage must be in [0, 1]")
+        self.tickers = list(tickers)
+        self.halflife = float(halflife)
+        self.decay = 0.5 ** (1.0 / self.halflife)
+        self.shrinkage = float(shrinkage)
+        self.min_periods = min_periods
+        self.periods_per_year = periods_per_year
+        self.block_rows = block_rows
+        n = len(self.tickers)
+        self.cov = np.zeros((n, n), dtype=np.float64)
+        self.weight = np.zeros((n, n), dtype=np.float64)
+        self.n_obs = np.zeros(n, dtype=np.int32)
+        self.last_date: Optional[str] = None
+        self._index = {t: i for i, t in enumerate(self.tickers)}
+
+    @property
+    def n_assets(self) -> int:
+        return len(self.tickers)
+
+    def index_of(self, tickers: Sequence[str]) -> np.ndarray:
+        return np.array([self._index.get(t, -1) for t in tickers], dtype=np.int64)
+
+    def update(self, returns: np.ndarray, date=None) -> None:
+        """Fold one day of returns (aligned to `tickers`, NaN = no observation) into the model."""
+        r = np.asarray(returns, dtype=np.float64)
+        if r.shape != (self.n_assets,):
+            raise ValueError(f"Expected {self.n_assets} returns, got shape {r.shape}")
+        valid = np.isfinite(r)
+        r = np.where(valid, r, 0.0)
+        m = valid.astype(np.float64)
+        c = 1.0 - self.decay
+        for start in range(0, self.n_assets, self.block_rows):
+            stop = min(start + self.block_rows, self.n_assets)
+            mask = m[start:stop, None] * m[None, :]
+            block = self.cov[start:stop]
+            block -= c * mask * block
+            block += c * (r[start:stop, None] * r[None, :])
+            weight = self.weight[start:stop]
+            weight += c * mask * (1.0 - weight)
+        self.n_obs += valid
+        if date is not None:
+            self.last_date = str(date)
+
+    def ready(self) -> np.ndarray:
+        return self.n_obs >= self.min_periods
+
+    def _unbiased(self) -> np.ndarray:
+        """EWMA state divided by each pair's accumulated weight (0 for pairs never observed)."""
+        out = np.zeros_like(self.cov)
+        np.divide(self.cov, self.weight, out=out, where=self.weight > 0)
+        return out
+
+    def covariance(self, shrinkage: Optional[float] = None) -> np.ndarray:
+        """Per-period covariance, shrunk toward its diagonal by `shrinkage` (default: model's)."""
+        delta = self.shrinkage if shrinkage is None else shrinkage
+        cov = self._unbiased()
+        if delta == 0.0:
+            return cov
+        out = (1.0 - delta) * cov
+        out[np.diag_indices_from(out)] = np.diag(cov)
+        return out
+
+    def factor_model(self, n_factors: int, floor: float = 1e-12) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-`n_factors` eigen decomposition: loadings B (N x k) and specific variances (N,)
+        with S ~= B B^T + diag(specific).
+        """
+        cov = self.covariance()
+        vals, vecs = np.linalg.eigh(cov)
+        k = min(n_factors, self.n_assets)
+        top = np.argsort(vals)[::-1][:k]
+        loadings = vecs[:, top] * np.sqrt(np.clip(vals[top], 0.0, None))
+        specific = np.clip(np.diag(cov) - np.einsum("ik,ik->i", loadings, loadings), floor, None)
+        return loadings, specific
+
+    def portfolio_vol(
+        self,
+        weights: np.ndarray,
+        n_factors: Optional[int] = None,
+        annualize: bool = True,
+    ) -> float:
+        """Volatility of a weight vector aligned to `tickers`."""
+        w = np.nan_to_num(np.asarray(weights, dtype=np.float64))
+        if n_factors:
+            loadings, specific = self.factor_model(n_factors)
+            exposure = loadings.T @ w
+            var = float(exposure @ exposure + np.dot(specific, w * w))
+        else:
+            # (1 - d) w'Sw + d w'diag(S)w, without materializing the shrunk matrix
+            cov = self._unbiased()
+            quad = float(w @ (cov @ w))
+            diag = float(np.dot(np.diag(cov), w * w))
+            var = (1.0 - self.shrinkage) * quad + self.shrinkage * diag
+        vol = np.sqrt(max(var, 0.0))
+        return vol * np.sqrt(self.periods_per_year) if annualize else vol
+
+    def reindex(self, tickers: Sequence[str]) -> "EWMACovariance":
+        """Copy onto a new universe; new names start empty, dropped names are discarded."""
+        out = EWMACovariance(
+            tickers,
+            halflife=self.halflife,
+            shrinkage=self.shrinkage,
+            min_periods=self.min_periods,
+            periods_per_year=self.periods_per_year,
+            block_rows=self.block_rows,
+        )
+        src = self.index_of(tickers)
+        keep = src >= 0
+        dst = np.flatnonzero(keep)
+        out.cov[np.ix_(dst, dst)] = self.cov[np.ix_(src[keep], src[keep])]
+        out.weight[np.ix_(dst, dst)] = self.weight[np.ix_(src[keep], src[keep])]
+        out.n_obs[dst] = self.n_obs[src[keep]]
+        out.last_date = self.last_date
+        return out
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        ensure_directory(path.parent)
+        iu = np.triu_indices(self.n_assets)
+        meta: Dict = {
+            "format": STATE_FORMAT,
+            "halflife": self.halflife,
+            "shrinkage": self.shrinkage,
+            "min_periods": self.min_periods,
+            "periods_per_year": self.periods_per_year,
+            "last_date": self.last_date,
+        }
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(
+            tmp,
+            tickers=np.array(self.tickers, dtype=str),
+            cov_triu=self.cov[iu].astype(np.float32),
+            weight_triu=self.weight[iu].astype(np.float32),
+            n_obs=self.n_obs,
+            meta=np.array(json.dumps(meta)),
+        )
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EWMACovariance":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") not in (STATE_FORMAT, *_LEGACY_FORMATS):
+                raise ValueError(f"Unsupported covariance state format: {meta.get('format')}")
+            model = cls(
+                data["tickers"].tolist(),
+                halflife=meta["halflife"],
+                shrinkage=meta["shrinkage"],
+                min_periods=meta["min_periods"],
+                periods_per_year=meta["periods_per_year"],
+            )
+            iu = np.triu_indices(model.n_assets)
+            model.cov[iu] = data["cov_triu"]
+            model.cov.T[iu] = data["cov_triu"]
+            model.n_obs = data["n_obs"].astype(np.int32)
+            if "weight_triu" in data:
+                model.weight[iu] = data["weight_triu"]
+                model.weight.T[iu] = data["weight_triu"]
+            else:
+                # v1 states kept no pair weights; the shorter history bounds the joint days
+                joint = np.minimum.outer(model.n_obs, model.n_obs)
+                model.weight[:] = np.where(joint > 0, 1.0 - model.decay**joint, 0.0)
+        model.last_date = meta["last_date"]
+        return model
+
+
+__all__ = ["EWMACovariance"]
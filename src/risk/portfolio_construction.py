@@ -0,0 +1,182 @@
+"""
+Cross-sectional portfolio construction under per-name caps, gross, net and turnover limits.
+
+For every date the constructor finds the weights closest (in L2) to the desired book that
+satisfy |w_i| <= max_weight, sum|w| <= gross_max and net_min <= sum(w) <= net_max. The
+KKT solution is w = clip(soft(t - nu, lam), -cap, cap); an active-set pass decides which of
+the gross/net constraints bind and recovers the multipliers exactly by inverting sorted
+piecewise-linear exposure curves, vectorized over all dates that violate a constraint
+(names with NaN targets are held at zero). Turnover couples consecutive dates, so
+it is applied afterwards in one sequential pass: each day trades from the previous day's
+solution toward its constrained target, scaled so sum|w - w_prev| <= turnover_max.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class PortfolioConstraints:
+    max_weight: float = 0.10
+    gross_max: float = 1.0
+    net_min: float = -1.0
+    net_max: float = 1.0
+    turnover_max: Optional[float] = None
+
+    def __post_init__(self):
+        if self.max_weight <= 0 or self.gross_max <= 0:
+            raise ValueError("max_weight and gross_max must be positive")
+        if not -self.gross_max <= self.net_min <= 0.0 <= self.net_max <= self.gross_max:
+            raise ValueError("net exposure bounds must bracket zero and lie within gross_max")
+        if self.turnover_max is not None and self.turnover_max < 0:
+            raise ValueError("turnover_max must be non-negative")
+
+
+def _solve_threshold(x: np.ndarray, valid: np.ndarray, target: np.ndarray, cap: float) -> np.ndarray:
+    """
+    Row-wise theta with sum_valid clip(x - theta, 0, cap) = target.
+
+    The left side is piecewise linear and nonincreasing in theta with breakpoints at x and
+    x - cap, so it is evaluated exactly at every sorted breakpoint (suffix sums plus a
+    row-offset searchsorted) and inverted by linear interpolation on the bracketing segment.
+    """
+    n_rows, n = x.shape
+    target = np.clip(target, 0.0, valid.sum(axis=1) * cap)
+    finite_min = np.where(valid, x, np.inf).min(axis=1)
+    finite_min = np.where(np.isfinite(finite_min), finite_min, 0.0)
+    xs = np.where(valid, x, (finite_min - 2.0 * cap - 1.0)[:, None])
+    ys = np.sort(xs, axis=1)
+    bp = np.sort(np.concatenate([ys, ys - cap], axis=1), axis=1)
+
+    width = float(ys.max() - ys.min()) + 4.0 * cap + 1.0
+    offset = (np.arange(n_rows) * width)[:, None]
+    suffix = np.concatenate([np.cumsum(ys[:, ::-1], axis=1)[:, ::-1], np.zeros((n_rows, 1))], axis=1)
+
+    def tail_excess(shift: float) -> np.ndarray:
+        # sum_i max(ys_i - shift - theta, 0) at every breakpoint theta
+        flat = (ys - shift + offset).ravel()
+        k = np.searchsorted(flat, (bp + offset).ravel(), side="right").reshape(bp.shape)
+        k -= (np.arange(n_rows) * n)[:, None]
+        return np.take_along_axis(suffix, k, axis=1) - (n - k) * (shift + bp)
+
+    g = tail_excess(0.0) - tail_excess(cap)
+    j = np.clip((g > target[:, None]).sum(axis=1) - 1, 0, 2 * n - 2)
+    rows = np.arange(n_rows)
+    g0, g1 = g[rows, j], g[rows, j + 1]
+    b0, b1 = bp[rows, j], bp[rows, j + 1]
+    slope = np.where(g0 > g1, (g0 - target) / np.where(g0 > g1, g0 - g1, 1.0), 0.0)
+    return np.where(target >= g[:, 0], bp[:, 0], b0 + np.clip(slope, 0.0, 1.0) * (b1 - b0))
+
+
+def _gross_only(t: np.ndarray, valid: np.ndarray, c: PortfolioConstraints) -> np.ndarray:
+    lam = np.maximum(_solve_threshold(np.abs(t), valid, np.full(len(t), c.gross_max), c.max_weight), 0.0)
+    return np.sign(t) * np.clip(np.abs(t) - lam[:, None], 0.0, c.max_weight)
+
+
+def _net_only(t: np.ndarray, valid: np.ndarray, bound: np.ndarray, cap: float) -> np.ndarray:
+    # sum clip(t - nu, -cap, cap) = bound  <=>  sum clip(t + cap - nu, 0, 2 cap) = bound + n cap
+    n_valid = valid.sum(axis=1)
+    nu = _solve_threshold(t + cap, valid, bound + n_valid * cap, 2.0 * cap)
+    return np.clip(t - nu[:, None], -cap, cap)
+
+
+def _long_short(t: np.ndarray, valid: np.ndarray, long_: np.ndarray, short: np.ndarray, cap: float) -> np.ndarray:
+    a = _solve_threshold(t, valid, long_, cap)
+    b = _solve_threshold(-t, valid, short, cap)
+    return np.clip(t - a[:, None], 0.0, cap) - np.clip(-t - b[:, None], 0.0, cap)
+
+
+def _project_rows(t: np.ndarray, valid: np.ndarray, c: PortfolioConstraints, tol: float) -> np.ndarray:
+    """
+    Active-set projection. The solution is clip(soft(t - nu, lam)); with the clipped book
+    infeasible, try gross-only (nu = 0), then net-only at the violated bound (lam = 0), and
+    otherwise both active, where long and short exposure are fixed at (G +/- B) / 2 and
+    solved independently.
+    """
+    w = np.clip(t, -c.max_weight, c.max_weight)
+    over_gross = np.abs(w).sum(axis=1) > c.gross_max + tol
+    if over_gross.any():
+        w[over_gross] = _gross_only(t[over_gross], valid[over_gross], c)
+
+    net = w.sum(axis=1)
+    bound = np.clip(net, c.net_min, c.net_max)
+    rows = np.flatnonzero(np.abs(net - bound) > tol)
+    if rows.size == 0:
+        return w
+    w[rows] = np.where(valid[rows], _net_only(t[rows], valid[rows], bound[rows], c.max_weight), 0.0)
+
+    both = rows[np.abs(w[rows]).sum(axis=1) > c.gross_max + tol]
+    if both.size:
+        g = c.gross_max
+        long_short = _long_short(
+            t[both], valid[both], 0.5 * (g + bound[both]), 0.5 * (g - bound[both]), c.max_weight
+        )
+        w[both] = np.where(valid[both], long_short, 0.0)
+    return w
+
+
+def solve_weights(
+    targets: np.ndarray,
+    constraints: PortfolioConstraints,
+    prev: Optional[np.ndarray] = None,
+    tol: float = 1e-12,
+) -> np.ndarray:
+    """
+    Constrained weights for a dates x names target matrix (NaN = no position).
+
+    `prev` is the book held before the first row (flat when omitted); it seeds the
+    turnover pass, which then chains each day's solution into the next.
+    """
+    raw = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+    valid = np.isfinite(raw)
+    t = np.where(valid, raw, 0.0)
+    c = constraints
+    w = np.clip(t, -c.max_weight, c.max_weight)
+    gross = np.abs(w).sum(axis=1)
+    net = w.sum(axis=1)
+    violated = np.flatnonzero((gross > c.gross_max + tol) | (net < c.net_min - tol) | (net > c.net_max + tol))
+    if violated.size:
+        w[violated] = _project_rows(t[violated], valid[violated], c, tol)
+
+    if c.turnover_max is not None:
+        held = np.zeros(t.shape[1]) if prev is None else np.nan_to_num(np.asarray(prev, dtype=np.float64))
+        budget = c.turnover_max
+        for i in range(len(w)):
+            trade = w[i] - held
+            traded = np.abs(trade).sum()
+            if traded > budget:
+                # Convex combination of two feasible books stays inside caps/gross/net
+                w[i] = held + trade * (budget / traded)
+            held = w[i]
+    return w
+
+
+def construct_portfolio(
+    positions: pd.DataFrame,
+    constraints: PortfolioConstraints,
+    prev: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """
+    Replace `target_weight` in a long (date, ticker) positions frame with the constrained
+    solution, solving all dates together. `prev` (ticker-indexed) is the starting book.
+    """
+    wide = positions.pivot_table(index="date", columns="ticker", values="target_weight", aggfunc="sum")
+    wide = wide.sort_index()
+    prev_arr = None if prev is None else prev.reindex(wide.columns).fillna(0.0).to_numpy()
+    solved = solve_weights(wide.to_numpy(), constraints, prev=prev_arr)
+    solved_long = (
+        pd.DataFrame(solved, index=wide.index, columns=wide.columns)
+        .rename_axis(index="date", columns="ticker")
+        .reset_index()
+        .melt(id_vars="date", var_name="ticker", value_name="_solved")
+    )
+    out = positions.merge(solved_long, on=["date", "ticker"], how="left")
+    out["target_weight"] = out["_solved"].fillna(0.0)
+    out["max_weight_applied"] = (out["target_weight"].abs() >= constraints.max_weight - 1e-12).astype(bool)
+    return out.drop(columns="_solved")
+
+
+__all__ = ["PortfolioConstraints", "solve_weights", "construct_portfolio"]
@@ -2,20 +2,124 @@
 Position sizing based on alpha_score and realized volatility.
 """
 
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 
 from src.meta.meta_utils import clamp
+from src.risk.covariance import EWMACovariance
+from src.risk.portfolio_construction import PortfolioConstraints, construct_portfolio
+
+
+def portfolio_vol_scales(
+    positions: pd.DataFrame,
+    risk_model: EWMACovariance,
+    asset_returns: pd.DataFrame,
+    target_vol: float,
+    n_factors: Optional[int] = None,
+    factor_refresh: int = 20,
+    prior_scales: Optional[pd.Series] = None,
+) -> pd.Series:
+    """
+    Per-date factor (<= 1) that brings the ex-ante portfolio vol down to `target_vol`,
+    indexed like `asset_returns` (dates x tickers, sorted).
+
+    Only dates after `risk_model.last_date` are streamed through the model (updating it in
+    place), so a model restored from a previous run costs one rank-1 update per new date.
+    Earlier dates take their factor from `prior_scales` (1.0 where unknown). Names the model
+    has not seen `min_periods` times are left out of the estimate. With `n_factors`, the
+    factor model is refreshed every `factor_refresh` dates and on the first streamed date.
+    """
+    tickers = risk_model.tickers
+    missing = sorted(set(positions["ticker"]) - set(tickers))
+    if missing:
+        raise ValueError(f"Risk model universe is missing tickers: {missing}")
+    returns = asset_returns.reindex(columns=tickers).to_numpy(dtype=np.float64)
+    weights = (
+        positions.pivot_table(index="date", columns="ticker", values="target_weight", aggfunc="sum")
+        .reindex(index=asset_returns.index, columns=tickers)
+        .to_numpy(dtype=np.float64)
+    )
+
+    start = 0
+    if risk_model.last_date is not None:
+        start = int((pd.to_datetime(asset_returns.index) <= pd.Timestamp(risk_model.last_date)).sum())
+    scales = np.ones(len(asset_returns))
+    if prior_scales is not None and start:
+        prior = pd.Series(prior_scales.to_numpy(), index=pd.to_datetime(prior_scales.index))
+        scales[:start] = prior.reindex(pd.to_datetime(asset_returns.index[:start])).fillna(1.0).to_numpy()
+
+    loadings = specific = None
+    for i in range(start, len(asset_returns)):
+        risk_model.update(returns[i], asset_returns.index[i])
+        w = np.where(risk_model.ready(), np.nan_to_num(weights[i]), 0.0)
+        if not w.any():
+            continue
+        if n_factors:
+            if loadings is None or i % factor_refresh == 0:
+                loadings, specific = risk_model.factor_model(n_factors)
+            exposure = loadings.T @ w
+            vol = np.sqrt(max(exposure @ exposure + np.dot(specific, w * w), 0.0) * risk_model.periods_per_year)
+        else:
+            vol = risk_model.portfolio_vol(w)
+        if vol > target_vol:
+            scales[i] = target_vol / vol
+    return pd.Series(scales, index=asset_returns.index, name="vol_scale")
+
+
+def apply_vol_scales(positions: pd.DataFrame, scales: pd.Series) -> pd.DataFrame:
+    out = positions.copy()
+    out["target_weight"] = out["target_weight"] * out["date"].map(scales).fillna(1.0).to_numpy()
+    return out
+
+
+def apply_portfolio_vol_target(
+    positions: pd.DataFrame,
+    risk_model: EWMACovariance,
+    asset_returns: pd.DataFrame,
+    target_vol: float,
+    n_factors: Optional[int] = None,
+    factor_refresh: int = 20,
+) -> pd.DataFrame:
+    """
+    Stream `asset_returns` (dates x tickers) through the risk model, updating it in place,
+    and scale each date's weights down so the ex-ante portfolio vol does not exceed
+    `target_vol`. Weights are never scaled up (see portfolio_vol_scales).
+    """
+    scales = portfolio_vol_scales(positions, risk_model, asset_returns, target_vol, n_factors, factor_refresh)
+    return apply_vol_scales(positions, scales)
 
 
 def compute_positions(
     alpha_scores: pd.DataFrame,
-    realized_vol: pd.Series,
+    realized_vol: pd.Series | pd.DataFrame,
     target_vol: float,
     max_weight: float,
+    risk_model: Optional[EWMACovariance] = None,
+    asset_returns: Optional[pd.DataFrame] = None,
+    n_factors: Optional[int] = None,
+    constraints: Optional[PortfolioConstraints] = None,
+    vol_scales: Optional[pd.Series] = None,
 ) -> pd.DataFrame:
+    """
+    Scale alpha by target_vol / realized vol and clip at max_weight.
+
+    `realized_vol` is a date-indexed Series for a single ticker, or a dates x tickers frame
+    for a multi-ticker alpha frame. With `risk_model` and `asset_returns` (dates x tickers),
+    each date's book is additionally scaled down to the portfolio-level `target_vol`;
+    precomputed `vol_scales` (portfolio_vol_scales) are applied instead when given.
+    `constraints` then projects each date's cross-section onto the gross/net/cap/turnover
+    limits (see portfolio_construction).
+    """
     df = alpha_scores.copy()
-    df = df.merge(realized_vol.rename("realized_vol_lookback"), left_on="date", right_index=True, how="left")
+    if isinstance(realized_vol, pd.DataFrame):
+        vol_long = realized_vol.rename_axis(index="date", columns="ticker").reset_index().melt(
+            id_vars="date", var_name="ticker", value_name="realized_vol_lookback"
+        )
+        df = df.merge(vol_long, on=["date", "ticker"], how="left")
+    else:
+        df = df.merge(realized_vol.rename("realized_vol_lookback"), left_on="date", right_index=True, how="left")
 
     vol = df["realized_vol_lookback"].replace(0, np.nan)
     scaling = target_vol / vol
@@ -23,6 +127,14 @@ def compute_positions(
     df["target_weight"] = clamp(scaled, -max_weight, max_weight).fillna(0.0)
     df["max_weight_applied"] = (df["target_weight"].abs() >= max_weight).astype(bool)
     df["strategy_name"] = df.get("strategy_name", "hybrid_alpha_mvp")
+    if vol_scales is not None:
+        df = apply_vol_scales(df, vol_scales)
+    elif risk_model is not None:
+        if asset_returns is None:
+            raise ValueError("asset_returns is required for portfolio vol targeting")
+        df = apply_portfolio_vol_target(df, risk_model, asset_returns, target_vol, n_factors=n_factors)
+    if constraints is not None:
+        df = construct_portfolio(df, constraints)
 
     return df[
         [
@@ -36,4 +148,4 @@ def compute_positions(
     ]
 
 
-__all__ = ["compute_positions"]
+__all__ = ["compute_positions", "apply_portfolio_vol_target", "apply_vol_scales", "portfolio_vol_scales"]
@@ -0,0 +1,200 @@
+"""
+Historical-simulation VaR/CVaR and scenario stress tests over the position panel.
+
+Everything is a matrix product of a scenarios x tickers return matrix against a tickers x
+dates weight matrix, evaluated in date chunks sized to a memory budget so large panels
+(thousands of scenarios, names and days) never materialize the full P&L cube.
+
+- Fixed scenario sets (stress tests, a common scenario library): P = S @ W.
+- Historical VaR: date d uses the trailing `window` realized return vectors ending at d.
+- Filtered historical VaR: the same, but on EWMA-standardized returns rescaled to each
+  asset's current vol forecast (effective weights W * sigma_d).
+
+Losses are reported as positive numbers.
+"""
+
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _tail_index(n_scenarios: int, alpha: float) -> int:
+    # small epsilon so e.g. (1 - 0.95) * 100 = 5.000000000000004 still gives 5 tail scenarios
+    return max(int(np.ceil((1.0 - alpha) * n_scenarios - 1e-9)) - 1, 0)
+
+
+def tail_metrics(pnl: np.ndarray, alpha: float = 0.99) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    VaR and CVaR per column of a scenarios x dates P&L block. VaR is minus the k-th worst
+    scenario (k = ceil((1 - alpha) * S)), CVaR minus the mean of the k worst.
+    """
+    k = _tail_index(pnl.shape[0], alpha)
+    tail = np.partition(pnl, k, axis=0)[: k + 1]
+    var = -tail.max(axis=0)
+    cvar = -tail.mean(axis=0)
+    return var, cvar
+
+
+def _chunk_size(rows: int, n_names: int, itemsize: int, memory_budget_mb: float) -> int:
+    budget = memory_budget_mb * 1024 * 1024
+    return max(1, int(budget // (itemsize * (2 * rows + n_names))))
+
+
+def scenario_pnl(
+    scenarios: np.ndarray,
+    weights: np.ndarray,
+    memory_budget_mb: float = 256.0,
+    dtype=np.float32,
+) -> np.ndarray:
+    """Scenarios x dates P&L for a fixed scenario set (S x N) against weights (N x D)."""
+    s = np.nan_to_num(np.asarray(scenarios, dtype=dtype))
+    out = np.empty((s.shape[0], weights.shape[1]), dtype=dtype)
+    step = _chunk_size(s.shape[0], s.shape[1], np.dtype(dtype).itemsize, memory_budget_mb)
+    for start in range(0, weights.shape[1], step):
+        block = np.nan_to_num(np.asarray(weights[:, start : start + step], dtype=dtype))
+        out[:, start : start + step] = s @ block
+    return out
+
+
+def scenario_var(
+    scenarios: np.ndarray,
+    weights: np.ndarray,
+    alpha: float = 0.99,
+    memory_budget_mb: float = 256.0,
+    dtype=np.float32,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """VaR/CVaR per date against one fixed scenario library, reduced chunk by chunk."""
+    s = np.nan_to_num(np.asarray(scenarios, dtype=dtype))
+    n_dates = weights.shape[1]
+    var = np.empty(n_dates)
+    cvar = np.empty(n_dates)
+    step = _chunk_size(s.shape[0], s.shape[1], np.dtype(dtype).itemsize, memory_budget_mb)
+    for start in range(0, n_dates, step):
+        block = np.nan_to_num(np.asarray(weights[:, start : start + step], dtype=dtype))
+        var[start : start + step], cvar[start : start + step] = tail_metrics(s @ block, alpha)
+    return var, cvar
+
+
+def rolling_historical_var(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    window: int = 500,
+    alpha: float = 0.99,
+    memory_budget_mb: float = 256.0,
+    dtype=np.float32,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Historical-simulation VaR/CVaR where date d is scored against the `window` return
+    vectors ending at d. `returns` and `weights` are both dates x names on the same axis.
+
+    For a chunk of dates [d0, d1) one product R[d0-window+1 : d1] @ W[d0:d1].T yields every
+    scenario/date pair needed; each date's window is then gathered from that band.
+    """
+    n_dates, n_names = returns.shape
+    r = np.nan_to_num(np.asarray(returns, dtype=dtype))
+    var = np.full(n_dates, np.nan)
+    cvar = np.full(n_dates, np.nan)
+    step = min(window, _chunk_size(2 * window, n_names, np.dtype(dtype).itemsize, memory_budget_mb))
+    offsets = np.arange(window)[:, None]
+    for start in range(window - 1, n_dates, step):
+        stop = min(start + step, n_dates)
+        first = start - window + 1
+        w_block = np.nan_to_num(np.asarray(weights[start:stop], dtype=dtype)).T
+        band = r[first:stop] @ w_block  # (window + C - 1) x C
+        cols = np.arange(stop - start)
+        pnl = band[offsets + cols[None, :], cols[None, :]]  # window x C
+        var[start:stop], cvar[start:stop] = tail_metrics(pnl, alpha)
+    return var, cvar
+
+
+def ewma_vol(returns: pd.DataFrame, halflife: float = 60.0) -> pd.DataFrame:
+    """Per-asset EWMA vol forecast made at each date's close (includes that date's return)."""
+    return np.sqrt((returns**2).ewm(halflife=halflife, adjust=False, ignore_na=True).mean())
+
+
+def filtered_historical_var(
+    returns: pd.DataFrame,
+    weights: pd.DataFrame,
+    window: int = 500,
+    alpha: float = 0.99,
+    halflife: float = 60.0,
+    memory_budget_mb: float = 256.0,
+    dtype=np.float32,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Filtered historical simulation: returns are standardized by the prior day's EWMA vol and
+    rescaled to the current forecast, i.e. scenario P&L = z_s @ (w_d * sigma_d).
+    """
+    sigma = ewma_vol(returns, halflife)
+    prior = sigma.shift(1).where(lambda s: s > 0)
+    z = (returns / prior).to_numpy()
+    effective = weights.to_numpy() * sigma.to_numpy()
+    return rolling_historical_var(z, effective, window, alpha, memory_budget_mb, dtype)
+
+
+def stress_test(
+    weights: pd.DataFrame,
+    shocks: pd.DataFrame,
+    memory_budget_mb: float = 256.0,
+) -> pd.DataFrame:
+    """
+    Apply shocked return vectors (scenarios x tickers) to every date's book (dates x
+    tickers). Returns dates x scenarios P&L; tickers missing from a scenario get 0.
+    """
+    aligned = shocks.reindex(columns=weights.columns).fillna(0.0)
+    pnl = scenario_pnl(aligned.to_numpy(), weights.to_numpy().T, memory_budget_mb, dtype=np.float64)
+    return pd.DataFrame(pnl.T, index=weights.index, columns=aligned.index)
+
+
+def uniform_shocks(tickers, scenarios: Mapping[str, float | Mapping[str, float]]) -> pd.DataFrame:
+    """Build a shock matrix from {name: shock for all names | {ticker: shock}}."""
+    rows: Dict[str, pd.Series] = {}
+    for name, shock in scenarios.items():
+        if isinstance(shock, Mapping):
+            rows[name] = pd.Series(shock, dtype=float).reindex(tickers).fillna(0.0)
+        else:
+            rows[name] = pd.Series(float(shock), index=list(tickers))
+    return pd.DataFrame(rows).T
+
+
+def risk_report(
+    returns: pd.DataFrame,
+    weights: pd.DataFrame,
+    alpha: float = 0.99,
+    window: int = 500,
+    filtered: bool = True,
+    halflife: float = 60.0,
+    memory_budget_mb: float = 256.0,
+    shocks: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Per-date historical (and optionally filtered) VaR/CVaR plus stress P&L columns for
+    wide returns/weights frames (dates x tickers) on the same axis.
+    """
+    weights = weights.reindex(index=returns.index, columns=returns.columns).fillna(0.0)
+    var, cvar = rolling_historical_var(
+        returns.to_numpy(), weights.to_numpy(), window, alpha, memory_budget_mb
+    )
+    report = pd.DataFrame({"var_hist": var, "cvar_hist": cvar}, index=returns.index)
+    if filtered:
+        f_var, f_cvar = filtered_historical_var(returns, weights, window, alpha, halflife, memory_budget_mb)
+        report["var_fhs"] = f_var
+        report["cvar_fhs"] = f_cvar
+    if shocks is not None and len(shocks):
+        stressed = stress_test(weights, shocks, memory_budget_mb)
+        report = report.join(stressed.add_prefix("stress_"))
+    return report.rename_axis("date").reset_index()
+
+
+__all__ = [
+    "tail_metrics",
+    "scenario_pnl",
+    "scenario_var",
+    "rolling_historical_var",
+    "ewma_vol",
+    "filtered_historical_var",
+    "stress_test",
+    "uniform_shocks",
+    "risk_report",
+]
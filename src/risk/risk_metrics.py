@@ -6,8 +6,8 @@ import numpy as np
 import pandas as pd
 
 
-def realized_vol(returns: pd.Series, lookback: int) -> pd.Series:
-    return returns.rolling(window=lookback, min_periods=lookback).std() * np.sqrt(252)
+def realized_vol(returns: pd.Series, lookback: int, periods_per_year: int = 252) -> pd.Series:
+    return returns.rolling(window=lookback, min_periods=lookback).std() * np.sqrt(periods_per_year)
 
 
 def drawdown(series: pd.Series) -> pd.Series:
@@ -0,0 +1,332 @@
+"""
+Long-running local scoring service that keeps LightGBM boosters resident.
+
+Clients POST a batch of FeatureRow records to `/score` and receive PredictionRow records.
+Concurrent requests are micro-batched: a single worker thread drains the request queue for
+up to `max_wait_ms` (or `max_batch_rows` rows) and scores each ticker/horizon model once
+per batch. `/metrics` exposes request latency percentiles, batch sizes and model cache stats.
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.ml.lightgbm_next_state import (
+    TrainResult,
+    build_prediction_frame,
+    load_trained_model,
+    predict_proba,
+)
+from models.ml.model_registry import ModelKey, get_model_cache
+from src.core.latency import LatencyTracker
+from src.core.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _ScoreRequest:
+    rows: List[Dict[str, Any]]
+    horizons: Sequence[int]
+    future: Future = field(default_factory=Future)
+
+
+class ScoringService:
+    """
+    Holds trained models in memory and scores FeatureRow batches through a micro-batcher.
+    """
+
+    def __init__(
+        self,
+        artifacts_dir: str | Path,
+        model_name: str,
+        horizons: Sequence[int],
+        tickers: Iterable[str] | None = None,
+        version: str = "v1",
+        max_batch_rows: int = 4096,
+        max_wait_ms: float = 2.0,
+    ):
+        self.artifacts_dir = str(artifacts_dir)
+        self.model_name = model_name
+        self.horizons = list(horizons)
+        self.version = version
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self._models: Dict[Tuple[str, int], TrainResult] = {}
+        self._queue: "queue.Queue[Optional[_ScoreRequest]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self.request_latency = LatencyTracker()
+        self.batch_latency = LatencyTracker()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.rows_scored = 0
+        self.errors = 0
+        if tickers:
+            self.warm(tickers)
+
+    def warm(self, tickers: Iterable[str]) -> None:
+        for ticker in tickers:
+            for h in self.horizons:
+                self._model(ticker, h)
+        logger.info(f"Scoring service holding {len(self._models)} models resident")
+
+    def _model(self, ticker: str, horizon: int) -> TrainResult:
+        model = self._models.get((ticker, horizon))
+        if model is None:
+            key = ModelKey(model_name=self.model_name, ticker=ticker, horizon=horizon, version=self.version)
+            model = load_trained_model(self.artifacts_dir, key)
+            self._models[(ticker, horizon)] = model
+        return model
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="scoring-batcher", daemon=True)
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def submit(self, rows: List[Dict[str, Any]], horizons: Sequence[int] | None = None) -> Future:
+        request = _ScoreRequest(rows=rows, horizons=list(horizons or self.horizons))
+        self._queue.put(request)
+        return request.future
+
+    def score(self, rows: List[Dict[str, Any]], horizons: Sequence[int] | None = None) -> List[Dict[str, Any]]:
+        """Score synchronously through the micro-batcher (starts the worker if needed)."""
+        self.start()
+        start = time.perf_counter()
+        try:
+            return self.submit(rows, horizons).result()
+        finally:
+            self.request_latency.record(time.perf_counter() - start)
+            with self._stats_lock:
+                self.requests += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counters = {
+                "requests": self.requests,
+                "batches": self.batches,
+                "rows_scored": self.rows_scored,
+                "errors": self.errors,
+            }
+        return {
+            **counters,
+            "models_resident": len(self._models),
+            "request_latency": self.request_latency.snapshot(),
+            "batch_latency": self.batch_latency.snapshot(),
+            "model_cache": get_model_cache().stats(),
+        }
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            n_rows = len(first.rows)
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while n_rows < self.max_batch_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                n_rows += len(item.rows)
+            try:
+                self._score_batch(batch)
+            except Exception as exc:  # keep the worker alive; surface the error to callers
+                logger.exception("Scoring batch failed")
+                for req in batch:
+                    if not req.future.done():
+                        req.future.set_exception(exc)
+            if stop:
+                return
+
+    def _score_batch(self, batch: List[_ScoreRequest]) -> None:
+        start = time.perf_counter()
+        frames = []
+        failures: Dict[int, Exception] = {}
+        for req_id, req in enumerate(batch):
+            df = pd.DataFrame(req.rows)
+            # validated per request, so one bad request cannot fail or drop rows of the others
+            if len(df) and ("ticker" not in df or df["ticker"].isna().any()):
+                failures[req_id] = ValueError("every FeatureRow record must include 'ticker'")
+                continue
+            df["_req"] = req_id
+            df["_pos"] = np.arange(len(df))
+            frames.append(df)
+        combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        outputs: List[pd.DataFrame] = []
+
+        wanted = sorted({h for req in batch for h in req.horizons})
+        groups = combined.groupby("ticker", sort=False) if "ticker" in combined else []
+        for ticker, group in groups:
+            req_ids = group["_req"].to_numpy()
+            for h in wanted:
+                in_h = np.array([h in batch[r].horizons for r in req_ids])
+                if not in_h.any():
+                    continue
+                rows = group[in_h]
+                try:
+                    trained = self._model(str(ticker), h)
+                except FileNotFoundError as exc:
+                    for r in np.unique(rows["_req"]):
+                        failures[int(r)] = exc
+                    continue
+                rows, invalid = _numeric_features(rows, trained.feature_columns)
+                failures.update(invalid)
+                if rows.empty:
+                    continue
+                proba = predict_proba(trained.model, trained.scaler, rows, trained.feature_columns)
+                dates = rows["date"] if "date" in rows else [None] * len(rows)
+                out = build_prediction_frame(dates, str(ticker), h, self.model_name, proba, trained.classes_)
+                out["_req"] = rows["_req"].to_numpy()
+                out["_pos"] = rows["_pos"].to_numpy()
+                outputs.append(out)
+
+        result = pd.concat(outputs, ignore_index=True) if outputs else pd.DataFrame(columns=["_req", "_pos"])
+        result = result.sort_values(["_req", "_pos", "horizon"] if "horizon" in result else ["_req", "_pos"])
+        scored = int((~combined["_req"].isin(list(failures))).sum()) if "_req" in combined else 0
+        with self._stats_lock:
+            self.errors += len(failures)
+            self.batches += 1
+            self.rows_scored += scored
+        for req_id, req in enumerate(batch):
+            if req_id in failures:
+                req.future.set_exception(failures[req_id])
+                continue
+            part = result[result["_req"] == req_id].drop(columns=["_req", "_pos"])
+            part = part.astype(object).where(part.notna(), None)
+            req.future.set_result(part.to_dict(orient="records"))
+        self.batch_latency.record(time.perf_counter() - start)
+
+
+def _numeric_features(rows: pd.DataFrame, feature_columns: Sequence[str]) -> Tuple[pd.DataFrame, Dict[int, Exception]]:
+    """
+    Coerce the model's feature columns to numbers and split off the requests that sent a
+    non-numeric value, so they fail on their own instead of failing the whole ticker group.
+    """
+    rows = rows.copy()
+    invalid: Dict[int, Exception] = {}
+    for col in feature_columns:
+        if col not in rows or pd.api.types.is_numeric_dtype(rows[col]):
+            continue
+        values = pd.to_numeric(rows[col], errors="coerce")
+        for r in np.unique(rows.loc[values.isna() & rows[col].notna(), "_req"]):
+            invalid.setdefault(int(r), ValueError(f"FeatureRow field '{col}' must be numeric"))
+        rows[col] = values
+    if invalid:
+        rows = rows[~rows["_req"].isin(list(invalid))]
+    return rows, invalid
+
+
+def _parse_score_request(body: bytes) -> Tuple[List[Dict[str, Any]], Optional[List[int]]]:
+    """(rows, horizons) of a /score body; ValueError with a client-facing message otherwise."""
+    if not body.strip():
+        raise ValueError("empty request body; expected a JSON object with a 'rows' list")
+    try:
+        payload = json.loads(body)
+    except ValueError as exc:
+        raise ValueError(f"request body is not valid JSON: {exc}") from None
+    if not isinstance(payload, dict):
+        raise ValueError("request body must be a JSON object with a 'rows' list")
+    rows = payload.get("rows")
+    if not isinstance(rows, list) or not rows:
+        raise ValueError("'rows' must be a non-empty list of FeatureRow records")
+    if not all(isinstance(row, dict) for row in rows):
+        raise ValueError("every FeatureRow record in 'rows' must be a JSON object")
+    horizons = payload.get("horizons")
+    if horizons is not None and (
+        not isinstance(horizons, list) or not all(isinstance(h, int) and not isinstance(h, bool) for h in horizons)
+    ):
+        raise ValueError("'horizons' must be a list of integers")
+    return rows, horizons
+
+
+def _make_handler(service: ScoringService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Dict[str, Any]) -> None:
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):  # noqa: N802
+            if self.path == "/metrics":
+                self._send(200, service.metrics())
+            elif self.path == "/health":
+                self._send(200, {"status": "ok", "models_resident": len(service._models)})
+            else:
+                self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):  # noqa: N802
+            if self.path != "/score":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                rows, horizons = _parse_score_request(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            except ValueError as exc:
+                self._send(400, {"error": str(exc)})
+                return
+            try:
+                predictions = service.score(rows, horizons)
+            except FileNotFoundError as exc:
+                self._send(404, {"error": str(exc)})
+                return
+            except (KeyError, ValueError) as exc:
+                self._send(400, {"error": str(exc)})
+                return
+            except Exception as exc:  # always answer the client, even for unexpected failures
+                logger.exception("Scoring request failed")
+                self._send(500, {"error": f"internal error: {type(exc).__name__}: {exc}"})
+                return
+            self._send(200, {"predictions": predictions})
+
+        def log_message(self, format, *args):  # noqa: A002
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return Handler
+
+
+def create_server(service: ScoringService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Create (but do not start) an HTTP server bound to host:port; port 0 picks a free port."""
+    service.start()
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def serve_forever(service: ScoringService, host: str = "127.0.0.1", port: int = 8765) -> None:
+    server = create_server(service, host, port)
+    logger.info(f"Scoring service listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.stop()
+
+
+__all__ = ["ScoringService", "create_server", "serve_forever"]
@@ -1,11 +1,13 @@
 """
 Rule-based mean reversion alpha: looks for short-term overextension relative to recent mean.
 Outputs a score in [-1, 1]; positive when price is below short-term mean by > threshold.
+The rolling window is counted in sessions, like the ret_<lookback>d column it reads.
 """
 
 import numpy as np
 import pandas as pd
 
+from src.core.frequency import DAILY, Frequency
 from src.core.types import DataFrame
 
 
@@ -13,14 +15,16 @@ def compute_mean_reversion_alpha(
     features: DataFrame,
     lookback: int = 5,
     z_threshold: float = 1.0,
+    frequency: Frequency = DAILY,
 ) -> pd.Series:
     ret_col = f"ret_{lookback}d"
     if ret_col not in features:
         raise KeyError(f"Missing return column {ret_col} for mean reversion alpha")
 
     returns = features[ret_col]
-    rolling_mean = returns.rolling(window=lookback, min_periods=lookback).mean()
-    rolling_std = returns.rolling(window=lookback, min_periods=lookback).std()
+    window = frequency.bars(lookback)
+    rolling_mean = returns.rolling(window=window, min_periods=window).mean()
+    rolling_std = returns.rolling(window=window, min_periods=window).std()
 
     zscore = (returns - rolling_mean) / rolling_std
     # Negative zscore means oversold; positive alpha
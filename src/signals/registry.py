@@ -0,0 +1,132 @@
+"""
+Signal registry: each signal declares its compute function, default parameters and the
+feature columns it reads (templated on its parameters). The planner takes the enabled
+signals plus any model columns, expands their feature dependencies and computes only that
+set through LazyFeatures, sharing intermediates between signals. Signals with rolling
+windows of their own count them in sessions and receive the plan's bar frequency.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.core.calendar import DAY_ID
+from src.core.frequency import DAILY, Frequency
+from src.core.types import DataFrame
+from src.features.lazy import LazyFeatures, feature_warmup, needs_benchmark, plan_columns
+from src.signals.mean_reversion_alpha import compute_mean_reversion_alpha
+from src.signals.relative_strength_alpha import compute_relative_strength_alpha
+from src.signals.trend_alpha import compute_trend_alpha
+from src.signals.volatility_alpha import compute_volatility_alpha
+
+
+@dataclass(frozen=True)
+class SignalSpec:
+    name: str
+    compute: Callable[..., pd.Series]
+    inputs: Tuple[str, ...]
+    params: Mapping[str, Any] = field(default_factory=dict)
+    # rows the signal's own rolling logic needs on top of its inputs' warmup
+    extra_warmup: Callable[[Mapping[str, Any], Frequency], int] = lambda p, f: 0
+    # compute takes `frequency` to convert its session-denominated windows to bars
+    frequency_aware: bool = False
+
+    def resolve(self, overrides: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        return {**self.params, **(overrides or {})}
+
+    def input_columns(self, params: Mapping[str, Any]) -> List[str]:
+        return [col.format(**params) for col in self.inputs]
+
+    def warmup(self, params: Mapping[str, Any], frequency: Frequency = DAILY) -> int:
+        base = max((feature_warmup(c) for c in self.input_columns(params)), default=0)
+        return base + self.extra_warmup(params, frequency)
+
+
+SIGNALS: Dict[str, SignalSpec] = {}
+
+
+def register_signal(spec: SignalSpec) -> SignalSpec:
+    SIGNALS[spec.name] = spec
+    return spec
+
+
+register_signal(
+    SignalSpec("trend_alpha", compute_trend_alpha, ("close", "sma_{fast}", "sma_{slow}"), {"fast": 20, "slow": 50})
+)
+register_signal(
+    SignalSpec(
+        "mean_reversion_alpha",
+        compute_mean_reversion_alpha,
+        ("ret_{lookback}d",),
+        {"lookback": 5, "z_threshold": 1.0},
+        extra_warmup=lambda p, f: f.bars(p["lookback"]) - 1,
+        frequency_aware=True,
+    )
+)
+register_signal(
+    SignalSpec(
+        "vol_alpha",
+        compute_volatility_alpha,
+        ("{vol_col}",),
+        {"vol_col": "realized_vol_20", "lookback": 60, "z_threshold": 1.0},
+        extra_warmup=lambda p, f: f.bars(p["lookback"]) - 1,
+        frequency_aware=True,
+    )
+)
+register_signal(
+    SignalSpec(
+        "rel_strength_alpha",
+        compute_relative_strength_alpha,
+        ("rel_ret_vs_benchmark_{lookback}",),
+        {"lookback": 20, "scale": 0.1},
+    )
+)
+
+
+@dataclass
+class SignalPlan:
+    signals: List[str]
+    params: Dict[str, Dict[str, Any]]
+    columns: List[str]
+    warmup: int
+    needs_benchmark: bool = False
+    model_columns: List[str] = field(default_factory=list)
+    frequency: Frequency = DAILY
+
+
+def plan_signals(
+    names: Optional[Sequence[str]] = None,
+    params: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    model_columns: Sequence[str] = (),
+    frequency: Frequency = DAILY,
+) -> SignalPlan:
+    """Resolve enabled signals (default: all registered) to the feature columns they need."""
+    names = list(names or SIGNALS)
+    unknown = [n for n in names if n not in SIGNALS]
+    if unknown:
+        raise KeyError(f"Unknown signals: {unknown}")
+    resolved = {n: SIGNALS[n].resolve((params or {}).get(n)) for n in names}
+    inputs = [c for n in names for c in SIGNALS[n].input_columns(resolved[n])] + list(model_columns)
+    warmup = max(
+        [SIGNALS[n].warmup(resolved[n], frequency) for n in names] + [feature_warmup(c) for c in model_columns] + [0]
+    )
+    columns = plan_columns(inputs)
+    return SignalPlan(names, resolved, columns, warmup, needs_benchmark(columns), list(model_columns), frequency)
+
+
+def compute_signals(features: LazyFeatures, plan: SignalPlan) -> DataFrame:
+    """date/ticker[/day_id] + one column per planned signal, followed by the plan's model columns."""
+    inputs = sorted({c for n in plan.signals for c in SIGNALS[n].input_columns(plan.params[n])})
+    frame = features.frame_for(inputs + [c for c in plan.model_columns if c not in inputs])
+    out = frame[[c for c in ("date", "ticker", DAY_ID) if c in frame]].copy()
+    for name in plan.signals:
+        spec = SIGNALS[name]
+        kwargs = {"frequency": plan.frequency} if spec.frequency_aware else {}
+        out[name] = spec.compute(frame, **plan.params[name], **kwargs).to_numpy()
+    for col in plan.model_columns:
+        out[col] = frame[col].to_numpy()
+    return out
+
+
+__all__ = ["SignalSpec", "SIGNALS", "register_signal", "SignalPlan", "plan_signals", "compute_signals"]
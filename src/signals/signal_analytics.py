@@ -0,0 +1,229 @@
+"""
+Signal quality analytics on the dates x tickers panel: cross-sectional rank IC, IC decay
+over forward horizons, quantile spread returns and turnover.
+
+Every statistic is computed for all dates at once: cross-sectional ranks come from one
+row-wise rank of the panel, Spearman IC is a row-wise Pearson correlation of ranks, and
+quantile returns are a bincount over (date, bucket) codes. Results are cached per signal
+on disk, keyed by a digest of the signal values, the price panel and the parameters, so a
+rerun only recomputes signals whose data changed.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.utils import ensure_directory, get_logger
+
+logger = get_logger(__name__)
+
+SIGNAL_COLUMNS = ("trend_alpha", "mean_reversion_alpha", "vol_alpha", "rel_strength_alpha", "ml_signal")
+
+
+def cross_sectional_ranks(panel: np.ndarray) -> np.ndarray:
+    """Average ranks (1..n) within each date row; NaN stays NaN."""
+    return pd.DataFrame(panel).rank(axis=1, method="average").to_numpy()
+
+
+def row_corr(a: np.ndarray, b: np.ndarray, min_obs: int) -> np.ndarray:
+    """Row-wise Pearson correlation over jointly finite entries (NaN below `min_obs`)."""
+    valid = np.isfinite(a) & np.isfinite(b)
+    n = valid.sum(axis=1)
+    a = np.where(valid, a, 0.0)
+    b = np.where(valid, b, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ma = a.sum(axis=1) / n
+        mb = b.sum(axis=1) / n
+        da = np.where(valid, a - ma[:, None], 0.0)
+        db = np.where(valid, b - mb[:, None], 0.0)
+        corr = (da * db).sum(axis=1) / np.sqrt((da * da).sum(axis=1) * (db * db).sum(axis=1))
+    return np.where(n >= min_obs, corr, np.nan)
+
+
+def rank_ic(signal: np.ndarray, fwd_returns: np.ndarray, min_obs: int = 3) -> np.ndarray:
+    """Per-date Spearman correlation between signal and forward return (jointly valid names)."""
+    valid = np.isfinite(signal) & np.isfinite(fwd_returns)
+    rs = cross_sectional_ranks(np.where(valid, signal, np.nan))
+    rr = cross_sectional_ranks(np.where(valid, fwd_returns, np.nan))
+    return row_corr(rs, rr, min_obs)
+
+
+def forward_returns(close: np.ndarray, horizon: int) -> np.ndarray:
+    """Close-to-close return over the next `horizon` rows (NaN at the tail)."""
+    out = np.full(close.shape, np.nan)
+    if horizon < len(close):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:-horizon] = close[horizon:] / close[:-horizon] - 1.0
+    return out
+
+
+def quantile_returns(signal: np.ndarray, fwd_returns: np.ndarray, n_quantiles: int = 5) -> np.ndarray:
+    """dates x quantiles mean forward return, bucketing each date's names by signal rank."""
+    valid = np.isfinite(signal) & np.isfinite(fwd_returns)
+    ranks = cross_sectional_ranks(np.where(valid, signal, np.nan))
+    n = valid.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bucket = np.floor((ranks - 1.0) * n_quantiles / n)
+    bucket = np.clip(np.nan_to_num(bucket, nan=0.0), 0, n_quantiles - 1).astype(np.int64)
+    n_dates = len(signal)
+    codes = (np.arange(n_dates)[:, None] * n_quantiles + bucket)[valid]
+    size = n_dates * n_quantiles
+    sums = np.bincount(codes, weights=fwd_returns[valid], minlength=size)
+    counts = np.bincount(codes, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return means.reshape(n_dates, n_quantiles)
+
+
+def rank_turnover(signal: np.ndarray, min_obs: int = 3) -> np.ndarray:
+    """1 - rank autocorrelation of the signal between consecutive dates."""
+    ranks = cross_sectional_ranks(signal)
+    out = np.full(len(signal), np.nan)
+    if len(signal) > 1:
+        out[1:] = 1.0 - row_corr(ranks[1:], ranks[:-1], min_obs)
+    return out
+
+
+def signal_report(
+    signal: np.ndarray,
+    close: np.ndarray,
+    dates: Sequence,
+    horizons: Sequence[int] = (1, 5, 10, 20),
+    n_quantiles: int = 5,
+) -> pd.DataFrame:
+    """Daily frame: ic_h<h> per horizon, q1..qN and spread at the first horizon, turnover."""
+    out = pd.DataFrame({"date": np.asarray(dates)})
+    first = None
+    for h in horizons:
+        fwd = forward_returns(close, h)
+        first = fwd if first is None else first
+        out[f"ic_h{h}"] = rank_ic(signal, fwd)
+    if first is not None:
+        q = quantile_returns(signal, first, n_quantiles)
+        for k in range(n_quantiles):
+            out[f"q{k + 1}"] = q[:, k]
+        out["spread"] = q[:, -1] - q[:, 0]
+    out["turnover"] = rank_turnover(signal)
+    return out
+
+
+def summarize_report(name: str, report: pd.DataFrame) -> Dict[str, float]:
+    row: Dict[str, float] = {"signal": name}
+    for col in [c for c in report.columns if c.startswith("ic_h")]:
+        ic = report[col].dropna()
+        row[f"mean_{col}"] = float(ic.mean()) if len(ic) else np.nan
+        row[f"ir_{col}"] = float(ic.mean() / ic.std()) if len(ic) > 1 and ic.std() > 0 else np.nan
+    if "spread" in report:
+        row["mean_spread"] = float(report["spread"].mean())
+    row["mean_turnover"] = float(report["turnover"].mean())
+    return row
+
+
+def _digest(*parts) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            h.update(repr(part).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+@dataclass
+class SignalPanel:
+    """Aligned dates x tickers arrays for prices and each signal column."""
+
+    dates: np.ndarray
+    tickers: List[str]
+    close: np.ndarray
+    signals: Dict[str, np.ndarray]
+
+    @classmethod
+    def from_frames(
+        cls,
+        prices: pd.DataFrame,
+        signals: pd.DataFrame,
+        columns: Optional[Sequence[str]] = None,
+    ) -> "SignalPanel":
+        close = prices.pivot_table(index="date", columns="ticker", values="close").sort_index()
+        cols = [c for c in (columns or SIGNAL_COLUMNS) if c in signals]
+        wide = {
+            c: signals.pivot_table(index="date", columns="ticker", values=c)
+            .reindex(index=close.index, columns=close.columns)
+            .to_numpy(dtype=np.float64)
+            for c in cols
+        }
+        return cls(close.index.to_numpy(), list(close.columns), close.to_numpy(dtype=np.float64), wide)
+
+
+class SignalAnalytics:
+    """Per-signal IC reports with an on-disk cache keyed by signal version."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str | Path] = None,
+        horizons: Sequence[int] = (1, 5, 10, 20),
+        n_quantiles: int = 5,
+    ):
+        self.cache_dir = ensure_directory(cache_dir) if cache_dir else None
+        self.horizons = tuple(int(h) for h in horizons)
+        self.n_quantiles = n_quantiles
+        self.hits = 0
+        self.misses = 0
+
+    def signal_version(self, panel: SignalPanel, name: str) -> str:
+        return _digest(
+            name,
+            panel.signals[name],
+            panel.close,
+            panel.dates.astype(str),
+            tuple(panel.tickers),
+            self.horizons,
+            self.n_quantiles,
+        )
+
+    def report(self, panel: SignalPanel, name: str) -> pd.DataFrame:
+        path = None
+        if self.cache_dir is not None:
+            path = self.cache_dir / f"{name}_{self.signal_version(panel, name)}.parquet"
+            if path.exists():
+                self.hits += 1
+                return pd.read_parquet(path)
+        self.misses += 1
+        report = signal_report(panel.signals[name], panel.close, panel.dates, self.horizons, self.n_quantiles)
+        if path is not None:
+            tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+            report.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+            for stale in self.cache_dir.glob(f"{name}_{'?' * 16}.parquet"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+        return report
+
+    def run(self, panel: SignalPanel) -> tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        """Summary table (one row per signal) and the daily report of each signal."""
+        reports = {name: self.report(panel, name) for name in panel.signals}
+        summary = pd.DataFrame([summarize_report(name, r) for name, r in reports.items()])
+        logger.info(f"Signal analytics: {self.misses} computed, {self.hits} from cache")
+        return summary, reports
+
+
+__all__ = [
+    "SIGNAL_COLUMNS",
+    "cross_sectional_ranks",
+    "row_corr",
+    "rank_ic",
+    "forward_returns",
+    "quantile_returns",
+    "rank_turnover",
+    "signal_report",
+    "summarize_report",
+    "SignalPanel",
+    "SignalAnalytics",
+]
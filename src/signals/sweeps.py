@@ -0,0 +1,203 @@
+"""
+Parameter sweeps for the rule-based alphas: a whole grid evaluated as one dates x params array.
+
+Every alpha is a clipped affine function of a few window-dependent series (SMA distance,
+rolling z-score, relative return). Those series are computed once per distinct window and
+the remaining parameters (thresholds, scales, fast/slow mix) are applied by broadcasting, so
+a grid costs roughly one rolling pass per distinct window plus an O(dates x params) clip.
+Column p of `SweepResult.scores` equals the single-call alpha for `params.iloc[p]`.
+"""
+
+import itertools
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.types import DataFrame
+from src.signals.signal_analytics import cross_sectional_ranks, forward_returns, row_corr
+
+
+@dataclass
+class SweepResult:
+    params: pd.DataFrame
+    scores: np.ndarray
+
+    @property
+    def n_params(self) -> int:
+        return len(self.params)
+
+
+def _grid(**axes: Sequence) -> pd.DataFrame:
+    names = list(axes)
+    return pd.DataFrame(list(itertools.product(*(axes[n] for n in names))), columns=names)
+
+
+def _finish(score: np.ndarray) -> np.ndarray:
+    return np.nan_to_num(np.clip(score, -1.0, 1.0), nan=0.0)
+
+
+def _sma(features: DataFrame, window: int) -> np.ndarray:
+    col = f"sma_{window}"
+    if col in features:
+        return features[col].to_numpy(dtype=np.float64)
+    return features["close"].rolling(window=window, min_periods=window).mean().to_numpy()
+
+
+def _rolling_z(values: pd.Series, window: int) -> np.ndarray:
+    rolling = values.rolling(window=window, min_periods=window)
+    return ((values - rolling.mean()) / rolling.std()).to_numpy()
+
+
+def sweep_trend(features: DataFrame, fast: Sequence[int], slow: Sequence[int]) -> SweepResult:
+    """Grid over compute_trend_alpha(fast, slow); SMAs missing from `features` are built from close."""
+    if "close" not in features:
+        raise KeyError("Missing columns for trend alpha: ['close']")
+    params = _grid(fast=fast, slow=slow)
+    price = features["close"].to_numpy(dtype=np.float64)
+    windows = sorted(set(params["fast"]) | set(params["slow"]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dist = {w: (price - _sma(features, w)) / price for w in windows}
+    fast_mat = np.column_stack([dist[w] for w in params["fast"]])
+    slow_mat = np.column_stack([dist[w] for w in params["slow"]])
+    return SweepResult(params, _finish(0.6 * fast_mat + 0.4 * slow_mat))
+
+
+def _zscore_sweep(
+    series_for: Callable[[int], pd.Series],
+    lookback: Sequence[int],
+    z_threshold: Sequence[float],
+) -> SweepResult:
+    params = _grid(lookback=lookback, z_threshold=z_threshold)
+    z = {w: _rolling_z(series_for(w), w) for w in sorted(set(params["lookback"]))}
+    zmat = np.column_stack([z[w] for w in params["lookback"]])
+    return SweepResult(params, _finish(-zmat / params["z_threshold"].to_numpy(dtype=np.float64)))
+
+
+def sweep_mean_reversion(features: DataFrame, lookback: Sequence[int], z_threshold: Sequence[float]) -> SweepResult:
+    """Grid over compute_mean_reversion_alpha(lookback, z_threshold)."""
+
+    def series_for(window: int) -> pd.Series:
+        col = f"ret_{window}d"
+        if col not in features:
+            raise KeyError(f"Missing return column {col} for mean reversion alpha")
+        return features[col]
+
+    return _zscore_sweep(series_for, lookback, z_threshold)
+
+
+def sweep_volatility(
+    features: DataFrame,
+    lookback: Sequence[int],
+    z_threshold: Sequence[float],
+    vol_col: str = "realized_vol_20",
+) -> SweepResult:
+    """Grid over compute_volatility_alpha(vol_col, lookback, z_threshold)."""
+    if vol_col not in features:
+        raise KeyError(f"Missing volatility column {vol_col} for volatility alpha")
+    return _zscore_sweep(lambda _: features[vol_col], lookback, z_threshold)
+
+
+def sweep_relative_strength(features: DataFrame, lookback: Sequence[int], scale: Sequence[float]) -> SweepResult:
+    """Grid over compute_relative_strength_alpha(lookback, scale)."""
+    params = _grid(lookback=lookback, scale=scale)
+    rel = {}
+    for w in sorted(set(params["lookback"])):
+        col = f"rel_ret_vs_benchmark_{w}"
+        if col not in features:
+            raise KeyError(f"Missing relative return column {col} for relative strength alpha")
+        rel[w] = features[col].to_numpy(dtype=np.float64)
+    rmat = np.column_stack([rel[w] for w in params["lookback"]])
+    return SweepResult(params, _finish(rmat / params["scale"].to_numpy(dtype=np.float64)))
+
+
+SWEEPS: Dict[str, Callable[..., SweepResult]] = {
+    "trend_alpha": sweep_trend,
+    "mean_reversion_alpha": sweep_mean_reversion,
+    "vol_alpha": sweep_volatility,
+    "rel_strength_alpha": sweep_relative_strength,
+}
+
+
+def sweep_sharpe(result: SweepResult, close: np.ndarray, periods_per_year: int = 252) -> np.ndarray:
+    """
+    Annualized Sharpe per parameter set of the time-series strategy holding `score` from
+    close t to close t+1, for one ticker (all columns in one matrix pass).
+    """
+    fwd = forward_returns(np.asarray(close, dtype=np.float64)[:, None], 1)[:, 0]
+    valid = np.isfinite(fwd)
+    pnl = result.scores[valid] * fwd[valid, None]
+    if len(pnl) < 2:
+        return np.zeros(result.n_params)
+    std = pnl.std(axis=0, ddof=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(std > 0, np.sqrt(periods_per_year) * pnl.mean(axis=0) / std, 0.0)
+
+
+def sweep_panel_ic(
+    features_by_ticker: Mapping[str, DataFrame],
+    signal: str,
+    grid: Mapping[str, Sequence],
+    horizon: int = 1,
+    chunk_params: int = 32,
+    min_obs: int = 3,
+) -> pd.DataFrame:
+    """
+    Cross-sectional rank IC of every grid point. Sweep scores are always finite, so every
+    parameter set sees the same valid names per date and forward returns are ranked once.
+    Scores are scattered into dates x tickers panels and ranked `chunk_params` parameter
+    sets at a time, bounding memory at chunk_params x dates x tickers.
+    """
+    sweep = SWEEPS[signal]
+    results = {t: sweep(df, **grid) for t, df in features_by_ticker.items()}
+    tickers = list(results)
+    all_dates = pd.Index(
+        np.unique(np.concatenate([pd.to_datetime(features_by_ticker[t]["date"]).to_numpy() for t in tickers]))
+    )
+    n_dates, n_tickers = len(all_dates), len(tickers)
+    params = next(iter(results.values())).params
+    n_params = len(params)
+    rows = [all_dates.get_indexer(pd.to_datetime(features_by_ticker[t]["date"])) for t in tickers]
+    close = np.full((n_dates, n_tickers), np.nan)
+    present = np.zeros((n_dates, n_tickers), dtype=bool)
+    for j, t in enumerate(tickers):
+        close[rows[j], j] = features_by_ticker[t]["close"].to_numpy(dtype=np.float64)
+        present[rows[j], j] = True
+
+    fwd = forward_returns(close, horizon)
+    observed = present & np.isfinite(fwd)
+    fwd_ranks = cross_sectional_ranks(np.where(observed, fwd, np.nan))
+
+    ic = np.empty((n_params, n_dates))
+    for start in range(0, n_params, chunk_params):
+        stop = min(start + chunk_params, n_params)
+        block = np.full((stop - start, n_dates, n_tickers), np.nan)
+        for j, t in enumerate(tickers):
+            block[:, rows[j], j] = results[t].scores[:, start:stop].T
+        ranks = cross_sectional_ranks(np.where(observed, block, np.nan).reshape(-1, n_tickers))
+        corr = row_corr(ranks, np.tile(fwd_ranks, (stop - start, 1)), min_obs)
+        ic[start:stop] = corr.reshape(stop - start, n_dates)
+
+    valid = np.isfinite(ic)
+    n = valid.sum(axis=1)
+    filled = np.where(valid, ic, 0.0)
+    out = params.copy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=1) / n
+        std = np.sqrt((np.where(valid, ic - mean[:, None], 0.0) ** 2).sum(axis=1) / (n - 1))
+        out["mean_ic"] = mean
+        out["ic_ir"] = np.where(std > 0, mean / std, np.nan)
+    return out
+
+
+__all__ = [
+    "SweepResult",
+    "SWEEPS",
+    "sweep_trend",
+    "sweep_mean_reversion",
+    "sweep_volatility",
+    "sweep_relative_strength",
+    "sweep_sharpe",
+    "sweep_panel_ic",
+]
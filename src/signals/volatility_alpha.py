@@ -1,10 +1,12 @@
 """
 Volatility-context alpha: prefers lower realized vol; penalizes elevated vol.
-Outputs a score in [-1, 1], scaled by z-score of realized vol.
+Outputs a score in [-1, 1], scaled by z-score of realized vol over `lookback` sessions.
 """
 
 import pandas as pd
 
+from src.core.cache import frame_ticker, get_series_cache
+from src.core.frequency import DAILY, Frequency
 from src.core.types import DataFrame
 
 
@@ -13,13 +15,17 @@ def compute_volatility_alpha(
     vol_col: str = "realized_vol_20",
     lookback: int = 60,
     z_threshold: float = 1.0,
+    frequency: Frequency = DAILY,
 ) -> pd.Series:
     if vol_col not in features:
         raise KeyError(f"Missing volatility column {vol_col} for volatility alpha")
 
     vol = features[vol_col]
-    mean = vol.rolling(window=lookback, min_periods=lookback).mean()
-    std = vol.rolling(window=lookback, min_periods=lookback).std()
+    cache = get_series_cache()
+    ticker = frame_ticker(features)
+    window = frequency.bars(lookback)
+    mean = cache.rolling_mean(ticker, vol_col, vol, window)
+    std = cache.rolling_std(ticker, vol_col, vol, window)
 
     zscore = (vol - mean) / std
     score = -zscore / z_threshold  # lower vol → positive alpha
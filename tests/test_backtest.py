@@ -64,3 +64,204 @@ def test_summarize_backtest_with_regime(tmp_path):
         saved = json.load(f)
     assert "pnl_by_regime" in summary
     assert "bull" in saved["pnl_by_regime"]
+
+
+def _cost_inputs():
+    dates = pd.date_range("2024-01-01", periods=6, freq="D").strftime("%Y-%m-%d")
+    prices = pd.DataFrame(
+        {
+            "date": list(dates) * 2,
+            "ticker": ["AAA"] * 6 + ["BBB"] * 6,
+            "close": [100, 101, 102, 101, 103, 104, 50, 50.5, 50.2, 51, 51.5, 51.0],
+            "volume": [1e6] * 12,
+        }
+    )
+    positions = pd.DataFrame(
+        {
+            "date": list(dates) * 2,
+            "ticker": ["AAA"] * 6 + ["BBB"] * 6,
+            "target_weight": [0.5, 0.51, 0.3, 0.31, 0.5, 0.5, -0.2, -0.2, -0.25, -0.1, -0.1, 0.0],
+            "strategy_name": "demo",
+        }
+    )
+    return prices, positions
+
+
+def test_backtest_costs_reduce_returns_and_populate_fees():
+    from src.backtest.costs import CostModel
+
+    prices, positions = _cost_inputs()
+    gross, _ = run_backtest(prices, positions, strategy_name="demo")
+    net, trades = run_backtest(prices, positions, strategy_name="demo", cost_model=CostModel(spread_bps=10, commission_bps=2))
+    assert net["daily_return"].sum() < gross["daily_return"].sum()
+    assert (net["transaction_costs"] >= 0).all()
+    first = trades[(trades["ticker"] == "AAA") & (trades["date"] == "2024-01-01")].iloc[0]
+    assert first["side"] == "buy"
+    assert abs(first["cost"] - 0.5 * (5 + 2) * 1e-4) < 1e-12
+    assert abs(first["fees"] - first["cost"] * 1_000_000) < 1e-6
+    assert abs(first["quantity"] - 0.5 * 1_000_000 / 100) < 1e-6
+    assert abs(net.loc[0, "turnover"] - 0.7) < 1e-12
+
+
+def test_multi_ticker_pnl_and_costs_reconcile_with_daily_returns():
+    from src.backtest.costs import CostModel
+
+    # BBB closes out on the last date, so its final cost has no next bar to be realized on
+    prices, positions = _cost_inputs()
+    portfolio, trades = run_backtest(prices, positions, strategy_name="demo", cost_model=CostModel(spread_bps=10))
+
+    gross = (trades["held_weight"] * trades["ret_1d_fwd"]).sum()
+    assert abs(portfolio["daily_return"].sum() - (gross - trades["cost"].sum())) < 1e-12
+    assert abs(portfolio["daily_return"].sum() - trades["pnl"].sum()) < 1e-12
+    daily = portfolio.set_index("date")["daily_return"]
+    by_date = trades.groupby("date")["pnl"].sum()
+    assert daily["2024-01-01"] == 0.0
+    assert abs(daily["2024-01-02"] - by_date["2024-01-01"]) < 1e-12
+    # the last bar carries the previous bar's returns plus the close-out costs
+    assert abs(daily["2024-01-06"] - (by_date["2024-01-05"] + by_date["2024-01-06"])) < 1e-12
+
+
+def test_data_gaps_are_not_charged_as_exit_and_reentry():
+    from src.backtest.costs import CostModel
+
+    prices, positions = _cost_inputs()
+    positions["target_weight"] = positions["ticker"].map({"AAA": 0.5, "BBB": -0.2})
+    gap = (prices["ticker"] == "AAA") & prices["date"].isin(["2024-01-03", "2024-01-04"])
+    prices, positions = prices[~gap], positions[~gap.to_numpy()]
+    _, trades = run_backtest(prices, positions, strategy_name="demo", cost_model=CostModel(spread_bps=10))
+    aaa = trades[trades["ticker"] == "AAA"].sort_values("date")
+    assert aaa["trade_weight"].tolist() == [0.5, 0.0, 0.0, 0.0]
+    assert (aaa["cost"].iloc[1:] == 0.0).all()
+
+
+def test_no_trade_band_suppresses_small_rebalances():
+    from src.backtest.costs import CostModel, apply_no_trade_band
+
+    held = apply_no_trade_band(pd.DataFrame({"a": [0.5, 0.51, 0.3, 0.31]}).to_numpy(), band=0.05)
+    assert held[:, 0].tolist() == [0.5, 0.5, 0.3, 0.3]
+
+    prices, positions = _cost_inputs()
+    _, trades = run_backtest(prices, positions, strategy_name="demo", cost_model=CostModel(no_trade_band=0.05))
+    aaa = trades[trades["ticker"] == "AAA"].sort_values("date")
+    assert aaa["held_weight"].tolist() == [0.5, 0.5, 0.3, 0.3, 0.5, 0.5]
+    assert (aaa["side"] == "hold").sum() == 3
+
+
+def test_simulator_partial_fills_and_growth():
+    import numpy as np
+
+    from src.backtest.simulator import SIDE_BUY, simulate
+
+    close = np.full((3, 2), 100.0)
+    volume = np.array([[1000.0, 1e9], [1000.0, 1e9], [1000.0, 1e9]])
+    targets = np.array([[0.5, 0.2], [0.5, 0.2], [0.5, 0.2]])
+    res = simulate(targets, close, volume, ["AAA", "BBB"], dates=["d0", "d1", "d2"], max_participation=0.1, capacity=1)
+
+    # 0.5 * 1e6 / 100 = 5000 shares wanted, at most 100 per bar; BBB fills at once
+    orders = res.orders.to_frame()
+    first = orders[(orders["date"] == "d0") & (orders["ticker"] == "AAA")].iloc[0]
+    assert first["quantity"] == 5000 and first["filled"] == 100 and first["side"] == SIDE_BUY
+    fills = res.fills.to_frame()
+    assert fills.loc[fills["ticker"] == "AAA", "quantity"].tolist() == [100, 100, 100]
+    assert fills.loc[fills["ticker"] == "BBB", "quantity"].tolist() == [2000]
+    assert res.fills.capacity >= len(res.fills) == 4
+    np.testing.assert_allclose(res.positions.quantity, [300, 2000])
+    np.testing.assert_allclose(res.equity, 1e6)
+
+
+def test_simulator_fees_and_arrow_export():
+    import numpy as np
+    import pyarrow as pa
+
+    from src.backtest.costs import CostModel
+    from src.backtest.simulator import simulate
+
+    close = np.array([[10.0], [11.0]])
+    res = simulate(np.array([[1.0], [0.0]]), close, None, ["AAA"], cost_model=CostModel(spread_bps=4, commission_bps=1))
+    fills = res.fills.column("fees")
+    # fees are 2 bps half-spread + 1 bp commission on each fill's notional
+    np.testing.assert_allclose(fills, [1e6 * 3e-4, 1.1e6 * 3e-4])
+    table = res.positions.to_arrow()
+    assert pa.types.is_dictionary(table.schema.field("ticker").type)
+    assert abs(res.equity[-1] - (1.1e6 - fills.sum())) < 1e-6
+
+
+def test_rolling_metrics_match_full_period_functions():
+    import numpy as np
+
+    from src.backtest.metrics import rolling_metrics
+
+    rng = np.random.default_rng(3)
+    returns = pd.DataFrame(rng.normal(0.0005, 0.01, (300, 3)), columns=["a", "b", "c"])
+    window = 63
+    rolled = rolling_metrics(returns, window)
+    assert rolled["sharpe"].iloc[: window - 1].isna().all().all()
+    for i in (window - 1, 150, 299):
+        chunk = returns["b"].iloc[i - window + 1 : i + 1]
+        assert abs(rolled["sharpe"]["b"].iloc[i] - sharpe_ratio(chunk)) < 1e-9
+        assert abs(rolled["sortino"]["b"].iloc[i] - sortino_ratio(chunk)) < 1e-9
+        assert abs(rolled["win_rate"]["b"].iloc[i] - win_rate(chunk)) < 1e-12
+        assert abs(rolled["max_drawdown"]["b"].iloc[i] - max_drawdown((1 + chunk).cumprod())) < 1e-9
+
+
+def test_bootstrap_intervals_bracket_point_estimate(tmp_path):
+    import numpy as np
+
+    from src.backtest.metrics import bootstrap_confidence_intervals, stationary_bootstrap_indices
+
+    idx = stationary_bootstrap_indices(50, 200, mean_block=5, rng=np.random.default_rng(0))
+    assert idx.shape == (200, 50) and idx.min() >= 0 and idx.max() < 50
+    # most steps continue the previous block
+    assert ((np.diff(idx, axis=1) % 50) == 1).mean() > 0.7
+
+    rng = np.random.default_rng(7)
+    returns = pd.Series(rng.normal(0.001, 0.01, 500))
+    ci = bootstrap_confidence_intervals(returns, n_samples=2000, mean_block=10)
+    assert ci["sharpe"]["lower"] < sharpe_ratio(returns) < ci["sharpe"]["upper"]
+    assert ci["max_drawdown"]["lower"] <= ci["max_drawdown"]["upper"] <= 0
+
+    portfolio = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=500), "daily_return": returns})
+    summary = summarize_backtest(
+        portfolio, pd.DataFrame(), out_dir=tmp_path, strategy_name="demo", rolling_windows=(63,), bootstrap_samples=200
+    )
+    assert set(summary["bootstrap"]) == {"sharpe", "max_drawdown"}
+    rolling = pd.read_parquet(tmp_path / "rolling_metrics.parquet")
+    assert {"date", "sharpe_63", "sortino_63", "win_rate_63", "max_drawdown_63"} <= set(rolling.columns)
+
+
+def test_attribution_splits_pnl_by_component_and_regime(tmp_path):
+    from src.backtest.attribution import attribute_pnl, pnl_by_component
+
+    trades = pd.DataFrame(
+        {
+            "date": ["2024-01-02", "2024-01-02", "2024-01-03"],
+            "ticker": ["AAA", "BBB", "AAA"],
+            "pnl": [0.02, -0.01, 0.03],
+        }
+    )
+    alpha = pd.DataFrame(
+        {
+            "date": ["2024-01-02", "2024-01-02", "2024-01-03"],
+            "ticker": ["AAA", "BBB", "AAA"],
+            "contrib_trend": [0.3, 0.0, 0.2],
+            "contrib_mean_rev": [0.1, 0.0, -0.1],
+            "contrib_vol": [0.0, 0.0, 0.0],
+            "contrib_rel_strength": [0.0, 0.0, 0.0],
+            "contrib_ml": [0.0, 0.0, 0.0],
+            "regime_label": ["bull", "bear", "bull"],
+        }
+    )
+    attribution = attribute_pnl(trades, alpha)
+    totals = pnl_by_component(attribution)
+    assert abs(totals["trend"] - (0.02 * 0.75 + 0.03 * 2.0)) < 1e-12
+    assert abs(totals["mean_rev"] - (0.02 * 0.25 - 0.03)) < 1e-12
+    assert abs(totals["residual"] + 0.01) < 1e-12
+    for dim in ("date", "ticker", "regime"):
+        assert abs(attribution.loc[attribution["dimension"] == dim, "pnl_total"].sum() - 0.04) < 1e-12
+    bull = attribution[(attribution["dimension"] == "regime") & (attribution["key"] == "bull")]
+    assert abs(bull["pnl_total"].iloc[0] - 0.05) < 1e-12
+
+    portfolio = pd.DataFrame({"date": ["2024-01-02", "2024-01-03"], "daily_return": [0.01, 0.03]})
+    summary = summarize_backtest(portfolio, trades, out_dir=tmp_path, strategy_name="demo", alpha_scores=alpha)
+    assert summary["pnl_by_regime"] == {"bear": -0.01, "bull": 0.05}
+    assert (tmp_path / "attribution.parquet").exists()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from models.regime.rule_based_regime import assign_regime
+from src.core.cache import SeriesCache, configure_series_cache
+from src.features.trend_features import build_trend_features
+from src.features.volatility_features import build_volatility_features
+
+
+def test_series_cache_shares_rolling_series_across_stages():
+    rng = np.random.default_rng(5)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, 300))
+    bars = pd.DataFrame(
+        {
+            "date": pd.date_range("2023-01-01", periods=300),
+            "ticker": "SPY",
+            "close": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+        }
+    )
+    cache = configure_series_cache(max_mb=16)
+    vol = build_volatility_features(bars, realized_vol_windows=[20], atr_period=14)
+    build_trend_features(bars, lookbacks={"sma": [50, 200], "returns": [1]})
+    misses = cache.misses
+
+    # Regime engine re-reads the same closes from its own copy of the bars
+    regimes = assign_regime(bars.copy(), 50, 200, 20, 1.0, -0.2)
+    assert cache.hits >= 4  # sma_50, sma_200, pct_change, realized_vol_20
+    assert cache.misses == misses + 2  # only the vol z-score mean/std are new
+    expected = pd.Series(close).pct_change().rolling(20, min_periods=20).std() * np.sqrt(252)
+    np.testing.assert_allclose(vol["realized_vol_20"], expected)
+    assert len(regimes) == 300
+
+    small = SeriesCache(max_bytes=3 * 300 * 8)
+    for w in (5, 10, 20, 40):
+        small.sma("SPY", bars["close"], w)
+    assert small.evictions == 1 and len(small) == 3 and small.nbytes <= small.max_bytes
+    small.sma("SPY", bars["close"], 5)
+    assert small.stats()["misses"] == 5
+    changed = bars["close"].copy()
+    changed.iloc[-1] *= 1.01
+    small.sma("SPY", changed, 40)
+    assert small.misses == 6
@@ -0,0 +1,62 @@
+import inspect
+import subprocess
+import sys
+
+import pandas as pd
+import yaml
+
+from src.cli import COMMANDS, build_parser, main, resolve
+
+HEAVY = ("pandas", "numpy", "pyarrow", "lightgbm", "sklearn", "scipy", "yaml")
+IMPORT_BUDGET_S = 0.15
+
+
+def _run(code):
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+
+def test_cli_import_stays_within_budget_and_loads_no_heavy_modules():
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import src.cli\n"
+        "src.cli.build_parser()\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(elapsed, ','.join(m for m in {HEAVY!r} if m in sys.modules))\n"
+    )
+    runs = [_run(code).split(" ") for _ in range(3)]
+    assert min(float(elapsed) for elapsed, _ in runs) < IMPORT_BUDGET_S
+    assert all(loaded.strip() == "" for _, loaded in runs)
+
+
+def test_prediction_stage_import_does_not_load_ml_libraries():
+    loaded = _run("import sys, src.pipeline.run_predictions; print(sorted({'lightgbm', 'sklearn'} & set(sys.modules)))")
+    assert loaded.strip() == "[]"
+
+
+def test_every_command_resolves_to_a_stage_accepting_its_options():
+    parser = build_parser()
+    for name, command in COMMANDS.items():
+        try:
+            stage = resolve(command.target)
+        except ModuleNotFoundError as exc:
+            if not (exc.name or "").startswith("src.data"):
+                raise
+            continue
+        params = inspect.signature(stage).parameters
+        assert set(command.options) <= set(params), name
+        args = parser.parse_args([name, "--ticker", "SPY"] if name == "inspect" else [name])
+        assert {o: getattr(args, o) for o in command.options}.keys() == set(command.options)
+
+
+def test_inspect_prints_filtered_signals(tmp_path, capsys):
+    signals_dir = tmp_path / "signals"
+    signals_dir.mkdir()
+    dates = pd.bdate_range("2024-01-01", periods=30)
+    pd.DataFrame({"date": dates, "ticker": "SPY", "trend_alpha": range(30)}).to_parquet(signals_dir / "SPY.parquet")
+    config = tmp_path / "settings.yaml"
+    config.write_text(yaml.safe_dump({"paths": {"signals_dir": str(signals_dir)}}))
+
+    assert main(["inspect", "--ticker", "SPY", "--config", str(config), "--start", "2024-01-10", "--rows", "3"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 4 and "2024-01-10" in out[1]
@@ -2,7 +2,10 @@ import pandas as pd
 import numpy as np
 import yaml
 
+from src.features.chunked import iter_chunks
 from src.features.trend_features import build_trend_features
+from src.core.frequency import get_frequency, resample_to_daily
+from src.core.io import read_parquet
 from src.features.volatility_features import build_volatility_features
 from src.features.volume_features import build_volume_features
 from src.pipeline.build_features import build_features
@@ -116,3 +119,148 @@ def test_feature_pipeline_integration(tmp_path):
     assert expected_cols.issubset(set(df.columns))
     # Returns should be numeric and not all NaN after sufficient history
     assert df["ret_1d"].dropna().shape[0] > 0
+
+
+def test_chunked_features_match_in_memory(tmp_path):
+    rng = np.random.default_rng(0)
+    processed_dir = tmp_path / "processed"
+    processed_dir.mkdir()
+    sizes = {"TST": 300, "BMK": 310}
+    for ticker, n in sizes.items():
+        close = 100 * np.exp(rng.normal(0, 0.01, n).cumsum())
+        pd.DataFrame(
+            {
+                "date": pd.bdate_range("2024-01-01", periods=n)[-n:],
+                "open": close,
+                "high": close * 1.01,
+                "low": close * 0.99,
+                "close": close,
+                "adj_close": close,
+                "volume": rng.integers(100_000, 200_000, n).astype(float),
+                "ticker": ticker,
+            }
+        ).to_parquet(processed_dir / f"{ticker}.parquet", index=False)
+
+    data_sources_path = tmp_path / "data_sources.yaml"
+    yaml.safe_dump(
+        {"processed_files": {"pattern": "{ticker}.parquet", "directory": str(processed_dir)}},
+        data_sources_path.open("w"),
+    )
+    # overlap covers the deepest lookback (beta_vs_benchmark_60: 61 rows); both are well
+    # below the file sizes so every file is streamed in several chunks
+    overlap, chunk_rows = 61, 40
+    for ticker, n in sizes.items():
+        frames = list(iter_chunks(processed_dir / f"{ticker}.parquet", chunk_rows, overlap))
+        assert len(frames) >= 3 and max(len(frame) for frame, _ in frames) < n
+    outputs = {}
+    chunked_cfg = {"enabled": True, "chunk_rows": chunk_rows, "overlap": overlap}
+    for mode, chunked in [("full", {"enabled": False}), ("chunked", chunked_cfg)]:
+        settings_path = tmp_path / f"settings_{mode}.yaml"
+        yaml.safe_dump(
+            {
+                "tickers": ["TST"],
+                "benchmark": "BMK",
+                "features": {
+                    "lookbacks": {"sma": [5], "returns": [1, 2, 20], "realized_vol": [3]},
+                    "atr_period": 3,
+                    "volume_lookback": 4,
+                    "chunked": chunked,
+                },
+                "paths": {"features_dir": str(tmp_path / mode / "features")},
+            },
+            settings_path.open("w"),
+        )
+        written = build_features(settings_path=settings_path, data_sources_path=data_sources_path)
+        outputs[mode] = {p.stem: pd.read_parquet(p) for p in written}
+
+    assert (tmp_path / "chunked" / "calendar.parquet").exists()
+    for ticker in ["TST", "BMK"]:
+        assert len(outputs["full"][ticker]) == sizes[ticker]
+        pd.testing.assert_frame_equal(outputs["chunked"][ticker], outputs["full"][ticker])
+    assert outputs["full"]["TST"]["beta_vs_benchmark_60"].notna().sum() > 200
+    assert outputs["full"]["TST"]["rel_ret_vs_benchmark_20"].notna().any()
+
+
+def test_chunked_intraday_features_are_session_partitioned(tmp_path):
+    rng = np.random.default_rng(2)
+    processed_dir = tmp_path / "processed"
+    processed_dir.mkdir()
+    sessions = pd.bdate_range("2024-01-02", periods=6)
+    stamps = np.concatenate([pd.date_range(d + pd.Timedelta("9h30min"), periods=26, freq="15min") for d in sessions])
+    for ticker in ["TST", "BMK"]:
+        close = 100 * np.exp(rng.normal(0, 0.002, len(stamps)).cumsum())
+        pd.DataFrame(
+            {
+                "date": stamps,
+                "open": close,
+                "high": close * 1.001,
+                "low": close * 0.999,
+                "close": close,
+                "adj_close": close,
+                "volume": rng.integers(1_000, 2_000, len(stamps)).astype(float),
+                "ticker": ticker,
+            }
+        ).to_parquet(processed_dir / f"{ticker}.parquet", index=False)
+
+    data_sources_path = tmp_path / "data_sources.yaml"
+    yaml.safe_dump(
+        {"processed_files": {"pattern": "{ticker}.parquet", "directory": str(processed_dir)}},
+        data_sources_path.open("w"),
+    )
+    # a stale single-file output from an earlier daily run must be replaced by the directory
+    (tmp_path / "chunked" / "features").mkdir(parents=True)
+    (tmp_path / "chunked" / "features" / "TST.parquet").write_bytes(b"stale")
+    outputs = {}
+    chunked_cfg = {"enabled": True, "chunk_rows": 40, "overlap": 60}
+    for mode, chunked in [("full", {"enabled": False}), ("chunked", chunked_cfg)]:
+        settings_path = tmp_path / f"settings_{mode}.yaml"
+        yaml.safe_dump(
+            {
+                "tickers": ["TST"],
+                "benchmark": "BMK",
+                "frequency": "15min",
+                "features": {
+                    "lookbacks": {"sma": [1], "returns": [1], "realized_vol": [1]},
+                    "atr_period": 1,
+                    "volume_lookback": 1,
+                    "chunked": chunked,
+                },
+                "paths": {"features_dir": str(tmp_path / mode / "features")},
+            },
+            settings_path.open("w"),
+        )
+        written = build_features(settings_path=settings_path, data_sources_path=data_sources_path)
+        outputs[mode] = {p.stem: p for p in written}
+
+    for ticker in ["TST", "BMK"]:
+        path = outputs["chunked"][ticker]
+        assert path.is_dir()
+        assert sorted(p.name for p in path.iterdir()) == [f"session={d:%Y-%m-%d}" for d in sessions]
+        pd.testing.assert_frame_equal(read_parquet(path), read_parquet(outputs["full"][ticker]))
+    assert read_parquet(outputs["chunked"]["TST"])["ret_1d"].notna().any()
+
+
+def test_intraday_frequency_windows_and_resampling():
+    freq = get_frequency("5min")
+    assert freq.bars_per_session == 78 and freq.periods_per_year == 78 * 252
+    rng = np.random.default_rng(1)
+    sessions = pd.bdate_range("2024-01-02", periods=3)
+    stamps = np.concatenate([pd.date_range(d + pd.Timedelta("9h30min"), periods=78, freq="5min") for d in sessions])
+    close = 100 * np.exp(rng.normal(0, 0.001, len(stamps)).cumsum())
+    bars = pd.DataFrame(
+        {"date": stamps, "ticker": "TST", "open": close, "high": close + 1, "low": close - 1, "close": close}
+    )
+    bars["volume"] = 10.0
+
+    trend = build_trend_features(bars, {"sma": [1], "returns": [1]}, frequency=freq)
+    np.testing.assert_allclose(trend["ret_1d"].iloc[100], close[100] / close[22] - 1)
+    assert trend["sma_1"].iloc[:77].isna().all() and np.isclose(trend["sma_1"].iloc[77], close[:78].mean())
+    vol = build_volatility_features(bars, [1], atr_period=1, frequency=freq)
+    expected = pd.Series(close).pct_change().iloc[1:79].std() * np.sqrt(freq.periods_per_year)
+    assert np.isclose(vol["realized_vol_1"].iloc[78], expected)
+
+    daily = resample_to_daily(bars.sample(frac=1, random_state=0))
+    assert list(daily["date"]) == list(sessions)
+    np.testing.assert_allclose(daily["close"], close[77::78])
+    np.testing.assert_allclose(daily["high"], [close[i : i + 78].max() + 1 for i in (0, 78, 156)])
+    np.testing.assert_allclose(daily["volume"], 780.0)
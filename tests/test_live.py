@@ -0,0 +1,159 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.core.calendar import join_on_day
+from src.features.relative_strength_features import build_relative_strength_features
+from src.features.trend_features import build_trend_features
+from src.features.volatility_features import build_volatility_features
+from src.features.volume_features import build_volume_features
+from src.live.feed import format_bar, replay_frame, tail_file
+from src.live.runtime import PaperTradingRuntime
+from src.signals.registry import SIGNALS
+
+
+def _settings():
+    with open("config/settings.yaml") as fh:
+        settings = yaml.safe_load(fh)
+    with open("config/regimes.yaml") as fh:
+        regimes = yaml.safe_load(fh)
+    return settings, regimes
+
+
+def _bars(n=320, tickers=("SPY", "NVDA"), seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2022-01-03", periods=n)
+    frames = []
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": dates,
+                    "ticker": ticker,
+                    "open": close,
+                    "high": close * 1.01,
+                    "low": close * 0.99,
+                    "close": close,
+                    "adj_close": close,
+                    "volume": rng.integers(100_000, 1_000_000, n).astype(float),
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def _batch_features(bars, bench_bars, feature_cfg):
+    def base(b):
+        lookbacks = feature_cfg["lookbacks"]
+        vol = build_volatility_features(b, list(lookbacks["realized_vol"]), feature_cfg["atr_period"])
+        trend = build_trend_features(join_on_day(b, vol, by="ticker"), lookbacks)
+        volume = build_volume_features(b, feature_cfg["volume_lookback"])
+        out = b[["date", "ticker", "close"]].copy()
+        for df in (trend, vol, volume):
+            out = join_on_day(out, df, by="ticker")
+        return out
+
+    feats = base(bars)
+    rs = build_relative_strength_features(feats, base(bench_bars), [20, 60], 60)
+    return join_on_day(feats, rs, by="ticker")
+
+
+def test_streaming_features_and_signals_match_batch():
+    settings, regimes = _settings()
+    bars = _bars()
+    runtime = PaperTradingRuntime.from_settings(settings, regimes)
+    seen = {t: ([], []) for t in runtime.tickers}
+    for _, group in bars.groupby("date", sort=True):
+        rows, signals = runtime.update({r["ticker"]: r for r in group.to_dict(orient="records")})
+        for t in signals:
+            seen[t][0].append(rows[t])
+            seen[t][1].append(signals[t])
+
+    bench = bars[bars["ticker"] == "SPY"].reset_index(drop=True)
+    for ticker in runtime.tickers:
+        batch = _batch_features(bars[bars["ticker"] == ticker].reset_index(drop=True), bench, settings["features"])
+        live = pd.DataFrame(seen[ticker][0])
+        for col in batch.columns.drop(["date", "ticker"]):
+            np.testing.assert_allclose(
+                live[col].to_numpy(float), pd.to_numeric(batch[col]).to_numpy(float), rtol=1e-9, atol=1e-12
+            )
+        live_signals = pd.DataFrame(seen[ticker][1])
+        for name in runtime.signals[ticker].names:
+            expected = SIGNALS[name].compute(batch, **runtime.signals[ticker].params[name])
+            np.testing.assert_allclose(live_signals[name].to_numpy(), expected.to_numpy(), atol=1e-9)
+
+
+def test_runtime_tails_feed_with_backpressure_and_conflation(tmp_path):
+    settings, regimes = _settings()
+    settings["live"] = {"queue_size": 4, "latency_budget_ms": 1.0, "conflate": True}
+    bars = _bars(n=300)
+    history, recent = bars[bars["date"] < bars["date"].unique()[260]], bars[bars["date"] >= bars["date"].unique()[260]]
+    feed_path = tmp_path / "bars.jsonl"
+    feed_path.write_text("".join(format_bar(r) + "\n" for r in recent.sort_values("date").to_dict(orient="records")))
+
+    scored = []
+
+    def slow_scorer(rows):
+        scored.append(rows[0]["date"])
+        time.sleep(0.005)
+        return [{"ticker": r["ticker"], "prob_state_p1": 0.6, "prob_state_m1": 0.1} for r in rows]
+
+    orders = []
+    runtime = PaperTradingRuntime.from_settings(settings, regimes, scorer=slow_scorer, order_sink=orders.extend)
+    assert runtime.warm_up(history) == 260
+    metrics = asyncio.run(runtime.run(tail_file(feed_path, poll_interval=0.01, idle_timeout=0.2)))
+
+    assert metrics["bars"] == len(recent)
+    assert metrics["steps"] == 40
+    assert metrics["backpressure_waits"] > 0
+    assert metrics["queue_high_water"] == 4
+    assert 0 < metrics["steps_conflated"] < metrics["steps"]
+    assert metrics["over_budget"] > 0
+    assert sum(metrics["bar_latency_histogram"].values()) == metrics["steps"]
+    assert metrics["orders"] == len(orders) > 0
+    # nothing queues behind the final step, so it is always traded
+    assert len(scored) == metrics["steps"] - metrics["steps_conflated"]
+    assert scored[-1] == recent["date"].max()
+    assert all(abs(w) <= settings["risk"]["max_weight"] for w in metrics["book"].values())
+
+
+def test_replay_drops_late_bars_and_unknown_tickers():
+    settings, regimes = _settings()
+    bars = _bars(n=30)
+    late = bars.iloc[[0]].assign(date=bars["date"].iloc[0] - pd.Timedelta(days=1))
+    unknown = bars.iloc[[5]].assign(ticker="XYZ")
+    # a newer timestamp from an unknown ticker must not count as a step
+    unknown_later = bars.iloc[[5]].assign(ticker="XYZ", date=bars["date"].max() + pd.Timedelta(days=1))
+
+    async def feed():
+        async for bar in replay_frame(bars):
+            yield bar
+        for frame in (late, unknown, unknown_later):
+            yield frame.to_dict(orient="records")[0]
+
+    runtime = PaperTradingRuntime.from_settings(settings, regimes)
+    metrics = asyncio.run(runtime.run(feed()))
+    assert metrics["steps"] == 30 and runtime.steps_received == 30
+    assert metrics["late_bars"] == 1
+    assert metrics["unknown_bars"] == 2
+
+
+def test_step_latency_runs_from_the_steps_own_last_bar():
+    settings, regimes = _settings()
+    bars = _bars(n=2).sort_values(["date", "ticker"]).to_dict(orient="records")
+
+    async def feed():
+        # day 0 only gets NVDA, so it completes when day 1 starts arriving 50 ms later
+        yield next(b for b in bars[:2] if b["ticker"] == "NVDA")
+        await asyncio.sleep(0.05)
+        for bar in bars[2:]:
+            yield bar
+
+    runtime = PaperTradingRuntime.from_settings(settings, regimes)
+    metrics = asyncio.run(runtime.run(feed()))
+    assert metrics["steps"] == 2
+    assert metrics["bar_latency"]["max_ms"] >= 50.0
@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 
+from src.core.calendar import TradingCalendar, join_on_day, same_day_ids
+from src.meta.regime_map import RegimeMatrix
 from src.meta.rule_based_meta import combine_signals
 
 
@@ -43,3 +46,87 @@ def test_combine_signals_applies_regime_weights():
     assert alpha.loc[0, "alpha_score"] > 0
     # In bear: trend negative with lower weight, ml negative -> should be negative alpha
     assert alpha.loc[1, "alpha_score"] < 0
+
+
+def test_regime_matrix_maps_each_ticker_to_its_benchmark():
+    dates = ["2024-01-01", "2024-01-02", "2024-01-03"]
+    frames = {
+        "SPY": pd.DataFrame({"date": dates, "regime_label": ["bull", "bear", "bull"]}),
+        "XLK": pd.DataFrame({"date": dates[1:], "regime_label": ["crash", "bear"]}),
+    }
+    matrix = RegimeMatrix.from_frames(frames)
+    assert matrix.ids.shape == (3, 2)
+    assert list(matrix.day_ids(["2024-01-02", "2023-12-29"])) == [1, -1]
+    assert list(matrix.labels(dates, "XLK")) == ["choppy", "crash", "bear"]
+    assert list(matrix.labels(dates, "QQQ")) == ["choppy"] * 3
+
+    signals = pd.DataFrame(
+        {
+            "date": dates,
+            "ticker": "TST",
+            "trend_alpha": [0.5, -0.5, 0.2],
+            "mean_reversion_alpha": [0.1, 0.0, -0.3],
+            "vol_alpha": [0.0, 0.2, 0.0],
+            "rel_strength_alpha": [0.0, 0.1, 0.4],
+        }
+    )
+    preds = pd.DataFrame({"date": dates, "ticker": "TST", "horizon": 1, "prob_state_p1": [0.6, 0.1, 0.3]})
+    weights = {
+        label: {"trend_alpha": w, "mean_reversion_alpha": 0.2, "vol_alpha": 0.3, "rel_strength_alpha": 0.1, "ml": 0.4}
+        for label, w in {"bull": 0.5, "bear": 0.2, "choppy": 0.1, "crash": 0.0}.items()
+    }
+
+    via_matrix = combine_signals(signals, preds, matrix, weights, benchmark="XLK")
+    via_frame = combine_signals(signals, preds, frames["XLK"], weights)
+    assert list(via_matrix["regime_label"]) == ["choppy", "crash", "bear"]
+    pd.testing.assert_frame_equal(via_matrix, via_frame)
+
+
+def test_trading_calendar_joins_match_merge_across_date_dtypes():
+    dates = pd.bdate_range("2024-01-01", periods=6)
+    right = pd.DataFrame({"date": np.repeat(dates, 2), "ticker": ["A", "B"] * 6, "close": np.arange(12.0)})
+    right = right.drop(index=[3, 8])
+    left = pd.DataFrame({"date": dates[[5, 0, 1, 4, 2]], "ticker": ["A", "B", "B", "C", "A"]})
+
+    expected = left.merge(right, on=["date", "ticker"], how="left")
+    pd.testing.assert_frame_equal(join_on_day(left, right, by="ticker"), expected)
+    # string dates on one side, tz-aware on the other: merge would refuse, the calendar does not care
+    mixed = join_on_day(
+        left.assign(date=left["date"].dt.strftime("%Y-%m-%d")),
+        right.assign(date=right["date"].dt.tz_localize("UTC")),
+        by="ticker",
+    )
+    np.testing.assert_array_equal(mixed["close"].to_numpy(), expected["close"].to_numpy())
+
+    calendar = TradingCalendar.from_frames([right, left])
+    assert len(calendar) == 6 and calendar.day_ids(["2024-01-03", "2023-12-29"]).tolist() == [2, -1]
+    assert calendar.dates_for([2])[0] == np.datetime64("2024-01-03")
+    with_ids = calendar.with_day_ids(right), calendar.with_day_ids(left)
+    pd.testing.assert_frame_equal(join_on_day(*reversed(with_ids), by="ticker").drop(columns="day_id"), expected)
+    assert calendar.is_prefix_of(calendar.extend(["2024-02-01"]))
+    assert not calendar.is_prefix_of(calendar.extend(["2023-12-01"]))
+
+    # right stamped by a calendar missing 2024-01-02: the same ids name different dates, so
+    # the join falls back to dates instead of silently shifting rows by a day
+    other = TradingCalendar(dates.delete(1))
+    shifted = other.with_day_ids(right[right["date"] != dates[1]])
+    assert not same_day_ids(with_ids[1], shifted)
+    expected_gap = left.merge(shifted.drop(columns="day_id"), on=["date", "ticker"], how="left")
+    joined = join_on_day(with_ids[1], shifted, by="ticker").drop(columns="day_id")
+    pd.testing.assert_frame_equal(joined, expected_gap)
+
+
+def test_intraday_bars_take_previous_session_regime():
+    frames = {"SPY": pd.DataFrame({"date": ["2024-01-02", "2024-01-03"], "regime_label": ["bull", "crash"]})}
+    matrix = RegimeMatrix.from_frames(frames)
+    bars = pd.to_datetime(["2024-01-02 09:35", "2024-01-03 09:35", "2024-01-03 15:55"])
+    assert list(matrix.labels(bars, "SPY")) == ["bull", "crash", "crash"]
+    assert list(matrix.labels(bars, "SPY", lag=1)) == ["choppy", "bull", "bull"]
+
+    signals = pd.DataFrame({"date": bars, "ticker": "TST", "trend_alpha": 0.5})
+    preds = pd.DataFrame({"date": bars, "ticker": "TST", "horizon": 1, "prob_state_p1": 0.2})
+    weights = {"bull": {"trend_alpha": 1.0}, "crash": {"trend_alpha": -1.0}, "choppy": {}}
+    via_matrix = combine_signals(signals, preds, matrix, weights, benchmark="SPY", regime_lag=1)
+    via_frame = combine_signals(signals, preds, frames["SPY"], weights, regime_lag=1)
+    assert list(via_matrix["regime_label"]) == ["choppy", "bull", "bull"]
+    pd.testing.assert_frame_equal(via_matrix, via_frame)
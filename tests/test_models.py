@@ -8,7 +8,7 @@ from models.ml.lightgbm_next_state import (
     save_trained_model,
     train_model,
 )
-from models.ml.model_registry import ModelKey
+from models.ml.model_registry import ModelCache, ModelKey, artifact_paths, get_model_cache
 from src.features.label_targets import _default_thresholds, label_future_states
 
 
@@ -55,3 +55,203 @@ def test_lightgbm_training_and_save_load(tmp_path):
     loaded = load_trained_model(artifacts_dir=tmp_path, key=key)
     proba = predict_proba(loaded.model, loaded.scaler, df[loaded.feature_columns], loaded.feature_columns)
     assert proba.shape[0] == len(df)
+
+
+def _train_small_model():
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=60, freq="D").date,
+            "ticker": ["TST"] * 60,
+            "feat1": np.sin(np.linspace(0, 6, 60)),
+            "feat2": np.linspace(1, 0, 60),
+        }
+    )
+    df["close"] = 100 + np.cumsum(df["feat1"])
+    df = label_future_states(df, horizons=[1], thresholds=_default_thresholds())
+    params = {"n_estimators": 20, "learning_rate": 0.1, "objective": "multiclass", "num_class": 7, "random_state": 42, "verbose": -1}
+    return df, train_model(df, label_col="target_state_h1", params=params, test_size=0.2)
+
+
+def test_registry_native_format_matches_in_memory_predictions(tmp_path):
+    df, result = _train_small_model()
+    key = ModelKey(model_name="native", ticker="TST", horizon=1, version="vtest")
+    save_trained_model(result, artifacts_dir=tmp_path, key=key)
+
+    paths = artifact_paths(tmp_path, key)
+    assert paths.booster.exists() and paths.sidecar.exists() and paths.arrays.exists()
+    assert not paths.legacy.exists()
+
+    loaded = load_trained_model(artifacts_dir=tmp_path, key=key, use_cache=False)
+    expected = predict_proba(result.model, result.scaler, df, result.feature_columns)
+    actual = predict_proba(loaded.model, loaded.scaler, df, loaded.feature_columns)
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-9)
+    assert list(loaded.classes_) == list(result.classes_)
+
+
+def test_model_cache_hits_and_evicts(tmp_path):
+    _, result = _train_small_model()
+    cache = get_model_cache()
+    cache.clear()
+    cache.reset_stats()
+    key = ModelKey(model_name="cached", ticker="TST", horizon=1, version="vtest")
+    save_trained_model(result, artifacts_dir=tmp_path, key=key)
+
+    first = load_trained_model(artifacts_dir=tmp_path, key=key)
+    second = load_trained_model(artifacts_dir=tmp_path, key=key)
+    assert first.model is second.model
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+    # Re-saving invalidates the cached entry
+    save_trained_model(result, artifacts_dir=tmp_path, key=key)
+    third = load_trained_model(artifacts_dir=tmp_path, key=key)
+    assert third.model is not first.model
+
+    small = ModelCache(max_entries=2)
+    for i in range(3):
+        small.get(("dir", f"m{i}"), None, lambda i=i: i)
+    assert len(small) == 2
+    assert small.stats()["evictions"] == 1
+
+
+def _synthetic_states(n: int, seed: int = 0, shift: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2020-01-01", periods=n, freq="D").date,
+            "ticker": ["TST"] * n,
+            "feat1": rng.normal(shift, 1.0, n),
+            "feat2": rng.normal(0.0, 1.0, n),
+        }
+    )
+    signal = 0.02 * df["feat1"] + 0.01 * rng.normal(size=n)
+    df["target_state_h1"] = np.select([signal < -0.01, signal > 0.01], [-1, 1], 0)
+    return df
+
+
+def test_warm_start_appends_rounds_and_records_lineage(tmp_path):
+    from models.ml.incremental import retrain_model
+
+    params = {"n_estimators": 10, "objective": "multiclass", "num_class": 3, "random_state": 42, "verbose": -1}
+    history = _synthetic_states(400)
+    first = train_model(history, label_col="target_state_h1", params=params)
+    key = ModelKey(model_name="warm", ticker="TST", horizon=1, version="vtest")
+    save_trained_model(first, artifacts_dir=tmp_path, key=key)
+    previous = load_trained_model(artifacts_dir=tmp_path, key=key)
+
+    retrained = retrain_model(
+        _synthetic_states(600, seed=1),
+        label_col="target_state_h1",
+        params=params,
+        previous=previous,
+        extra_rounds=5,
+        recent_rows=200,
+    )
+    assert retrained.mode == "warm_start"
+    booster = retrained.result.model.booster_
+    assert booster.num_trees() == previous.model.num_trees() + 5 * 3
+    assert [e["mode"] for e in retrained.result.lineage] == ["full", "warm_start"]
+
+    save_trained_model(retrained.result, artifacts_dir=tmp_path, key=key)
+    reloaded = load_trained_model(artifacts_dir=tmp_path, key=key)
+    assert reloaded.lineage[-1]["revision"] == 2
+
+
+def test_drift_forces_full_refit():
+    from models.ml.incremental import detect_drift, retrain_model
+
+    params = {"n_estimators": 10, "objective": "multiclass", "num_class": 3, "random_state": 42, "verbose": -1}
+    previous = train_model(_synthetic_states(400), label_col="target_state_h1", params=params)
+
+    drifted = _synthetic_states(200, seed=2, shift=3.0)
+    report = detect_drift(previous, drifted, label_col="target_state_h1")
+    assert report.needs_refit
+    assert "feat1" in report.shifted_features
+
+    retrained = retrain_model(drifted, label_col="target_state_h1", params=params, previous=previous, recent_rows=200)
+    assert retrained.mode == "full"
+    assert len(retrained.result.lineage) == 1
+
+
+def test_slow_drift_across_warm_starts_eventually_forces_refit():
+    from models.ml.incremental import retrain_model
+
+    params = {"n_estimators": 10, "objective": "multiclass", "num_class": 3, "random_state": 42, "verbose": -1}
+    previous = train_model(_synthetic_states(400), label_col="target_state_h1", params=params)
+    reference = previous.feature_mean.copy()
+
+    # each round drifts feat1 by 0.2 std: never enough against the last window, but the
+    # cumulative shift against the last full refit crosses the 0.5 threshold
+    modes = []
+    for round_no, shift in enumerate([0.2, 0.4, 0.6, 0.8], start=1):
+        retrained = retrain_model(
+            _synthetic_states(200, seed=10 + round_no, shift=shift),
+            label_col="target_state_h1",
+            params=params,
+            previous=previous,
+            extra_rounds=5,
+            recent_rows=200,
+        )
+        modes.append(retrained.mode)
+        if retrained.mode == "warm_start":
+            np.testing.assert_array_equal(retrained.result.feature_mean, reference)
+        else:
+            reference = retrained.result.feature_mean
+        previous = retrained.result
+    assert modes[:3] == ["warm_start", "warm_start", "full"]
+
+
+def test_benchmark_warm_start_reports_time_and_logloss():
+    from models.ml.incremental import benchmark_warm_start
+
+    params = {"n_estimators": 20, "objective": "multiclass", "num_class": 3, "random_state": 42, "verbose": -1}
+    report = benchmark_warm_start(
+        _synthetic_states(700), label_col="target_state_h1", params=params, extra_rounds=5, recent_rows=150, holdout_rows=150
+    )
+    assert report["full_seconds"] > 0 and report["warm_seconds"] > 0
+    assert np.isfinite(report["full_logloss"]) and np.isfinite(report["warm_logloss"])
+
+
+def test_design_matrix_is_float32_ordered_and_cached(tmp_path):
+    from models.ml.design_matrix import (
+        DesignMatrixCache,
+        build_design_matrix,
+        build_panel_design_matrix,
+        select_feature_columns,
+    )
+
+    df = pd.DataFrame(
+        {
+            "date": ["2024-01-01", "2024-01-02"],
+            "ticker": ["TST", "TST"],
+            "a": [1.0, np.nan],
+            "b": [3, 4],
+            "target_state_h1": [1, 0],
+        }
+    )
+    assert select_feature_columns(df) == ["a", "b"]
+
+    X = build_design_matrix(df, ["b", "a", "missing"])
+    assert X.dtype == np.float32 and X.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(X[:, 0], [3, 4])
+    assert np.isnan(X[1, 1]) and np.isnan(X[:, 2]).all()
+
+    cache = DesignMatrixCache(tmp_path)
+    first = cache.get("TST", df, ["a", "b"], data_version="v1")
+    second = cache.get("TST", df, ["a", "b"], data_version="v1")
+    assert first is second
+    assert cache.path_for("TST", ["a", "b"], "v1").exists()
+    assert cache.misses == 1 and cache.hits == 1
+    cache.get("TST", df, ["a", "b"], data_version="v2")
+    assert len(list(tmp_path.glob("TST_*.npy"))) == 1
+
+    panel, offsets = build_panel_design_matrix({"X": df, "Y": df.iloc[:1]}, ["a", "b"])
+    assert panel.shape == (3, 2)
+    np.testing.assert_array_equal(panel[offsets["Y"]], X[:1, [1, 0]])
+
+
+def test_training_excludes_label_columns_from_features():
+    df, result = _train_small_model()
+    assert not any(c.startswith("target_state_") for c in result.feature_columns)
+    assert result.scaler is None
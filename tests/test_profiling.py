@@ -0,0 +1,107 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.core.profiling import add_profiling_arguments, profiling_options, profiling_run
+from src.core.telemetry import telemetry_run, traced
+
+
+def _work(n):
+    frame = pd.DataFrame({"x": np.arange(n, dtype=float)})
+    return frame["x"].rolling(20).mean().sum()
+
+
+@traced("stage", name="heavy_stage")
+def _heavy_stage():
+    keep = [np.ones(200_000) for _ in range(5)]
+    total = sum(_work(20_000) for _ in range(5))
+    return total, keep
+
+
+@traced("stage", name="light_stage")
+def _light_stage():
+    return _work(1_000)
+
+
+def _parse(lines):
+    rows = [line.rsplit(" ", 1) for line in lines.read_text().splitlines()]
+    return [(stack.split(";"), int(weight)) for stack, weight in rows]
+
+
+def test_cprofile_writes_collapsed_stacks_and_summaries_per_stage(tmp_path):
+    _work(100)  # keep pandas' first-call imports out of the traced allocations
+    with profiling_run(tmp_path, mode="cprofile", memory=True, top_n=10) as profiler:
+        _heavy_stage()
+        _light_stage()
+        _light_stage()
+
+    assert set(profiler.written) == {"heavy_stage", "light_stage", "light_stage-2"}
+    stacks = _parse(tmp_path / "heavy_stage.collapsed")
+    assert stacks and all(weight > 0 for _, weight in stacks)
+    assert any(any(frame.startswith("_work (tests/test_profiling.py") for frame in s) for s, _ in stacks)
+    top = (tmp_path / "heavy_stage.top.txt").read_text()
+    assert "Top 10 by cumulative" in top and "_work" in top
+    assert (tmp_path / "heavy_stage.prof").stat().st_size > 0
+
+    assert (tmp_path / "heavy_stage.alloc.txt").read_text().startswith("elapsed")
+    alloc = _parse(tmp_path / "heavy_stage.alloc.collapsed")
+    retained = sum(w for s, w in alloc if any(f.startswith("tests/test_profiling.py") for f in s))
+    assert retained >= 5 * 200_000 * 8
+
+
+def test_sampling_single_stage_alongside_telemetry(tmp_path):
+    with telemetry_run(tmp_path / "run") as telemetry, profiling_run(
+        tmp_path / "run" / "profiles", mode="sampling", stages=["heavy_stage"], interval=0.001
+    ) as profiler:
+        _light_stage()
+        _heavy_stage()
+
+    assert list(profiler.written) == ["heavy_stage"]
+    stacks = _parse(tmp_path / "run" / "profiles" / "heavy_stage.collapsed")
+    assert sum(w for s, w in stacks if s[0] == "MainThread" and any("_heavy_stage" in f for f in s)) > 0
+    assert "inclusive samples" in (tmp_path / "run" / "profiles" / "heavy_stage.top.txt").read_text()
+    assert {s.name for s in telemetry.spans} >= {"heavy_stage", "light_stage"}
+    assert (tmp_path / "run" / "report.json").exists()
+
+
+def test_profiling_options_from_flags_and_settings(tmp_path):
+    parser = argparse.ArgumentParser()
+    add_profiling_arguments(parser)
+    settings = {"profiling": {"mode": None, "stages": [], "memory": False, "top_n": 25, "interval_ms": 2}}
+
+    options = profiling_options(parser.parse_args([]), settings)
+    with profiling_run(tmp_path, **options) as profiler:
+        _light_stage()
+    assert profiler is None and not any(tmp_path.iterdir())
+
+    args = parser.parse_args(["--profile", "sampling", "--profile-stage", "build_features", "--profile-memory"])
+    options = profiling_options(args, settings)
+    assert options == {
+        "mode": "sampling",
+        "stages": ["build_features"],
+        "memory": True,
+        "top_n": 25,
+        "interval": 0.002,
+    }
+
+
+def test_allocation_profile_warns_when_telemetry_traces_shallow_stacks(tmp_path, caplog):
+    import tracemalloc
+
+    _work(100)
+    with profiling_run(tmp_path / "alone", mode=None, memory=True):
+        _heavy_stage()
+    assert "stacks up to 32 frames" in (tmp_path / "alone" / "heavy_stage.alloc.txt").read_text()
+    assert not any("truncated" in r.message for r in caplog.records)
+
+    # telemetry already traces 1 frame; restarting would corrupt its open spans' memory deltas
+    with telemetry_run(None, memory="tracemalloc") as telemetry, profiling_run(
+        tmp_path / "shared", mode=None, memory=True
+    ):
+        _heavy_stage()
+        _light_stage()
+        assert tracemalloc.get_traceback_limit() == 1
+    assert "stacks up to 1 frames" in (tmp_path / "shared" / "heavy_stage.alloc.txt").read_text()
+    assert sum("truncated" in r.message for r in caplog.records) == 1
+    assert next(s for s in telemetry.spans if s.name == "heavy_stage").mem_delta >= 5 * 200_000 * 8
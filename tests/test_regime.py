@@ -1,6 +1,17 @@
+import numpy as np
 import pandas as pd
 
+from models.regime.hmm_regime_model import (
+    FittedHMM,
+    filter_step,
+    filtered_state_probs,
+    hmm_observations,
+    infer_regime,
+    train_hmm_regime,
+)
+from models.regime.online_regime import OnlineRegimeTracker
 from models.regime.rule_based_regime import assign_regime
+from src.core.streaming import RollingWindow
 
 
 def test_rule_based_regime_labels_trend_and_crash():
@@ -32,3 +43,84 @@ def test_rule_based_regime_labels_trend_and_crash():
     assert "bull" in regimes["regime_label"].values
     # After drop, expect crash labels
     assert "crash" in regimes["regime_label"].values
+
+
+def _two_regime_bars(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    calm = rng.normal(0.001, 0.005, 300)
+    stress = rng.normal(-0.004, 0.03, 100)
+    rets = np.concatenate([calm, stress, calm[:200]])
+    close = 100 * np.exp(np.cumsum(rets))
+    dates = pd.date_range("2020-01-01", periods=len(close), freq="B").date
+    return pd.DataFrame({"date": dates, "close": close, "ticker": "BMK"})
+
+
+def test_hmm_regime_filtered_probs_follow_schema_and_are_causal():
+    bars = _two_regime_bars()
+    model = train_hmm_regime(bars, n_states=3, n_restarts=3, n_iter=30, n_jobs=2)
+    regimes = infer_regime(model, bars)
+
+    prob_cols = [f"regime_prob_{k}" for k in ("bull", "bear", "choppy", "crash")]
+    assert list(regimes.columns) == ["date", "benchmark", "regime_label", "regime_id", *prob_cols]
+    np.testing.assert_allclose(regimes[prob_cols].sum(axis=1), 1.0, atol=1e-9)
+    # Stress block should be dominated by the high-vol (crash) state
+    assert (regimes["regime_label"].iloc[330:400] == "crash").mean() > 0.8
+
+    truncated = infer_regime(model, bars.iloc[:350])
+    np.testing.assert_allclose(truncated[prob_cols].to_numpy(), regimes[prob_cols].iloc[:350].to_numpy())
+
+
+def test_hmm_filter_step_matches_batch_filter():
+    bars = _two_regime_bars(1)
+    model = train_hmm_regime(bars, n_states=2, n_restarts=2, n_iter=20)
+    batch = filtered_state_probs(model, bars)
+
+    obs = hmm_observations(bars, model.vol_lookback)
+    log_post = None
+    for row in obs:
+        log_post = filter_step(model, log_post, row)
+    np.testing.assert_allclose(np.exp(log_post), batch[-1], atol=1e-10)
+
+    restored = FittedHMM.from_dict(model.to_dict())
+    np.testing.assert_allclose(filtered_state_probs(restored, bars), batch)
+
+
+def test_online_tracker_matches_batch_and_resumes_from_checkpoint(tmp_path):
+    rng = np.random.default_rng(3)
+    rets = np.concatenate([rng.normal(0.001, 0.01, 300), rng.normal(-0.01, 0.03, 60), rng.normal(0.0, 0.01, 140)])
+    close = 100 * np.cumprod(1 + rets)
+    dates = pd.date_range("2021-01-01", periods=len(close), freq="B").date
+    bars = pd.DataFrame({"date": dates, "close": close, "ticker": "BMK"})
+    params = dict(
+        trend_ma_short=20,
+        trend_ma_long=100,
+        vol_lookback=20,
+        high_vol_zscore=1.5,
+        crash_drawdown_threshold=-0.15,
+    )
+    expected = assign_regime(bars, **params)
+
+    tracker = OnlineRegimeTracker("BMK", **params)
+    head = tracker.update_frame(bars.iloc[:320])
+    tracker.save(tmp_path / "tracker.json")
+    resumed = OnlineRegimeTracker.load(tmp_path / "tracker.json")
+    tail = resumed.update_frame(bars.iloc[320:])
+
+    online = pd.concat([head, tail], ignore_index=True)
+    assert list(online.columns) == list(expected.columns)
+    assert (online["regime_label"] == expected["regime_label"]).all()
+    assert {"bull", "crash"} <= set(online["regime_label"])
+    assert resumed.n_bars == len(bars)
+
+
+def test_rolling_window_tracks_pandas_rolling():
+    values = np.random.default_rng(4).normal(50, 3, 2000)
+    window = RollingWindow(30, resync_every=100)
+    means, stds = [], []
+    for v in values:
+        window.push(v)
+        means.append(window.mean() if window.full else np.nan)
+        stds.append(window.std() if window.full else np.nan)
+    series = pd.Series(values)
+    np.testing.assert_allclose(means, series.rolling(30).mean(), rtol=1e-10)
+    np.testing.assert_allclose(stds, series.rolling(30).std(), rtol=1e-8)
@@ -1,6 +1,10 @@
+import numpy as np
 import pandas as pd
 
+from src.risk.covariance import EWMACovariance
+from src.risk.portfolio_construction import PortfolioConstraints, solve_weights
 from src.risk.position_sizing import compute_positions
+from src.risk.risk_analytics import risk_report, rolling_historical_var, uniform_shocks
 
 
 def test_compute_positions_scales_and_clips():
@@ -19,3 +23,207 @@ def test_compute_positions_scales_and_clips():
     # Second would be > max_weight; must be clipped
     assert positions.loc[1, "target_weight"] == 0.2
     assert positions["max_weight_applied"].iloc[1]
+
+
+def test_ewma_covariance_rank_one_updates_and_roundtrip(tmp_path):
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0, 0.01, size=(200, 5))
+    returns[:50, 4] = np.nan  # late listing
+    model = EWMACovariance(["A", "B", "C", "D", "E"], halflife=30, min_periods=20, block_rows=2)
+    for row in returns:
+        model.update(row)
+
+    lam = 0.5 ** (1 / 30)
+    expected = np.zeros((5, 5))
+    for row in returns:
+        m = np.isfinite(row)
+        r = np.nan_to_num(row)
+        expected = np.where(np.outer(m, m), lam * expected + (1 - lam) * np.outer(r, r), expected)
+    np.testing.assert_allclose(model.cov, expected, rtol=1e-12)
+    assert list(model.n_obs) == [200, 200, 200, 200, 150]
+
+    loadings, specific = model.factor_model(5)
+    np.testing.assert_allclose(loadings @ loadings.T + np.diag(specific), model.covariance(), atol=1e-10)
+
+    path = model.save(tmp_path / "cov.npz")
+    restored = EWMACovariance.load(path)
+    assert restored.tickers == model.tickers
+    np.testing.assert_allclose(restored.cov, model.cov, rtol=1e-6)
+    np.testing.assert_allclose(restored.covariance(), model.covariance(), rtol=1e-5)
+
+
+def test_ewma_covariance_matches_adjusted_pandas_ewm_on_short_ragged_histories():
+    rng = np.random.default_rng(3)
+    common = rng.normal(0, 0.01, 90)
+    returns = pd.DataFrame({t: common + rng.normal(0, 0.01, 90) for t in ["A", "B", "C"]})
+    returns.loc[:59, "C"] = np.nan  # listed late: 30 observations
+    returns.loc[[64, 75], "C"] = np.nan  # suspended days
+    model = EWMACovariance(["A", "B", "C"], halflife=60, min_periods=20, block_rows=2)
+    for row in returns.to_numpy():
+        model.update(row)
+
+    # Zero-mean EWM covariance: adjust=True weights over the days each pair traded together
+    # (ignore_na), i.e. ewm(adjust=True).cov(bias=True) of returns around a zero mean
+    expected = np.empty((3, 3))
+    for i, a in enumerate(returns):
+        for j, b in enumerate(returns):
+            product = (returns[a] * returns[b]).dropna()
+            expected[i, j] = product.ewm(halflife=60, adjust=True).mean().iloc[-1]
+    np.testing.assert_allclose(model.covariance(), expected, rtol=1e-10)
+    full = returns[["A", "B"]]
+    pandas_cov = full.ewm(halflife=60, adjust=True).cov(bias=True).iloc[-2:].to_numpy()
+    means = full.ewm(halflife=60, adjust=True).mean().iloc[-1].to_numpy()
+    np.testing.assert_allclose(model.covariance()[:2, :2], pandas_cov + np.outer(means, means), rtol=1e-10)
+
+
+def test_compute_positions_targets_portfolio_vol():
+    rng = np.random.default_rng(1)
+    dates = pd.date_range("2024-01-01", periods=120, freq="B")
+    common = rng.normal(0, 0.02, len(dates))
+    returns = pd.DataFrame({t: common + rng.normal(0, 0.002, len(dates)) for t in ["A", "B"]}, index=dates)
+    alpha = pd.concat(
+        [pd.DataFrame({"date": dates, "ticker": t, "alpha_score": 1.0}) for t in ["A", "B"]],
+        ignore_index=True,
+    )
+    vol = returns.rolling(20).std() * np.sqrt(252)
+
+    plain = compute_positions(alpha, vol, target_vol=0.15, max_weight=0.5)
+    risk_model = EWMACovariance(["A", "B"], halflife=20, min_periods=20)
+    scaled = compute_positions(
+        alpha, vol, target_vol=0.15, max_weight=0.5, risk_model=risk_model, asset_returns=returns
+    )
+
+    last = scaled[scaled["date"] == dates[-1]].set_index("ticker")["target_weight"]
+    # Perfectly correlated names each sized to target_vol would double portfolio vol
+    assert risk_model.portfolio_vol(last.reindex(["A", "B"]).to_numpy()) <= 0.15 + 1e-9
+    assert (scaled["target_weight"].abs() <= plain["target_weight"].abs() + 1e-12).all()
+    assert (scaled["target_weight"] < plain["target_weight"] - 1e-6).any()
+
+
+def test_solve_weights_respects_gross_net_caps_and_turnover():
+    rng = np.random.default_rng(2)
+    targets = rng.normal(0.05, 0.1, size=(50, 40))
+    targets[:, :3] = np.nan
+    constraints = PortfolioConstraints(max_weight=0.1, gross_max=1.0, net_min=-0.2, net_max=0.3)
+    weights = solve_weights(targets, constraints)
+
+    assert np.all(weights[:, :3] == 0.0)
+    assert np.abs(weights).max() <= 0.1 + 1e-12
+    assert np.abs(weights).sum(axis=1).max() <= 1.0 + 1e-9
+    assert weights.sum(axis=1).max() <= 0.3 + 1e-9
+    # KKT form: optimal weights are clip(soft(t - nu, lam)); with net binding, names with
+    # targets well below the threshold stay at zero and the largest targets sit at the cap
+    row = weights[0]
+    assert row[3:][np.argmax(targets[0, 3:])] == 0.1
+
+    limited = solve_weights(targets, PortfolioConstraints(0.1, 1.0, -0.2, 0.3, turnover_max=0.25))
+    turnover = np.abs(np.diff(limited, axis=0)).sum(axis=1)
+    assert turnover.max() <= 0.25 + 1e-9
+    assert np.abs(limited[0]).sum() <= 0.25 + 1e-9
+
+
+def test_compute_positions_applies_portfolio_constraints():
+    dates = ["2024-01-01", "2024-01-02"]
+    alpha = pd.DataFrame(
+        {"date": dates * 3, "ticker": ["A", "A", "B", "B", "C", "C"], "alpha_score": [1.0, 1.0, 0.8, 0.8, 0.6, -0.6]}
+    )
+    vol = pd.DataFrame({t: [0.15, 0.15] for t in "ABC"}, index=dates)
+    positions = compute_positions(
+        alpha,
+        vol,
+        target_vol=0.15,
+        max_weight=0.5,
+        constraints=PortfolioConstraints(max_weight=0.5, gross_max=1.0, net_min=-0.5, net_max=0.5),
+    )
+    book = positions.pivot(index="date", columns="ticker", values="target_weight")
+    # Day 1: all long, net cap binds. Day 2: gross binds, soft-threshold shrinks equally.
+    np.testing.assert_allclose(book.loc["2024-01-01"], [1 / 6, 1 / 6, 1 / 6])
+    np.testing.assert_allclose(book.loc["2024-01-02"], [1 / 3, 1 / 3, -1 / 3])
+
+
+def test_rolling_historical_var_matches_direct_quantiles_when_chunked():
+    rng = np.random.default_rng(5)
+    returns = rng.normal(0, 0.01, size=(300, 12))
+    weights = rng.normal(0, 0.1, size=(300, 12))
+    var, cvar = rolling_historical_var(
+        returns, weights, window=100, alpha=0.95, memory_budget_mb=0.01, dtype=np.float64
+    )
+    assert np.isnan(var[:99]).all()
+    for d in (99, 180, 299):
+        pnl = np.sort(returns[d - 99 : d + 1] @ weights[d])
+        assert np.isclose(var[d], -pnl[4])
+        assert np.isclose(cvar[d], -pnl[:5].mean())
+
+
+def test_risk_report_includes_filtered_var_and_stress():
+    rng = np.random.default_rng(6)
+    dates = pd.date_range("2023-01-02", periods=260, freq="B")
+    returns = pd.DataFrame(rng.normal(0, 0.01, size=(260, 3)), index=dates, columns=["A", "B", "C"])
+    weights = pd.DataFrame(0.2, index=dates, columns=["A", "B", "C"])
+    shocks = uniform_shocks(returns.columns, {"crash": -0.2, "tech": {"A": -0.3}})
+
+    report = risk_report(returns, weights, alpha=0.99, window=120, shocks=shocks)
+    assert {"var_hist", "cvar_hist", "var_fhs", "cvar_fhs", "stress_crash", "stress_tech"} <= set(report.columns)
+    assert np.allclose(report["stress_crash"], -0.12)
+    assert np.allclose(report["stress_tech"], -0.06)
+    tail = report.dropna()
+    assert (tail["cvar_hist"] >= tail["var_hist"] - 1e-12).all()
+    assert (tail["var_fhs"] > 0).all()
+
+
+def test_position_sizing_resumes_risk_model_one_day_at_a_time(tmp_path, monkeypatch):
+    import yaml
+
+    from src.core.io import write_parquet
+    from src.pipeline.run_position_sizing import run_position_sizing
+
+    rng = np.random.default_rng(5)
+    dates = pd.date_range("2024-01-01", periods=90, freq="B")
+    common = rng.normal(0, 0.02, len(dates))
+    closes = {t: 100 * np.cumprod(1 + common + rng.normal(0, 0.004, len(dates))) for t in ["A", "B", "C"]}
+
+    def run(root, n_dates):
+        for t, close in closes.items():
+            frame = pd.DataFrame({"date": dates[:n_dates], "ticker": t, "close": close[:n_dates]})
+            frame["ret_1d"] = frame["close"].pct_change()
+            write_parquet(frame, root / "features" / f"{t}.parquet")
+            write_parquet(frame[["date", "ticker"]].assign(alpha_score=0.8), root / "alpha" / f"{t}.parquet")
+        settings = {
+            "tickers": list(closes),
+            "paths": {
+                "features_dir": str(root / "features"),
+                "alpha_scores_dir": str(root / "alpha"),
+                "positions_dir": str(root / "positions"),
+                "risk_model_dir": str(root / "risk"),
+            },
+            "risk": {
+                "target_vol": 0.15,
+                "max_weight": 0.5,
+                "covariance": {"enabled": True, "halflife": 20, "shrinkage": 0.1, "min_periods": 20},
+            },
+        }
+        (root / "settings.yaml").write_text(yaml.safe_dump(settings))
+        run_position_sizing(settings_path=root / "settings.yaml")
+        return pd.concat(
+            [pd.read_parquet(root / "positions" / "hybrid_alpha_mvp" / f"{t}.parquet") for t in closes],
+            ignore_index=True,
+        )
+
+    resumed = tmp_path / "resumed"
+    run(resumed, 89)
+    updates = []
+    original = EWMACovariance.update
+
+    def counting_update(self, returns, date=None):
+        updates.append(date)
+        original(self, returns, date)
+
+    monkeypatch.setattr(EWMACovariance, "update", counting_update)
+    incremental = run(resumed, 90)
+    monkeypatch.undo()
+    full = run(tmp_path / "full", 90)
+
+    assert updates == [dates[-1]]
+    assert EWMACovariance.load(resumed / "risk" / "ewma_covariance.npz").last_date == str(dates[-1])
+    np.testing.assert_allclose(incremental["target_weight"], full["target_weight"], rtol=1e-5, atol=1e-9)
+    assert (pd.read_parquet(resumed / "risk" / "portfolio_vol_scale.parquet")["vol_scale"] < 1.0).any()
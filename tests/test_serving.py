@@ -0,0 +1,180 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from models.ml.lightgbm_next_state import predict_proba, save_trained_model, train_model
+from models.ml.model_registry import ModelKey
+from src.serving.scoring_service import ScoringService, create_server
+
+
+def _train(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=200, freq="D").astype(str),
+            "ticker": ["TST"] * 200,
+            "feat1": rng.normal(size=200),
+            "feat2": rng.normal(size=200),
+        }
+    )
+    df["target_state_h1"] = np.select([df["feat1"] < -0.5, df["feat1"] > 0.5], [-1, 1], 0)
+    params = {"n_estimators": 10, "objective": "multiclass", "num_class": 3, "random_state": 42, "verbose": -1}
+    result = train_model(df, label_col="target_state_h1", params=params)
+    save_trained_model(result, artifacts_dir=tmp_path, key=ModelKey("svc", "TST", 1, "v1"))
+    return df, result
+
+
+def _post(url, payload):
+    req = urllib.request.Request(url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return json.loads(resp.read())
+
+
+def test_scoring_service_http_roundtrip_and_metrics(tmp_path):
+    df, result = _train(tmp_path)
+    service = ScoringService(tmp_path, model_name="svc", horizons=[1], tickers=["TST"], max_wait_ms=5.0)
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        rows = df[["date", "ticker", "feat1", "feat2"]].head(5).to_dict(orient="records")
+        responses = [None] * 4
+
+        def call(i):
+            responses[i] = _post(f"{base}/score", {"rows": rows})
+
+        callers = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+        for t in callers:
+            t.start()
+        for t in callers:
+            t.join()
+
+        preds = responses[0]["predictions"]
+        assert len(preds) == 5
+        assert {"date", "ticker", "horizon", "pred_state", "prob_pred_state", "prob_state_p1"} <= set(preds[0])
+        expected = predict_proba(result.model, result.scaler, pd.DataFrame(rows), result.feature_columns).max(axis=1)
+        np.testing.assert_allclose([p["prob_pred_state"] for p in preds], expected, rtol=1e-6)
+
+        with urllib.request.urlopen(f"{base}/metrics", timeout=10) as resp:
+            metrics = json.loads(resp.read())
+        assert metrics["requests"] == 4
+        assert metrics["batches"] <= 4
+        assert metrics["request_latency"]["p99_ms"] >= metrics["request_latency"]["p50_ms"] > 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.stop()
+
+
+def test_scoring_service_unknown_ticker_fails_only_that_request(tmp_path):
+    df, _ = _train(tmp_path)
+    service = ScoringService(tmp_path, model_name="svc", horizons=[1], max_wait_ms=20.0)
+    service.start()
+    try:
+        good = service.submit(df[["date", "ticker", "feat1", "feat2"]].head(2).to_dict(orient="records"))
+        bad = service.submit([{"date": "2024-01-01", "ticker": "NOPE", "feat1": 0.0, "feat2": 0.0}])
+        assert len(good.result(timeout=10)) == 2
+        assert isinstance(bad.exception(timeout=10), FileNotFoundError)
+    finally:
+        service.stop()
+
+
+def test_scoring_service_rejects_bad_bodies_with_accurate_400s(tmp_path):
+    df, _ = _train(tmp_path)
+    service = ScoringService(tmp_path, model_name="svc", horizons=[1], max_wait_ms=20.0)
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/score"
+
+    def error_for(body: bytes):
+        req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(req, timeout=10)
+        except urllib.error.HTTPError as exc:
+            return exc.code, json.loads(exc.read())["error"]
+        raise AssertionError("expected an HTTP error")
+
+    try:
+        assert error_for(b"") == (400, "empty request body; expected a JSON object with a 'rows' list")
+        assert error_for(b"{not json")[1].startswith("request body is not valid JSON")
+        assert error_for(b"[1, 2]")[1] == "request body must be a JSON object with a 'rows' list"
+        assert error_for(b'{"rows": []}')[1] == "'rows' must be a non-empty list of FeatureRow records"
+        assert error_for(b'{"rows": [1]}')[1] == "every FeatureRow record in 'rows' must be a JSON object"
+        assert error_for(b'{"rows": [{"feat1": 0}], "horizons": "1"}')[1] == "'horizons' must be a list of integers"
+        assert error_for(b'{"rows": [{"feat1": 0}]}') == (400, "every FeatureRow record must include 'ticker'")
+        assert service.metrics()["errors"] == 1
+
+        # a request missing 'ticker' fails alone instead of dropping rows of its batch-mates
+        good = service.submit(df[["date", "ticker", "feat1", "feat2"]].head(3).to_dict(orient="records"))
+        bad = service.submit([{"date": "2024-01-01", "feat1": 0.0, "feat2": 0.0}])
+        assert len(good.result(timeout=10)) == 3
+        assert isinstance(bad.exception(timeout=10), ValueError)
+        metrics = service.metrics()
+        assert metrics["errors"] == 2 and metrics["rows_scored"] == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.stop()
+
+
+def test_scoring_service_non_numeric_feature_fails_only_that_request(tmp_path):
+    df, result = _train(tmp_path)
+    service = ScoringService(tmp_path, model_name="svc", horizons=[1], tickers=["TST"], max_wait_ms=50.0)
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/score"
+    try:
+        rows = df[["date", "ticker", "feat1", "feat2"]].head(3).to_dict(orient="records")
+        good = service.submit(rows)
+        bad = service.submit([{"date": "2024-01-01", "ticker": "TST", "feat1": "abc", "feat2": 0.0}])
+        preds = good.result(timeout=10)
+        expected = predict_proba(result.model, result.scaler, pd.DataFrame(rows), result.feature_columns).max(axis=1)
+        np.testing.assert_allclose([p["prob_pred_state"] for p in preds], expected, rtol=1e-6)
+        assert str(bad.exception(timeout=10)) == "FeatureRow field 'feat1' must be numeric"
+        metrics = service.metrics()
+        assert metrics["errors"] == 1 and metrics["rows_scored"] == 3
+
+        req = urllib.request.Request(url, data=json.dumps({"rows": [{"ticker": "TST", "feat2": "x"}]}).encode())
+        try:
+            urllib.request.urlopen(req, timeout=10)
+            raise AssertionError("expected an HTTP error")
+        except urllib.error.HTTPError as exc:
+            assert exc.code == 400
+            assert json.loads(exc.read())["error"] == "FeatureRow field 'feat2' must be numeric"
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.stop()
+
+
+def test_scoring_service_unexpected_error_returns_json_500(tmp_path, monkeypatch):
+    _train(tmp_path)
+    service = ScoringService(tmp_path, model_name="svc", horizons=[1], max_wait_ms=5.0)
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def boom(rows, horizons=None):
+        raise RuntimeError("booster crashed")
+
+    monkeypatch.setattr(service, "score", boom)
+    url = f"http://127.0.0.1:{server.server_address[1]}/score"
+    req = urllib.request.Request(url, data=json.dumps({"rows": [{"ticker": "TST", "feat1": 0.0}]}).encode())
+    try:
+        try:
+            urllib.request.urlopen(req, timeout=10)
+            raise AssertionError("expected an HTTP error")
+        except urllib.error.HTTPError as exc:
+            assert exc.code == 500
+            assert json.loads(exc.read())["error"] == "internal error: RuntimeError: booster crashed"
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.stop()
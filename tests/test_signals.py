@@ -38,3 +38,241 @@ def test_relative_strength_alpha():
     score = compute_relative_strength_alpha(df, lookback=20, scale=0.05)
     assert score.iloc[1] > 0
     assert score.iloc[2] < 0
+
+
+def test_signal_analytics_rank_ic_quantiles_and_cache(tmp_path):
+    import numpy as np
+
+    from src.signals.signal_analytics import SignalAnalytics, SignalPanel, quantile_returns, rank_ic
+
+    rng = np.random.default_rng(0)
+    signal = rng.normal(size=(40, 8))
+    fwd = signal * 0.01 + rng.normal(scale=1e-4, size=signal.shape)
+    signal[3, 2] = np.nan
+    ic = rank_ic(signal, fwd)
+    brute = [
+        pd.Series(signal[i]).corr(pd.Series(fwd[i]), method="spearman") for i in range(len(signal))
+    ]
+    np.testing.assert_allclose(ic, brute, atol=1e-12)
+    q = quantile_returns(signal, fwd, n_quantiles=4)
+    assert (q[:, -1] > q[:, 0]).all()
+
+    dates = pd.date_range("2024-01-01", periods=40)
+    close = 100 * np.cumprod(1 + rng.normal(scale=0.01, size=(40, 8)), axis=0)
+    tickers = [f"T{i}" for i in range(8)]
+    prices = pd.DataFrame(
+        {"date": np.repeat(dates, 8), "ticker": tickers * 40, "close": close.ravel()}
+    )
+    signals = prices[["date", "ticker"]].assign(trend_alpha=signal.ravel(), vol_alpha=rng.normal(size=320))
+    panel = SignalPanel.from_frames(prices, signals)
+    analytics = SignalAnalytics(cache_dir=tmp_path, horizons=(1, 5))
+    summary, reports = analytics.run(panel)
+    assert set(summary["signal"]) == {"trend_alpha", "vol_alpha"}
+    assert {"ic_h1", "ic_h5", "spread", "turnover"} <= set(reports["trend_alpha"].columns)
+    assert analytics.misses == 2
+
+    panel.signals["vol_alpha"] = panel.signals["vol_alpha"] * 2.0
+    _, again = analytics.run(panel)
+    assert analytics.hits == 1 and analytics.misses == 3
+    pd.testing.assert_frame_equal(again["trend_alpha"], reports["trend_alpha"])
+
+
+def test_parameter_sweeps_match_single_calls():
+    import numpy as np
+
+    from src.signals.sweeps import sweep_mean_reversion, sweep_panel_ic, sweep_sharpe, sweep_trend
+
+    rng = np.random.default_rng(1)
+    close = pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, 200)))
+    feats = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=200), "close": close})
+    for w in (3, 5, 10):
+        feats[f"ret_{w}d"] = close.pct_change(w)
+    for w in (10, 20):
+        feats[f"sma_{w}"] = close.rolling(w, min_periods=w).mean()
+
+    mr = sweep_mean_reversion(feats, lookback=[3, 5, 10], z_threshold=[0.5, 1.0, 2.0])
+    assert mr.scores.shape == (200, 9)
+    for p, row in mr.params.iterrows():
+        single = compute_mean_reversion_alpha(feats, lookback=int(row.lookback), z_threshold=row.z_threshold)
+        np.testing.assert_allclose(mr.scores[:, p], single.to_numpy())
+
+    tr = sweep_trend(feats, fast=[10], slow=[20, 30])
+    np.testing.assert_allclose(tr.scores[:, 0], compute_trend_alpha(feats, fast=10, slow=20).to_numpy())
+    assert sweep_sharpe(tr, close.to_numpy()).shape == (2,)
+
+    from src.signals.signal_analytics import forward_returns, rank_ic
+
+    dates = feats["date"]
+    panel = {}
+    for i in range(5):
+        px = pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, 200)))
+        panel[f"T{i}"] = pd.DataFrame({"date": dates, "close": px, **{f"ret_{w}d": px.pct_change(w) for w in (3, 5)}})
+    # one ticker starts late, so dates are not shared by every name
+    panel["T4"] = panel["T4"].iloc[30:].reset_index(drop=True)
+    grid = {"lookback": [3, 5], "z_threshold": [0.5, 1.0]}
+    ic = sweep_panel_ic(panel, "mean_reversion_alpha", grid)
+    assert list(ic.columns) == ["lookback", "z_threshold", "mean_ic", "ic_ir"] and len(ic) == 4
+
+    close = pd.DataFrame({t: df.set_index("date")["close"] for t, df in panel.items()}).reindex(dates)
+    fwd = forward_returns(close.to_numpy(), 1)
+    for _, row in ic.iterrows():
+        params = {"lookback": int(row.lookback), "z_threshold": row.z_threshold}
+        scores = pd.DataFrame(
+            {
+                t: pd.Series(compute_mean_reversion_alpha(df, **params).to_numpy(), index=df["date"])
+                for t, df in panel.items()
+            }
+        ).reindex(dates)
+        single = rank_ic(scores.to_numpy(), fwd)
+        assert np.isfinite(single).sum() > 150
+        np.testing.assert_allclose(row.mean_ic, np.nanmean(single))
+        np.testing.assert_allclose(row.ic_ir, np.nanmean(single) / np.nanstd(single, ddof=1))
+    chunked = sweep_panel_ic(panel, "mean_reversion_alpha", grid, chunk_params=1)
+    pd.testing.assert_frame_equal(chunked, ic)
+
+
+def test_signal_registry_plans_and_computes_only_needed_features():
+    import numpy as np
+
+    from src.features.lazy import LazyFeatures
+    from src.signals.registry import compute_signals, plan_signals
+
+    rng = np.random.default_rng(2)
+    n = 120
+    close = pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, n)))
+    dates = pd.date_range("2024-01-01", periods=n)
+    bars = pd.DataFrame({"date": dates, "ticker": "AAA", "close": close})
+    bench = LazyFeatures(pd.DataFrame({"date": dates, "ticker": "SPY", "close": close * 0.9 + 5}))
+
+    plan = plan_signals(["trend_alpha", "vol_alpha"], model_columns=["momentum_20"])
+    assert plan.columns.index("ret_1d") < plan.columns.index("realized_vol_20")
+    assert "ret_5d" not in plan.columns and not plan.needs_benchmark
+    assert plan.warmup == 20 + 1 + 59
+
+    features = LazyFeatures(bars)
+    out = compute_signals(features, plan)
+    assert list(out.columns) == ["date", "ticker", "trend_alpha", "vol_alpha", "momentum_20"]
+    # ret_1d computed once and shared; nothing outside the plan
+    assert features.computed.count("ret_1d") == 1
+    assert set(features.computed) <= set(plan.columns)
+
+    reference = bars.copy()
+    reference["sma_20"] = close.rolling(20, min_periods=20).mean()
+    reference["sma_50"] = close.rolling(50, min_periods=50).mean()
+    reference["realized_vol_20"] = close.pct_change().rolling(20, min_periods=20).std() * np.sqrt(252)
+    np.testing.assert_allclose(out["trend_alpha"], compute_trend_alpha(reference))
+    np.testing.assert_allclose(out["vol_alpha"], compute_volatility_alpha(reference))
+
+    rel = compute_signals(LazyFeatures(bars, benchmark=bench), plan_signals(["rel_strength_alpha"]))
+    expected = close.pct_change(20) - (close * 0.9 + 5).pct_change(20)
+    np.testing.assert_allclose(rel["rel_strength_alpha"], compute_relative_strength_alpha(
+        pd.DataFrame({"rel_ret_vs_benchmark_20": expected})
+    ))
+
+
+def test_signal_windows_count_sessions_on_intraday_bars():
+    import numpy as np
+
+    from src.core.frequency import get_frequency
+    from src.features.lazy import LazyFeatures
+    from src.signals.registry import compute_signals, plan_signals
+
+    freq = get_frequency("15min")
+    rng = np.random.default_rng(3)
+    n = 26 * 8
+    feats = pd.DataFrame({"ret_2d": rng.normal(0, 0.01, n), "realized_vol_20": np.abs(rng.normal(0.2, 0.05, n))})
+    window = freq.bars(2)
+    expected = -(feats["ret_2d"] - feats["ret_2d"].rolling(window).mean()) / feats["ret_2d"].rolling(window).std()
+    score = compute_mean_reversion_alpha(feats, lookback=2, frequency=freq)
+    assert (score.iloc[: window - 1] == 0).all()
+    np.testing.assert_allclose(score.iloc[window - 1 :], expected.clip(-1, 1).iloc[window - 1 :])
+
+    params = {"mean_reversion_alpha": {"lookback": 2}, "vol_alpha": {"lookback": 3}}
+    plan = plan_signals(["mean_reversion_alpha", "vol_alpha"], params, frequency=freq)
+    assert plan.warmup == 20 + 1 + freq.bars(3) - 1
+    out = compute_signals(LazyFeatures(feats), plan)
+    np.testing.assert_allclose(out["mean_reversion_alpha"], score)
+    vol = compute_volatility_alpha(feats, lookback=3, frequency=freq)
+    np.testing.assert_allclose(out["vol_alpha"], vol)
+    assert (vol.iloc[: freq.bars(3) - 1] == 0).all() and vol.iloc[freq.bars(3) - 1 :].ne(0).any()
+
+
+def test_lazy_build_signals_reads_bars_from_data_sources_paths(tmp_path):
+    import numpy as np
+    import yaml
+
+    from src.core.io import write_parquet
+    from src.pipeline.build_signals import build_signals
+
+    rng = np.random.default_rng(4)
+    dates = pd.date_range("2024-01-01", periods=80)
+    for ticker in ["AAA", "SPY"]:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+        bars = pd.DataFrame({"date": dates, "ticker": ticker, "close": close})
+        write_parquet(bars, tmp_path / "root" / "bars" / f"{ticker}_clean.parquet")
+    data_sources = {
+        "data_root": str(tmp_path / "root"),
+        "processed_files": {"directory": "bars", "pattern": "{ticker}_clean.parquet"},
+    }
+    settings = {
+        "tickers": ["AAA"],
+        "benchmark": "SPY",
+        "paths": {"data_root": str(tmp_path / "elsewhere"), "signals_dir": str(tmp_path / "signals")},
+        "signals": {"lazy": True, "enabled": ["trend_alpha", "rel_strength_alpha"]},
+    }
+    (tmp_path / "settings.yaml").write_text(yaml.safe_dump(settings))
+    (tmp_path / "data_sources.yaml").write_text(yaml.safe_dump(data_sources))
+
+    written = build_signals(settings_path=tmp_path / "settings.yaml", data_sources_path=tmp_path / "data_sources.yaml")
+    signals = pd.read_parquet(written[0])
+    assert list(signals.columns) == ["date", "ticker", "trend_alpha", "rel_strength_alpha"]
+    assert signals["rel_strength_alpha"].notna().any()
+
+
+def test_signal_analytics_stage_uses_data_sources_and_day_joins(tmp_path):
+    import numpy as np
+    import yaml
+
+    from src.core.io import write_parquet
+    from src.pipeline.run_signal_analytics import run_signal_analytics
+
+    rng = np.random.default_rng(6)
+    dates = pd.date_range("2024-01-01", periods=60)
+    tickers = ["T0", "T1", "T2", "T3"]
+    for ticker in tickers:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+        frame = pd.DataFrame({"date": dates, "ticker": ticker, "close": close})
+        write_parquet(frame, tmp_path / "root" / "bars" / f"{ticker}.parquet")
+        write_parquet(
+            frame[["date", "ticker"]].assign(trend_alpha=rng.normal(size=len(dates))),
+            tmp_path / "signals" / f"{ticker}.parquet",
+        )
+        # predictions carry string dates: a plain merge on date would match nothing
+        p_up = rng.uniform(size=len(dates))
+        preds = pd.DataFrame(
+            {
+                "date": dates.strftime("%Y-%m-%d"),
+                "ticker": ticker,
+                "horizon": 1,
+                "prob_state_p1": p_up,
+                "prob_state_m1": 1 - p_up,
+            }
+        )
+        write_parquet(preds, tmp_path / "preds" / f"{ticker}.parquet")
+    data_sources = {"data_root": str(tmp_path / "root"), "processed_files": {"directory": "bars"}}
+    settings = {
+        "tickers": tickers,
+        "paths": {
+            "data_root": str(tmp_path / "elsewhere"),
+            "signals_dir": str(tmp_path / "signals"),
+            "predictions_dir": str(tmp_path / "preds"),
+            "signal_analytics_dir": str(tmp_path / "analytics"),
+        },
+        "signal_analytics": {"horizons": [1]},
+    }
+    (tmp_path / "settings.yaml").write_text(yaml.safe_dump(settings))
+    (tmp_path / "data_sources.yaml").write_text(yaml.safe_dump(data_sources))
+
+    run_signal_analytics(settings_path=tmp_path / "settings.yaml", data_sources_path=tmp_path / "data_sources.yaml")
+    report = pd.read_parquet(tmp_path / "analytics" / "ml_signal.parquet")
+    assert report["ic_h1"].notna().sum() > 50
@@ -0,0 +1,91 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.core.io import read_parquet, write_parquet
+from src.core.telemetry import get_telemetry, telemetry_run, traced
+from src.features.volume_features import build_volume_features
+
+
+@traced("stage", name="toy_stage")
+def _toy_stage(path):
+    bars = pd.DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=500, freq="D"),
+            "ticker": "TST",
+            "volume": np.arange(500, dtype=float) + 1.0,
+        }
+    )
+    written = write_parquet(bars, path)
+    features = build_volume_features(read_parquet(written), lookback=20)
+    return features.iloc[:100]
+
+
+def test_telemetry_records_nested_spans_report_and_trace(tmp_path):
+    out_dir = tmp_path / "telemetry"
+    with telemetry_run(out_dir, memory="tracemalloc") as telemetry:
+        result = _toy_stage(tmp_path / "bars.parquet")
+        with telemetry.span("alloc") as span:
+            buf = np.ones(1_000_000)
+        del buf
+    assert get_telemetry() is None
+    assert len(result) == 100
+
+    report = json.loads((out_dir / "report.json").read_text())
+    spans = {s["name"]: s for s in report["spans"]}
+    size = (tmp_path / "bars.parquet").stat().st_size
+    assert spans["io.write_parquet"]["bytes_written"] == size
+    assert spans["io.read_parquet"]["bytes_read"] == size
+    assert spans["io.read_parquet"]["rows_out"] == 500
+    assert spans["volume_features.build_volume_features"]["rows_in"] == 500
+    assert spans["toy_stage"]["rows_out"] == 100
+    assert spans["toy_stage"]["depth"] == spans["run"]["depth"] + 1
+    assert spans["io.read_parquet"]["depth"] == spans["toy_stage"]["depth"] + 1
+    assert spans["toy_stage"]["wall_s"] >= spans["io.read_parquet"]["wall_s"]
+    # the nested allocation peak propagates to every enclosing span
+    assert spans["alloc"]["mem_peak_delta"] == span.mem_peak_delta >= 8_000_000
+    assert spans["run"]["mem_peak_delta"] >= 8_000_000
+    assert [s["name"] for s in report["stages"]] == ["toy_stage"]
+    assert {f["name"] for f in report["functions"]} >= {"io.read_parquet", "io.write_parquet", "toy_stage"}
+
+    trace = json.loads((out_dir / "trace.json").read_text())
+    events = {e["name"]: e for e in trace["traceEvents"]}
+    assert events["toy_stage"]["ph"] == "X"
+    stage, read = events["toy_stage"], events["io.read_parquet"]
+    assert stage["ts"] <= read["ts"] and read["ts"] + read["dur"] <= stage["ts"] + stage["dur"] + 1e-3
+    assert read["args"]["bytes_read"] == size
+
+
+def test_traced_errors_are_recorded_and_reraised(tmp_path):
+    @traced("stage", name="boom")
+    def boom():
+        raise KeyError("x")
+
+    with telemetry_run(None) as telemetry:
+        try:
+            boom()
+        except KeyError:
+            pass
+    assert [s.error for s in telemetry.spans if s.name == "boom"] == ["KeyError"]
+
+
+def test_disabled_telemetry_overhead_is_negligible():
+    def raw(x):
+        return x
+
+    wrapped = traced("hot")(raw)
+    n = 200_000
+
+    def per_call(fn):
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for i in range(n):
+                fn(i)
+            best = min(best, (time.perf_counter() - start) / n)
+        return best
+
+    assert get_telemetry() is None
+    assert per_call(wrapped) - per_call(raw) < 1e-6